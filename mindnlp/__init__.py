@@ -26,10 +26,17 @@ from mindspore import jit as ms_jit
 from mindnlp import injection
 from mindnlp import transformers
 from mindnlp.dataset import load_dataset
-from mindnlp.workflow.workflow import Workflow
 from mindnlp.vocab import Vocab
 
 if mindspore.get_context('device_target') == 'Ascend':
     mindspore.set_context(ascend_config={"jit_compile": False})
 
-__all__ = ['ms_jit', 'load_dataset', 'Workflow', 'Vocab']
+__all__ = ['ms_jit', 'load_dataset', 'Workflow', 'Vocab']  # pylint: disable=undefined-all-variable
+
+
+def __getattr__(name):
+    # the works of `Workflow` import model packages, which `import mindnlp` should not load
+    if name == 'Workflow':
+        from mindnlp.workflow.workflow import Workflow  # pylint: disable=import-outside-toplevel
+        return Workflow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -19,6 +19,9 @@ load
 """
 import os
 from typing import Union, Optional, Dict, Sequence, Mapping
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from mindspore.dataset import GeneratorDataset
 from datasets import load_dataset as hf_load
 from datasets import Dataset, IterableDataset, Split, Features, \
@@ -42,12 +45,207 @@ class TransferDataset():
         self.column_names = column_names
 
     def __getitem__(self, index):
-        return tuple(self.ds[int(index)][name] for name in self.column_names)
+        data = self.ds[int(index)]
+        return tuple(data[name] for name in self.column_names)
 
     def __len__(self):
         return self.ds.num_rows
 
 
+def _pad_list_array(array, padding, max_length, pad_value):
+    """Converts an Arrow list array to a 2-D numpy array, padding or truncating the rows when required."""
+    lengths = pc.list_value_length(array).to_numpy(zero_copy_only=False)
+    values = array.flatten().to_numpy(zero_copy_only=False)
+    longest = int(lengths.max()) if len(lengths) else 0
+
+    if padding == 'max_length':
+        if max_length is None:
+            raise ValueError("`max_length` must be set when `padding='max_length'`.")
+        target = max_length
+    else:
+        target = longest if max_length is None else min(longest, max_length)
+
+    if lengths.size and (lengths == target).all():
+        # rectangular batch, the flattened values are already in row-major order
+        return values.reshape(len(lengths), target)
+    if not padding and (max_length is None or longest <= max_length):
+        raise ValueError("Rows of a batch have different lengths, set `padding` to pad them to a common length.")
+
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    row_ids = np.repeat(np.arange(len(lengths)), lengths)
+    col_ids = np.arange(len(values)) - np.repeat(offsets[:-1], lengths)
+    keep = col_ids < target
+    out = np.full((len(lengths), target), pad_value, dtype=values.dtype)
+    out[row_ids[keep], col_ids[keep]] = values[keep]
+    return out
+
+
+def _column_to_numpy(column, padding=False, max_length=None, pad_value=0):
+    """
+    Converts an Arrow column of a batch to numpy. Primitive columns without nulls are converted with zero copy,
+    list columns are converted to 2-D arrays.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+    if pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+        return _pad_list_array(column, padding, max_length, pad_value)
+    if pa.types.is_fixed_size_list(column.type):
+        return column.flatten().to_numpy(zero_copy_only=False).reshape(len(column), column.type.list_size)
+    array = column.to_numpy(zero_copy_only=False)
+    if array.dtype == object:
+        # strings and other python objects are passed to MindSpore as numpy strings
+        array = array.astype(np.str_)
+    return array
+
+
+def _check_batch_args(batch_size, padding):
+    if batch_size <= 0:
+        raise ValueError(f"`batch_size` should be a positive integer, but got {batch_size}.")
+    if padding not in (False, True, 'longest', 'max_length'):
+        raise ValueError(f"`padding` should be one of False, True, 'longest' and 'max_length', but got {padding}.")
+
+
+def _batch_to_numpy(table, column_names, padding=False, max_length=None, pad_value=0):
+    """Converts an Arrow table holding one batch to a tuple of numpy arrays."""
+    return tuple(_column_to_numpy(table.column(name), padding, max_length, pad_value) for name in column_names)
+
+
+class BatchedTransferIterableDataset():
+    """
+    Batched source for Huggingface IterableDataset, see `BatchedTransferDataset`. Shuffling and bucketing are not
+    supported for streamed datasets.
+    """
+    def __init__(self, arrow_ds, column_names, batch_size, drop_remainder=False, padding=False, max_length=None,
+                 pad_value=0):
+        _check_batch_args(batch_size, padding)
+        self.ds = arrow_ds
+        self.column_names = column_names
+        self.batch_size = batch_size
+        self.drop_remainder = drop_remainder
+        self.padding = padding
+        self.max_length = max_length
+        self.pad_value = pad_value
+
+    def __iter__(self):
+        for batch in self.ds.iter(batch_size=self.batch_size, drop_last_batch=self.drop_remainder):
+            table = pa.table({name: batch[name] for name in self.column_names})
+            yield _batch_to_numpy(table, self.column_names, self.padding, self.max_length, self.pad_value)
+
+
+class BatchedTransferDataset():
+    """
+    Batched source for Huggingface Dataset.
+
+    Instead of decoding one row at a time, whole batches are sliced from the underlying Arrow table and converted
+    to numpy column by column. Contiguous slices are used when `shuffle` is False, otherwise each epoch gathers
+    the rows of a random permutation with a single Arrow `take` per batch. The `GeneratorDataset` built on this
+    source is already batched.
+
+    Args:
+        arrow_ds (Dataset): The Huggingface dataset.
+        column_names (list[str]): The columns to yield.
+        batch_size (int): Number of rows in each batch.
+        shuffle (bool): Whether to shuffle the rows at each epoch. Default: False.
+        drop_remainder (bool): Whether to drop the last incomplete batch (of each bucket). Default: False.
+        padding (Union[bool, str]): Padding of the list columns. `True` or `'longest'` pads to the longest row of
+            the batch, `'max_length'` pads to `max_length`. Batches with rows of different lengths can not be
+            yielded without padding. Default: False.
+        max_length (int): Rows longer than `max_length` are truncated. Default: None.
+        pad_value (Union[int, float]): Value used for padding. Default: 0.
+        bucket_boundaries (list[int]): Group the rows by the length of `length_column`: bucket `i` holds the rows
+            whose length is in `[bucket_boundaries[i-1], bucket_boundaries[i])`. Every batch is drawn from a single
+            bucket and padded to `bucket_boundaries[i] - 1`, the rows longer than the last boundary are padded as
+            set by `padding`. Default: None.
+        length_column (str): The list column whose length is used for bucketing. Default: None.
+        seed (int): Seed of the shuffling. Default: None.
+    """
+    def __init__(self, arrow_ds, column_names, batch_size, shuffle=False, drop_remainder=False,
+                 padding=False, max_length=None, pad_value=0, bucket_boundaries=None, length_column=None,
+                 seed=None):
+        _check_batch_args(batch_size, padding)
+        if bucket_boundaries is not None:
+            if length_column is None:
+                raise ValueError("`length_column` must be set when `bucket_boundaries` is set.")
+            if list(bucket_boundaries) != sorted(bucket_boundaries):
+                raise ValueError("`bucket_boundaries` should be sorted in increasing order.")
+
+        self.ds = arrow_ds
+        self.column_names = column_names
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_remainder = drop_remainder
+        self.padding = padding
+        self.max_length = max_length
+        self.pad_value = pad_value
+        self.bucket_boundaries = bucket_boundaries
+        self.rng = np.random.default_rng(seed)
+
+        self._bucket_ids = None
+        if bucket_boundaries is not None:
+            column = self.ds.with_format('arrow', columns=[length_column])[0:self.ds.num_rows][length_column]
+            lengths = pc.list_value_length(column).to_numpy(zero_copy_only=False)
+            self._bucket_ids = np.digitize(lengths, bucket_boundaries)
+
+    def _table(self, key):
+        """Rows `key` of the dataset as an Arrow table, taking the indices mapping of the dataset into account."""
+        return self.ds.with_format('arrow', columns=self.column_names)[key]
+
+    def _batch_indices(self):
+        """Row indices of each batch for one epoch, `None` stands for the contiguous slices."""
+        num_rows = self.ds.num_rows
+        indices = self.rng.permutation(num_rows) if self.shuffle else np.arange(num_rows)
+        if self._bucket_ids is None:
+            if not self.shuffle:
+                return None
+            groups = [indices]
+        else:
+            bucket_ids = self._bucket_ids[indices]
+            groups = [indices[bucket_ids == bucket] for bucket in np.unique(bucket_ids)]
+
+        batches = []
+        for group in groups:
+            stop = len(group) - len(group) % self.batch_size if self.drop_remainder else len(group)
+            batches.extend(group[start:start + self.batch_size] for start in range(0, stop, self.batch_size))
+        if self.shuffle and len(groups) > 1:
+            batches = [batches[idx] for idx in self.rng.permutation(len(batches))]
+        return batches
+
+    def _padding_length(self, bucket_id):
+        if self.bucket_boundaries is None or bucket_id >= len(self.bucket_boundaries):
+            return self.padding, self.max_length
+        # pad every batch of a bucket to the bucket boundary
+        max_length = self.bucket_boundaries[bucket_id] - 1
+        if self.max_length is not None:
+            max_length = min(max_length, self.max_length)
+        return 'max_length', max_length
+
+    def _convert(self, table, bucket_id=None):
+        padding, max_length = self._padding_length(bucket_id)
+        return _batch_to_numpy(table, self.column_names, padding, max_length, self.pad_value)
+
+    def __iter__(self):
+        batches = self._batch_indices()
+        if batches is None:
+            num_rows = self.ds.num_rows
+            stop = num_rows - num_rows % self.batch_size if self.drop_remainder else num_rows
+            for start in range(0, stop, self.batch_size):
+                yield self._convert(self._table(slice(start, min(start + self.batch_size, stop))))
+            return
+
+        for indices in batches:
+            bucket_id = None if self._bucket_ids is None else self._bucket_ids[indices[0]]
+            yield self._convert(self._table(indices.tolist()), bucket_id)
+
+    def __len__(self):
+        if self._bucket_ids is None:
+            sizes = [self.ds.num_rows]
+        else:
+            sizes = np.bincount(self._bucket_ids)
+        if self.drop_remainder:
+            return int(sum(size // self.batch_size for size in sizes))
+        return int(sum(-(-size // self.batch_size) for size in sizes))
+
+
 def load_dataset(
     path: str,
     name: Optional[str] = None,
@@ -181,6 +379,11 @@ def load_dataset(
             Keyword arguments to be passed to the `BuilderConfig`
             and used in the [`DatasetBuilder`].
 
+            The following keys configure the returned `GeneratorDataset` instead: `shuffle`, and to read the
+            data in batches of Arrow columns instead of row by row, `batch_size`, `drop_remainder`, `padding`,
+            `max_length`, `pad_value`, `bucket_boundaries`, `length_column` and `seed` (see
+            `BatchedTransferDataset`). The dataset returned with `batch_size` is already batched.
+
     Returns:
         [`GeneratorDataset`] or [`Dict`]:
         - if `split` is not `None`: the dataset requested,
@@ -228,6 +431,11 @@ def load_dataset(
     ```
     """
     shuffle = config_kwargs.get('shuffle', False)
+    batch_size = config_kwargs.get('batch_size', None)
+    batch_kwargs = {key: config_kwargs[key] for key in ('drop_remainder', 'padding', 'max_length', 'pad_value')
+                    if key in config_kwargs}
+    bucket_kwargs = {key: config_kwargs[key] for key in ('bucket_boundaries', 'length_column', 'seed')
+                     if key in config_kwargs}
     if cache_dir is None:
         cache_dir = os.path.join(DEFAULT_ROOT, "datasets", path)
 
@@ -260,13 +468,21 @@ def load_dataset(
 
     for key, raw_ds in ds_dict.items():
         column_names = list(raw_ds.features.keys())
-        source = TransferDataset(raw_ds, column_names) if isinstance(raw_ds, Dataset) \
-            else TransferIterableDataset(raw_ds, column_names)
+        if batch_size is None:
+            source = TransferDataset(raw_ds, column_names) if isinstance(raw_ds, Dataset) \
+                else TransferIterableDataset(raw_ds, column_names)
+            source_shuffle = shuffle
+        else:
+            # batches are shuffled by the source itself
+            source = BatchedTransferDataset(raw_ds, column_names, batch_size, shuffle, **batch_kwargs,
+                                            **bucket_kwargs) if isinstance(raw_ds, Dataset) \
+                else BatchedTransferIterableDataset(raw_ds, column_names, batch_size, **batch_kwargs)
+            source_shuffle = False
         ms_ds = GeneratorDataset(
             source=source,
             column_names=column_names,
-            shuffle=shuffle,
-            num_parallel_workers=num_proc if num_proc else 1)
+            shuffle=source_shuffle,
+            num_parallel_workers=num_proc if num_proc and batch_size is None else 1)
         datasets_dict[key] = ms_ds
 
     if len(datasets_dict) == 1:
@@ -18,6 +18,7 @@
 Trainer for training.
 """
 import os
+import time
 from typing import Optional, List, Union
 from inspect import signature
 from tqdm.autonotebook import tqdm
@@ -68,6 +69,17 @@ class Trainer:
         callbacks (Optional[list[Callback], Callback]): List of callback objects which should be executed
             while training. Default: None.
         jit (bool): Whether use Just-In-Time compile.
+        gradient_accumulation_steps (int): Number of micro-batches whose gradients are accumulated before
+            each optimizer update. Default: 1.
+        logging_steps (int): Number of steps between two synchronizations of the training loss to the host,
+            which update `run_context.loss` and the progress bar. The loss is always synchronized at the end
+            of each epoch. Default: 1.
+
+    During training, `run_context.step_time` holds the wall time in seconds spent by the last step waiting for
+    data (`'data'`), running the train step (`'compute'`) and running the callbacks (`'callbacks'`), and
+    `run_context.epoch_time` holds their totals over the current epoch. Since the train step is launched
+    asynchronously, the device time of the steps between two loss synchronizations is charged to the
+    `'compute'` time of the step that synchronizes.
 
     """
 
@@ -86,6 +98,14 @@ class Trainer:
         epochs = kwargs.pop('epochs', None)
         jit = kwargs.pop('jit', False)
         check_gradients = kwargs.pop('check_gradients', False)
+        gradient_accumulation_steps = kwargs.pop('gradient_accumulation_steps',
+                                                 getattr(args, 'gradient_accumulation_steps', 1))
+        logging_steps = kwargs.pop('logging_steps', getattr(args, 'logging_steps', 1))
+        if gradient_accumulation_steps < 1:
+            raise ValueError(f'`gradient_accumulation_steps` should be a positive integer, '
+                             f'but got {gradient_accumulation_steps}.')
+        if logging_steps < 1:
+            raise ValueError(f'`logging_steps` should be a positive integer, but got {logging_steps}.')
 
         if jit and 'MS' not in str(network.__class__.__name__):
             raise ValueError(f'{network.__class__.__name__} do not support static graph via jit compile, '
@@ -93,6 +113,8 @@ class Trainer:
         # deprecated args
         self.jit = jit
         self.check_gradients = check_gradients
+        self.gradient_accumulation_steps = gradient_accumulation_steps
+        self.logging_steps = logging_steps
 
         if isinstance(train_dataset, TakeDataset):
             logger.warning("The `train_dataset` is split after the 'batch' operation, "
@@ -105,6 +127,8 @@ class Trainer:
         self.optimizer = optimizer
         self.forward_fn = None
         self.train_fn = None
+        # (input columns, target columns) bound to the network arguments, built on the first batch.
+        self._data_binding = None
 
         if loss_fn is None:
             self.obj_network = True
@@ -135,7 +159,8 @@ class Trainer:
 
         if self.train_fn is None:
             self.train_fn = get_default_train_step_fn(self.forward_fn, self.optimizer, self.loss_scaler,
-                                                      self.check_gradients or self.amp_level != 'O0', self.jit, self.obj_network)
+                                                      self.check_gradients or self.amp_level != 'O0', self.jit, self.obj_network,
+                                                      self.gradient_accumulation_steps)
 
     def _prepare_callbacks(self, callbacks):
         if isinstance(callbacks, Callback):
@@ -217,6 +242,7 @@ class Trainer:
             K_CONTEXT.set_backend_policy('ms')
 
         total = self.train_dataset.get_dataset_size()
+        self._data_binding = None
         # train epoch begin
         for epoch in range(0, self.epochs):
             self.network.set_train()
@@ -227,25 +253,45 @@ class Trainer:
             if self.earlystop is True:
                 break
             self.callback_manager.train_epoch_begin(run_context)
+            epoch_time = {'data': 0.0, 'compute': 0.0, 'callbacks': 0.0}
+            run_context.epoch_time = epoch_time
             with tqdm(total=total) as progress:
                 progress.set_description(f'Epoch {epoch}')
+                # the loss is summed on device and only copied to host every `logging_steps` steps.
                 loss_total = 0
+                iterator = self.train_dataset.create_dict_iterator()
+                data_begin = time.perf_counter()
                 # step begin
-                for data in self.train_dataset.create_dict_iterator():
+                for data in iterator:
                     data, tgts = self._data_process(data, tgt_columns)
+                    step_begin = time.perf_counter()
                     run_context.cur_step_nums += 1
                     self.cur_step_nums += 1
                     self.callback_manager.train_step_begin(run_context)
+                    compute_begin = time.perf_counter()
                     if self.obj_network:
                         loss = self.train_fn(**data)
                     else:
                         loss = self.train_fn(tgts, **data)
                     loss_total += loss
-                    run_context.loss = loss_total/self.cur_step_nums
-                    progress.set_postfix(loss=loss_total/self.cur_step_nums)
+                    if self.cur_step_nums % self.logging_steps == 0 or self.cur_step_nums == total:
+                        self._log_loss(run_context, progress, loss_total)
+                    compute_end = time.perf_counter()
                     progress.update(1)
                     # step end
                     self.callback_manager.train_step_end(run_context)
+                    data_end = time.perf_counter()
+                    step_time = {
+                        'data': step_begin - data_begin,
+                        'compute': compute_end - compute_begin,
+                        'callbacks': (compute_begin - step_begin) + (data_end - compute_end),
+                    }
+                    for key, value in step_time.items():
+                        epoch_time[key] += value
+                    run_context.step_time = step_time
+                    data_begin = time.perf_counter()
+                if self.cur_step_nums % self.logging_steps != 0 and self.cur_step_nums != total:
+                    self._log_loss(run_context, progress, loss_total)
             # train epoch end
             progress.close()
             self.callback_manager.train_epoch_end(run_context)
@@ -260,6 +306,12 @@ class Trainer:
             K_CONTEXT.set_backend_policy('ge')
             K_CONTEXT.set_backend_policy('ms')
 
+    def _log_loss(self, run_context, progress, loss_total):
+        """Synchronize the average loss of the current epoch to the host."""
+        loss = float(loss_total.asnumpy()) / self.cur_step_nums
+        run_context.loss = loss
+        progress.set_postfix(loss=loss)
+
     def _run_ds_sink(self, train_dataset, eval_dataset, list_callback,
                      cb_params, print_steps, eval_steps):
         """Training process for data sinking mode."""
@@ -286,41 +338,54 @@ class Trainer:
 
     def _data_process(self, data, tgt_columns):
         """Process data match the network construct"""
+        if self._data_binding is None:
+            self._data_binding = self._bind_data_columns(data.keys(), tgt_columns)
+        input_columns, tgt_columns = self._data_binding
+
+        inputs = {arg: data[arg] for arg in input_columns if arg in data}
+        if self.obj_network:
+            return inputs, None
+        tgts = tuple(data[tgt_column] for tgt_column in tgt_columns)
+        return inputs, mutable(tgts)
+
+    def _bind_data_columns(self, data_columns, tgt_columns):
+        """
+        Match the dataset columns with the arguments of the network construct once, the binding is reused
+        by the following steps.
+        """
         # prepare input dataset.
         sig = signature(self.network.construct)
         net_args = sig.parameters
 
-        inputs = {}
+        input_columns = []
         used_col = set()
         for arg in net_args:
             if arg in ('self', 'kwargs'):
                 continue
-            if arg not in data.keys():
+            if arg not in data_columns:
                 if str(net_args[arg])[-4:] != 'None':
                     raise ValueError(f'network inputs need `{arg}`, but not found in dataset columns.')
             else:
-                inputs[arg] = data.get(arg)
+                input_columns.append(arg)
                 used_col.add(arg)
 
         if self.obj_network:
-            return inputs, None
+            return input_columns, None
 
         # process target dataset.
-        tgts = ()
         tgt_columns = self._prepare_tgt_columns(tgt_columns)
         for tgt_column in tgt_columns:
-            if tgt_column in data:
-                tgts += (data.get(tgt_column),)
+            if tgt_column in data_columns:
                 used_col.add(tgt_column)
             else:
                 raise ValueError(f'Not found `{tgt_column}` in dataset, please check dataset column names.')
 
-        remain_data_keys = set(data.keys()) - used_col
+        remain_data_keys = set(data_columns) - used_col
 
         if remain_data_keys:
             logger.warning(f'{remain_data_keys} is not match inputs arguments of network or function.')
 
-        return inputs, mutable(tgts)
+        return input_columns, tgt_columns
 
     def _prepare_tgt_columns(self, tgt_columns):
         """Check and prepare target columns for training."""
@@ -20,6 +20,7 @@ from mindspore import ops, value_and_grad
 
 from mindnlp import ms_jit
 from mindnlp._legacy.amp import all_finite, init_status
+from mindnlp.modules.accumulator import Accumulator
 from mindnlp.utils import ModelOutput
 
 def get_default_forward_fn_with_loss_fn(network, loss_fn, loss_scaler):
@@ -59,9 +60,28 @@ def get_default_forward_fn_without_loss_fn(network, loss_scaler):
 
     return forward_fn
 
-def get_default_train_step_fn(forward_fn, optimizer, loss_scaler, check_gradients, jit, for_object_net=False):
-    """get default train function"""
+def get_default_train_step_fn(forward_fn, optimizer, loss_scaler, check_gradients, jit, for_object_net=False,
+                              accumulate_step=1):
+    """
+    get default train function
+
+    When `accumulate_step` > 1, the gradients of each micro-batch are averaged into an `Accumulator` inside
+    the step function and the optimizer only updates the weights every `accumulate_step` calls.
+    """
     grad_fn = value_and_grad(forward_fn, None, optimizer.parameters, has_aux=False)
+    if accumulate_step < 1:
+        raise ValueError(f'`accumulate_step` should be a positive integer, but got {accumulate_step}.')
+    if accumulate_step > 1:
+        update_fn = Accumulator(optimizer, accumulate_step)
+        grad_scale = 1.0 / accumulate_step
+        hyper_map = ops.HyperMap()
+    else:
+        update_fn = optimizer
+
+    def update(grads):
+        if accumulate_step > 1:
+            grads = hyper_map(ops.partial(ops.mul, grad_scale), grads)
+        return update_fn(grads)
 
     def default_run_step(labels, *args, **kwargs):
         """Core process of each step, including the forward propagation process and back propagation of data."""
@@ -72,10 +92,10 @@ def get_default_train_step_fn(forward_fn, optimizer, loss_scaler, check_gradient
             is_finite = all_finite(grads, status)
             if is_finite:
                 grads = loss_scaler.unscale(grads)
-                optimizer(grads)
+                update(grads)
             loss_scaler.adjust(is_finite)
         else:
-            optimizer(grads)
+            update(grads)
         return loss
 
     def default_run_step_for_obj_net(*args, **kwargs):
@@ -88,10 +108,10 @@ def get_default_train_step_fn(forward_fn, optimizer, loss_scaler, check_gradient
             is_finite = all_finite(grads, status)
             if is_finite:
                 grads = loss_scaler.unscale(grads)
-                loss = ops.depend(loss, optimizer(grads))
+                loss = ops.depend(loss, update(grads))
             loss = ops.depend(loss, loss_scaler.adjust(is_finite))
         else:
-            loss = ops.depend(loss, optimizer(grads))
+            loss = ops.depend(loss, update(grads))
         return loss
 
     run_step = default_run_step_for_obj_net if for_object_net else default_run_step
@@ -19,7 +19,7 @@ from collections import Counter
 import numpy as np
 
 from mindnlp.abc import Metric
-from .utils import _check_value_type
+from .utils import _check_value_type, _encode_tokens, _ngram_hashes, _run_starts
 
 class BleuScore(Metric):
     r"""
@@ -129,19 +129,10 @@ class BleuScore(Metric):
             ref_len_list = [len(ref) for ref in references]
             ref_len_diff = [abs(len(candidate) - x) for x in ref_len_list]
             self.bp_r += ref_len_list[ref_len_diff.index(min(ref_len_diff))]
-            candidate_counter = count_ngram(candidate, self.n_size)
-            reference_counter = Counter()
 
-            for ref in references:
-                reference_counter |= count_ngram(ref, self.n_size)
-
-            ngram_counter_clip = candidate_counter & reference_counter
-
-            for counter_clip in ngram_counter_clip:
-                self.numerator[len(counter_clip) - 1] += ngram_counter_clip[counter_clip]
-
-            for counter in candidate_counter:
-                self.denominator[len(counter) - 1] += candidate_counter[counter]
+        numerator, denominator = _clipped_ngram_counts(cand, ref_list, self.n_size)
+        self.numerator += numerator
+        self.denominator += denominator
 
         self.cand_len = np.array(self.bp_c)
         self.ref_len = np.array(self.bp_r)
@@ -185,6 +176,57 @@ def count_ngram(input_list, n_gram):
     return ngram_counter
 
 
+def _clipped_ngram_counts(cand, ref_list, n_size):
+    """
+    Counts the clipped and the total candidate n-grams of a batch, for each n-gram order.
+
+    The n-gram of a candidate is clipped to its maximum count in any of its references. All
+    the sentences are integer-encoded once and their n-grams hashed, with the index of the
+    candidate as seed, so the `Counter` operations of the whole batch reduce to sorting.
+
+    Args:
+        cand (list): A list of tokenized candidate sentences.
+        ref_list (list): For each candidate, a list of tokenized reference sentences.
+        n_size (int): The maximum n-gram order.
+
+    Returns:
+        - **numerator** (np.ndarray) - The clipped n-gram count of each order.
+        - **denominator** (np.ndarray) - The candidate n-gram count of each order.
+    """
+    numerator = np.zeros(n_size)
+    denominator = np.zeros(n_size)
+
+    refs = [ref for references in ref_list for ref in references]
+    ids, lengths = _encode_tokens(cand + refs)
+    owners = np.concatenate([np.arange(len(cand)),
+                             np.repeat(np.arange(len(cand)), [len(references) for references in ref_list])])
+
+    for order in range(1, n_size + 1):
+        hashes, sentences = _ngram_hashes(ids, lengths, order, seeds=owners)
+        is_cand = sentences < len(cand)
+        cand_hashes, cand_counts = np.unique(hashes[is_cand], return_counts=True)
+        denominator[order - 1] = cand_counts.sum()
+        if not cand_hashes.size or is_cand.all():
+            continue
+
+        # count each n-gram per reference, then keep its maximum over the references
+        ref_hashes, ref_sentences = hashes[~is_cand], sentences[~is_cand]
+        sort_idx = np.lexsort((ref_sentences, ref_hashes))
+        ref_hashes, ref_sentences = ref_hashes[sort_idx], ref_sentences[sort_idx]
+        starts = _run_starts(ref_hashes, ref_sentences)
+        counts = np.diff(np.append(starts, len(ref_hashes)))
+        ref_hashes = ref_hashes[starts]
+        starts = _run_starts(ref_hashes)
+        max_counts = np.maximum.reduceat(counts, starts)
+        ref_hashes = ref_hashes[starts]
+
+        pos = np.minimum(np.searchsorted(ref_hashes, cand_hashes), len(ref_hashes) - 1)
+        found = ref_hashes[pos] == cand_hashes
+        numerator[order - 1] = np.where(found, np.minimum(cand_counts, max_counts[pos]), 0).sum()
+
+    return numerator, denominator
+
+
 def bleu_fn(cand, ref_list, n_size=4, weights=None):
     r"""
     Calculates the BLEU score. BLEU (bilingual evaluation understudy) is a metric
@@ -239,8 +281,6 @@ def bleu_fn(cand, ref_list, n_size=4, weights=None):
         raise ValueError(f'`cand` and `ref_list` should be equal in length, but got {len(cand)}'
                          f', {len(ref_list)}')
 
-    numerator = np.zeros(n_size)
-    denominator = np.zeros(n_size)
     precision_scores = np.zeros(n_size)
     bp_c = 0.0
     bp_r = 0.0
@@ -252,19 +292,8 @@ def bleu_fn(cand, ref_list, n_size=4, weights=None):
         ref_len_list = [len(ref) for ref in references]
         ref_len_diff = [abs(len(candidate) - x) for x in ref_len_list]
         bp_r += ref_len_list[ref_len_diff.index(min(ref_len_diff))]
-        candidate_counter = count_ngram(candidate, n_size)
-        reference_counter = Counter()
-
-        for ref in references:
-            reference_counter |= count_ngram(ref, n_size)
-
-        ngram_counter_clip = candidate_counter & reference_counter
-
-        for counter_clip in ngram_counter_clip:
-            numerator[len(counter_clip) - 1] += ngram_counter_clip[counter_clip]
 
-        for counter in candidate_counter:
-            denominator[len(counter) - 1] += candidate_counter[counter]
+    numerator, denominator = _clipped_ngram_counts(cand, ref_list, n_size)
 
     cand_len = np.array(bp_c)
     ref_len = np.array(bp_r)
@@ -15,8 +15,9 @@
 """"Class for Metric Distinct"""
 
 
+import numpy as np
 from mindnlp.abc import Metric
-from .utils import _check_value_type
+from .utils import _check_value_type, _encode_tokens, _ngram_hashes
 
 def distinct_fn(cand_list, n_size=2):
     """
@@ -43,15 +44,10 @@ def distinct_fn(cand_list, n_size=2):
     cand_list = _check_value_type("cand_list", cand_list, list)
     n_size = _check_value_type("n_size", n_size, [int])
 
-    diff_ngram = set()
-    count = 0.0
+    ids, lengths = _encode_tokens([cand_list])
+    hashes, _ = _ngram_hashes(ids, lengths, n_size)
 
-    for i in range(0, len(cand_list) - n_size + 1):
-        ngram = ' '.join(cand_list[i:(i + n_size)])
-        count += 1
-        diff_ngram.add(ngram)
-
-    distinct_score = len(diff_ngram) / count
+    distinct_score = len(np.unique(hashes)) / float(len(hashes))
     return distinct_score
 
 
@@ -82,11 +78,13 @@ class Distinct(Metric):
         self.n_size = _check_value_type("n_size", n_size, [int])
         self.diff_ngram = set()
         self.count = 0.0
+        self._token_ids = {}
 
     def clear(self):
         """Clears the internal evaluation results."""
         self.diff_ngram = set()
         self.count = 0.0
+        self._token_ids = {}
 
     def update(self, *inputs):
         """
@@ -108,10 +106,11 @@ class Distinct(Metric):
 
         cand_list = _check_value_type("cand_list", cand_list, list)
 
-        for i in range(0, len(cand_list) - self.n_size + 1):
-            ngram = ' '.join(cand_list[i:(i + self.n_size)])
-            self.count += 1
-            self.diff_ngram.add(ngram)
+        # token ids are kept across updates, so the n-gram hashes stay comparable
+        ids, lengths = _encode_tokens([cand_list], self._token_ids)
+        hashes, _ = _ngram_hashes(ids, lengths, self.n_size)
+        self.count += len(hashes)
+        self.diff_ngram.update(hashes.tolist())
 
     def eval(self):
         """
@@ -16,18 +16,37 @@
 
 import numpy as np
 from mindnlp.abc import Metric
-from .utils import _check_value_type
+from .utils import _check_value_type, _encode_tokens, _ngram_hashes, _run_starts
 
 
-def _get_ngrams(words, n_size=1):
+def _lcs_lengths(cand, refs):
     """
-    Calculates n-gram for multiple sentences.
+    Calculates the length of the longest common subsequence of cand and each of refs.
+
+    Uses the bit-parallel algorithm of Hyyrö: the DP column over `cand` is kept as the
+    bits of one integer, so each token of a reference costs a few integer operations
+    instead of a loop over `cand`.
+
+    Args:
+        cand (list): The tokenized candidate sentence.
+        refs (list): A list of tokenized reference sentences.
+
+    Returns:
+        - **lengths** (list) - The LCS length of `cand` and each reference.
     """
-    ngram_set = set()
-    max_start = len(words) - n_size
-    for i in range(max_start + 1):
-        ngram_set.add(tuple(words[i:i + n_size]))
-    return ngram_set
+    match_masks = {}
+    for idx, token in enumerate(cand):
+        match_masks[token] = match_masks.get(token, 0) | (1 << idx)
+    full_mask = (1 << len(cand)) - 1
+
+    lengths = []
+    for ref in refs:
+        column = full_mask
+        for token in ref:
+            matches = column & match_masks.get(token, 0)
+            column = ((column + matches) | (column - matches)) & full_mask
+        lengths.append(len(cand) - bin(column).count('1'))
+    return lengths
 
 def _lcs(strg, sub):
     """
@@ -41,18 +60,65 @@ def _lcs(strg, sub):
         - **length** (float) - The length of the longest common subsequence
                                 of string and sub.
     """
-    if len(strg) < len(sub):
-        sub, strg = strg, sub
-    lengths = np.zeros((len(strg) + 1, len(sub) + 1))
-    for j in range(1, len(sub) + 1):
-        for i in range(1, len(strg) + 1):
-            if strg[i - 1] == sub[j - 1]:
-                lengths[i][j] = lengths[i - 1][j - 1] + 1
-            else:
-                lengths[i][j] = max(lengths[i - 1][j], lengths[i][j - 1])
+    return float(_lcs_lengths(strg, [sub])[0])
+
+def _rouge_l_score(cand, refs, beta):
+    """
+    Calculates the ROUGE-L score of one candidate against its references.
+    """
+    precs, recalls = [], []
+    for ref, basic_lcs in zip(refs, np.array(_lcs_lengths(cand, refs), np.float64)):
+        precs.append(basic_lcs / len(cand))
+        recalls.append(basic_lcs / len(ref))
+
+    prec_max = max(precs)
+    rec_max = max(recalls)
+
+    if prec_max != 0 and rec_max != 0:
+        return ((1 + beta**2) * prec_max * rec_max) / float(rec_max + beta**2 * prec_max)
+    return 0.0
+
+def _rouge_n_counts(cands, refs_list, n_size):
+    """
+    Counts the overlapping and the reference n-grams of a batch of candidates.
+
+    All the sentences are integer-encoded once and their n-grams hashed, with the index of
+    the candidate as seed, so the set intersections of the whole batch reduce to one
+    `np.isin` over the distinct n-grams of each reference.
+
+    Args:
+        cands (list): A list of tokenized candidate sentences.
+        refs_list (list): For each candidate, a list of tokenized reference sentences.
+        n_size (int): N_gram value.
+
+    Returns:
+        - **overlap_count** (int) - The number of distinct reference n-grams found in the candidate.
+        - **ref_count** (int) - The number of distinct reference n-grams.
+    """
+    refs = [ref for references in refs_list for ref in references]
+    ids, lengths = _encode_tokens(cands + refs)
+    owners = np.concatenate([np.arange(len(cands)),
+                             np.repeat(np.arange(len(cands)), [len(references) for references in refs_list])])
+    hashes, sentences = _ngram_hashes(ids, lengths, n_size, seeds=owners)
 
-    length = lengths[len(strg)][len(sub)]
-    return length
+    is_cand = sentences < len(cands)
+    cand_hashes = np.unique(hashes[is_cand])
+    ref_hashes, ref_sentences = hashes[~is_cand], sentences[~is_cand]
+    order = np.lexsort((ref_hashes, ref_sentences))
+    ref_hashes = ref_hashes[order][_run_starts(ref_hashes[order], ref_sentences[order])]
+
+    return int(np.isin(ref_hashes, cand_hashes).sum()), len(ref_hashes)
+
+def _as_batch(name, cand_list, ref_list):
+    """
+    Wraps a single candidate and its references as a batch of one.
+    """
+    if cand_list and isinstance(cand_list[0], list):
+        if len(cand_list) != len(ref_list):
+            raise ValueError(f'For `{name}.update`, `cand_list` and `ref_list` should be equal in '
+                             f'length, but got {len(cand_list)}, {len(ref_list)}')
+        return cand_list, ref_list
+    return [cand_list], [ref_list]
 
 
 def rouge_n_fn(cand_list, ref_list, n_size=1):
@@ -86,17 +152,7 @@ def rouge_n_fn(cand_list, ref_list, n_size=1):
     ref_list = _check_value_type("ref_list", ref_list, list)
     n_size = _check_value_type("n_size", n_size, [int])
 
-    overlap_count = 0
-    ref_count = 0
-
-    cand_ngrams = _get_ngrams(cand_list, n_size)
-    for reference in ref_list:
-        ref_ngrams = _get_ngrams(reference, n_size)
-        ref_count += len(ref_ngrams)
-
-        # Gets the overlapping ngrams between evaluated and reference
-        overlap_ngrams = cand_ngrams.intersection(ref_ngrams)
-        overlap_count += len(overlap_ngrams)
+    overlap_count, ref_count = _rouge_n_counts([cand_list], [ref_list], n_size)
 
     if ref_count == 0:
         raise RuntimeError(f'ROUGE-N can not be calculated, because the number of references is {0}')
@@ -145,25 +201,7 @@ def rouge_l_fn(cand_list, ref_list, beta=1.2):
     ref_list = _check_value_type("ref_list", ref_list, list)
     beta = _check_value_type("beta", beta, [float])
 
-    inst_scores = []
-
-    precs, recalls = [], []
-    for ref in ref_list:
-        basic_lcs = _lcs(cand_list, ref)
-        prec = basic_lcs / len(cand_list) if cand_list is not None else 0.
-        rec = basic_lcs / len(ref) if ref is not None else 0.
-        precs.append(prec)
-        recalls.append(rec)
-
-    prec_max = max(precs)
-    rec_max = max(recalls)
-
-    if prec_max != 0 and rec_max != 0:
-        score = ((1 + beta**2) * prec_max * rec_max) / \
-                float(rec_max + beta**2 * prec_max)
-    else:
-        score = 0.0
-    inst_scores.append(score)
+    inst_scores = [_rouge_l_score(cand_list, ref_list, beta)]
 
     rougel_score = 1. * sum(inst_scores) / len(inst_scores)
 
@@ -210,11 +248,13 @@ class RougeN(Metric):
         Args:
             inputs: Input `cand_list` and `ref_list`.
 
-                - cand_list (list): A list of tokenized candidate sentence.
-                - ref_list (list): A list of lists of tokenized ground truth sentences.
+                - cand_list (list): A list of tokenized candidate sentence, or a batch of them.
+                - ref_list (list): A list of lists of tokenized ground truth sentences, or one such
+                  list per candidate of the batch.
 
         Raises:
             ValueError: If the number of inputs is not 2.
+            ValueError: If the batch sizes of `cand_list` and `ref_list` are not equal.
 
         """
         if len(inputs) != 2:
@@ -227,14 +267,10 @@ class RougeN(Metric):
         cand_list = _check_value_type("cand_list", cand_list, list)
         ref_list = _check_value_type("ref_list", ref_list, list)
 
-        cand_ngrams = _get_ngrams(cand_list, self.n_size)
-        for reference in ref_list:
-            ref_ngrams = _get_ngrams(reference, self.n_size)
-            self.ref_count += len(ref_ngrams)
-
-            # Gets the overlapping ngrams between evaluated and reference
-            overlap_ngrams = cand_ngrams.intersection(ref_ngrams)
-            self.overlap_count += len(overlap_ngrams)
+        cand_list, ref_list = _as_batch('RougeN', cand_list, ref_list)
+        overlap_count, ref_count = _rouge_n_counts(cand_list, ref_list, self.n_size)
+        self.overlap_count += overlap_count
+        self.ref_count += ref_count
 
     def eval(self):
         """
@@ -310,11 +346,13 @@ class RougeL(Metric):
 
         Args:
             inputs: Input `cand_list` and `ref_list`.
-                    cand_list (list): A list of tokenized candidate sentence.
-                    ref_list (list): A list of lists of tokenized ground truth sentences.
+                    cand_list (list): A list of tokenized candidate sentence, or a batch of them.
+                    ref_list (list): A list of lists of tokenized ground truth sentences, or one such
+                    list per candidate of the batch.
 
         Raises:
             ValueError: If the number of inputs is not 2.
+            ValueError: If the batch sizes of `cand_list` and `ref_list` are not equal.
 
         """
         if len(inputs) != 2:
@@ -327,23 +365,9 @@ class RougeL(Metric):
         cand_list = _check_value_type("cand_list", cand_list, list)
         ref_list = _check_value_type("ref_list", ref_list, list)
 
-        precs, recalls = [], []
-        for ref in ref_list:
-            basic_lcs = _lcs(cand_list, ref)
-            prec = basic_lcs / len(cand_list) if cand_list is not None else 0.
-            rec = basic_lcs / len(ref) if ref is not None else 0.
-            precs.append(prec)
-            recalls.append(rec)
-
-        prec_max = max(precs)
-        rec_max = max(recalls)
-
-        if prec_max != 0 and rec_max != 0:
-            score = ((1 + self.bias**2) * prec_max * rec_max) / \
-                    float(rec_max + self.bias**2 * prec_max)
-        else:
-            score = 0.0
-        self.inst_scores.append(score)
+        cand_list, ref_list = _as_batch('RougeL', cand_list, ref_list)
+        for cand, refs in zip(cand_list, ref_list):
+            self.inst_scores.append(_rouge_l_score(cand, refs, self.bias))
 
     def eval(self):
         """
@@ -116,3 +116,70 @@ def _get_rank(raw_list):
     for i, k in enumerate(sort_x):
         rank_x[k] = i + 1
     return rank_x
+
+
+_NGRAM_HASH_PRIME = np.uint64(0x100000001b3)
+
+
+def _encode_tokens(sentences, token_ids=None):
+    """
+    Integer-encodes tokenized sentences into one flat array.
+
+    Args:
+        sentences (list): A list of tokenized sentences.
+        token_ids (dict): The token to id mapping to extend, pass the same dict to keep ids
+            stable across calls. Default: None.
+
+    Returns:
+        - **ids** (np.ndarray) - The uint64 ids of all the tokens, sentence after sentence.
+        - **lengths** (np.ndarray) - The length of each sentence.
+    """
+    token_ids = {} if token_ids is None else token_ids
+    lengths = np.fromiter((len(sentence) for sentence in sentences), np.int64, len(sentences))
+    ids = [token_ids.setdefault(token, len(token_ids)) for sentence in sentences for token in sentence]
+    return np.array(ids, np.uint64), lengths
+
+
+def _ngram_hashes(ids, lengths, n_size, seeds=None):
+    """
+    Hashes the n-grams of integer-encoded sentences, without crossing sentence boundaries.
+
+    The hash is a polynomial rolling hash over uint64, seeded per sentence so that n-grams
+    of different groups (e.g. different candidates) never compare equal.
+
+    Args:
+        ids (np.ndarray): The uint64 token ids returned by `_encode_tokens`.
+        lengths (np.ndarray): The length of each sentence.
+        n_size (int): N_gram value.
+        seeds (np.ndarray): The uint64 seed of each sentence. Default: None, all zeros.
+
+    Returns:
+        - **hashes** (np.ndarray) - The hash of each n-gram.
+        - **sentences** (np.ndarray) - The index of the sentence of each n-gram.
+    """
+    num_starts = len(ids) - n_size + 1
+    if num_starts <= 0:
+        return np.zeros(0, np.uint64), np.zeros(0, np.int64)
+
+    ends = np.cumsum(lengths)
+    sentences = np.repeat(np.arange(len(lengths)), lengths)[:num_starts]
+    valid = np.arange(num_starts) + n_size <= ends[sentences]
+
+    if seeds is None:
+        hashes = np.zeros(num_starts, np.uint64)
+    else:
+        hashes = np.asarray(seeds, np.uint64)[sentences]
+    for offset in range(n_size):
+        hashes = hashes * _NGRAM_HASH_PRIME + ids[offset:offset + num_starts] + np.uint64(1)
+
+    return hashes[valid], sentences[valid]
+
+
+def _run_starts(*keys):
+    """
+    Returns the start index of each run of equal rows in sorted, aligned key arrays.
+    """
+    changed = np.zeros(max(len(keys[0]) - 1, 0), bool)
+    for key in keys:
+        changed |= key[1:] != key[:-1]
+    return np.flatnonzero(np.concatenate([np.ones(min(len(keys[0]), 1), bool), changed]))
@@ -16,6 +16,7 @@
 
 """crf module"""
 
+import numpy as np
 import mindspore
 from mindspore import nn, ops, Tensor
 from mindspore import Parameter
@@ -275,31 +276,56 @@ class CRF(nn.Cell):
         # shape: (batch_size, num_tags)
         score += self.end_transitions
 
+        # stack the backpointers once, so that the traceback gathers them for the whole batch at each step
+        # shape: (seq_length - 1, batch_size, num_tags)
+        if history:
+            history = ops.stack(history)
+
         return score, history
 
+    @staticmethod
+    def batch_post_decode(score, history, seq_length, pad_tag=0):
+        """Trace back the best tag sequences of the whole batch based on the score and history tensors.
+
+        Args:
+            score (Tensor): Viterbi score of size ``(batch_size, num_tags)``.
+            history (Union[Tensor, tuple[Tensor]]): Backpointers of size ``(seq_length - 1, batch_size, num_tags)``,
+                or the tuple of their ``seq_length - 1`` steps.
+            seq_length (Tensor): Length of each sequence, of size ``(batch_size,)``.
+            pad_tag (int): Tag used to pad the sequences shorter than the longest one. Default: 0.
+
+        Returns:
+            Tuple of the best tags, a Tensor of size ``(batch_size, seq_length)`` padded with ``pad_tag``, and of the
+            length of each sequence.
+        """
+        score = score.asnumpy()
+        seq_ends = seq_length.asnumpy().astype(np.int64) - 1
+        if isinstance(history, (tuple, list)):
+            history = np.stack([hist.asnumpy() for hist in history]) if history else None
+        elif history is not None:
+            history = history.asnumpy()
+
+        batch_size = score.shape[0]
+        max_length = 1 if history is None else history.shape[0] + 1
+        batch_idx = np.arange(batch_size)
+        best_tags = np.full((batch_size, max_length), pad_tag, dtype=np.int64)
+
+        # Find the tag which maximizes the score at the last timestep; this is our best tag for the last timestep
+        best_last_tag = score.argmax(axis=1)
+        best_tags[batch_idx, seq_ends] = best_last_tag
+        # We trace back where the best last tags come from, one step for the whole batch at a time; a sequence
+        # starts its traceback at the step before its last timestep
+        for idx in range(max_length - 2, -1, -1):
+            active = idx < seq_ends
+            best_last_tag = np.where(active, history[idx, batch_idx, best_last_tag], best_last_tag)
+            best_tags[active, idx] = best_last_tag[active]
+
+        return Tensor(best_tags), Tensor(seq_ends + 1)
+
     @staticmethod
     def post_decode(score, history, seq_length):
         """Trace back the best tag sequence based on the score and history tensors."""
-        # Now, compute the best path for each sample
-        batch_size = seq_length.shape[0]
-        seq_ends = seq_length - 1
-        # shape: (batch_size,)
-        best_tags_list = []
-
-        for idx in range(batch_size):
-            # Find the tag which maximizes the score at the last timestep; this is our best tag
-            # for the last timestep
-            best_last_tag = score[idx].argmax(axis=0)
-            best_tags = [best_last_tag]
-            # We trace back where the best last tag comes from, append that to our best tag
-            # sequence, and trace it back again, and so on
-            for hist in reversed(history[:seq_ends[idx]]):
-                best_last_tag = hist[idx][best_tags[-1]]
-                best_tags.append(best_last_tag)
-            # Reverse the order because we start from the last timestep
-            best_tags.reverse()
-            best_tags_list.append(best_tags)
-
-        return best_tags_list
+        best_tags, seq_length = CRF.batch_post_decode(score, history, seq_length)
+        return [tags[:length] for tags, length in zip(best_tags.asnumpy().tolist(), seq_length.asnumpy().tolist())]
 
 __all__ = ["CRF", "sequence_mask"]
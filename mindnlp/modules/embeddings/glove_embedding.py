@@ -18,17 +18,19 @@ import os
 import re
 import json
 import logging
-from itertools import islice
 import numpy as np
 from mindspore import ops
 from mindspore import Tensor
 from mindnlp.utils import get_from_cache, unzip
+from mindnlp.vocab import Vocab
 from mindnlp.abc.modules.embedding import TokenEmbedding
 from mindnlp.configs import DEFAULT_ROOT
 from mindnlp._legacy.nn import Dropout
+from .utils import load_vectors, select_vectors
 
 JSON_FILENAME = 'glove_hyper.json'
 EMBED_FILENAME = 'glove.txt'
+NPY_FILENAME = 'glove.npy'
 logging.getLogger().setLevel(logging.INFO)
 
 
@@ -68,7 +70,8 @@ class Glove(TokenEmbedding):
         self.dropout_p = dropout
 
     @classmethod
-    def from_pretrained(cls, name='6B', dims=300, root=DEFAULT_ROOT, special_first=True, **kwargs):
+    def from_pretrained(cls, name='6B', dims=300, root=DEFAULT_ROOT, special_first=True,
+                        vocab=None, return_vocab=False, **kwargs):
         r"""
         Creates Embedding instance from given pre-trained word vector.
 
@@ -79,12 +82,21 @@ class Glove(TokenEmbedding):
             special_first (bool): Indicates whether special participles from special_tokens will be added to
                 the top of the dictionary. If True, add special_tokens to the beginning of the dictionary,
                 otherwise add them to the end. Default: True.
+            vocab (Vocab): Only load the vectors of the tokens in this vocabulary, row `i` of the embedding
+                is the vector of the token with index `i` and tokens without a vector get zeros.
+                `special_first` is ignored. Default: None, load all the vectors.
+            return_vocab (bool): Whether to also return the vocabulary of the embedding. Default: False.
             kwargs (dict):
                 - requires_grad (bool): Whether this parameter needs to be gradient to update.
                 - dropout (float): Dropout of the output of Embedding.
 
         Returns:
             - Glove, Returns an embedding instance generated through a pretrained word vector.
+            - Vocab, The vocabulary of the embedding, only returned when `return_vocab` is True.
+
+        Note:
+            The first load writes a binary cache (a `.npy` matrix and a `.vocab.json` token index)
+            next to the vector file, later loads memory-map it instead of parsing the text.
 
         """
         if name not in cls.urls:
@@ -103,25 +115,25 @@ class Glove(TokenEmbedding):
 
         glove_file_path = os.path.join(cache_dir, glove_file_name)
 
-        embeddings = []
-        with open(glove_file_path, encoding='utf-8') as file:
-            for line in file:
-                _, embedding = line.split(maxsplit=1)
-                embeddings.append(np.fromstring(embedding, dtype=np.float32, sep=' '))
-
-        if special_first:
-            embeddings.insert(0, np.random.rand(dims))
-            embeddings.insert(1, np.zeros((dims,), np.float32))
+        tokens, matrix = load_vectors(glove_file_path, dims, skip_header=False)
+        if vocab is not None:
+            embeddings = select_vectors(tokens, matrix, vocab)
         else:
-            embeddings.append(np.random.rand(dims))
-            embeddings.append(np.zeros((dims,), np.float32))
-
-        embeddings = np.array(embeddings).astype(np.float32)
+            special_embeddings = np.stack([np.random.rand(dims), np.zeros((dims,))]).astype(np.float32)
+            if special_first:
+                embeddings = np.concatenate([special_embeddings, matrix])
+            else:
+                embeddings = np.concatenate([matrix, special_embeddings])
+            if return_vocab:
+                vocab = Vocab(tokens, ["<pad>", "<unk>"], special_first)
 
         requires_grad = kwargs.get('requires_grad', True)
         dropout = kwargs.get('dropout', 0.0)
 
-        return cls(Tensor(embeddings), requires_grad, dropout)
+        embedding = cls(Tensor(embeddings), requires_grad, dropout)
+        if return_vocab:
+            return embedding, vocab
+        return embedding
 
     def construct(self, ids):
         r"""
@@ -155,7 +167,7 @@ class Glove(TokenEmbedding):
         folder = os.path.join(root, 'embeddings', 'Glove', 'save', foldername)
         os.makedirs(folder, exist_ok=True)
 
-        embed = self.embed
+        embed = self.embed.asnumpy()
         embed_list = embed
         nums = self._embed_len
         dims = self._embed_dim
@@ -177,6 +189,8 @@ class Glove(TokenEmbedding):
             file.seek(0)
             file.write(f'{nums} {dims}')
 
+        np.save(os.path.join(folder, NPY_FILENAME), embed)
+
         logging.info('Embedding has been saved to %s', folder)
 
     @classmethod
@@ -194,10 +208,14 @@ class Glove(TokenEmbedding):
         Returns:
             None
 
+        Note:
+            The matrix is memory-mapped from the `.npy` copy written by `save`. Folders saved
+            without it are parsed from text once, and the `.npy` copy is written for later loads.
+
         """
 
         if load_npy:
-            load_embed = np.load(npy_path)
+            load_embed = np.load(npy_path, mmap_mode='r')
 
             return cls(Tensor(load_embed))
 
@@ -208,13 +226,14 @@ class Glove(TokenEmbedding):
         with open(os.path.join(folder, JSON_FILENAME), 'r', encoding='utf-8') as file:
             hyper = json.load(file)
 
-        embeddings = []
-        with open(os.path.join(folder, EMBED_FILENAME), encoding='utf-8') as file:
-            for line in islice(file, 1, None):
-                embedding = line.rstrip('\n')
-                embeddings.append(np.fromstring(embedding, dtype=np.float32, sep=' '))
-
-        embeddings = np.array(embeddings).astype(np.float32)
+        npy_file = os.path.join(folder, NPY_FILENAME)
+        if os.path.exists(npy_file):
+            embeddings = np.load(npy_file, mmap_mode='r')
+        else:
+            with open(os.path.join(folder, EMBED_FILENAME), encoding='utf-8') as file:
+                file.readline()
+                embeddings = np.loadtxt(file, dtype=np.float32, ndmin=2)
+            np.save(npy_file, embeddings)
 
         logging.info("Load embedding from %s", folder)
 
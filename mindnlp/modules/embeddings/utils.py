@@ -0,0 +1,173 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Binary cache for pretrained word vector files"""
+
+import os
+import json
+import logging
+import numpy as np
+
+MATRIX_SUFFIX = '.npy'
+INDEX_SUFFIX = '.vocab.json'
+
+
+def vectors_cache_paths(vectors_path):
+    r"""
+    Get the matrix and vocab index paths of the binary cache of a vector file.
+
+    Args:
+        vectors_path (str): Path of the text vector file.
+
+    Returns:
+        - tuple(str, str), The paths of the `.npy` matrix and of the vocab index.
+
+    """
+    prefix = os.path.splitext(vectors_path)[0]
+    return prefix + MATRIX_SUFFIX, prefix + INDEX_SUFFIX
+
+
+def _cache_is_valid(vectors_path, matrix_path, index_path):
+    if not (os.path.exists(matrix_path) and os.path.exists(index_path)):
+        return False
+    if not os.path.exists(vectors_path):
+        return True
+    return os.path.getmtime(vectors_path) <= min(os.path.getmtime(matrix_path), os.path.getmtime(index_path))
+
+
+def build_vectors_cache(vectors_path, dims, skip_header=False):
+    r"""
+    Parse a text vector file once and write it as a `.npy` matrix plus a vocab index.
+
+    Rows are written straight into a memory-mapped `.npy` file, so the parse never holds
+    more than one line of the matrix in memory. Tokens containing spaces are supported, as
+    the values are split from the right.
+
+    Args:
+        vectors_path (str): Path of the text vector file, one `token v1 ... vdims` per line.
+        dims (int): The dimension of the vectors.
+        skip_header (bool): Whether the first line is a `count dims` header. Default: False.
+
+    Returns:
+        - tuple(str, str), The paths of the `.npy` matrix and of the vocab index.
+
+    Raises:
+        ValueError: If a line does not hold `dims` values.
+
+    """
+    matrix_path, index_path = vectors_cache_paths(vectors_path)
+
+    with open(vectors_path, 'rb') as file:
+        if skip_header:
+            file.readline()
+        nums = sum(1 for line in file if line.strip())
+
+    tmp_matrix_path = matrix_path + '.tmp'
+    tmp_index_path = index_path + '.tmp'
+    matrix = np.lib.format.open_memmap(tmp_matrix_path, mode='w+', dtype=np.float32, shape=(nums, dims))
+    tokens = []
+    with open(vectors_path, encoding='utf-8') as file:
+        if skip_header:
+            file.readline()
+        for lineno, line in enumerate(file, 2 if skip_header else 1):
+            line = line.rstrip()
+            if not line:
+                continue
+            parts = line.rsplit(' ', dims)
+            if len(parts) != dims + 1:
+                raise ValueError(f"Expected {dims} values at line {lineno} of {vectors_path}, "
+                                 f"but got {len(parts) - 1}.")
+            matrix[len(tokens)] = np.asarray(parts[1:], dtype=np.float32)
+            tokens.append(parts[0])
+    matrix.flush()
+    del matrix
+
+    with open(tmp_index_path, 'w', encoding='utf-8') as file:
+        json.dump(tokens, file, ensure_ascii=False)
+
+    # the index is moved last, so an interrupted build is never mistaken for a valid cache
+    os.replace(tmp_matrix_path, matrix_path)
+    os.replace(tmp_index_path, index_path)
+    logging.info('Vector cache has been saved to %s', matrix_path)
+
+    return matrix_path, index_path
+
+
+def load_vectors(vectors_path, dims, skip_header=False, mmap=True):
+    r"""
+    Load the tokens and the matrix of a text vector file through its binary cache.
+
+    The cache is built on the first call, and rebuilt when the text file is newer than it.
+
+    Args:
+        vectors_path (str): Path of the text vector file.
+        dims (int): The dimension of the vectors.
+        skip_header (bool): Whether the first line is a `count dims` header. Default: False.
+        mmap (bool): Whether to memory-map the matrix instead of reading it. Default: True.
+
+    Returns:
+        - list[str], The tokens, in row order.
+        - numpy.ndarray, The `(len(tokens), dims)` float32 matrix.
+
+    """
+    matrix_path, index_path = vectors_cache_paths(vectors_path)
+    if not _cache_is_valid(vectors_path, matrix_path, index_path):
+        build_vectors_cache(vectors_path, dims, skip_header)
+
+    with open(index_path, encoding='utf-8') as file:
+        tokens = json.load(file)
+    matrix = np.load(matrix_path, mmap_mode='r' if mmap else None)
+    if matrix.shape != (len(tokens), dims):
+        raise ValueError(f"The vector cache {matrix_path} has shape {matrix.shape}, "
+                         f"but expected {(len(tokens), dims)}.")
+
+    return tokens, matrix
+
+
+def select_vectors(tokens, matrix, vocab):
+    r"""
+    Gather the rows of a vocabulary from a (memory-mapped) matrix.
+
+    Only the rows of the tokens in `vocab` are read. Tokens missing from `tokens` get
+    zero vectors.
+
+    Args:
+        tokens (list[str]): The tokens of the matrix, in row order.
+        matrix (numpy.ndarray): The `(len(tokens), dims)` matrix.
+        vocab (Vocab): The vocabulary to select, row `i` of the result is the vector of
+            the token with index `i`.
+
+    Returns:
+        - numpy.ndarray, The `(len(vocab), dims)` float32 matrix.
+
+    """
+    token_to_row = {}
+    for row, token in enumerate(tokens):
+        token_to_row.setdefault(token, row)
+
+    ids, rows = [], []
+    for token, idx in vocab.vocab.items():
+        row = token_to_row.get(token)
+        if row is not None:
+            ids.append(idx)
+            rows.append(row)
+
+    num_ids = max(vocab.vocab.values()) + 1 if len(vocab) else 0
+    embeddings = np.zeros((num_ids, matrix.shape[1]), np.float32)
+    if rows:
+        rows = np.asarray(rows)
+        order = np.argsort(rows)
+        # sorted fancy indexing reads the mapped file front to back
+        embeddings[np.asarray(ids)[order]] = matrix[rows[order]]
+    return embeddings
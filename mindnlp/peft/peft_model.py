@@ -28,6 +28,8 @@ from mindspore import nn, ops
 from mindspore.train.serialization import  _exec_save
 from mindspore.nn import CrossEntropyLoss
 
+from mindnlp.utils.serialization import save_safetensors
+
 from .config import PeftConfig, PromptLearningConfig
 
 from .tuners import (
@@ -35,7 +37,7 @@ from .tuners import (
     # LoraConfig
 )
 from .utils import (
-    # SAFETENSORS_WEIGHTS_NAME,
+    SAFETENSORS_WEIGHTS_NAME,
     # TRANSFORMERS_MODELS_TO_PREFIX_TUNING_POSTPROCESS_MAPPING,
     WEIGHTS_NAME,
     PeftType,
@@ -46,6 +48,7 @@ from .utils import (
     _set_trainable,
     # add_library_to_model_card,
     get_peft_model_state_dict,
+    get_data_list,
     # infer_device,
     load_peft_weights,
     set_peft_model_state_dict,
@@ -96,7 +99,13 @@ class PeftModel(nn.Cell):
         This function saves the adapter model and the adapter configuration files to a directory, so that it can be
         reloaded using the [`LoraModel.from_pretrained`] class method, and also used by the [`LoraModel.push_to_hub`]
         method.
+
+        Args:
+            save_directory (`str`): Directory where the adapter model and configuration files will be saved.
+            safe_serialization (`bool`, *optional*, defaults to `True`):
+                Whether to stream the adapter weights to a safetensors file instead of a MindSpore checkpoint.
         """
+        safe_serialization = kwargs.get("safe_serialization", True)
         if os.path.isfile(save_directory):
             raise ValueError(f"Provided path ({save_directory}) should be a directory, not a file")
         os.makedirs(save_directory, exist_ok=True)
@@ -111,10 +120,15 @@ class PeftModel(nn.Cell):
             output_dir = os.path.join(save_directory, adapter_name) if adapter_name != "default" else save_directory
             os.makedirs(output_dir, exist_ok=True)
 
-            _exec_save(
-                ckpt_file_name=os.path.join(output_dir, WEIGHTS_NAME),
-                data_list=output_state_dict,
-            )
+            if safe_serialization:
+                save_safetensors(
+                    output_state_dict, os.path.join(output_dir, SAFETENSORS_WEIGHTS_NAME), metadata={"format": "np"}
+                )
+            else:
+                _exec_save(
+                    ckpt_file_name=os.path.join(output_dir, WEIGHTS_NAME),
+                    data_list=get_data_list(self, output_state_dict),
+                )
 
             # save the config and change the inference mode to `True`
             if peft_config.base_model_name_or_path is None:
@@ -219,12 +233,16 @@ class PeftModel(nn.Cell):
         except AttributeError:
             return getattr(self.base_model, name)
 
-    def construct(self, *args, **kwargs):
+    def construct(self, *args, adapter_ids=None, **kwargs):
         """
         Forward pass of the model.
+
+        `adapter_ids`, an integer tensor or list of shape `(batch_size,)`, selects the adapter of each row of
+        the batch (see [`LoraModel.pack_adapters`]); `-1` runs a row through the base model only.
         """
         # print(self.get_base_model().layers[0].__class__.construct)
-        return self.get_base_model()(*args, **kwargs)
+        with self.base_model.adapter_batch(adapter_ids):
+            return self.get_base_model()(*args, **kwargs)
 
     @contextmanager
     def disable_adapter(self):
@@ -471,8 +489,10 @@ class PeftModelForCausalLM(PeftModel):
             self.base_model.model.generation_config = self.generation_config
         else:
             self.base_model.generation_config = self.generation_config
+        adapter_ids = kwargs.pop("adapter_ids", None)
         try:
-            outputs = self.base_model.generate(**kwargs)
+            with self.base_model.adapter_batch(adapter_ids):
+                outputs = self.base_model.generate(**kwargs)
         except:
             self.base_model.prepare_inputs_for_generation = self.base_model_prepare_inputs_for_generation
             raise
@@ -651,9 +671,11 @@ class PeftModelForSeq2SeqLM(PeftModel):
         self.base_model._prepare_encoder_decoder_kwargs_for_generation = (
             self._prepare_encoder_decoder_kwargs_for_generation
         )
+        adapter_ids = kwargs.pop("adapter_ids", None)
         try:
             if not isinstance(peft_config, PromptLearningConfig):
-                outputs = self.base_model.generate(**kwargs)
+                with self.base_model.adapter_batch(adapter_ids):
+                    outputs = self.base_model.generate(**kwargs)
             else:
                 if "input_ids" not in kwargs:
                     raise ValueError("input_ids must be provided for Peft model generation")
@@ -23,11 +23,15 @@
 """Lora."""
 import math
 import re
+import time
+import logging
 import warnings
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from enum import Enum
 from typing import List, Optional, Union
 
+import numpy as np
 import mindspore
 from mindspore import nn, ops
 from mindspore.common.initializer import initializer, HeUniform, Zero, Normal
@@ -51,6 +55,8 @@ from ..utils import (
 
 from .tuners_utils import BaseTuner, BaseTunerLayer
 
+logger = logging.getLogger(__name__)
+
 # if is_bnb_available():
 #     import bitsandbytes as bnb
 
@@ -167,6 +173,12 @@ class LoraModel(BaseTuner):
         # call BaseTuner.__init__
         # setup config and inject lora adapter
         super().__init__(model, config, adapter_name)
+        self.packed_adapter_names = None
+        # adapters of `peft_config` when packing, and whether all of them were packed
+        self._packed_config_names = None
+        self._packed_all_adapters = False
+        # the last adapter ids tensor checked, with the number of packed adapters and its int32 copy
+        self._checked_adapter_ids = None
 
     @staticmethod
     def _prepare_adapter_config(peft_config, model_config):
@@ -325,24 +337,179 @@ class LoraModel(BaseTuner):
 
     def set_adapter(self, adapter_name):
         """set_adapter"""
-        for module in self.model.modules():
+        for _, module in self.model.cells_and_names():
             if isinstance(module, LoraLayer):
                 if module.merged:
                     warnings.warn("Adapter cannot be set when the model is merged. Unmerging the model first.")
                     module.unmerge()
                 module.active_adapter = adapter_name
 
-    def merge_adapter(self):
-        """merge_adapter"""
-        for module in self.model.modules():
-            if isinstance(module, LoraLayer):
+    def pack_adapters(self, adapter_names=None):
+        """
+        Stack the weights of several adapters in every Lora layer, so that rows of one batch can use
+        different adapters. Index `i` of `adapter_ids` selects `adapter_names[i]`.
+
+        Args:
+            adapter_names (`List[str]`, *optional*): The adapters to pack. Defaults to all the adapters,
+                in the order they were added.
+        """
+        pack_all_adapters = adapter_names is None
+        if pack_all_adapters:
+            adapter_names = list(self.peft_config.keys())
+        for name in adapter_names:
+            if name not in self.peft_config:
+                raise ValueError(f"Adapter {name} does not exist.")
+
+        for _, module in self.model.cells_and_names():
+            if not isinstance(module, LoraLayer):
+                continue
+            if not isinstance(module, Linear):
+                raise ValueError(
+                    f"Mixed-adapter batches only support Lora `Linear` layers, but got {type(module)}."
+                )
+            if module.merged:
+                warnings.warn("Adapters cannot be packed when the model is merged. Unmerging the model first.")
+                module.unmerge()
+            module.pack_adapters(adapter_names)
+        self.packed_adapter_names = list(adapter_names)
+        self._packed_config_names = list(self.peft_config.keys())
+        self._packed_all_adapters = pack_all_adapters
+
+    @contextmanager
+    def adapter_batch(self, adapter_ids):
+        """
+        Run the Lora layers in mixed-adapter mode: row `i` of the batch uses the packed adapter
+        `adapter_ids[i]`, and rows with `-1` use the base model only. The adapters are packed on first use,
+        and packed again when adapters were added or deleted since.
+
+        Args:
+            adapter_ids (`mindspore.Tensor` or `List[int]`): Integer ids of shape `(batch_size,)`.
+        """
+        if adapter_ids is None:
+            yield
+            return
+        if self.packed_adapter_names is None:
+            self.pack_adapters()
+        elif self._packed_config_names != list(self.peft_config.keys()):
+            self.pack_adapters(None if self._packed_all_adapters else self.packed_adapter_names)
+
+        adapter_ids = self._check_adapter_ids(adapter_ids)
+        lora_layers = [module for _, module in self.model.cells_and_names() if isinstance(module, LoraLayer)]
+        try:
+            for module in lora_layers:
+                module.adapter_ids = adapter_ids
+            yield
+        finally:
+            for module in lora_layers:
+                module.adapter_ids = None
+
+    def _check_adapter_ids(self, adapter_ids):
+        """
+        Checks that `adapter_ids` select packed adapters and returns them as a flat int32 tensor. Lists are
+        checked on the host, and a tensor is only copied to the host the first time it is used, so that the
+        forward passes reusing the same ids do not wait for the device.
+        """
+        num_adapters = len(self.packed_adapter_names)
+        is_tensor = isinstance(adapter_ids, mindspore.Tensor)
+        if is_tensor:
+            checked = self._checked_adapter_ids
+            if checked is not None and checked[0] is adapter_ids and checked[1] == num_adapters:
+                return checked[2]
+            ids = adapter_ids.asnumpy().reshape(-1)
+        else:
+            ids = np.asarray(adapter_ids).reshape(-1)
+
+        invalid_ids = ids[(ids < -1) | (ids >= num_adapters)].tolist()
+        if invalid_ids:
+            raise ValueError(
+                f"`adapter_ids` must be in [-1, {num_adapters}) for the packed adapters "
+                f"{self.packed_adapter_names}, but got {invalid_ids}."
+            )
+        if not is_tensor:
+            return mindspore.Tensor(ids.astype(np.int32))
+        checked_ids = adapter_ids.astype(mindspore.int32).reshape(-1)
+        self._checked_adapter_ids = (adapter_ids, num_adapters, checked_ids)
+        return checked_ids
+
+    def construct(self, *args, adapter_ids=None, **kwargs):
+        with self.adapter_batch(adapter_ids):
+            return self.model(*args, **kwargs)
+
+    def _merge_lora_layers(self, merge=True, residual_dtype=None):
+        """
+        Merge or unmerge every Lora layer in a single streamed pass. Each delta weight is added to its
+        base parameter in place and released before the next layer, so the peak extra memory is one
+        delta weight (plus the residuals, if kept) instead of a copy of the model.
+        """
+        start = time.perf_counter()
+        num_layers, peak_delta_bytes = 0, 0
+        for _, module in self.model.cells_and_names():
+            if not isinstance(module, LoraLayer) or module.merged == merge:
+                continue
+            if merge and isinstance(module, Linear):
+                module.merge(residual_dtype)
+            elif merge:
                 module.merge()
+            else:
+                module.unmerge()
+            if module.merged == merge:
+                num_layers += 1
+                peak_delta_bytes = max(peak_delta_bytes, module.weight.nbytes)
+
+        residual_bytes = sum(
+            module.merge_residual.nbytes
+            for _, module in self.model.cells_and_names()
+            if isinstance(module, LoraLayer) and module.merge_residual is not None
+        )
+        report = {
+            "num_layers": num_layers,
+            "seconds": time.perf_counter() - start,
+            "peak_delta_bytes": peak_delta_bytes,
+            "residual_bytes": residual_bytes,
+        }
+        logger.info(
+            "%s %d Lora layers in %.3fs (peak delta %d bytes, residuals %d bytes)",
+            "Merged" if merge else "Unmerged", num_layers, report["seconds"], peak_delta_bytes, residual_bytes,
+        )
+        return report
+
+    def merge_adapter(self, residual_dtype=None):
+        """
+        Merge the active adapter into the base weights in place.
+
+        Args:
+            residual_dtype (`mindspore.dtype`, *optional*): Keep the exact inverse of the merge in this dtype,
+                so that `unmerge_adapter` restores the base weights bit for bit. See `Linear.merge`.
+
+        Returns:
+            `dict`: The number of merged layers, the elapsed seconds, the size in bytes of the largest
+            temporary delta weight and the total size in bytes of the kept residuals.
+        """
+        return self._merge_lora_layers(merge=True, residual_dtype=residual_dtype)
 
     def unmerge_adapter(self):
-        """unmerge_adapter"""
-        for module in self.model.modules():
-            if isinstance(module, LoraLayer):
-                module.unmerge()
+        """
+        Unmerge the merged adapter from the base weights in place, using the residuals when they were kept.
+
+        Returns:
+            `dict`: Same report as `merge_adapter`.
+        """
+        return self._merge_lora_layers(merge=False)
+
+    def switch_adapter(self, adapter_name, residual_dtype=None):
+        """
+        Hot switch the merged adapter: unmerge the current one, then merge `adapter_name`.
+
+        Returns:
+            `dict`: The report of the merge, with the seconds of the unmerge added.
+        """
+        if adapter_name not in self.peft_config:
+            raise ValueError(f"Adapter {adapter_name} does not exist.")
+        unmerge_report = self.unmerge_adapter()
+        self.set_adapter(adapter_name)
+        report = self.merge_adapter(residual_dtype)
+        report["seconds"] += unmerge_report["seconds"]
+        return report
 
     @staticmethod
     def _prepare_lora_config(peft_config, model_config):
@@ -367,15 +534,16 @@ class LoraModel(BaseTuner):
         if getattr(self.model, "is_loaded_in_8bit", False):
             raise ValueError("Cannot merge LORA layers when the model is loaded in 8-bit mode")
 
-        key_list = [key for key, _ in self.model.named_modules() if "lora" not in key]
+        key_list = [key for key, _ in self.model.cells_and_names() if "lora" not in key]
         for key in key_list:
             try:
                 parent, target, target_name = _get_submodules(self.model, key)
             except AttributeError:
                 continue
             if isinstance(target, LoraLayer):
+                # `_replace_module` moves the merged weight and bias to the new cell
                 if isinstance(target, nn.Embedding):
-                    new_module = nn.Embedding(target.in_channels, target.out_channels)
+                    new_module = nn.Embedding(target.vocab_size, target.embedding_size, padding_idx=target.padding_idx)
                 elif isinstance(target, nn.Conv2d):
                     new_module = nn.Conv2d(
                         target.in_channels,
@@ -390,7 +558,8 @@ class LoraModel(BaseTuner):
                     new_module = nn.Dense(target.in_channels, target.out_channels, has_bias=bias)
                 else:
                     raise ValueError(f"Not support {type(target)}.")
-                target.merge()
+                if not target.merged:
+                    target.merge()
                 self._replace_module(parent, target_name, new_module, target)
 
             # save any additional trainable modules part of `modules_to_save`
@@ -568,6 +737,11 @@ class LoraLayer(BaseTunerLayer):
         # Mark the weight as unmerged
         self.merged = False
         self.disable_adapters = False
+        # Stacked adapter weights and per-row adapter indices for mixed-adapter batches
+        self.packed_adapters = None
+        self.adapter_ids = None
+        # Exact inverse of the last merge, see `Linear.merge`
+        self.merge_residual = None
         self.in_features = in_features
         self.out_features = out_features
         self.kwargs = kwargs
@@ -712,39 +886,63 @@ class Linear(nn.Dense, LoraLayer):
         self.active_adapter = adapter_name
         self.is_target_conv_1d_layer = is_target_conv_1d_layer
 
-    def merge(self):
-        """merge"""
+    def merge(self, residual_dtype=None):
+        """
+        merge the active adapter into the weight in place.
+
+        Args:
+            residual_dtype (`mindspore.dtype`, *optional*): If set, keep `weight_before - weight_after` in
+                this dtype, so that `unmerge` restores the weight exactly instead of subtracting the delta
+                again. The restore is exact when the residual dtype holds that difference exactly:
+                `mindspore.float32` does for half precision weights unless a weight is more than 2**13 times
+                smaller than the delta added to it, `mindspore.float64` always does for float16 weights.
+        """
         if self.active_adapter not in self.lora_A.keys():
             return
         if self.merged:
             warnings.warn("Already merged. Nothing to do.")
             return
         if self.r[self.active_adapter] > 0:
-            self.weight.data += self.get_delta_weight(self.active_adapter)
+            delta = self.get_delta_weight(self.active_adapter)
+            if residual_dtype is not None:
+                original = self.weight.astype(residual_dtype)
+                if residual_dtype == self.weight.dtype:
+                    original = original.copy()
+            ops.assign_add(self.weight, delta)
+            del delta
+            if residual_dtype is not None:
+                self.merge_residual = original - self.weight.astype(residual_dtype)
             self.merged = True
 
     def unmerge(self):
-        """unmerge"""
+        """unmerge the active adapter from the weight in place."""
         if self.active_adapter not in self.lora_A.keys():
             return
         if not self.merged:
             warnings.warn("Already unmerged. Nothing to do.")
             return
         if self.r[self.active_adapter] > 0:
-            self.weight.data -= self.get_delta_weight(self.active_adapter)
+            residual = self.merge_residual
+            if residual is not None:
+                self.weight.set_data((self.weight.astype(residual.dtype) + residual).astype(self.weight.dtype))
+                self.merge_residual = None
+            else:
+                ops.assign_sub(self.weight, self.get_delta_weight(self.active_adapter))
             self.merged = False
 
     def get_delta_weight(self, adapter):
         """
-        get delta weight. Add or Sub to origin.
+        get delta weight in the dtype of the weight. Add or Sub to origin.
         """
-        return (
-            transpose(
-                self.lora_B[adapter].weight @ self.lora_A[adapter].weight,
-                self.fan_in_fan_out,
-            )
-            * self.scaling[adapter]
-        )
+        # multiply in the adapter dtype, so that low precision weights only round the product once
+        lora_A = self.lora_A[adapter].weight
+        # scale and transpose the low-rank factors, not the full-size product
+        lora_B = (self.lora_B[adapter].weight * self.scaling[adapter]).astype(lora_A.dtype)
+        if self.fan_in_fan_out:
+            delta = ops.matmul(lora_A.T, lora_B.T)
+        else:
+            delta = ops.matmul(lora_B, lora_A)
+        return delta.astype(self.weight.dtype)
 
     def extend_repr(self):
         s = f'input_channels={self.in_channels}, output_channels={self.out_channels}'
@@ -758,7 +956,64 @@ class Linear(nn.Dense, LoraLayer):
     def _linear(self, x: mindspore.Tensor) -> mindspore.Tensor:
         return ops.dense(x, transpose(self.weight, self.fan_in_fan_out), bias=self.bias)
 
+    def pack_adapters(self, adapter_names):
+        """
+        Stack the weights of several adapters for mixed-adapter batches.
+
+        Adapter `i` of `adapter_names` is stored as `A: (in_features, max_r)` and
+        `B: (max_r, out_features)` with its scaling folded into `B`, zero padded to the largest rank.
+        A last all-zero slot is used by rows that take no adapter, and by adapters not applied to this layer.
+        The stacks are copies, so they must be packed again after the adapter weights change.
+        """
+        ranks = [self.r[name] for name in adapter_names if name in self.lora_A.keys()]
+        max_r = max(ranks, default=0)
+        if max_r == 0:
+            self.packed_adapters = None
+            return
+
+        dtype = self.weight.dtype
+        for name in adapter_names:
+            if name in self.lora_A.keys():
+                dtype = self.lora_A[name].weight.dtype
+                break
+
+        num_slots = len(adapter_names) + 1
+        stacked_A = ops.zeros((num_slots, self.in_features, max_r), dtype)
+        stacked_B = ops.zeros((num_slots, max_r, self.out_features), dtype)
+        for idx, name in enumerate(adapter_names):
+            if name not in self.lora_A.keys() or self.r[name] == 0:
+                continue
+            r = self.r[name]
+            stacked_A[idx, :, :r] = self.lora_A[name].weight.T.to(dtype)
+            stacked_B[idx, :r, :] = (self.lora_B[name].weight * self.scaling[name]).T.to(dtype)
+        self.packed_adapters = (stacked_A, stacked_B)
+
+    def _mixed_lora(self, x: mindspore.Tensor) -> mindspore.Tensor:
+        """Gathered batched matmul (BGMV) of every row with the adapter selected by `adapter_ids`."""
+        stacked_A, stacked_B = self.packed_adapters
+        adapter_ids = self.adapter_ids
+        batch_size = adapter_ids.shape[0]
+        if x.shape[0] % batch_size != 0:
+            raise ValueError(
+                f"The input has {x.shape[0]} rows, which is not a multiple of the {batch_size} `adapter_ids`."
+            )
+        # -1 selects the all-zero slot
+        no_adapter = stacked_A.shape[0] - 1
+        adapter_ids = ops.where(adapter_ids < 0, ops.full_like(adapter_ids, no_adapter), adapter_ids)
+        # rows expanded for beams or flattened tokens stay contiguous per batch entry
+        rows = x.to(stacked_A.dtype).reshape(batch_size, -1, self.in_features)
+        after_A = ops.bmm(rows, ops.gather(stacked_A, adapter_ids, 0))
+        after_B = ops.bmm(after_A, ops.gather(stacked_B, adapter_ids, 0))
+        return after_B.reshape(x.shape[:-1] + (self.out_features,))
+
     def construct(self, x: mindspore.Tensor):
+        if self.adapter_ids is not None and not self.disable_adapters:
+            previous_dtype = x.dtype
+            result = self._linear(x)
+            if self.packed_adapters is not None:
+                result += self._mixed_lora(x).to(result.dtype)
+            return result.to(previous_dtype)
+
         if self.active_adapter not in self.lora_A.keys():
             return self._linear(x)
 
@@ -815,12 +1070,7 @@ class Embedding(nn.Embedding, LoraLayer):
             warnings.warn("Already unmerged. Nothing to do.")
             return
         if self.r[self.active_adapter] > 0:
-            self.weight.data -= (
-                transpose(
-                    self.lora_embedding_B[self.active_adapter] @ self.lora_embedding_A[self.active_adapter], True
-                )
-                * self.scaling[self.active_adapter]
-            )
+            ops.assign_sub(self.weight, self.get_delta_weight(self.active_adapter))
             self.merged = False
 
     def merge(self):
@@ -829,14 +1079,17 @@ class Embedding(nn.Embedding, LoraLayer):
             warnings.warn("Already merged. Nothing to do.")
             return
         if self.r[self.active_adapter] > 0:
-            self.weight.data += (
-                transpose(
-                    self.lora_embedding_B[self.active_adapter] @ self.lora_embedding_A[self.active_adapter], True
-                )
-                * self.scaling[self.active_adapter]
-            )
+            ops.assign_add(self.weight, self.get_delta_weight(self.active_adapter))
             self.merged = True
 
+    def get_delta_weight(self, adapter):
+        """
+        get delta weight in the dtype of the weight. Add or Sub to origin.
+        """
+        lora_embedding_A = self.lora_embedding_A[adapter]
+        lora_embedding_B = (self.lora_embedding_B[adapter] * self.scaling[adapter]).astype(lora_embedding_A.dtype)
+        return ops.matmul(lora_embedding_A.T, lora_embedding_B.T).astype(self.weight.dtype)
+
     def construct(self, ids: mindspore.Tensor):
         if self.disable_adapters:
             if self.r[self.active.adapter] > 0 and self.merged:
@@ -23,7 +23,7 @@ from .other import (
     COMMON_LAYERS_PATTERN,
     CONFIG_NAME,
     WEIGHTS_NAME,
-    # SAFETENSORS_WEIGHTS_NAME,
+    SAFETENSORS_WEIGHTS_NAME,
     CLAMP_QUANTILE,
     _set_trainable,
     # add_library_to_model_card,
@@ -42,4 +42,4 @@ from .other import (
     # infer_device,
 )
 # from .hub_utils import hub_file_exists
-from .save_and_load import get_peft_model_state_dict, set_peft_model_state_dict, load_peft_weights
+from .save_and_load import get_data_list, get_peft_model_state_dict, set_peft_model_state_dict, load_peft_weights
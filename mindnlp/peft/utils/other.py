@@ -291,6 +291,7 @@ TRANSFORMERS_MODELS_TO_ADALORA_TARGET_MODULES_MAPPING = {}
 
 
 WEIGHTS_NAME = "adapter_model.ckpt"
+SAFETENSORS_WEIGHTS_NAME = "adapter_model.safetensors"
 CONFIG_NAME = "adapter_config.json"
 
 CLAMP_QUANTILE = 0.99
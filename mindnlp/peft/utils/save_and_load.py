@@ -19,15 +19,21 @@ from collections import OrderedDict
 
 import mindspore
 
+from mindnlp.utils.serialization import load_checkpoint_lazy
 from .peft_types import PeftType
-from .other import WEIGHTS_NAME
+from .other import SAFETENSORS_WEIGHTS_NAME, WEIGHTS_NAME
 
-def get_data_list(model: mindspore.nn.Cell):
-    """Get state dict of the Peft model for saving."""
-    param_dict: OrderedDict = model.parameters_dict()
+def get_data_list(model: mindspore.nn.Cell, param_dict: OrderedDict = None):
+    """Get state dict of the Peft model for saving, only for the parameters in `param_dict` if given."""
+    if param_dict is None:
+        param_dict = model.parameters_dict()
     data_list = OrderedDict()  # {key: [dims, tensor_type, data]}
 
     for key, value in param_dict.items():
+        if isinstance(value, list):
+            # already converted
+            data_list[key] = value
+            continue
         data_list[key] = []
         dims = []
         if value.shape == ():
@@ -44,18 +50,36 @@ def get_data_list(model: mindspore.nn.Cell):
     return data_list
 
 
+def _get_adapter_parameters(model, config, adapter_name):
+    """
+    Parameters of the model which can belong to the state dict of an adapter, without copying any data.
+    """
+    include_bias = config.peft_type == PeftType.LORA and config.bias != "none"
+    modules_to_save = model.modules_to_save or ()
+    adapter_parameters = OrderedDict()
+    for key, value in model.parameters_dict().items():
+        if ("lora_" in key and adapter_name in key) or (include_bias and "bias" in key) \
+                or any(f"{module_name}.modules_to_save.{adapter_name}" in key for module_name in modules_to_save):
+            adapter_parameters[key] = value
+    return adapter_parameters
+
+
 def get_peft_model_state_dict(model, state_dict=None, adapter_name="default"):
     """
     Get the state dict of the Peft model.
 
+    Only the adapter parameters are looked up, and they are returned as the model `Parameter`s without being copied
+    to host, so that they can be streamed to disk one at a time.
+
     Args:
-        model ([`PeftModel`]): The Peft model. 
+        model ([`PeftModel`]): The Peft model.
+        state_dict (`dict`, *optional*): The state dict to filter, defaults to the parameters of the model.
+        adapter_name (`str`, *optional*): The name of the adapter, defaults to `"default"`.
     """
 
     config = model.peft_config[adapter_name]
     if state_dict is None:
-        # NOTE: state_dict = model.state_dict()
-        state_dict = get_data_list(model)
+        state_dict = _get_adapter_parameters(model, config, adapter_name)
     if config.peft_type == PeftType.LORA:
         # to_return = lora_state_dict(model, bias=model.peft_config.bias)
         # adapted from `https://github.com/microsoft/LoRA/blob/main/loralib/utils.py`
@@ -125,7 +149,23 @@ def set_peft_model_state_dict(model, peft_model_state_dict, adapter_name="defaul
     else:
         raise NotImplementedError
 
-    param_not_load, ckpt_not_load = mindspore.load_param_into_net(model, peft_model_state_dict)
+    # assign the adapter parameters in place, instead of matching the whole network like `load_param_into_net`
+    params = _get_adapter_parameters(model, config, adapter_name)
+    ckpt_not_load = []
+    for key, value in peft_model_state_dict.items():
+        param = params.pop(key, None)
+        if param is None:
+            ckpt_not_load.append(key)
+            continue
+        if not isinstance(value, mindspore.Tensor):
+            value = mindspore.Tensor(value)
+        if value.shape != param.shape:
+            raise ValueError(f"The shape of {key} in the adapter weights is {value.shape}, "
+                             f"but the model expects {param.shape}.")
+        if value.dtype != param.dtype:
+            value = value.astype(param.dtype)
+        param.set_data(value)
+    param_not_load = [key for key in params if "lora_" in key]
 
     return (param_not_load, ckpt_not_load)
 
@@ -140,11 +180,15 @@ def load_peft_weights(model_id: str,) -> dict:
     """
     path = model_id
 
+    if os.path.exists(os.path.join(path, SAFETENSORS_WEIGHTS_NAME)):
+        # memory-mapped, each tensor is only read when it is assigned
+        return load_checkpoint_lazy(os.path.join(path, SAFETENSORS_WEIGHTS_NAME))
+
     if os.path.exists(os.path.join(path, WEIGHTS_NAME)):
         filename = os.path.join(path, WEIGHTS_NAME)
     else:
         # TODO: add download logic later
-        raise ValueError(f"load peft model failed, peft model file: {filename} not exists.")
+        raise ValueError(f"load peft model failed, peft model file: {os.path.join(path, WEIGHTS_NAME)} not exists.")
 
     adapters_weights = mindspore.load_checkpoint(filename)
 
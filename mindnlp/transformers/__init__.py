@@ -13,16 +13,29 @@
 # limitations under the License.
 # ============================================================================
 """MindNLP Transformers"""
-from . import models, pipelines
-from .models import *
-from .pipelines import *
-from .configuration_utils import PretrainedConfig
-from .modeling_utils import PreTrainedModel
-from .tokenization_utils_base import PreTrainedTokenizerBase, SpecialTokensMixin
-from .tokenization_utils import PreTrainedTokenizer
-from .tokenization_utils_fast import PreTrainedTokenizerFast
+import sys
+from itertools import chain
 
-__all__ = ['PretrainedConfig', 'PreTrainedModel', 'PreTrainedTokenizerBase',
-           'SpecialTokensMixin', 'PreTrainedTokenizer', 'PreTrainedTokenizerFast']
-__all__.extend(models.__all__)
-__all__.extend(pipelines.__all__)
+from mindnlp.utils.import_utils import _LazyModule
+from .models._import_structure import _import_structure as _models_import_structure
+
+_import_structure = {
+    "models": list(chain(*_models_import_structure.values())),
+    "pipelines": [
+        "CsvPipelineDataFormat",
+        "JsonPipelineDataFormat",
+        "PipedPipelineDataFormat",
+        "Pipeline",
+        "PipelineDataFormat",
+        "TextClassificationPipeline",
+        "pipeline",
+    ],
+    "configuration_utils": ["PretrainedConfig"],
+    "generation": ["BatchTextIteratorStreamer", "TextIteratorStreamer", "TextStreamer"],
+    "modeling_utils": ["PreTrainedModel"],
+    "tokenization_utils_base": ["PreTrainedTokenizerBase", "SpecialTokensMixin"],
+    "tokenization_utils": ["PreTrainedTokenizer"],
+    "tokenization_utils_fast": ["PreTrainedTokenizerFast"],
+}
+
+sys.modules[__name__] = _LazyModule(__name__, globals()["__file__"], _import_structure, module_spec=__spec__)
@@ -19,7 +19,7 @@ Audio processing functions to extract features from audio waveforms. This code i
 and remove unnecessary dependencies.
 """
 import warnings
-from typing import Optional, Union
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -302,6 +302,7 @@ def spectrogram(
     db_range: Optional[float] = None,
     remove_dc_offset: Optional[bool] = None,
     dtype: np.dtype = np.float32,
+    compute_dtype: np.dtype = np.float64,
 ) -> np.ndarray:
     """
     Calculates a spectrogram over one waveform using the Short-Time Fourier Transform.
@@ -318,10 +319,10 @@ def spectrogram(
     How this works:
 
       1. The input waveform is split into frames of size `frame_length` that are partially overlapping by `frame_length
-         - hop_length` samples.
-      2. Each frame is multiplied by the window and placed into a buffer of size `fft_length`.
-      3. The DFT is taken of each windowed frame.
-      4. The results are stacked into a spectrogram.
+         - hop_length` samples. The frames are a strided view of the waveform, no samples are copied.
+      2. Each frame is multiplied by the window and zero-padded to a buffer of size `fft_length`.
+      3. The DFT of all the windowed frames is taken in a single batched call.
+      4. The results form the rows of the spectrogram.
 
     We make a distinction between the following "blocks" of sample data, each of which may have a different lengths:
 
@@ -333,9 +334,9 @@ def spectrogram(
     padded window can be obtained from `window_function()`. The FFT input buffer may be larger than the analysis frame,
     typically the next power of two.
 
-    Note: This function is not optimized for speed yet. It should be mostly compatible with `librosa.stft` and
-    `torchaudio.functional.transforms.Spectrogram`, although it is more flexible due to the different ways spectrograms
-    can be constructed.
+    Note: This function should be mostly compatible with `librosa.stft` and `torchaudio.functional.transforms.Spectrogram`,
+    although it is more flexible due to the different ways spectrograms can be constructed. Use `spectrogram_batch` to
+    process several waveforms at once.
 
     Args:
         waveform (`np.ndarray` of shape `(length,)`):
@@ -389,11 +390,90 @@ def spectrogram(
         dtype (`np.dtype`, *optional*, defaults to `np.float32`):
             Data type of the spectrogram tensor. If `power` is None, this argument is ignored and the dtype will be
             `np.complex64`.
+        compute_dtype (`np.dtype`, *optional*, defaults to `np.float64`):
+            Floating point precision used for the DFT and the mel filter bank. `np.float32` is roughly twice as fast
+            and is accurate enough for most feature extractors.
 
     Returns:
         `nd.array` containing a spectrogram of shape `(num_frequency_bins, length)` for a regular spectrogram or shape
         `(num_mel_filters, length)` for a mel spectrogram.
     """
+    return spectrogram_batch(
+        [waveform],
+        window,
+        frame_length,
+        hop_length,
+        fft_length=fft_length,
+        power=power,
+        center=center,
+        pad_mode=pad_mode,
+        onesided=onesided,
+        preemphasis=preemphasis,
+        mel_filters=mel_filters,
+        mel_floor=mel_floor,
+        log_mel=log_mel,
+        reference=reference,
+        min_value=min_value,
+        db_range=db_range,
+        remove_dc_offset=remove_dc_offset,
+        dtype=dtype,
+        compute_dtype=compute_dtype,
+    )[0][0]
+
+
+def _frame_waveforms(waveforms: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """
+    Returns a read-only view of shape `(..., num_frames, frame_length)` over the last axis of `waveforms`, where frame
+    `t` starts at sample `t * hop_length`.
+    """
+    frames = np.lib.stride_tricks.sliding_window_view(waveforms, frame_length, axis=-1)
+    return frames[..., ::hop_length, :]
+
+
+def spectrogram_batch(
+    waveform_list: List[np.ndarray],
+    window: np.ndarray,
+    frame_length: int,
+    hop_length: int,
+    fft_length: Optional[int] = None,
+    power: Optional[float] = 1.0,
+    center: bool = True,
+    pad_mode: str = "reflect",
+    onesided: bool = True,
+    preemphasis: Optional[float] = None,
+    mel_filters: Optional[np.ndarray] = None,
+    mel_floor: float = 1e-10,
+    log_mel: Optional[str] = None,
+    reference: float = 1.0,
+    min_value: float = 1e-10,
+    db_range: Optional[float] = None,
+    remove_dc_offset: Optional[bool] = None,
+    dtype: np.dtype = np.float32,
+    compute_dtype: np.dtype = np.float64,
+    padding_value: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the spectrograms of a batch of waveforms using the Short-Time Fourier Transform.
+
+    The waveforms are zero-padded to the length of the longest one and the frames of the whole batch are transformed
+    with a single batched DFT, which is much faster than calling `spectrogram` on each waveform. The padding does not
+    change the results: the frames past the end of a waveform are set to `padding_value` and the log scaling
+    (including `db_range`) is applied per waveform.
+
+    Args:
+        waveform_list (`List[np.ndarray]` with arrays of shape `(length,)`):
+            The input waveforms. Each one must be a single real-valued, mono waveform, lengths may differ.
+        window, frame_length, hop_length, fft_length, power, center, pad_mode, onesided, preemphasis, mel_filters,
+        mel_floor, log_mel, reference, min_value, db_range, remove_dc_offset, dtype, compute_dtype:
+            See `spectrogram`.
+        padding_value (`float`, *optional*, defaults to 0.0):
+            The value of the frames past the end of the shorter waveforms.
+
+    Returns:
+        `Tuple[np.ndarray, np.ndarray]`: the padded spectrograms, of shape `(batch_size, num_frequency_bins,
+        max_length)` or `(batch_size, num_mel_filters, max_length)`, and the number of frames of each waveform, of
+        shape `(batch_size,)`. Frame `t` of waveform `i` is valid if `t < num_frames[i]`.
+    """
     window_length = len(window)
 
     if fft_length is None:
@@ -408,74 +488,80 @@ def spectrogram(
     if hop_length <= 0:
         raise ValueError("hop_length must be greater than zero")
 
-    if waveform.ndim != 1:
-        raise ValueError(f"Input waveform must have only one dimension, shape is {waveform.shape}")
+    for waveform in waveform_list:
+        if waveform.ndim != 1:
+            raise ValueError(f"Input waveform must have only one dimension, shape is {waveform.shape}")
+        if np.iscomplexobj(waveform):
+            raise ValueError("Complex-valued input waveforms are not currently supported")
 
-    if np.iscomplexobj(waveform):
-        raise ValueError("Complex-valued input waveforms are not currently supported")
-
-    # center pad the waveform
+    # center pad the waveforms
     if center:
         padding = [(int(frame_length // 2), int(frame_length // 2))]
-        waveform = np.pad(waveform, padding, mode=pad_mode)
-
-    # promote to float64, since np.fft uses float64 internally
-    waveform = waveform.astype(np.float64)
-    window = window.astype(np.float64)
-
-    # split waveform into frames of frame_length size
-    num_frames = int(1 + np.floor((waveform.size - frame_length) / hop_length))
-
-    num_frequency_bins = (fft_length // 2) + 1 if onesided else fft_length
-    spectrogram = np.empty((num_frames, num_frequency_bins), dtype=np.complex64)
+        waveform_list = [np.pad(waveform, padding, mode=pad_mode) for waveform in waveform_list]
+
+    # zero-pad to a common length, so that the whole batch is a single array
+    lengths = [waveform.size for waveform in waveform_list]
+    if min(lengths) < frame_length:
+        raise ValueError(f"Input waveforms must have at least frame_length ({frame_length}) samples after padding")
+    max_length = max(lengths)
+    waveforms = np.zeros((len(waveform_list), max_length), dtype=compute_dtype)
+    for idx, waveform in enumerate(waveform_list):
+        waveforms[idx, : waveform.size] = waveform
+    window = window.astype(compute_dtype)
+
+    # split waveforms into frames of frame_length size, shape (batch_size, num_frames, frame_length)
+    frames = _frame_waveforms(waveforms, frame_length, hop_length)
+
+    if remove_dc_offset:
+        frames = frames - frames.mean(axis=-1, keepdims=True)
+
+    if preemphasis is not None:
+        frames = np.concatenate(
+            [frames[..., :1] * (1 - preemphasis), frames[..., 1:] - preemphasis * frames[..., :-1]], axis=-1
+        )
 
-    # rfft is faster than fft
+    # rfft is faster than fft, frames are zero-padded to fft_length by the transform
     fft_func = np.fft.rfft if onesided else np.fft.fft
-    buffer = np.zeros(fft_length)
-
-    timestep = 0
-    for frame_idx in range(num_frames):
-        buffer[:frame_length] = waveform[timestep : timestep + frame_length]
-
-        if remove_dc_offset:
-            buffer[:frame_length] = buffer[:frame_length] - buffer[:frame_length].mean()
-
-        if preemphasis is not None:
-            buffer[1:frame_length] -= preemphasis * buffer[: frame_length - 1]
-            buffer[0] *= 1 - preemphasis
-
-        buffer[:frame_length] *= window
-
-        spectrogram[frame_idx] = fft_func(buffer)
-        timestep += hop_length
+    spectrogram = fft_func(frames * window, n=fft_length, axis=-1)
 
     # note: ** is much faster than np.power
     if power is not None:
-        spectrogram = np.abs(spectrogram, dtype=np.float64) ** power
-
-    spectrogram = spectrogram.T
+        spectrogram = np.abs(spectrogram).astype(compute_dtype, copy=False) ** power
+    else:
+        spectrogram = spectrogram.astype(np.complex64, copy=False)
 
     if mel_filters is not None:
-        spectrogram = np.maximum(mel_floor, np.dot(mel_filters.T, spectrogram))
-
-    if power is not None and log_mel is not None:
-        if log_mel == "log":
-            spectrogram = np.log(spectrogram)
-        elif log_mel == "log10":
-            spectrogram = np.log10(spectrogram)
-        elif log_mel == "dB":
-            if power == 1.0:
-                spectrogram = amplitude_to_db(spectrogram, reference, min_value, db_range)
-            elif power == 2.0:
-                spectrogram = power_to_db(spectrogram, reference, min_value, db_range)
-            else:
-                raise ValueError(f"Cannot use log_mel option '{log_mel}' with power {power}")
-        else:
-            raise ValueError(f"Unknown log_mel option: {log_mel}")
-
-        spectrogram = np.asarray(spectrogram, dtype)
-
-    return spectrogram
+        spectrogram = np.maximum(mel_floor, np.matmul(spectrogram, mel_filters.astype(compute_dtype, copy=False)))
+
+    # (batch_size, num_frames, num_bins) -> (batch_size, num_bins, num_frames)
+    spectrogram = spectrogram.swapaxes(-1, -2)
+
+    num_frames = np.array([1 + (length - frame_length) // hop_length for length in lengths], dtype=np.int64)
+    # as in `spectrogram`, only log scaled spectrograms are converted to `dtype`
+    log_scaled = power is not None and log_mel is not None
+    spectrograms = np.full(spectrogram.shape, padding_value, dtype=dtype if log_scaled else spectrogram.dtype)
+    for idx, frames_count in enumerate(num_frames):
+        spec = spectrogram[idx, :, :frames_count]
+        if log_scaled:
+            spec = _log_scale(spec, power, log_mel, reference, min_value, db_range)
+        spectrograms[idx, :, :frames_count] = spec
+
+    return spectrograms, num_frames
+
+
+def _log_scale(spectrogram, power, log_mel, reference, min_value, db_range):
+    """Converts a (mel) spectrogram to log scale as described by the `log_mel` argument of `spectrogram`."""
+    if log_mel == "log":
+        return np.log(spectrogram)
+    if log_mel == "log10":
+        return np.log10(spectrogram)
+    if log_mel == "dB":
+        if power == 1.0:
+            return amplitude_to_db(spectrogram, reference, min_value, db_range)
+        if power == 2.0:
+            return power_to_db(spectrogram, reference, min_value, db_range)
+        raise ValueError(f"Cannot use log_mel option '{log_mel}' with power {power}")
+    raise ValueError(f"Unknown log_mel option: {log_mel}")
 
 
 def power_to_db(
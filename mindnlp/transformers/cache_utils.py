@@ -20,6 +20,7 @@ Cache utils.
 """
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import mindspore
 from mindspore import ops
 
@@ -335,3 +336,446 @@ class SinkCache(Cache):
         for layer_idx in range(len(self.key_cache)):
             self.key_cache[layer_idx] = self.key_cache[layer_idx].index_select(0, beam_idx)
             self.value_cache[layer_idx] = self.value_cache[layer_idx].index_select(0, beam_idx)
+
+
+class StaticCache(Cache):
+    """
+    Static Cache class to be used with `generate(cache_implementation="static")`.
+
+    The Key and Value buffers are allocated once with shape `[max_batch_size, num_key_value_heads, max_cache_len,
+    head_dim]` and new states are written in place at their position index, so decoding does not reallocate and copy
+    the whole history at every step, and the attention shapes stay fixed for the whole generation.
+
+    Parameters:
+        config (`PretrainedConfig`):
+            The configuration file defining the shape-related attributes required to initialize the static cache.
+        max_batch_size (`int`):
+            The maximum batch size with which the model will be used.
+        max_cache_len (`int`):
+            The maximum sequence length with which the model will be used.
+        dtype (`mindspore.dtype`, *optional*, defaults to `mindspore.float32`):
+            The default `dtype` to use when initializing the layer.
+    """
+
+    def __init__(self, config, max_batch_size: int, max_cache_len: int, dtype=None) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_cache_len = config.max_position_embeddings if max_cache_len is None else max_cache_len
+        self.head_dim = config.hidden_size // config.num_attention_heads
+        self.dtype = dtype if dtype is not None else mindspore.float32
+        self.num_key_value_heads = (
+            config.num_attention_heads
+            if getattr(config, "num_key_value_heads", None) is None
+            else config.num_key_value_heads
+        )
+
+        cache_shape = (max_batch_size, self.num_key_value_heads, self.max_cache_len, self.head_dim)
+        self.key_cache: List[mindspore.Tensor] = [
+            ops.zeros(cache_shape, dtype=self.dtype) for _ in range(config.num_hidden_layers)
+        ]
+        self.value_cache: List[mindspore.Tensor] = [
+            ops.zeros(cache_shape, dtype=self.dtype) for _ in range(config.num_hidden_layers)
+        ]
+        # Number of positions written so far, tracked per layer on the host to avoid reading the buffers back
+        self._seq_lengths: List[int] = [0] * config.num_hidden_layers
+        self.seen_tokens = 0  # Used in `generate` to keep tally of how many tokens the cache has seen
+
+    def __getitem__(self, layer_idx: int) -> List[Tuple[mindspore.Tensor]]:
+        """
+        Support for backwards-compatible `past_key_value` indexing. Note that the returned tensors have the full
+        `max_cache_len` length, use `get_seq_length` to get the number of cached tokens.
+        """
+        if layer_idx < len(self):
+            return (self.key_cache[layer_idx], self.value_cache[layer_idx])
+        raise KeyError(f"Cache only has {len(self)} layers, attempted to access layer with index {layer_idx}")
+
+    def __iter__(self):
+        for layer_idx in range(len(self)):
+            yield (self.key_cache[layer_idx], self.value_cache[layer_idx])
+
+    def __len__(self):
+        return len(self.key_cache)
+
+    def update(
+        self,
+        key_states: mindspore.Tensor,
+        value_states: mindspore.Tensor,
+        layer_idx: int,
+        cache_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[mindspore.Tensor, mindspore.Tensor]:
+        """
+        Writes the new `key_states` and `value_states` in place into the buffers of layer `layer_idx`, right after the
+        already cached positions.
+
+        Parameters:
+            key_states (`mindspore.Tensor`):
+                The new key states to cache.
+            value_states (`mindspore.Tensor`):
+                The new value states to cache.
+            layer_idx (`int`):
+                The index of the layer to cache the states for.
+            cache_kwargs (`Dict[str, Any]`, `optional`):
+                Additional arguments for the cache subclass. No additional arguments are used in `StaticCache`.
+
+        Return:
+            A tuple containing the full key and value buffers of the layer. Positions that have not been written yet
+            are zeros and must be masked out by the caller.
+        """
+        start = self._seq_lengths[layer_idx]
+        end = start + key_states.shape[-2]
+        if end > self.max_cache_len:
+            raise ValueError(
+                f"StaticCache is full: trying to cache {end} tokens with `max_cache_len={self.max_cache_len}`."
+            )
+
+        if layer_idx == 0:
+            self.seen_tokens += key_states.shape[-2]
+
+        k_out = self.key_cache[layer_idx]
+        v_out = self.value_cache[layer_idx]
+        k_out[:, :, start:end] = key_states.astype(self.dtype)
+        v_out[:, :, start:end] = value_states.astype(self.dtype)
+        self.key_cache[layer_idx] = k_out
+        self.value_cache[layer_idx] = v_out
+        self._seq_lengths[layer_idx] = end
+
+        return k_out, v_out
+
+    def get_seq_length(self, layer_idx: Optional[int] = 0) -> int:
+        """Returns the number of cached tokens. A layer index can be optionally passed."""
+        if len(self.key_cache) <= layer_idx:
+            return 0
+        return self._seq_lengths[layer_idx]
+
+    def get_max_length(self) -> Optional[int]:
+        """Returns the maximum sequence length of the cached states."""
+        return self.max_cache_len
+
+    def reorder_cache(self, beam_idx: mindspore.Tensor):
+        """Reorders the cache for beam search, given the selected beam indices."""
+        for layer_idx in range(len(self.key_cache)):
+            self.key_cache[layer_idx] = self.key_cache[layer_idx].index_select(0, beam_idx)
+            self.value_cache[layer_idx] = self.value_cache[layer_idx].index_select(0, beam_idx)
+
+    def reset(self):
+        """Marks every slot as free so the buffers can be reused by a new generation call without reallocating."""
+        self._seq_lengths = [0] * len(self.key_cache)
+        self.seen_tokens = 0
+
+    def to_legacy_cache(self) -> Tuple[Tuple[mindspore.Tensor], Tuple[mindspore.Tensor]]:
+        """Converts the filled part of the `StaticCache` into the legacy cache format."""
+        legacy_cache = ()
+        for layer_idx in range(len(self)):
+            seq_length = self._seq_lengths[layer_idx]
+            legacy_cache += (
+                (self.key_cache[layer_idx][:, :, :seq_length], self.value_cache[layer_idx][:, :, :seq_length]),
+            )
+        return legacy_cache
+
+
+class PagedCache(Cache):
+    """
+    A cache that stores the Key and Value states in fixed-size blocks taken from a pool shared by all the sequences,
+    as in [vLLM](https://arxiv.org/abs/2309.06180). Each sequence owns a block table mapping its logical positions to
+    physical blocks, blocks are allocated when a sequence grows and returned to the pool when it is freed, so memory
+    use follows the number of tokens actually cached instead of `batch_size * max_length`.
+
+    Blocks are reference counted: `fork_sequence` shares all the blocks of a sequence with a new one (e.g. a common
+    prompt, or the beams of beam search) and a shared block is only copied when one of its owners writes into it
+    (copy-on-write).
+
+    The pools are stored per layer with shape `[num_blocks * block_size, num_key_value_heads, head_dim]`. The rows of
+    the batch passed to the model are bound to sequences with `set_batch`; if no sequence is bound, one new sequence is
+    created per row on the first update. `update` returns the Key and Value states of the batch gathered to the usual
+    `[batch_size, num_heads, seq_len, head_dim]` layout, shorter sequences being padded at the end.
+
+    Parameters:
+        config (`PretrainedConfig`):
+            The configuration file defining the shape-related attributes required to initialize the cache.
+        num_blocks (`int`):
+            The number of blocks in the pool.
+        block_size (`int`, *optional*, defaults to 16):
+            The number of tokens stored in each block.
+        dtype (`mindspore.dtype`, *optional*, defaults to `mindspore.float32`):
+            The `dtype` of the pools.
+    """
+
+    def __init__(self, config, num_blocks: int, block_size: int = 16, dtype=None) -> None:
+        self.num_blocks = num_blocks
+        self.block_size = block_size
+        self.head_dim = config.hidden_size // config.num_attention_heads
+        self.dtype = dtype if dtype is not None else mindspore.float32
+        self.num_key_value_heads = (
+            config.num_attention_heads
+            if getattr(config, "num_key_value_heads", None) is None
+            else config.num_key_value_heads
+        )
+
+        pool_shape = (num_blocks * block_size, self.num_key_value_heads, self.head_dim)
+        self.key_cache: List[mindspore.Tensor] = [
+            ops.zeros(pool_shape, dtype=self.dtype) for _ in range(config.num_hidden_layers)
+        ]
+        self.value_cache: List[mindspore.Tensor] = [
+            ops.zeros(pool_shape, dtype=self.dtype) for _ in range(config.num_hidden_layers)
+        ]
+
+        # Host-side bookkeeping, blocks are popped from the end of the free list
+        self.free_blocks: List[int] = list(range(num_blocks - 1, -1, -1))
+        self.ref_counts: List[int] = [0] * num_blocks
+        self.block_tables: Dict[int, List[int]] = {}
+        self.seq_lengths: Dict[int, int] = {}
+        self.batch_seq_ids: List[int] = []
+        self._next_seq_id = 0
+        self._layer_seq_lengths: List[int] = [0] * config.num_hidden_layers
+        # Physical slots written and read by the current forward pass, shared by all the layers
+        self._slot_mapping = None
+        self._gather_index = None
+        self.seen_tokens = 0  # Used in `generate` to keep tally of how many tokens the cache has seen
+
+    def __getitem__(self, layer_idx: int) -> List[Tuple[mindspore.Tensor]]:
+        """
+        Support for backwards-compatible `past_key_value` indexing, e.g. `past_key_value[0][0].shape[2]` to get the
+        sequence length. The states of the current batch are gathered from the pool.
+        """
+        if layer_idx < len(self):
+            return self._gather(layer_idx)
+        raise KeyError(f"Cache only has {len(self)} layers, attempted to access layer with index {layer_idx}")
+
+    def __iter__(self):
+        for layer_idx in range(len(self)):
+            yield self._gather(layer_idx)
+
+    def __len__(self):
+        return len(self.key_cache)
+
+    @property
+    def num_free_blocks(self) -> int:
+        """The number of blocks that can still be allocated."""
+        return len(self.free_blocks)
+
+    @property
+    def num_used_blocks(self) -> int:
+        """The number of blocks currently owned by at least one sequence."""
+        return self.num_blocks - len(self.free_blocks)
+
+    def add_sequence(self, seq_id: Optional[int] = None) -> int:
+        """Registers a new empty sequence and returns its id."""
+        if seq_id is None:
+            seq_id = self._next_seq_id
+        if seq_id in self.block_tables:
+            raise ValueError(f"Sequence {seq_id} is already registered in the cache.")
+        self._next_seq_id = max(self._next_seq_id, seq_id + 1)
+        self.block_tables[seq_id] = []
+        self.seq_lengths[seq_id] = 0
+        return seq_id
+
+    def fork_sequence(self, parent_seq_id: int, child_seq_id: Optional[int] = None) -> int:
+        """
+        Creates a new sequence sharing all the cached tokens of `parent_seq_id`. No data is copied: the blocks are
+        shared and only copied when one of the two sequences writes into a shared block.
+        """
+        child_seq_id = self.add_sequence(child_seq_id)
+        block_table = list(self.block_tables[parent_seq_id])
+        for block in block_table:
+            self.ref_counts[block] += 1
+        self.block_tables[child_seq_id] = block_table
+        self.seq_lengths[child_seq_id] = self.seq_lengths[parent_seq_id]
+        return child_seq_id
+
+    def free_sequence(self, seq_id: int):
+        """Releases a sequence, its blocks go back to the pool once no other sequence uses them."""
+        for block in self.block_tables.pop(seq_id):
+            self.ref_counts[block] -= 1
+            if self.ref_counts[block] == 0:
+                self.free_blocks.append(block)
+        del self.seq_lengths[seq_id]
+        if seq_id in self.batch_seq_ids:
+            self.batch_seq_ids = [idx for idx in self.batch_seq_ids if idx != seq_id]
+
+    def set_batch(self, seq_ids: List[int]):
+        """Binds the rows of the next model inputs to the sequences `seq_ids`, in order."""
+        for seq_id in seq_ids:
+            if seq_id not in self.block_tables:
+                raise ValueError(f"Sequence {seq_id} is not registered in the cache.")
+        self.batch_seq_ids = list(seq_ids)
+        batch_length = max((self.seq_lengths[seq_id] for seq_id in seq_ids), default=0)
+        self._layer_seq_lengths = [batch_length] * len(self.key_cache)
+        self._slot_mapping = None
+        self._gather_index = self._build_gather_index() if batch_length > 0 else None
+
+    def reset(self):
+        """Frees every sequence."""
+        for seq_id in list(self.block_tables):
+            self.free_sequence(seq_id)
+        self.set_batch([])
+        self.seen_tokens = 0
+
+    def _check_free_blocks(self, num_blocks: int):
+        if num_blocks > len(self.free_blocks):
+            raise RuntimeError(
+                f"PagedCache is out of blocks ({self.num_blocks} blocks of {self.block_size} tokens, {num_blocks} "
+                f"needed and {len(self.free_blocks)} free). Free finished sequences or create the cache with a larger "
+                "`num_blocks`."
+            )
+
+    def _allocate_block(self) -> int:
+        self._check_free_blocks(1)
+        block = self.free_blocks.pop()
+        self.ref_counts[block] = 1
+        return block
+
+    def _copy_block(self, src_block: int, dst_block: int):
+        src = slice(src_block * self.block_size, (src_block + 1) * self.block_size)
+        dst = slice(dst_block * self.block_size, (dst_block + 1) * self.block_size)
+        for layer_idx in range(len(self.key_cache)):
+            self.key_cache[layer_idx][dst] = self.key_cache[layer_idx][src]
+            self.value_cache[layer_idx][dst] = self.value_cache[layer_idx][src]
+
+    def _num_blocks_to_append(self, seq_ids: List[int], num_tokens: int) -> int:
+        """
+        Number of blocks `_append_slots` allocates to append `num_tokens` positions to each sequence of `seq_ids`: the
+        new blocks, plus the copies of shared blocks that are written into.
+        """
+        if num_tokens <= 0:
+            return 0
+        # shared blocks copied by a sequence have one owner less for the next ones
+        ref_counts = {}
+        num_blocks = 0
+        for seq_id in seq_ids:
+            block_table = self.block_tables[seq_id]
+            seq_length = self.seq_lengths[seq_id]
+            first_block = seq_length // self.block_size
+            last_block = (seq_length + num_tokens - 1) // self.block_size
+            for block_idx in range(first_block, last_block + 1):
+                if block_idx >= len(block_table):
+                    num_blocks += 1
+                    continue
+                block = block_table[block_idx]
+                ref_count = ref_counts.get(block, self.ref_counts[block])
+                if ref_count > 1:
+                    num_blocks += 1
+                    ref_counts[block] = ref_count - 1
+        return num_blocks
+
+    def _append_slots(self, seq_id: int, num_tokens: int) -> List[int]:
+        """Reserves the physical slots of the next `num_tokens` positions of `seq_id`."""
+        block_table = self.block_tables[seq_id]
+        slots = []
+        for position in range(self.seq_lengths[seq_id], self.seq_lengths[seq_id] + num_tokens):
+            block_idx, offset = divmod(position, self.block_size)
+            if block_idx == len(block_table):
+                block_table.append(self._allocate_block())
+            elif self.ref_counts[block_table[block_idx]] > 1:
+                # copy-on-write of a block shared with another sequence
+                shared_block = block_table[block_idx]
+                new_block = self._allocate_block()
+                self._copy_block(shared_block, new_block)
+                self.ref_counts[shared_block] -= 1
+                block_table[block_idx] = new_block
+            slots.append(block_table[block_idx] * self.block_size + offset)
+        self.seq_lengths[seq_id] += num_tokens
+        return slots
+
+    def _build_gather_index(self) -> mindspore.Tensor:
+        """Physical slots of every cached position of the batch, padded with the first slot of each sequence."""
+        batch_length = max(self.seq_lengths[seq_id] for seq_id in self.batch_seq_ids)
+        gather_index = np.zeros((len(self.batch_seq_ids), batch_length), dtype=np.int32)
+        offsets = np.arange(self.block_size, dtype=np.int32)
+        for row, seq_id in enumerate(self.batch_seq_ids):
+            seq_length = self.seq_lengths[seq_id]
+            blocks = np.array(self.block_tables[seq_id], dtype=np.int32)
+            slots = (blocks[:, None] * self.block_size + offsets).reshape(-1)[:seq_length]
+            gather_index[row, :seq_length] = slots
+            gather_index[row, seq_length:] = slots[0] if seq_length > 0 else 0
+        return mindspore.Tensor(gather_index)
+
+    def _gather(self, layer_idx: int) -> Tuple[mindspore.Tensor, mindspore.Tensor]:
+        if self._gather_index is None:
+            raise ValueError(
+                "The batch bound to the PagedCache has no cached states yet, call `update` or `set_batch` with "
+                "sequences holding cached tokens first."
+            )
+        # [batch_size, seq_len, num_heads, head_dim] -> [batch_size, num_heads, seq_len, head_dim]
+        key_states = self.key_cache[layer_idx][self._gather_index].swapaxes(1, 2)
+        value_states = self.value_cache[layer_idx][self._gather_index].swapaxes(1, 2)
+        return key_states, value_states
+
+    def update(
+        self,
+        key_states: mindspore.Tensor,
+        value_states: mindspore.Tensor,
+        layer_idx: int,
+        cache_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[mindspore.Tensor, mindspore.Tensor]:
+        """
+        Writes the new `key_states` and `value_states` of the batch into the blocks of its sequences for the layer
+        `layer_idx`. Slots are reserved once per forward pass, when the first layer is updated.
+
+        Parameters:
+            key_states (`mindspore.Tensor`):
+                The new key states to cache.
+            value_states (`mindspore.Tensor`):
+                The new value states to cache.
+            layer_idx (`int`):
+                The index of the layer to cache the states for.
+            cache_kwargs (`Dict[str, Any]`, `optional`):
+                Additional arguments for the cache subclass. No additional arguments are used in `PagedCache`.
+
+        Return:
+            A tuple containing the cached key and value states of the batch, including the new ones.
+        """
+        batch_size, num_heads, num_tokens, head_dim = key_states.shape
+        if layer_idx == 0:
+            if not self.batch_seq_ids:
+                self.batch_seq_ids = [self.add_sequence() for _ in range(batch_size)]
+            if len(self.batch_seq_ids) != batch_size:
+                raise ValueError(
+                    f"The batch has {batch_size} rows but {len(self.batch_seq_ids)} sequences are bound to it, "
+                    "please call `set_batch` with one sequence id per row."
+                )
+            # reserve the blocks of the whole batch first, so that running out of blocks leaves the cache unchanged
+            self._check_free_blocks(self._num_blocks_to_append(self.batch_seq_ids, num_tokens))
+            self.seen_tokens += num_tokens
+            slots = [self._append_slots(seq_id, num_tokens) for seq_id in self.batch_seq_ids]
+            self._slot_mapping = mindspore.Tensor(np.array(slots, dtype=np.int32).reshape(-1))
+            self._gather_index = self._build_gather_index()
+        elif self._slot_mapping is None:
+            raise ValueError(
+                f"Layer {layer_idx} is updated before layer 0 in this forward pass, the slots of the new tokens are only "
+                "reserved when layer 0 is updated."
+            )
+
+        # [batch_size, num_heads, num_tokens, head_dim] -> [batch_size * num_tokens, num_heads, head_dim]
+        self.key_cache[layer_idx][self._slot_mapping] = key_states.swapaxes(1, 2).reshape(
+            batch_size * num_tokens, num_heads, head_dim
+        ).astype(self.dtype)
+        self.value_cache[layer_idx][self._slot_mapping] = value_states.swapaxes(1, 2).reshape(
+            batch_size * num_tokens, num_heads, head_dim
+        ).astype(self.dtype)
+        self._layer_seq_lengths[layer_idx] = self._gather_index.shape[1]
+
+        return self._gather(layer_idx)
+
+    def get_seq_length(self, layer_idx: Optional[int] = 0) -> int:
+        """Returns the length of the longest cached sequence of the batch. A layer index can be optionally passed."""
+        if len(self.key_cache) <= layer_idx:
+            return 0
+        return self._layer_seq_lengths[layer_idx]
+
+    def get_max_length(self) -> Optional[int]:
+        """Returns the maximum sequence length of the cached states. PagedCache only bounds the total token count."""
+        return None
+
+    def reorder_cache(self, beam_idx: mindspore.Tensor):
+        """
+        Reorders the cache for beam search, given the selected beam indices. Only the block tables are updated: the
+        selected beams are forked and the others freed, without copying any key/value state.
+        """
+        old_seq_ids = self.batch_seq_ids
+        new_seq_ids = [self.fork_sequence(old_seq_ids[idx]) for idx in beam_idx.asnumpy().tolist()]
+        for seq_id in old_seq_ids:
+            self.free_sequence(seq_id)
+        self.set_batch(new_seq_ids)
+
+    def to_legacy_cache(self) -> Tuple[Tuple[mindspore.Tensor], Tuple[mindspore.Tensor]]:
+        """Converts the states of the current batch into the legacy cache format."""
+        return tuple(self._gather(layer_idx) for layer_idx in range(len(self)))
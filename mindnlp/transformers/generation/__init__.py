@@ -17,6 +17,8 @@ Generation
 """
 from .beam_constraints import *
 from .beam_search import *
+from .engine import *
 from .logits_process import *
 from .stopping_criteria import *
+from .streamers import *
 from .utils import *
@@ -144,6 +144,10 @@ class BeamSearchScorer(BeamScorer):
                 f" divisible by `num_beam_groups`, but is {num_beam_groups} with `num_beams` being {num_beams}."
             )
 
+    @property
+    def batch_size(self) -> int:
+        return len(self._beam_hyps) // self.num_beam_groups
+
     @property
     def is_done(self) -> bool:
         return self._done.all()
@@ -340,6 +344,326 @@ class BeamSearchScorer(BeamScorer):
         )
 
 
+class TensorBeamSearchScorer(BeamScorer):
+    r"""
+    [`BeamScorer`] implementing standard (and diverse) beam search decoding with fixed-shape tensors.
+
+    It keeps the same hypotheses as [`BeamSearchScorer`], but the finished hypotheses of every batch element are
+    stored in preallocated `(batch_size, num_beam_groups, group_size)` tensors and updated for the whole batch at
+    once: EOS masking, selection of the next beams, insertion of finished hypotheses and the early-stopping check are
+    tensor operations, so `process` does not synchronize with the host for every candidate token.
+
+    Args:
+        batch_size (`int`):
+            Batch Size of `input_ids` for which standard beam search decoding is run in parallel.
+        num_beams (`int`):
+            Number of beams for beam search.
+        length_penalty (`float`, *optional*, defaults to 1.0):
+            Exponential penalty to the length that is used with beam-based generation. See [`BeamSearchScorer`].
+        do_early_stopping (`bool` or `str`, *optional*, defaults to `False`):
+            Controls the stopping condition for beam-based methods. See [`BeamSearchScorer`].
+        num_beam_hyps_to_keep (`int`, *optional*, defaults to 1):
+            The number of beam hypotheses that shall be returned upon calling
+            [`~transformer.TensorBeamSearchScorer.finalize`].
+        num_beam_groups (`int`, *optional*, defaults to 1):
+            Number of groups to divide `num_beams` into in order to ensure diversity among different groups of beams.
+        max_length (`int`, *optional*):
+            The maximum length of the sequence to be generated. When given, the hypothesis buffer is allocated once
+            with this width.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        num_beams: int,
+        length_penalty: Optional[float] = 1.0,
+        do_early_stopping: Optional[Union[bool, str]] = False,
+        num_beam_hyps_to_keep: Optional[int] = 1,
+        num_beam_groups: Optional[int] = 1,
+        max_length: Optional[int] = None,
+    ):
+        if not isinstance(num_beams, int) or num_beams <= 1:
+            raise ValueError(
+                f"`num_beams` has to be an integer strictly greater than 1, but is {num_beams}. For `num_beams` == 1,"
+                " one should make use of `greedy_search` instead."
+            )
+
+        if not isinstance(num_beam_groups, int) or (num_beam_groups > num_beams) or (num_beams % num_beam_groups != 0):
+            raise ValueError(
+                "`num_beam_groups` has to be an integer smaller or equal than `num_beams` and `num_beams` has to be"
+                f" divisible by `num_beam_groups`, but is {num_beam_groups} with `num_beams` being {num_beams}."
+            )
+
+        if not isinstance(do_early_stopping, bool) and max_length is None:
+            raise ValueError(
+                "When `do_early_stopping` is set to a string, `max_length` must be defined. Ensure it is passed to the"
+                " BeamScorer class instance at initialization time."
+            )
+
+        self.batch_size = batch_size
+        self.num_beams = num_beams
+        self.length_penalty = length_penalty
+        self.do_early_stopping = do_early_stopping
+        self.num_beam_hyps_to_keep = num_beam_hyps_to_keep
+        self.num_beam_groups = num_beam_groups
+        self.group_size = self.num_beams // self.num_beam_groups
+        self.max_length = max_length
+
+        # finished hypotheses of the j-th group of the i-th mini-batch live in `[i, j]`; empty slots have a score of
+        # `-inf` and a length of 0
+        hyp_shape = (batch_size, num_beam_groups, self.group_size)
+        self._hyp_scores = ops.full(hyp_shape, -float("inf"), dtype=mindspore.float32)
+        self._hyp_lengths = ops.zeros(hyp_shape, dtype=mindspore.int64)
+        # allocated on the first call, once the dtype of `input_ids` is known
+        self._hyp_tokens = None
+        # only tracked (on the host) when `beam_indices` are requested
+        self._hyp_beam_indices = [
+            [[None] * self.group_size for _ in range(num_beam_groups)] for _ in range(batch_size)
+        ]
+        self._done = ops.zeros((batch_size, num_beam_groups), dtype=mindspore.bool_)
+
+    @property
+    def is_done(self) -> bool:
+        return self._done.all()
+
+    @staticmethod
+    def _pad_tokens(tokens: mindspore.Tensor, width: int) -> mindspore.Tensor:
+        if tokens.shape[-1] >= width:
+            return tokens
+        padding = ops.zeros(tokens.shape[:-1] + (width - tokens.shape[-1],), dtype=tokens.dtype)
+        return ops.cat([tokens, padding], axis=-1)
+
+    def _prepare_token_buffer(self, input_ids: mindspore.Tensor):
+        length = input_ids.shape[-1]
+        if self._hyp_tokens is None:
+            width = max(length, self.max_length or 0)
+            self._hyp_tokens = ops.zeros(self._hyp_scores.shape + (width,), dtype=input_ids.dtype)
+        elif self._hyp_tokens.shape[-1] < length:
+            self._hyp_tokens = self._pad_tokens(self._hyp_tokens, length)
+
+    def _add_hypotheses(
+        self,
+        group_index: int,
+        scores: mindspore.Tensor,
+        tokens: mindspore.Tensor,
+        lengths: mindspore.Tensor,
+    ) -> mindspore.Tensor:
+        """
+        Merges `group_size` candidate hypotheses per batch element into the hypotheses of `group_index`, keeping the
+        `group_size` best ones. Returns the position of every kept hypothesis in `[old hypotheses, candidates]`.
+        """
+        all_scores = ops.cat([self._hyp_scores[:, group_index], scores], axis=1)
+        new_scores, keep = ops.topk(all_scores, self.group_size, dim=1, largest=True, sorted=True)
+
+        all_tokens = ops.cat([self._hyp_tokens[:, group_index], tokens], axis=1)
+        token_index = keep.unsqueeze(-1).broadcast_to(keep.shape + (all_tokens.shape[-1],))
+        all_lengths = ops.cat([self._hyp_lengths[:, group_index], lengths], axis=1)
+
+        self._hyp_tokens[:, group_index] = ops.gather_elements(all_tokens, 1, token_index)
+        self._hyp_lengths[:, group_index] = ops.gather_elements(all_lengths, 1, keep)
+        self._hyp_scores[:, group_index] = new_scores
+        return keep
+
+    def _add_beam_indices(self, group_index: int, keep: mindspore.Tensor, candidates: List[List[Optional[tuple]]]):
+        keep = keep.asnumpy()
+        for batch_idx in range(self.batch_size):
+            merged = self._hyp_beam_indices[batch_idx][group_index] + candidates[batch_idx]
+            self._hyp_beam_indices[batch_idx][group_index] = [merged[i] for i in keep[batch_idx]]
+
+    def _hypotheses_done(
+        self, group_index: int, best_sum_logprobs: mindspore.Tensor, cur_len: int
+    ) -> mindspore.Tensor:
+        # same stopping rules as `BeamHypotheses.is_done`, for every batch element at once
+        is_full = (self._hyp_lengths[:, group_index] > 0).all(-1)
+        if self.do_early_stopping is True:
+            return is_full
+
+        if self.do_early_stopping is False or self.length_penalty <= 0.0:
+            highest_attainable_score = best_sum_logprobs / cur_len**self.length_penalty
+        else:
+            highest_attainable_score = best_sum_logprobs / self.max_length**self.length_penalty
+        worst_score = self._hyp_scores[:, group_index].min(-1)
+        return ops.logical_and(is_full, worst_score >= highest_attainable_score)
+
+    def process(
+        self,
+        input_ids: mindspore.Tensor,
+        next_scores: mindspore.Tensor,
+        next_tokens: mindspore.Tensor,
+        next_indices: mindspore.Tensor,
+        pad_token_id: Optional[int] = None,
+        eos_token_id: Optional[Union[int, List[int]]] = None,
+        beam_indices: Optional[mindspore.Tensor] = None,
+        group_index: Optional[int] = 0,
+    ) -> Dict[str, mindspore.Tensor]:
+        cur_len = input_ids.shape[-1] + 1  # add up to the length which the next_scores is calculated on
+        batch_size = self.batch_size
+        group_size = self.group_size
+
+        if batch_size != (input_ids.shape[0] // group_size):
+            if self.num_beam_groups > 1:
+                raise ValueError(
+                    f"A group beam size of {input_ids.shape[0]} is used as the input, but a group beam "
+                    f"size of {group_size} is expected by the beam scorer."
+                )
+            raise ValueError(
+                f"A beam size of {input_ids.shape[0]} is used as the input, but a beam size of "
+                f"{group_size} is expected by the beam scorer."
+            )
+
+        if isinstance(eos_token_id, int):
+            eos_token_id = [eos_token_id]
+
+        done = self._done[:, group_index].unsqueeze(-1)
+        if pad_token_id is None and eos_token_id is not None and done.any():
+            raise ValueError("Generated beams >= num_beams -> eos_token_id and pad_token have to be defined")
+
+        num_candidates = next_tokens.shape[-1]
+        if eos_token_id is not None:
+            eos = mindspore.tensor(eos_token_id, dtype=next_tokens.dtype)
+            is_eos = (next_tokens.unsqueeze(-1) == eos).any(-1)
+        else:
+            is_eos = ops.zeros(next_tokens.shape, dtype=mindspore.bool_)
+        batch_offset = (ops.arange(batch_size) * group_size).astype(next_indices.dtype).unsqueeze(-1)
+
+        # the next beams are the `group_size` best ranked candidates that are not EOS: push EOS candidates behind
+        # all others and take the smallest ranks
+        rank = ops.arange(num_candidates).astype(mindspore.int32).broadcast_to(next_tokens.shape)
+        sort_key = ops.where(is_eos, rank + num_candidates, rank).astype(mindspore.float32)
+        _, beam_pos = ops.topk(sort_key, group_size, dim=1, largest=False, sorted=True)
+
+        next_beam_scores = ops.gather_elements(next_scores, 1, beam_pos).masked_fill(done, 0)
+        next_beam_tokens = ops.gather_elements(next_tokens, 1, beam_pos).masked_fill(
+            done, pad_token_id if pad_token_id is not None else 0
+        )
+        next_beam_indices = (ops.gather_elements(next_indices, 1, beam_pos) + batch_offset).masked_fill(done, 0)
+
+        if eos_token_id is not None:
+            # an EOS candidate finishes a hypothesis only if it belongs to the top `group_size` tokens
+            is_finished = ops.logical_and(is_eos[:, :group_size], ops.logical_not(done))
+            hyp_len = input_ids.shape[-1]
+            self._prepare_token_buffer(input_ids)
+
+            source = next_indices[:, :group_size] + batch_offset
+            hyp_scores = next_scores[:, :group_size].astype(mindspore.float32) / (hyp_len**self.length_penalty)
+            hyp_scores = hyp_scores.masked_fill(ops.logical_not(is_finished), -float("inf"))
+            hyp_tokens = input_ids[source.view(-1)].view(batch_size, group_size, hyp_len)
+            hyp_tokens = self._pad_tokens(hyp_tokens, self._hyp_tokens.shape[-1])
+            hyp_lengths = is_finished.astype(mindspore.int64) * hyp_len
+
+            keep = self._add_hypotheses(group_index, hyp_scores, hyp_tokens, hyp_lengths)
+
+            if beam_indices is not None:
+                source = source.asnumpy()
+                candidates = [
+                    [beam_indices[src] + (src,) for src in source[batch_idx].tolist()]
+                    for batch_idx in range(batch_size)
+                ]
+                self._add_beam_indices(group_index, keep, candidates)
+
+        # Check if we are done so that we can save a pad step if all(done)
+        is_done = self._hypotheses_done(group_index, next_scores.max(-1).astype(mindspore.float32), cur_len)
+        self._done[:, group_index] = ops.logical_or(done.squeeze(-1), is_done)
+
+        return UserDict(
+            {
+                "next_beam_scores": next_beam_scores.view(-1),
+                "next_beam_tokens": next_beam_tokens.view(-1),
+                "next_beam_indices": next_beam_indices.view(-1),
+            }
+        )
+
+    def finalize(
+        self,
+        input_ids: mindspore.Tensor,
+        final_beam_scores: mindspore.Tensor,
+        final_beam_tokens: mindspore.Tensor,
+        final_beam_indices: mindspore.Tensor,
+        max_length: int,
+        pad_token_id: Optional[int] = None,
+        eos_token_id: Optional[Union[int, List[int]]] = None,
+        beam_indices: Optional[mindspore.Tensor] = None,
+    ) -> Tuple[mindspore.Tensor]:
+        batch_size = self.batch_size
+        num_beam_groups = self.num_beam_groups
+        group_size = self.group_size
+        num_keep = self.num_beam_hyps_to_keep
+
+        if isinstance(eos_token_id, int):
+            eos_token_id = [eos_token_id]
+
+        # finalize all open beam hypotheses and add to generated hypotheses
+        cur_len = input_ids.shape[-1]
+        self._prepare_token_buffer(input_ids)
+        width = self._hyp_tokens.shape[-1]
+
+        is_open = ops.logical_not(self._done).unsqueeze(-1).broadcast_to(self._hyp_scores.shape)
+        open_scores = final_beam_scores.astype(mindspore.float32).view(self._hyp_scores.shape)
+        open_scores = (open_scores / cur_len**self.length_penalty).masked_fill(ops.logical_not(is_open), -float("inf"))
+        open_tokens = self._pad_tokens(input_ids, width).view(self._hyp_tokens.shape)
+        open_lengths = is_open.astype(mindspore.int64) * cur_len
+
+        for group_index in range(num_beam_groups):
+            keep = self._add_hypotheses(
+                group_index, open_scores[:, group_index], open_tokens[:, group_index], open_lengths[:, group_index]
+            )
+            if beam_indices is not None:
+                candidates = [
+                    [
+                        beam_indices[(batch_idx * num_beam_groups + group_index) * group_size + index_per_group]
+                        for index_per_group in range(group_size)
+                    ]
+                    for batch_idx in range(batch_size)
+                ]
+                self._add_beam_indices(group_index, keep, candidates)
+
+        # select the best hypotheses over all groups
+        all_scores = self._hyp_scores.view(batch_size, num_beam_groups * group_size)
+        best_scores, best = ops.topk(all_scores, num_keep, dim=1, largest=True, sorted=True)
+        best_tokens = ops.gather_elements(
+            self._hyp_tokens.view(batch_size, num_beam_groups * group_size, width),
+            1,
+            best.unsqueeze(-1).broadcast_to(best.shape + (width,)),
+        ).view(batch_size * num_keep, width)
+        best_lengths = ops.gather_elements(self._hyp_lengths.view(batch_size, num_beam_groups * group_size), 1, best)
+        best_lengths = best_lengths.view(batch_size * num_keep, 1)
+
+        # prepare for adding eos
+        sent_lengths = best_lengths.asnumpy()
+        sent_max_len = sent_lengths.max().item() + 1
+        sent_max_len = min(sent_max_len, max_length) if max_length is not None else sent_max_len
+
+        # shorter batches are padded if needed
+        if sent_lengths.min() != sent_lengths.max() and pad_token_id is None:
+            raise ValueError("`pad_token_id` has to be defined")
+
+        positions = ops.arange(sent_max_len).unsqueeze(0)
+        decoded = self._pad_tokens(best_tokens, sent_max_len)[:, :sent_max_len].astype(input_ids.dtype)
+        decoded = decoded.masked_fill(positions >= best_lengths, pad_token_id if pad_token_id is not None else 0)
+        if eos_token_id is not None:
+            # inserting only the first eos_token_id
+            decoded = decoded.masked_fill(positions == best_lengths, eos_token_id[0])
+
+        indices = None
+        if beam_indices is not None:
+            best = best.asnumpy()
+            indices = np.full((batch_size * num_keep, sent_max_len), -1, dtype=np.int64)
+            for batch_idx in range(batch_size):
+                for j, hyp_idx in enumerate(best[batch_idx].tolist()):
+                    best_idx = self._hyp_beam_indices[batch_idx][hyp_idx // group_size][hyp_idx % group_size]
+                    best_idx = [int(idx) for idx in best_idx[:sent_max_len]]
+                    indices[batch_idx * num_keep + j, : len(best_idx)] = best_idx
+            indices = mindspore.tensor(indices, dtype=input_ids.dtype)
+
+        return UserDict(
+            {
+                "sequences": decoded,
+                "sequence_scores": best_scores.view(-1),
+                "beam_indices": indices,
+            }
+        )
+
+
 class ConstrainedBeamSearchScorer(BeamScorer):
     r"""
     [`BeamScorer`] implementing constrained beam search decoding.
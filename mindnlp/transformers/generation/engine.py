@@ -0,0 +1,487 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+Continuous batching generation engine.
+"""
+import copy
+import math
+import queue
+import asyncio
+import itertools
+import threading
+from collections import deque
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Union
+
+import numpy as np
+import mindspore
+from mindspore import ops
+
+from mindnlp.utils import logging
+from ..cache_utils import PagedCache
+from .configuration_utils import GenerationConfig
+from .logits_process import LogitsProcessorList
+from .stopping_criteria import MaxLengthCriteria, StoppingCriteriaList
+
+
+logger = logging.get_logger(__name__)
+
+_END_OF_STREAM = object()
+
+
+class TokenStream:
+    """
+    Iterator over the tokens generated for one request of a [`ContinuousBatchingEngine`].
+
+    When the engine loop runs in a background thread (see [`ContinuousBatchingEngine.start`]), iterating blocks until
+    the next token is produced. Otherwise iterating drives the engine itself by calling
+    [`ContinuousBatchingEngine.step`] until a token of this request is available.
+    """
+
+    def __init__(self, engine: "ContinuousBatchingEngine", request_id: int):
+        self.engine = engine
+        self.request_id = request_id
+        self.token_queue = queue.Queue()
+
+    def put(self, token_id: int):
+        """Queues a generated token."""
+        self.token_queue.put(token_id)
+
+    def end(self):
+        """Marks the end of the stream."""
+        self.token_queue.put(_END_OF_STREAM)
+
+    def __iter__(self) -> Iterator[int]:
+        return self
+
+    def __next__(self) -> int:
+        while True:
+            try:
+                if self.engine.is_running:
+                    item = self.token_queue.get(timeout=0.05)
+                else:
+                    item = self.token_queue.get_nowait()
+                break
+            except queue.Empty:
+                if not self.engine.is_running:
+                    self.engine.step()
+        if item is _END_OF_STREAM:
+            raise StopIteration()
+        return item
+
+
+class GenerationRequest:
+    """
+    State of one request scheduled by a [`ContinuousBatchingEngine`]: its tokens, its own generation config, logits
+    processors and stopping criteria, and the id of its sequence in the paged key/value cache.
+    """
+
+    def __init__(
+        self,
+        request_id: int,
+        prompt_ids: List[int],
+        generation_config: GenerationConfig,
+        logits_processor: LogitsProcessorList,
+        logits_warper: Optional[LogitsProcessorList],
+        stopping_criteria: StoppingCriteriaList,
+        stream: TokenStream,
+        token_callback: Optional[Callable[[Optional[int]], None]] = None,
+    ):
+        self.request_id = request_id
+        self.prompt_ids = prompt_ids
+        self.output_ids: List[int] = []
+        self.generation_config = generation_config
+        self.logits_processor = logits_processor
+        self.logits_warper = logits_warper
+        self.stopping_criteria = stopping_criteria
+        # `MaxLengthCriteria` and eos are checked on the host, the other criteria need the token tensor
+        self.extra_stopping_criteria = [
+            criteria for criteria in stopping_criteria if not isinstance(criteria, MaxLengthCriteria)
+        ]
+        eos_token_id = generation_config.eos_token_id
+        if isinstance(eos_token_id, int):
+            eos_token_id = [eos_token_id]
+        self.eos_token_id = set(eos_token_id) if eos_token_id is not None else set()
+        self.stream = stream
+        self.token_callback = token_callback
+        self.seq_id = None
+        self.reserved_blocks = 0
+        self.finished = False
+
+    @property
+    def token_ids(self) -> List[int]:
+        """The prompt followed by the generated tokens."""
+        return self.prompt_ids + self.output_ids
+
+    @property
+    def needs_processing(self) -> bool:
+        """Whether the logits of this request go through logits processors or sampling."""
+        return len(self.logits_processor) > 0 or self.logits_warper is not None
+
+    def token_tensor(self) -> mindspore.Tensor:
+        """The prompt and generated tokens as a `(1, seq_len)` tensor."""
+        return mindspore.Tensor([self.token_ids], mindspore.int64)
+
+    def emit(self, token_id: Optional[int]):
+        """Sends a generated token, or `None` once the request is finished, to the stream and the callback."""
+        if token_id is None:
+            self.stream.end()
+        else:
+            self.stream.put(token_id)
+        if self.token_callback is not None:
+            self.token_callback(token_id)
+
+
+class ContinuousBatchingEngine:
+    """
+    Generation engine for a stream of requests with continuous (iteration-level) batching.
+
+    Instead of running one fixed batch until its slowest row is done, the engine re-forms the batch at every step:
+    finished requests leave the batch and free their key/value blocks right away, and queued requests are admitted as
+    soon as there is room. Each request keeps its own generation config, logits processors and stopping criteria, and
+    its tokens are returned through its own [`TokenStream`].
+
+    The key/value states of all requests live in one [`PagedCache`], so the model must support the `Cache` API
+    (`_supports_cache_class`). A request is admitted only when the cache can hold its `max_length` tokens, so running
+    requests never run out of blocks.
+
+    Args:
+        model ([`PreTrainedModel`]):
+            A decoder-only model with a language modeling head.
+        max_batch_size (`int`, *optional*, defaults to 32):
+            The maximum number of requests decoded together.
+        num_blocks (`int`, *optional*):
+            The number of blocks of the paged key/value cache. Defaults to enough blocks for `max_batch_size` requests
+            of `config.max_position_embeddings` tokens.
+        block_size (`int`, *optional*, defaults to 16):
+            The number of tokens per cache block.
+        generation_config ([`GenerationConfig`], *optional*):
+            The default generation config of the requests, defaults to `model.generation_config`.
+
+    Example:
+
+    ```python
+    >>> engine = ContinuousBatchingEngine(model, max_batch_size=16)
+    >>> engine.start()
+    >>> stream = engine.add_request(tokenizer("Hello")["input_ids"], max_new_tokens=20)
+    >>> print(tokenizer.decode(list(stream)))
+    >>> engine.stop()
+    ```
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = 32,
+        num_blocks: Optional[int] = None,
+        block_size: int = 16,
+        generation_config: Optional[GenerationConfig] = None,
+    ):
+        if model.config.is_encoder_decoder:
+            raise ValueError("`ContinuousBatchingEngine` only supports decoder-only models.")
+        if not model._supports_cache_class:
+            raise ValueError(
+                f"{model.__class__.__name__} does not support `Cache` instances as `past_key_values`, which is "
+                "required by `ContinuousBatchingEngine`."
+            )
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.generation_config = generation_config if generation_config is not None else model.generation_config
+        if num_blocks is None:
+            num_blocks = max_batch_size * math.ceil(model.config.max_position_embeddings / block_size)
+        self.cache = PagedCache(model.config, num_blocks=num_blocks, block_size=block_size, dtype=model.dtype)
+        # only the logits of the last prompt token are needed to start decoding
+        self._prefill_kwargs = {"num_logits_to_keep": 1} if model._supports_num_logits_to_keep() else {}
+
+        self.waiting = deque()
+        self.running: List[GenerationRequest] = []
+        self._reserved_blocks = 0
+        self._request_counter = itertools.count()
+        self._lock = threading.RLock()
+        self._has_work = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the engine loop runs in a background thread."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def has_unfinished_requests(self) -> bool:
+        """Whether some requests are still waiting or running."""
+        return len(self.waiting) > 0 or len(self.running) > 0
+
+    def add_request(
+        self,
+        input_ids: Union[List[int], mindspore.Tensor],
+        generation_config: Optional[GenerationConfig] = None,
+        logits_processor: Optional[LogitsProcessorList] = None,
+        stopping_criteria: Optional[StoppingCriteriaList] = None,
+        token_callback: Optional[Callable[[Optional[int]], None]] = None,
+        **kwargs,
+    ) -> TokenStream:
+        """
+        Queues a request and returns the stream of its generated tokens.
+
+        Args:
+            input_ids (`List[int]` or `mindspore.Tensor`):
+                The prompt token ids, a list or a tensor of shape `(sequence_length,)` or `(1, sequence_length)`.
+            generation_config ([`GenerationConfig`], *optional*):
+                The generation config of this request, defaults to the engine one. Beam search is not supported.
+            logits_processor (`LogitsProcessorList`, *optional*):
+                Custom logits processors of this request, merged with the ones built from the generation config.
+            stopping_criteria (`StoppingCriteriaList`, *optional*):
+                Custom stopping criteria of this request, merged with the ones built from the generation config.
+            token_callback (`Callable[[Optional[int]], None]`, *optional*):
+                Called from the engine loop with every generated token, and with `None` when the request finishes.
+            kwargs:
+                Attributes of the generation config to override for this request, e.g. `max_new_tokens=32`.
+        """
+        if isinstance(input_ids, mindspore.Tensor):
+            input_ids = input_ids.asnumpy()
+        prompt_ids = np.asarray(input_ids).reshape(-1).tolist()
+        if not prompt_ids:
+            raise ValueError("`input_ids` of a request must contain at least one token.")
+
+        generation_config = copy.deepcopy(generation_config if generation_config is not None else self.generation_config)
+        unused_kwargs = generation_config.update(**kwargs)
+        if unused_kwargs:
+            raise ValueError(f"The following generation arguments are not supported by the engine: {unused_kwargs}")
+        generation_config.validate()
+        if generation_config.num_beams > 1 or generation_config.num_return_sequences > 1:
+            raise ValueError("`ContinuousBatchingEngine` only supports greedy search and sampling of one sequence.")
+        if generation_config.max_new_tokens is not None:
+            generation_config.max_length = len(prompt_ids) + generation_config.max_new_tokens
+        if generation_config.max_length <= len(prompt_ids):
+            raise ValueError(
+                f"The prompt has {len(prompt_ids)} tokens, which leaves no room to generate with "
+                f"`max_length={generation_config.max_length}`."
+            )
+
+        logits_processor = self.model._get_logits_processor(
+            generation_config=generation_config,
+            input_ids_seq_length=len(prompt_ids),
+            encoder_input_ids=mindspore.Tensor([prompt_ids], mindspore.int64),
+            prefix_allowed_tokens_fn=None,
+            logits_processor=logits_processor if logits_processor is not None else LogitsProcessorList(),
+            model_kwargs={"use_cache": True},
+        )
+        logits_warper = self.model._get_logits_warper(generation_config) if generation_config.do_sample else None
+        stopping_criteria = self.model._get_stopping_criteria(
+            generation_config=generation_config,
+            stopping_criteria=stopping_criteria if stopping_criteria is not None else StoppingCriteriaList(),
+        )
+
+        request_id = next(self._request_counter)
+        request = GenerationRequest(
+            request_id,
+            prompt_ids,
+            generation_config,
+            logits_processor,
+            logits_warper,
+            stopping_criteria,
+            TokenStream(self, request_id),
+            token_callback,
+        )
+        request.reserved_blocks = math.ceil(generation_config.max_length / self.cache.block_size)
+        if request.reserved_blocks > self.cache.num_blocks:
+            raise ValueError(
+                f"A request of `max_length={generation_config.max_length}` needs {request.reserved_blocks} cache "
+                f"blocks but the engine cache only has {self.cache.num_blocks}."
+            )
+
+        with self._lock:
+            self.waiting.append(request)
+        self._has_work.set()
+        return request.stream
+
+    def step(self) -> int:
+        """
+        Runs one scheduling iteration: admits (and prefills) the queued requests that fit, then decodes one token for
+        every running request. Returns the number of requests still unfinished.
+        """
+        with self._lock:
+            admitted = self._admit_requests()
+            decoding = [request for request in self.running if request not in admitted]
+            if decoding:
+                self._decode(decoding)
+            return len(self.waiting) + len(self.running)
+
+    def generate(self, prompts: List[Union[List[int], mindspore.Tensor]], **kwargs) -> List[List[int]]:
+        """
+        Generates all the `prompts` with continuous batching and returns, for each of them, the prompt followed by the
+        generated tokens. `kwargs` are passed to [`~ContinuousBatchingEngine.add_request`].
+        """
+        prompts = [prompt.asnumpy() if isinstance(prompt, mindspore.Tensor) else prompt for prompt in prompts]
+        streams = [self.add_request(prompt, **kwargs) for prompt in prompts]
+        return [np.asarray(prompt).reshape(-1).tolist() + list(stream) for prompt, stream in zip(prompts, streams)]
+
+    def start(self):
+        """Starts the engine loop in a background thread."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="ContinuousBatchingEngine", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background engine loop after the current step. Unfinished requests stay queued."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._has_work.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            if not self.has_unfinished_requests():
+                self._has_work.wait()
+                self._has_work.clear()
+                continue
+            self.step()
+
+    def _admit_requests(self) -> List[GenerationRequest]:
+        admitted = []
+        while self.waiting and len(self.running) < self.max_batch_size:
+            request = self.waiting[0]
+            if self._reserved_blocks + request.reserved_blocks > self.cache.num_blocks:
+                break
+            self.waiting.popleft()
+            self._reserved_blocks += request.reserved_blocks
+            request.seq_id = self.cache.add_sequence()
+            self.running.append(request)
+            admitted.append(request)
+            self._prefill(request)
+        return admitted
+
+    def _prefill(self, request: GenerationRequest):
+        self.cache.set_batch([request.seq_id])
+        outputs = self.model(
+            input_ids=mindspore.Tensor([request.prompt_ids], mindspore.int64),
+            past_key_values=self.cache,
+            use_cache=True,
+            return_dict=True,
+            **self._prefill_kwargs,
+        )
+        self._process_logits([request], outputs.logits[:, -1, :])
+
+    def _decode(self, requests: List[GenerationRequest]):
+        self.cache.set_batch([request.seq_id for request in requests])
+        # every row attends to its own cached tokens plus the new one, shorter rows are padded at the end
+        seq_lengths = np.array([self.cache.seq_lengths[request.seq_id] for request in requests], dtype=np.int64)
+        attention_mask = (np.arange(seq_lengths.max() + 1)[None, :] <= seq_lengths[:, None]).astype(np.int64)
+
+        outputs = self.model(
+            input_ids=mindspore.Tensor([[request.output_ids[-1]] for request in requests], mindspore.int64),
+            attention_mask=mindspore.Tensor(attention_mask),
+            position_ids=mindspore.Tensor(seq_lengths[:, None]),
+            past_key_values=self.cache,
+            use_cache=True,
+            return_dict=True,
+        )
+        self._process_logits(requests, outputs.logits[:, -1, :])
+
+    def _process_logits(self, requests: List[GenerationRequest], next_token_logits: mindspore.Tensor):
+        next_tokens = [None] * len(requests)
+        next_token_scores = [None] * len(requests)
+
+        # rows without processors are decoded greedily together
+        plain_rows = [row for row, request in enumerate(requests) if not request.needs_processing]
+        if plain_rows:
+            plain_logits = next_token_logits[mindspore.Tensor(plain_rows, mindspore.int32)]
+            for row, token in zip(plain_rows, plain_logits.argmax(-1).asnumpy().tolist()):
+                next_tokens[row] = token
+                next_token_scores[row] = next_token_logits[row : row + 1]
+
+        processed_rows = [row for row, request in enumerate(requests) if request.needs_processing]
+        if processed_rows:
+            row_tokens = []
+            for row in processed_rows:
+                request = requests[row]
+                input_ids = request.token_tensor()
+                scores = request.logits_processor(input_ids, next_token_logits[row : row + 1])
+                if request.logits_warper is not None:
+                    scores = request.logits_warper(input_ids, scores)
+                    probs = ops.softmax(scores, axis=-1)
+                    row_tokens.append(ops.multinomial(probs, num_samples=1).reshape(-1).astype(mindspore.int64))
+                else:
+                    row_tokens.append(scores.argmax(-1).astype(mindspore.int64))
+                next_token_scores[row] = scores
+            for row, token in zip(processed_rows, ops.cat(row_tokens).asnumpy().tolist()):
+                next_tokens[row] = token
+
+        for request, token, scores in zip(requests, next_tokens, next_token_scores):
+            request.output_ids.append(token)
+            request.emit(token)
+            if self._is_finished(request, token, scores):
+                self._finish(request)
+
+    def _is_finished(self, request: GenerationRequest, token: int, scores: mindspore.Tensor) -> bool:
+        if token in request.eos_token_id:
+            return True
+        if len(request.prompt_ids) + len(request.output_ids) >= request.generation_config.max_length:
+            return True
+        if request.extra_stopping_criteria:
+            input_ids = request.token_tensor()
+            return any(criteria(input_ids, scores) for criteria in request.extra_stopping_criteria)
+        return False
+
+    def _finish(self, request: GenerationRequest):
+        request.finished = True
+        self.running.remove(request)
+        self.cache.free_sequence(request.seq_id)
+        self._reserved_blocks -= request.reserved_blocks
+        request.emit(None)
+
+
+class AsyncGenerationEngine:
+    """
+    `asyncio` front end of a [`ContinuousBatchingEngine`]. The engine loop runs in a background thread and the tokens
+    of each request are handed to the event loop as they are generated.
+
+    Example:
+
+    ```python
+    >>> async_engine = AsyncGenerationEngine(ContinuousBatchingEngine(model))
+    >>> async for token in async_engine.generate(input_ids, max_new_tokens=20):
+    ...     print(token)
+    ```
+    """
+
+    def __init__(self, engine: ContinuousBatchingEngine):
+        self.engine = engine
+
+    async def generate(self, input_ids: Union[List[int], mindspore.Tensor], **kwargs) -> AsyncIterator[int]:
+        """Queues a request and yields its tokens. `kwargs` are passed to [`ContinuousBatchingEngine.add_request`]."""
+        self.engine.start()
+        loop = asyncio.get_running_loop()
+        token_queue = asyncio.Queue()
+
+        def token_callback(token_id):
+            loop.call_soon_threadsafe(token_queue.put_nowait, token_id)
+
+        self.engine.add_request(input_ids, token_callback=token_callback, **kwargs)
+        while True:
+            token_id = await token_queue.get()
+            if token_id is None:
+                break
+            yield token_id
+
+    def shutdown(self):
+        """Stops the background engine loop."""
+        self.engine.stop()
+
+
+__all__ = ["ContinuousBatchingEngine", "AsyncGenerationEngine", "GenerationRequest", "TokenStream"]
@@ -24,7 +24,7 @@ Logits process
 import math
 import inspect
 import logging
-from typing import List, Iterable, Union, Optional, Callable, Tuple, Dict
+from typing import List, Union, Optional, Callable, Tuple, Dict
 import mindspore
 from mindspore import ops
 import numpy as np
@@ -186,39 +186,36 @@ class RepetitionPenaltyLogitsProcessor(LogitsProcessor):
         return scores
 
 
-def _get_ngrams(ngram_size: int, prev_input_ids: mindspore.Tensor, num_hypos: int):
-    generated_ngrams = [{} for _ in range(num_hypos)]
-    for idx in range(num_hypos):
-        gen_tokens = prev_input_ids[idx].asnumpy().tolist()
-        generated_ngram = generated_ngrams[idx]
-        for ngram in zip(*[gen_tokens[i:] for i in range(ngram_size)]):
-            prev_ngram_tuple = tuple(ngram[:-1])
-            generated_ngram[prev_ngram_tuple] = generated_ngram.get(prev_ngram_tuple, []) + [ngram[-1]]
-    return generated_ngrams
-
-
-def _get_generated_ngrams(banned_ngrams, prev_input_ids, ngram_size, cur_len):
-    # Before decoding the next token, prevent decoding of ngrams that have already appeared
-    start_idx = cur_len + 1 - ngram_size
-    ngram_idx = tuple(prev_input_ids[start_idx:cur_len].tolist())
-    return banned_ngrams.get(ngram_idx, [])
-
-
-def _calc_banned_ngram_tokens(
-        ngram_size: int, prev_input_ids: mindspore.Tensor, num_hypos: int, cur_len: int
-) -> List[Iterable[int]]:
-    """Copied from fairseq for no_repeat_ngram in beam_search"""
-    if cur_len + 1 < ngram_size:
-        # return no banned tokens if we haven't generated no_repeat_ngram_size tokens yet
-        return [[] for _ in range(num_hypos)]
-
-    generated_ngrams = _get_ngrams(ngram_size, prev_input_ids, num_hypos)
-
-    banned_tokens = [
-        _get_generated_ngrams(generated_ngrams[hypo_idx], prev_input_ids[hypo_idx], ngram_size, cur_len)
-        for hypo_idx in range(num_hypos)
-    ]
-    return banned_tokens
+def _scatter_ban_mask(tokens: mindspore.Tensor, banned: mindspore.Tensor, vocab_size: int) -> mindspore.Tensor:
+    """
+    Returns the `(num_hypos, vocab_size)` boolean mask of the tokens in `tokens` of shape `(num_hypos, num_candidates)`
+    whose entry in `banned` is `True`, built with a single batched scatter.
+    """
+    counts = ops.tensor_scatter_elements(
+        ops.zeros((tokens.shape[0], vocab_size), mindspore.int32),
+        tokens,
+        banned.astype(mindspore.int32),
+        axis=1,
+        reduction="add",
+    )
+    return counts > 0
+
+
+def _calc_banned_ngram_mask(
+        ngram_size: int, prev_input_ids: mindspore.Tensor, ngram_source_ids: mindspore.Tensor, vocab_size: int
+) -> mindspore.Tensor:
+    """
+    Computes on device the mask of the tokens that would complete, after the last `ngram_size - 1` tokens of each row
+    of `prev_input_ids`, an n-gram already present in the same row of `ngram_source_ids`.
+    """
+    num_ngrams = ngram_source_ids.shape[-1] - ngram_size + 1
+    # the last `ngram_size - 1` tokens are compared with the first `ngram_size - 1` tokens of every n-gram
+    prefix = prev_input_ids[:, prev_input_ids.shape[-1] - ngram_size + 1:]
+    match = ops.ones((ngram_source_ids.shape[0], num_ngrams), mindspore.bool_)
+    for offset in range(ngram_size - 1):
+        window = ngram_source_ids[:, offset: offset + num_ngrams]
+        match = ops.logical_and(match, window == prefix[:, offset: offset + 1])
+    return _scatter_ban_mask(ngram_source_ids[:, ngram_size - 1:], match, vocab_size)
 
 
 class NoRepeatNGramLogitsProcessor(LogitsProcessor):
@@ -226,6 +223,9 @@ class NoRepeatNGramLogitsProcessor(LogitsProcessor):
     [`LogitsProcessor`] that enforces no repetition of n-grams. See
     [Fairseq](https://github.com/pytorch/fairseq/blob/a07cb6f40480928c9e0548b737aadd36ee66ac76/fairseq/sequence_generator.py#L345).
 
+    The banned tokens of all the hypotheses are computed on device by comparing the last `ngram_size - 1` tokens with
+    every n-gram of the sequence, so no token ids are copied to the host.
+
     Args:
         ngram_size (`int`):
             All ngrams of size `ngram_size` can only occur once.
@@ -237,14 +237,13 @@ class NoRepeatNGramLogitsProcessor(LogitsProcessor):
         self.ngram_size = ngram_size
 
     def __call__(self, input_ids: mindspore.Tensor, scores: mindspore.Tensor) -> mindspore.Tensor:
-        num_batch_hypotheses = scores.shape[0]
         cur_len = input_ids.shape[-1]
-        banned_batch_tokens = _calc_banned_ngram_tokens(self.ngram_size, input_ids, num_batch_hypotheses, cur_len)
-
-        for i, banned_tokens in enumerate(banned_batch_tokens):
-            scores[i, banned_tokens] = -float("inf")
+        if cur_len < self.ngram_size:
+            # no banned tokens before the first complete n-gram
+            return scores
 
-        return scores
+        banned_mask = _calc_banned_ngram_mask(self.ngram_size, input_ids, input_ids, scores.shape[-1])
+        return scores.masked_fill(banned_mask, -float("inf"))
 
 
 class EncoderNoRepeatNGramLogitsProcessor(LogitsProcessor):
@@ -268,30 +267,33 @@ class EncoderNoRepeatNGramLogitsProcessor(LogitsProcessor):
         if len(encoder_input_ids.shape) == 1:
             encoder_input_ids = encoder_input_ids.unsqueeze(0)
         self.batch_size = encoder_input_ids.shape[0]
-        self.generated_ngrams = _get_ngrams(encoder_ngram_size, encoder_input_ids, self.batch_size)
+        self.encoder_input_ids = encoder_input_ids
+        # encoder ids repeated for each beam, built on the first call
+        self._hypo_encoder_input_ids = None
 
     def __call__(self, input_ids: mindspore.Tensor, scores: mindspore.Tensor) -> mindspore.Tensor:
         # B x num_beams
         num_hypos = scores.shape[0]
         num_beams = num_hypos // self.batch_size
         cur_len = input_ids.shape[-1]
-        banned_batch_tokens = [
-            _get_generated_ngrams(
-                self.generated_ngrams[hypo_idx // num_beams], input_ids[hypo_idx], self.ngram_size, cur_len
-            )
-            for hypo_idx in range(num_hypos)
-        ]
-
-        for i, banned_tokens in enumerate(banned_batch_tokens):
-            scores[i, banned_tokens] = -float("inf")
+        if cur_len + 1 < self.ngram_size or self.encoder_input_ids.shape[-1] < self.ngram_size:
+            return scores
 
-        return scores
+        if self._hypo_encoder_input_ids is None or self._hypo_encoder_input_ids.shape[0] != num_hypos:
+            self._hypo_encoder_input_ids = ops.repeat_interleave(self.encoder_input_ids, num_beams, 0)
+        banned_mask = _calc_banned_ngram_mask(
+            self.ngram_size, input_ids, self._hypo_encoder_input_ids, scores.shape[-1]
+        )
+        return scores.masked_fill(banned_mask, -float("inf"))
 
 
 class NoBadWordsLogitsProcessor(LogitsProcessor):
     """
     [`LogitsProcessor`] that enforces that specified sequences will never be sampled.
 
+    The bad words of several tokens are stored as a right-aligned tensor of prefixes, which is compared on device with
+    the last tokens of every hypothesis at each step.
+
     Args:
         bad_words_ids (`List[List[int]]`):
             List of list of token ids that are not allowed to be generated. In order to get the token ids of the words
@@ -331,93 +333,83 @@ class NoBadWordsLogitsProcessor(LogitsProcessor):
                 self.bad_words_id_length_greater_than_1.append(word)
 
         self.static_bad_words_mask: Optional[mindspore.Tensor] = None
+        # right-aligned prefixes and last tokens of the bad words of several tokens, built on the first call
+        self._bad_words_prefixes: Optional[mindspore.Tensor] = None
+        self._bad_words_prefixes_mask: Optional[mindspore.Tensor] = None
+        self._bad_words_last_tokens: Optional[mindspore.Tensor] = None
 
         for banned_token_seq in self.bad_words_id_length_greater_than_1:
             if len(banned_token_seq) == 0:
                 raise ValueError(f"Banned words token sequences {bad_words_ids} cannot have an empty list")
 
     def __call__(self, input_ids: mindspore.Tensor, scores: mindspore.Tensor) -> mindspore.Tensor:
+        vocab_size = scores.shape[1]
         if self.static_bad_words_mask is None and len(self.bad_words_id_length_1) > 0:
             self.static_bad_words_mask = self._calc_static_bad_word_mask(scores)
+        if self._bad_words_last_tokens is None and len(self.bad_words_id_length_greater_than_1) > 0:
+            self._prepare_bad_words_prefixes(vocab_size)
 
-        dynamic_banned_tokens = self._calc_banned_bad_words_ids(input_ids.tolist())
-        scores = self._set_scores_to_inf_for_banned_tokens(scores, dynamic_banned_tokens)
+        banned_mask = self.static_bad_words_mask
+        if self._bad_words_last_tokens is not None:
+            dynamic_banned_mask = self._calc_banned_bad_words_mask(input_ids, vocab_size)
+            banned_mask = dynamic_banned_mask if banned_mask is None \
+                else ops.logical_or(dynamic_banned_mask, banned_mask)
 
-        return scores
+        if banned_mask is None:
+            return scores
+        return scores.masked_fill(banned_mask, -float("inf"))
 
     def _calc_static_bad_word_mask(self, scores: mindspore.Tensor) -> mindspore.Tensor:
         static_bad_words_mask = ops.zeros(scores.shape[1])
-        static_bad_words_mask[self.bad_words_id_length_1] = 1
+        static_bad_words_mask[self._valid_tokens(self.bad_words_id_length_1, scores.shape[1])] = 1
         return static_bad_words_mask.unsqueeze(0).bool()
 
-    def _tokens_match(self, prev_tokens: List[int], tokens: List[int]) -> bool:
-        if len(tokens) == 0:
-            # if bad word tokens is just one token always ban it
-            return True
-        if len(tokens) > len(prev_tokens):
-            # if bad word tokens are longer then prev input_ids they can't be equal
-            return False
-        return prev_tokens[-len(tokens):] == tokens
-
-    def _calc_banned_bad_words_ids(self, prev_input_ids: List[List[int]]) -> Iterable[int]:
-        banned_tokens = []
-        for prev_input_ids_slice in prev_input_ids:
-            banned_tokens_slice = []
-            for banned_token_seq in self.bad_words_id_length_greater_than_1:
-                if self._tokens_match(prev_input_ids_slice, banned_token_seq[:-1]):
-                    banned_tokens_slice.append(banned_token_seq[-1])
-
-            banned_tokens.append(banned_tokens_slice)
-
-        return banned_tokens
-
-    def _set_scores_to_inf_for_banned_tokens(
-            self, scores: mindspore.Tensor, banned_tokens: List[List[int]]
-    ) -> mindspore.Tensor:
-        """
-        Modifies the scores in place by setting the banned token positions to `-inf`. Banned token is expected to be a
-        list of list of banned tokens to ban in the format [[batch index, vocabulary position],...
-
-        Args:
-            scores: logits distribution of shape (batch size, vocabulary size)
-            banned_tokens: list of list of tokens to ban of length (batch_size)
-        """
-        banned_mask_list = []
-        for idx, batch_banned_tokens in enumerate(banned_tokens):
-            for token in batch_banned_tokens:
-                # Eliminates invalid bad word IDs that are over the vocabulary size.
-                if token <= scores.shape[1]:
-                    banned_mask_list.append([idx, token])
-                else:
-                    logging.error(
-                        "An invalid bad word ID is defined: %d. This ID is not contained in the "
-                        "vocabulary, and is therefore ignored.", token
-                    )
-        if not banned_mask_list and self.static_bad_words_mask is None:
-            return scores
-
-        if banned_mask_list:
-            banned_mask = mindspore.Tensor(banned_mask_list)
-            indices = ops.ones(len(banned_mask))
-            # A sparse tensor is generated from a list of coordinates: [[0, 1], [0, 2], [2, 0]]. A conversion to dense tensor generates:
-            # [ 0  1  1 ]
-            # [ 0  0  0 ]
-            # [ 1  0  0 ]
-
-            banned_mask = (
-                mindspore.COOTensor(banned_mask,
-                                    indices, scores.shape)
-                .to_dense()
-                .bool()
+    @staticmethod
+    def _valid_tokens(tokens: List[int], vocab_size: int) -> List[int]:
+        # Eliminates invalid bad word IDs that are over the vocabulary size.
+        for token in tokens:
+            if token >= vocab_size:
+                logging.error(
+                    "An invalid bad word ID is defined: %d. This ID is not contained in the "
+                    "vocabulary, and is therefore ignored.", token
+                )
+        return [token for token in tokens if token < vocab_size]
+
+    def _prepare_bad_words_prefixes(self, vocab_size: int):
+        """Stacks the prefixes of the bad words into a `(num_words, max_prefix_len)` tensor, aligned on the right."""
+        valid_last_tokens = self._valid_tokens([word[-1] for word in self.bad_words_id_length_greater_than_1],
+                                               vocab_size)
+        words = [word for word in self.bad_words_id_length_greater_than_1 if word[-1] in valid_last_tokens]
+        self.bad_words_id_length_greater_than_1 = words
+        if not words:
+            return
+        max_prefix_len = max(len(word) - 1 for word in words)
+        prefixes = np.zeros((len(words), max_prefix_len), np.int64)
+        prefixes_mask = np.zeros((len(words), max_prefix_len), np.bool_)
+        for idx, word in enumerate(words):
+            prefixes[idx, max_prefix_len - len(word) + 1:] = word[:-1]
+            prefixes_mask[idx, max_prefix_len - len(word) + 1:] = True
+        self._bad_words_prefixes = mindspore.Tensor(prefixes)
+        self._bad_words_prefixes_mask = mindspore.Tensor(prefixes_mask)
+        self._bad_words_last_tokens = mindspore.Tensor([word[-1] for word in words], mindspore.int64)
+
+    def _calc_banned_bad_words_mask(self, input_ids: mindspore.Tensor, vocab_size: int) -> mindspore.Tensor:
+        num_hypos, cur_len = input_ids.shape
+        max_prefix_len = self._bad_words_prefixes.shape[1]
+        last_tokens = input_ids[:, max(cur_len - max_prefix_len, 0):].astype(mindspore.int64)
+        if cur_len < max_prefix_len:
+            # positions before the start of the sequence never match a token of a bad word
+            last_tokens = ops.cat(
+                [ops.full((num_hypos, max_prefix_len - cur_len), -1, dtype=mindspore.int64), last_tokens], axis=-1
             )
-
-            if self.static_bad_words_mask is not None:
-                banned_mask = ops.bitwise_or(banned_mask, self.static_bad_words_mask)
-        else:
-            banned_mask = self.static_bad_words_mask
-
-        scores = scores.masked_fill(banned_mask, -float("inf"))
-        return scores
+        # (num_hypos, num_words, max_prefix_len), padding positions of the prefixes always match
+        matches = ops.logical_or(
+            last_tokens.unsqueeze(1) == self._bad_words_prefixes.unsqueeze(0),
+            ops.logical_not(self._bad_words_prefixes_mask).unsqueeze(0),
+        )
+        banned = matches.all(axis=-1)
+        tokens = self._bad_words_last_tokens.unsqueeze(0).broadcast_to((num_hypos, -1))
+        return _scatter_ban_mask(tokens, banned, vocab_size)
 
 
 class MinLengthLogitsProcessor(LogitsProcessor):
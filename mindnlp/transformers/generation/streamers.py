@@ -0,0 +1,355 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+Streamers for `generate`
+"""
+from queue import Queue
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ..tokenization_utils_base import PreTrainedTokenizerBase
+
+
+# number of prompt tokens kept as decoding context when the prompt itself is not streamed
+_PROMPT_CONTEXT_TOKENS = 5
+
+
+class BaseStreamer:
+    """
+    Base class from which `.generate()` streamers should inherit.
+    """
+
+    def put(self, value):
+        """Function that is called by `.generate()` to push new tokens"""
+        raise NotImplementedError()
+
+    def end(self):
+        """Function that is called by `.generate()` to signal the end of generation"""
+        raise NotImplementedError()
+
+
+class IncrementalDetokenizer:
+    """
+    Turns the tokens of one sequence into text incrementally.
+
+    Only a window of tokens is decoded at each step: the tokens whose text was already released, as context, and the
+    tokens after them. The text of new tokens is released once it no longer ends with an incomplete UTF-8 sequence
+    (decoded as U+FFFD), and the window then slides past them. Decoding the window with its left context keeps merge
+    boundaries, such as the leading spaces of SentencePiece pieces, correct. The cost of each token therefore does not
+    depend on the length of the sequence.
+
+    Args:
+        tokenizer (`PreTrainedTokenizerBase`):
+            The tokenizer used to decode the tokens.
+        decode_kwargs (`dict`, *optional*):
+            Additional keyword arguments to pass to the tokenizer's `decode` method. `clean_up_tokenization_spaces`
+            defaults to `False`, since cleaning up each window separately could remove text that was already released.
+    """
+
+    def __init__(self, tokenizer: "PreTrainedTokenizerBase", **decode_kwargs):
+        self.tokenizer = tokenizer
+        decode_kwargs.setdefault("clean_up_tokenization_spaces", False)
+        self.decode_kwargs = decode_kwargs
+        self.tokens = []
+        # tokens[:prefix_offset] are dropped context, the text of tokens[:read_offset] has been released
+        self.prefix_offset = 0
+        self.read_offset = 0
+
+    def set_context(self, token_ids: List[int]):
+        """Uses the tail of `token_ids` as decoding context, without releasing its text."""
+        self.tokens = list(token_ids[-_PROMPT_CONTEXT_TOKENS:])
+        self.prefix_offset = 0
+        self.read_offset = len(self.tokens)
+
+    def put(self, token_ids: List[int]) -> str:
+        """Adds `token_ids` to the sequence and returns the text that became final."""
+        self.tokens.extend(token_ids)
+        prefix_text = self.tokenizer.decode(self.tokens[self.prefix_offset:self.read_offset], **self.decode_kwargs)
+        new_text = self.tokenizer.decode(self.tokens[self.prefix_offset:], **self.decode_kwargs)
+        if new_text == prefix_text:
+            # tokens without text, such as the padding of finished rows with `skip_special_tokens=True`, are
+            # released as well, otherwise the window would grow with each of them
+            text = ""
+        elif len(new_text) < len(prefix_text) or new_text.endswith("\ufffd"):
+            # incomplete character or nothing printable yet, wait for the next tokens
+            return ""
+        else:
+            text = new_text[len(prefix_text):]
+
+        # the released tokens become the context of the next window
+        del self.tokens[:self.prefix_offset]
+        self.prefix_offset = self.read_offset - self.prefix_offset
+        self.read_offset = len(self.tokens)
+        return text
+
+    def flush(self) -> str:
+        """Returns the text of the tokens that were held back, and resets the sequence."""
+        text = ""
+        if self.read_offset < len(self.tokens):
+            prefix_text = self.tokenizer.decode(self.tokens[self.prefix_offset:self.read_offset], **self.decode_kwargs)
+            new_text = self.tokenizer.decode(self.tokens[self.prefix_offset:], **self.decode_kwargs)
+            text = new_text[len(prefix_text):]
+        self.tokens = []
+        self.prefix_offset = 0
+        self.read_offset = 0
+        return text
+
+
+def _to_rows(value) -> List[List[int]]:
+    """Converts the token ids pushed by `generate`, of shape `(batch_size,)` or `(batch_size, seq_len)`, to lists."""
+    value = value.asnumpy() if hasattr(value, "asnumpy") else np.asarray(value)
+    if value.ndim == 1:
+        value = value[:, None]
+    return value.tolist()
+
+
+class TextStreamer(BaseStreamer):
+    """
+    Simple text streamer that prints the token(s) to stdout as soon as their text is complete.
+
+    <Tip warning={true}>
+
+    The API for the streamer classes is still under development and may change in the future.
+
+    </Tip>
+
+    Parameters:
+        tokenizer (`AutoTokenizer`):
+            The tokenized used to decode the tokens.
+        skip_prompt (`bool`, *optional*, defaults to `False`):
+            Whether to skip the prompt to `.generate()` or not. Useful e.g. for chatbots.
+        decode_kwargs (`dict`, *optional*):
+            Additional keyword arguments to pass to the tokenizer's `decode` method.
+
+    Examples:
+
+        ```python
+        >>> from mindnlp.transformers import AutoModelForCausalLM, AutoTokenizer, TextStreamer
+
+        >>> tok = AutoTokenizer.from_pretrained("gpt2")
+        >>> model = AutoModelForCausalLM.from_pretrained("gpt2")
+        >>> inputs = tok(["An increasing sequence: one,"], return_tensors="ms")
+        >>> streamer = TextStreamer(tok)
+
+        >>> # Despite returning the usual output, the streamer will also print the generated text to stdout.
+        >>> _ = model.generate(**inputs, streamer=streamer, max_new_tokens=20)
+        An increasing sequence: one, two, three, four, five, six, seven, eight, nine, ten, eleven,
+        ```
+    """
+
+    def __init__(self, tokenizer: "PreTrainedTokenizerBase", skip_prompt: bool = False, **decode_kwargs):
+        self.tokenizer = tokenizer
+        self.skip_prompt = skip_prompt
+        self.decode_kwargs = decode_kwargs
+        self.detokenizer = IncrementalDetokenizer(tokenizer, **decode_kwargs)
+        self.next_tokens_are_prompt = True
+
+    def put(self, value):
+        """
+        Receives tokens, decodes them incrementally, and prints their text as soon as it is complete.
+        """
+        rows = _to_rows(value)
+        if len(rows) > 1:
+            raise ValueError(f"{self.__class__.__name__} only supports batch size 1")
+
+        if self.skip_prompt and self.next_tokens_are_prompt:
+            self.detokenizer.set_context(rows[0])
+            self.next_tokens_are_prompt = False
+            return
+        self.next_tokens_are_prompt = False
+
+        text = self.detokenizer.put(rows[0])
+        if text:
+            self.on_finalized_text(text)
+
+    def end(self):
+        """Flushes any remaining text and signals the end of the stream"""
+        text = self.detokenizer.flush()
+        self.next_tokens_are_prompt = True
+        self.on_finalized_text(text, stream_end=True)
+
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        """Prints the new text to stdout. If the stream is ending, also prints a newline."""
+        print(text, flush=True, end="" if not stream_end else None)
+
+
+class TextIteratorStreamer(TextStreamer):
+    """
+    Streamer that stores print-ready text in a queue, to be used by a downstream application as an iterator. This is
+    useful for applications that benefit from accessing the generated text in a non-blocking way (e.g. in an
+    interactive Gradio demo).
+
+    Parameters:
+        tokenizer (`AutoTokenizer`):
+            The tokenized used to decode the tokens.
+        skip_prompt (`bool`, *optional*, defaults to `False`):
+            Whether to skip the prompt to `.generate()` or not. Useful e.g. for chatbots.
+        timeout (`float`, *optional*):
+            The timeout for the text queue. If `None`, the queue will block indefinitely. Useful to handle exceptions
+            in `.generate()`, when it is called in a separate thread.
+        decode_kwargs (`dict`, *optional*):
+            Additional keyword arguments to pass to the tokenizer's `decode` method.
+
+    Examples:
+
+        ```python
+        >>> from mindnlp.transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer
+        >>> from threading import Thread
+
+        >>> tok = AutoTokenizer.from_pretrained("gpt2")
+        >>> model = AutoModelForCausalLM.from_pretrained("gpt2")
+        >>> inputs = tok(["An increasing sequence: one,"], return_tensors="ms")
+        >>> streamer = TextIteratorStreamer(tok)
+
+        >>> # Run the generation in a separate thread, so that we can fetch the generated text in a non-blocking way.
+        >>> generation_kwargs = dict(inputs, streamer=streamer, max_new_tokens=20)
+        >>> thread = Thread(target=model.generate, kwargs=generation_kwargs)
+        >>> thread.start()
+        >>> generated_text = ""
+        >>> for new_text in streamer:
+        ...     generated_text += new_text
+        >>> generated_text
+        'An increasing sequence: one, two, three, four, five, six, seven, eight, nine, ten, eleven,'
+        ```
+    """
+
+    def __init__(
+        self, tokenizer: "PreTrainedTokenizerBase", skip_prompt: bool = False, timeout: Optional[float] = None,
+        **decode_kwargs
+    ):
+        super().__init__(tokenizer, skip_prompt, **decode_kwargs)
+        self.text_queue = Queue()
+        self.stop_signal = None
+        self.timeout = timeout
+
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        """Put the new text in the queue. If the stream is ending, also put a stop signal in the queue."""
+        if text:
+            self.text_queue.put(text, timeout=self.timeout)
+        if stream_end:
+            self.text_queue.put(self.stop_signal, timeout=self.timeout)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        value = self.text_queue.get(timeout=self.timeout)
+        if value == self.stop_signal:
+            raise StopIteration()
+        return value
+
+
+class _RowIterator:
+    """Iterator over the text of one row of a [`BatchTextIteratorStreamer`]."""
+
+    def __init__(self, text_queue: Queue, stop_signal, timeout: Optional[float]):
+        self.text_queue = text_queue
+        self.stop_signal = stop_signal
+        self.timeout = timeout
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        value = self.text_queue.get(timeout=self.timeout)
+        if value == self.stop_signal:
+            raise StopIteration()
+        return value
+
+
+class BatchTextIteratorStreamer(BaseStreamer):
+    """
+    Streamer for batched generation, with one incremental detokenizer and one text queue per row. `streamer[i]` is an
+    iterator over the text of the `i`-th row, so each row can be consumed by its own client.
+
+    Rows that finished early keep receiving the padding token from `.generate()`, pass `skip_special_tokens=True` to
+    drop it from their text.
+
+    Parameters:
+        tokenizer (`AutoTokenizer`):
+            The tokenized used to decode the tokens.
+        batch_size (`int`):
+            The number of rows of the generation.
+        skip_prompt (`bool`, *optional*, defaults to `False`):
+            Whether to skip the prompt to `.generate()` or not.
+        timeout (`float`, *optional*):
+            The timeout for the text queues. If `None`, the queues will block indefinitely.
+        decode_kwargs (`dict`, *optional*):
+            Additional keyword arguments to pass to the tokenizer's `decode` method.
+
+    Examples:
+
+        ```python
+        >>> from threading import Thread
+        >>> streamer = BatchTextIteratorStreamer(tok, batch_size=2, skip_prompt=True, skip_special_tokens=True)
+        >>> thread = Thread(target=model.generate, kwargs=dict(inputs, streamer=streamer, max_new_tokens=20))
+        >>> thread.start()
+        >>> for new_text in streamer[0]:
+        ...     print(new_text, end="")
+        ```
+    """
+
+    def __init__(
+        self, tokenizer: "PreTrainedTokenizerBase", batch_size: int, skip_prompt: bool = False,
+        timeout: Optional[float] = None, **decode_kwargs
+    ):
+        if batch_size < 1:
+            raise ValueError(f"`batch_size` has to be a positive integer, but is {batch_size}")
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.skip_prompt = skip_prompt
+        self.timeout = timeout
+        self.stop_signal = None
+        self.detokenizers = [IncrementalDetokenizer(tokenizer, **decode_kwargs) for _ in range(batch_size)]
+        self.text_queues = [Queue() for _ in range(batch_size)]
+        self.next_tokens_are_prompt = True
+
+    def put(self, value):
+        """Receives tokens of shape `(batch_size,)` or `(batch_size, seq_len)` and queues the text of each row."""
+        rows = _to_rows(value)
+        if len(rows) != self.batch_size:
+            raise ValueError(f"Expected tokens for {self.batch_size} rows, but got {len(rows)}")
+
+        if self.skip_prompt and self.next_tokens_are_prompt:
+            for detokenizer, token_ids in zip(self.detokenizers, rows):
+                detokenizer.set_context(token_ids)
+            self.next_tokens_are_prompt = False
+            return
+        self.next_tokens_are_prompt = False
+
+        for detokenizer, text_queue, token_ids in zip(self.detokenizers, self.text_queues, rows):
+            text = detokenizer.put(token_ids)
+            if text:
+                text_queue.put(text, timeout=self.timeout)
+
+    def end(self):
+        """Flushes the remaining text of every row and ends their streams"""
+        for detokenizer, text_queue in zip(self.detokenizers, self.text_queues):
+            text = detokenizer.flush()
+            if text:
+                text_queue.put(text, timeout=self.timeout)
+            text_queue.put(self.stop_signal, timeout=self.timeout)
+        self.next_tokens_are_prompt = True
+
+    def __len__(self):
+        return self.batch_size
+
+    def __getitem__(self, index: int) -> _RowIterator:
+        return _RowIterator(self.text_queues[index], self.stop_signal, self.timeout)
+
+
+__all__ = ["BaseStreamer", "TextStreamer", "TextIteratorStreamer", "BatchTextIteratorStreamer"]
@@ -45,6 +45,7 @@ from mindspore import ops
 
 from mindnlp.utils import ModelOutput, logging, ExplicitEnum
 from .configuration_utils import GenerationConfig
+from ..cache_utils import StaticCache
 from ..modeling_outputs import CausalLMOutputWithPast, Seq2SeqLMOutput
 
 from .logits_process import (
@@ -75,7 +76,7 @@ from .logits_process import (
     TypicalLogitsWarper,
     UnbatchedClassifierFreeGuidanceLogitsProcessor,
 )
-from .beam_search import BeamScorer, BeamSearchScorer, ConstrainedBeamSearchScorer
+from .beam_search import BeamScorer, BeamSearchScorer, ConstrainedBeamSearchScorer, TensorBeamSearchScorer
 
 from .beam_constraints import DisjunctiveConstraint, PhrasalConstraint
 
@@ -90,6 +91,10 @@ from .stopping_criteria import (
 
 logger = logging.get_logger(__name__)
 
+NEED_SETUP_CACHE_CLASSES_MAPPING = {
+    "static": StaticCache,
+}
+
 
 @dataclass
 class SampleDecoderOnlyOutput(ModelOutput):
@@ -837,6 +842,27 @@ class GenerationMixin:
 
         return model_kwargs
 
+    def _get_cache(self, cache_implementation: str, max_batch_size: int, max_cache_len: int):
+        """
+        Returns a preallocated cache of type `cache_implementation` able to hold `max_batch_size` sequences of
+        `max_cache_len` tokens. The buffers of the previous call are reused when the requested shape and dtype did not
+        change, so repeated `generate` calls do not allocate new key/value buffers.
+        """
+        cache_cls = NEED_SETUP_CACHE_CLASSES_MAPPING[cache_implementation]
+        cache = getattr(self, "_cache", None)
+        need_new_cache = (
+            not isinstance(cache, cache_cls)
+            or cache.max_batch_size != max_batch_size
+            or cache.max_cache_len != max_cache_len
+            or cache.dtype != self.dtype
+        )
+        if need_new_cache:
+            cache = cache_cls(self.config, max_batch_size=max_batch_size, max_cache_len=max_cache_len, dtype=self.dtype)
+            self._cache = cache
+        else:
+            cache.reset()
+        return cache
+
     def _reorder_cache(self, past, beam_idx):
         raise NotImplementedError(
             f"Make sure that a `_reorder_cache` function is correctly implemented in {self.__class__.__module__} to"
@@ -1077,6 +1103,13 @@ class GenerationMixin:
                 "TODO: You need to implement this function."
             )
 
+    def _supports_num_logits_to_keep(self) -> bool:
+        """
+        Returns whether the model accepts `num_logits_to_keep`, i.e. whether it can compute the logits of the last
+        positions only instead of projecting every position through the LM head.
+        """
+        return "num_logits_to_keep" in set(inspect.signature(self.construct).parameters.keys())
+
     def _validate_model_kwargs(self, model_kwargs: Dict[str, Any]):
         """Validates model kwargs for generation. Generate argument typos will also be caught here."""
         # Excludes arguments that are handled before calling any model function
@@ -1370,6 +1403,10 @@ class GenerationMixin:
         else:
             model_kwargs["use_cache"] = generation_config.use_cache
 
+        # the next token only depends on the logits of the last position, there is no need to compute the others
+        if "num_logits_to_keep" not in model_kwargs and self._supports_num_logits_to_keep():
+            model_kwargs["num_logits_to_keep"] = 1
+
         accepts_attention_mask = "attention_mask" in set(inspect.signature(self.construct).parameters.keys())
         requires_attention_mask = "encoder_outputs" not in model_kwargs
 
@@ -1426,6 +1463,28 @@ class GenerationMixin:
             generation_config.max_length = generation_config.max_new_tokens + input_ids_length
         self._validate_generated_length(generation_config, input_ids_length, has_default_max_length)
 
+        if generation_config.cache_implementation is not None and model_kwargs.get("past_key_values") is not None:
+            raise ValueError(
+                "Passing both `cache_implementation` (used to initialize certain caches) and `past_key_values` (a "
+                "Cache object) is unsupported. Please use only one of the two."
+            )
+        if generation_config.cache_implementation in NEED_SETUP_CACHE_CLASSES_MAPPING:
+            if not self._supports_cache_class or not self._supports_static_cache:
+                raise ValueError(
+                    f"The `cache_implementation` '{generation_config.cache_implementation}' is not supported by "
+                    f"{self.__class__.__name__}. Please use a model that supports it, or unset `cache_implementation`."
+                )
+            model_kwargs["past_key_values"] = self._get_cache(
+                generation_config.cache_implementation,
+                batch_size * max(generation_config.num_beams, generation_config.num_return_sequences),
+                generation_config.max_length,
+            )
+        elif generation_config.cache_implementation is not None:
+            raise ValueError(
+                f"Unknown `cache_implementation` '{generation_config.cache_implementation}', expected one of "
+                f"{list(NEED_SETUP_CACHE_CLASSES_MAPPING.keys())}."
+            )
+
         # 7. determine generation mode
         generation_mode = self._get_generation_mode(generation_config, assistant_model)
         if streamer is not None and (generation_config.num_beams > 1):
@@ -1567,7 +1626,7 @@ class GenerationMixin:
 
         elif generation_mode == GenerationMode.BEAM_SEARCH:
             # 11. prepare beam search scorer
-            beam_scorer = BeamSearchScorer(
+            beam_scorer = TensorBeamSearchScorer(
                 batch_size=batch_size,
                 num_beams=generation_config.num_beams,
                 length_penalty=generation_config.length_penalty,
@@ -1601,7 +1660,7 @@ class GenerationMixin:
             logits_warper = self._get_logits_warper(generation_config)
 
             # 12. prepare beam search scorer
-            beam_scorer = BeamSearchScorer(
+            beam_scorer = TensorBeamSearchScorer(
                 batch_size=batch_size,
                 num_beams=generation_config.num_beams,
                 length_penalty=generation_config.length_penalty,
@@ -1635,7 +1694,7 @@ class GenerationMixin:
 
         elif generation_mode == GenerationMode.GROUP_BEAM_SEARCH:
             # 11. prepare beam search scorer
-            beam_scorer = BeamSearchScorer(
+            beam_scorer = TensorBeamSearchScorer(
                 batch_size=batch_size,
                 num_beams=generation_config.num_beams,
                 length_penalty=generation_config.length_penalty,
@@ -2838,7 +2897,7 @@ class GenerationMixin:
             else self.generation_config.return_dict_in_generate
         )
 
-        batch_size = len(beam_scorer._beam_hyps)
+        batch_size = beam_scorer.batch_size
         num_beams = beam_scorer.num_beams
 
         batch_beam_size, cur_len = input_ids.shape
@@ -3162,7 +3221,7 @@ class GenerationMixin:
             else self.generation_config.return_dict_in_generate
         )
 
-        batch_size = len(beam_scorer._beam_hyps)
+        batch_size = beam_scorer.batch_size
         num_beams = beam_scorer.num_beams
 
         batch_beam_size, cur_len = input_ids.shape
@@ -3476,7 +3535,7 @@ class GenerationMixin:
         num_beams = beam_scorer.num_beams
         num_beam_groups = beam_scorer.num_beam_groups
         num_sub_beams = num_beams // num_beam_groups
-        batch_size = len(beam_scorer._beam_hyps) // num_beam_groups
+        batch_size = beam_scorer.batch_size
 
         batch_beam_size, cur_len = input_ids.shape
 
@@ -4269,6 +4328,8 @@ class GenerationMixin:
             candidate_kwargs = copy.copy(model_kwargs)
             candidate_kwargs = self._extend_attention_mask(candidate_kwargs, candidate_input_ids.shape[1])
             candidate_kwargs = self._extend_token_type_ids(candidate_kwargs, candidate_input_ids.shape[1])
+            if "num_logits_to_keep" in candidate_kwargs:
+                candidate_kwargs["num_logits_to_keep"] = candidate_length + 1
 
             model_inputs = self.prepare_inputs_for_generation(candidate_input_ids, **candidate_kwargs)
 
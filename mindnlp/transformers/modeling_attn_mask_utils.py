@@ -14,6 +14,7 @@
 # limitations under the License.
 # ============================================================================
 """attn mask utils"""
+from collections import OrderedDict
 from typing import List, Optional, Tuple, Union
 import numpy as np
 import mindspore
@@ -33,8 +34,27 @@ class AttentionMaskConverter:
 
         sliding_window (`int`, *optional*):
             Optionally, the sliding window masks can be created if `sliding_window` is defined to a positive integer.
+
+    Causal masks are sliced from a single preallocated maximal causal mask per `(sliding_window, dtype)` and the
+    slices are cached by `(query_length, key_value_length, sliding_window, dtype)`, shared by all the converters, so
+    that repeated forward passes with the same shapes do not rebuild them. The memory held by these caches is bounded
+    by the class attributes `max_cached_mask_length`, `max_cached_full_masks`, `max_cached_masks` and
+    `max_cached_mask_elements`, which can be lowered (or set to 0 to disable caching) before running a model.
     """
 
+    # maximal causal masks, keyed by (sliding_window, dtype), least recently used first
+    _full_causal_masks = OrderedDict()
+    max_cached_full_masks = 2
+    # (query_length, key_value_length) slices of the maximal masks, keyed by (query_length, key_value_length,
+    # sliding_window, dtype), least recently used first
+    _causal_mask_cache = OrderedDict()
+    max_cached_masks = 64
+    # total number of elements of the cached slices
+    max_cached_mask_elements = 1 << 24
+    _cached_mask_elements = 0
+    # longer masks are built on the fly instead of being sliced from a preallocated maximal mask
+    max_cached_mask_length = 4096
+
     def __init__(self, is_causal: bool, sliding_window: Optional[int] = None):
         self.is_causal = is_causal
         self.sliding_window = sliding_window
@@ -114,8 +134,100 @@ class AttentionMaskConverter:
 
         return expanded_4d_mask
 
+    @classmethod
+    def clear_cache(cls):
+        """Releases the cached causal masks."""
+        cls._full_causal_masks.clear()
+        cls._causal_mask_cache.clear()
+        cls._cached_mask_elements = 0
+
+    @classmethod
+    def _full_causal_mask(cls, length: int, dtype, sliding_window: Optional[int] = None) -> mindspore.Tensor:
+        """
+        Returns a causal mask of at least `(length, length)`, in which query position `i` may attend to key position
+        `j` if `i - sliding_window < j <= i`. The mask only depends on `j - i`, so the mask of queries with a past of
+        `p` tokens is the slice `[p:p + query_length, :key_value_length]`.
+        """
+        key = (sliding_window, str(dtype))
+        mask = cls._full_causal_masks.get(key)
+        if mask is not None and mask.shape[-1] >= length:
+            cls._full_causal_masks.move_to_end(key)
+            return mask
+
+        # grow geometrically so that decoding step by step only reallocates a logarithmic number of times
+        size = max(length, 2 * mask.shape[-1] if mask is not None else 0)
+        size = min(size, max(length, cls.max_cached_mask_length))
+        min_value = np.finfo(mindspore.dtype_to_nptype(dtype)).min
+        positions = np.arange(size)
+        distance = positions[None, :] - positions[:, None]
+        masked = distance > 0
+        if sliding_window is not None:
+            masked |= distance <= -sliding_window
+        mask = mindspore.Tensor(np.where(masked, min_value, 0).astype(mindspore.dtype_to_nptype(dtype)))
+        # slices of the previous maximal mask are still valid, no need to drop them
+        cls._full_causal_masks[key] = mask
+        cls._full_causal_masks.move_to_end(key)
+        while len(cls._full_causal_masks) > cls.max_cached_full_masks:
+            cls._full_causal_masks.popitem(last=False)
+        return mask
+
+    @classmethod
+    def _causal_mask_2d(
+        cls, query_length: int, key_value_length: int, dtype, sliding_window: Optional[int] = None
+    ) -> mindspore.Tensor:
+        """Returns the `(query_length, key_value_length)` causal mask, sliced from the maximal causal mask."""
+        past_key_values_length = key_value_length - query_length
+        if key_value_length > cls.max_cached_mask_length or cls.max_cached_full_masks <= 0:
+            return cls._build_causal_mask(query_length, key_value_length, dtype, sliding_window)
+
+        if query_length == 1:
+            # single token decoding step: one row of the maximal mask, which is not worth caching since the key
+            # value length grows at every step
+            full_mask = cls._full_causal_mask(key_value_length, dtype, sliding_window)
+            return full_mask[past_key_values_length:key_value_length, :key_value_length]
+
+        key = (query_length, key_value_length, sliding_window, str(dtype))
+        mask = cls._causal_mask_cache.get(key)
+        if mask is not None:
+            cls._causal_mask_cache.move_to_end(key)
+            return mask
+
+        full_mask = cls._full_causal_mask(key_value_length, dtype, sliding_window)
+        mask = full_mask[past_key_values_length:key_value_length, :key_value_length]
+        num_elements = query_length * key_value_length
+        if num_elements > cls.max_cached_mask_elements:
+            return mask
+
+        cls._causal_mask_cache[key] = mask
+        cls._cached_mask_elements += num_elements
+        while (
+            len(cls._causal_mask_cache) > cls.max_cached_masks
+            or cls._cached_mask_elements > cls.max_cached_mask_elements
+        ):
+            (evicted_query_length, evicted_key_value_length, _, _), _ = cls._causal_mask_cache.popitem(last=False)
+            cls._cached_mask_elements -= evicted_query_length * evicted_key_value_length
+        return mask
+
     @staticmethod
+    def _build_causal_mask(
+        query_length: int, key_value_length: int, dtype, sliding_window: Optional[int] = None
+    ) -> mindspore.Tensor:
+        """
+        Builds the `(query_length, key_value_length)` causal mask of the last `query_length` positions on device,
+        without caching it.
+        """
+        min_value = mindspore.tensor(np.finfo(mindspore.dtype_to_nptype(dtype)).min, dtype)
+        past_key_values_length = key_value_length - query_length
+        query_positions = (ops.arange(query_length) + past_key_values_length).view(query_length, 1)
+        key_positions = ops.arange(key_value_length).view(1, key_value_length)
+        masked = key_positions > query_positions
+        if sliding_window is not None:
+            masked = ops.logical_or(masked, key_positions <= query_positions - sliding_window)
+        return ops.zeros((query_length, key_value_length), dtype).masked_fill(masked, min_value)
+
+    @classmethod
     def _make_causal_mask(
+        cls,
         input_ids_shape,
         dtype,
         past_key_values_length: int = 0,
@@ -125,22 +237,7 @@ class AttentionMaskConverter:
         Make causal mask used for bi-directional self-attention.
         """
         bsz, tgt_len = input_ids_shape
-        mask = ops.full((tgt_len, tgt_len), mindspore.tensor(np.finfo(mindspore.dtype_to_nptype(dtype)).min))
-        mask_cond = ops.arange(mask.shape[-1])
-        mask = mask.masked_fill(mask_cond < (mask_cond + 1).view(mask.shape[-1], 1), 0)
-
-        mask = mask.to(dtype)
-
-        if past_key_values_length > 0:
-            mask = ops.cat([ops.zeros((tgt_len, past_key_values_length), dtype=dtype), mask], axis=-1)
-
-        # add lower triangular sliding window mask if necessary
-        if sliding_window is not None:
-            diagonal = past_key_values_length - sliding_window + 1
-
-            context_mask = 1 - ops.triu(ops.ones_like(mask, dtype=mindspore.int32), diagonal=diagonal)
-            mask = mask.masked_fill(context_mask.bool(), mindspore.tensor(np.finfo(mindspore.dtype_to_nptype(dtype)).min))
-
+        mask = cls._causal_mask_2d(tgt_len, tgt_len + past_key_values_length, dtype, sliding_window)
         return mask[None, None, :, :].broadcast_to((bsz, 1, tgt_len, tgt_len + past_key_values_length))
 
     @staticmethod
@@ -198,6 +295,54 @@ def _prepare_4d_causal_attention_mask(
     return attention_mask
 
 
+def _prepare_4d_causal_attention_mask_for_static_cache(
+    attention_mask: Optional[mindspore.Tensor],
+    input_shape: Union[Tuple, List],
+    inputs_embeds: mindspore.Tensor,
+    past_key_values_length: int,
+    max_cache_length: int,
+    sliding_window: Optional[int] = None,
+):
+    """
+    Creates a causal 4D mask of shape `(batch_size, 1, query_length, max_cache_length)` to be used with a
+    preallocated key/value cache such as `StaticCache`. The mask is the one of `_prepare_4d_causal_attention_mask`,
+    right-padded so that the cache slots that have not been written yet are never attended to.
+
+    Args:
+        attention_mask (`mindspore.Tensor` or `None`):
+            A 2D attention mask of shape `(batch_size, key_value_length)`
+        input_shape (`tuple(int)` or `list(int)`):
+            The input shape should be a tuple that defines `(batch_size, query_length)`.
+        inputs_embeds (`mindspore.Tensor`):
+            The embedded inputs as a mindspore Tensor.
+        past_key_values_length (`int`):
+            The number of tokens already written in the key value cache.
+        max_cache_length (`int`):
+            The length of the preallocated key value buffers.
+        sliding_window (`int`, *optional*):
+            If the model uses windowed attention, a sliding window should be passed.
+    """
+    batch_size, query_length = input_shape[0], input_shape[-1]
+    key_value_length = query_length + past_key_values_length
+    dtype = inputs_embeds.dtype
+
+    attention_mask = _prepare_4d_causal_attention_mask(
+        attention_mask, input_shape, inputs_embeds, past_key_values_length, sliding_window=sliding_window
+    )
+    if attention_mask is None:
+        attention_mask = ops.zeros((batch_size, 1, query_length, key_value_length), dtype=dtype)
+
+    if max_cache_length > key_value_length:
+        padding_mask = ops.full(
+            (batch_size, 1, query_length, max_cache_length - key_value_length),
+            float(np.finfo(mindspore.dtype_to_nptype(dtype)).min),
+            dtype=dtype,
+        )
+        attention_mask = ops.cat([attention_mask, padding_mask], axis=-1)
+
+    return attention_mask
+
+
 def _prepare_4d_attention_mask(mask: mindspore.Tensor, dtype, tgt_len: Optional[int] = None):
     """
     Creates a non-causal 4D mask of shape `(batch_size, 1, query_length, key_value_length)` from a 2D mask of shape
@@ -0,0 +1,95 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""attention utils"""
+import math
+from typing import Optional, Tuple
+
+import mindspore
+from mindspore import ops
+
+
+def repeat_kv(hidden_states: mindspore.Tensor, n_rep: int) -> mindspore.Tensor:
+    """
+    This is the equivalent of torch.repeat_interleave(x, dim=1, repeats=n_rep). The hidden states go from (batch,
+    num_key_value_heads, seqlen, head_dim) to (batch, num_attention_heads, seqlen, head_dim)
+    """
+    batch, num_key_value_heads, slen, head_dim = hidden_states.shape
+    if n_rep == 1:
+        return hidden_states
+    hidden_states = hidden_states[:, :, None, :, :].broadcast_to((batch, num_key_value_heads, n_rep, slen, head_dim))
+    return hidden_states.reshape(batch, num_key_value_heads * n_rep, slen, head_dim)
+
+
+def grouped_query_attention(
+    query_states: mindspore.Tensor,
+    key_states: mindspore.Tensor,
+    value_states: mindspore.Tensor,
+    attention_mask: Optional[mindspore.Tensor] = None,
+    scaling: Optional[float] = None,
+    dropout: float = 0.0,
+    training: bool = False,
+) -> Tuple[mindspore.Tensor, mindspore.Tensor]:
+    """
+    Eager scaled dot product attention for multi-head, multi-query and grouped-query attention.
+
+    The query heads sharing a key/value head are folded into the query length, so each key/value head is multiplied
+    once by all the queries of its group and the keys and values are never repeated to `num_heads`.
+
+    Args:
+        query_states (`mindspore.Tensor`): Queries of shape `(batch_size, num_heads, query_length, head_dim)`.
+        key_states (`mindspore.Tensor`): Keys of shape `(batch_size, num_key_value_heads, key_value_length, head_dim)`,
+            `num_heads` must be a multiple of `num_key_value_heads`.
+        value_states (`mindspore.Tensor`): Values, of the same shape as `key_states`.
+        attention_mask (`mindspore.Tensor`, *optional*): Additive mask of shape
+            `(batch_size, 1, query_length, key_value_length)`.
+        scaling (`float`, *optional*): Scale of the attention scores, defaults to `1 / sqrt(head_dim)`.
+        dropout (`float`, defaults to 0.0): Dropout probability of the attention weights.
+        training (`bool`, defaults to `False`): Whether the dropout is applied.
+
+    Returns:
+        The attention output of shape `(batch_size, num_heads, query_length, head_dim)` and the attention weights of
+        shape `(batch_size, num_heads, query_length, key_value_length)`, in the dtype of `value_states`. The softmax
+        is computed in float32.
+    """
+    bsz, num_heads, q_len, head_dim = query_states.shape
+    num_key_value_heads, kv_seq_len = key_states.shape[1], key_states.shape[2]
+    if num_heads % num_key_value_heads != 0:
+        raise ValueError(
+            f"The number of query heads ({num_heads}) must be a multiple of the number of key/value heads "
+            f"({num_key_value_heads})."
+        )
+    if attention_mask is not None and attention_mask.shape != (bsz, 1, q_len, kv_seq_len):
+        raise ValueError(
+            f"Attention mask should be of size {(bsz, 1, q_len, kv_seq_len)}, but is {attention_mask.shape}"
+        )
+    # heads `[k * n_groups, (k + 1) * n_groups)` attend to key/value head `k`, as with `repeat_kv`
+    n_groups = num_heads // num_key_value_heads
+    query_states = query_states.reshape(bsz, num_key_value_heads, n_groups * q_len, head_dim)
+    attn_weights = ops.matmul(query_states, key_states.swapaxes(2, 3))
+    attn_weights = attn_weights / math.sqrt(head_dim) if scaling is None else attn_weights * scaling
+    attn_weights = attn_weights.reshape(bsz, num_heads, q_len, kv_seq_len)
+
+    if attention_mask is not None:
+        attn_weights = attn_weights + attention_mask
+
+    # upcast attention to fp32
+    attn_weights = ops.softmax(attn_weights, axis=-1, dtype=mindspore.float32).to(value_states.dtype)
+    attn_weights = ops.dropout(attn_weights, p=dropout, training=training)
+
+    attn_output = ops.matmul(
+        attn_weights.reshape(bsz, num_key_value_heads, n_groups * q_len, kv_seq_len), value_states
+    )
+    attn_output = attn_output.reshape(bsz, num_heads, q_len, head_dim)
+    return attn_output, attn_weights
@@ -0,0 +1,131 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""rotary position embedding utils"""
+from typing import Optional, Tuple
+
+import mindspore
+from mindspore import nn, ops
+
+
+class RotaryEmbeddingTables:
+    """
+    Registry of the cos/sin tables of rotary position embeddings.
+
+    One pair of tables is kept per `(dim, base, scaling_type, scaling_factor, max_position_embeddings, dtype)` and
+    shared by all the layers and models using it. The tables start with `max_position_embeddings` positions and grow
+    geometrically. Dynamic NTK scaling changes the base with the sequence length, so beyond
+    `max_position_embeddings` its tables are rebuilt for exactly the requested length.
+
+    The slice of the last requested length is memoized, so that the layers of a forward pass share it too.
+    """
+
+    _tables = {}
+
+    @classmethod
+    def get(
+        cls,
+        dim: int,
+        seq_len: int,
+        base: float = 10000,
+        scaling_type: Optional[str] = None,
+        scaling_factor: float = 1.0,
+        max_position_embeddings: int = 2048,
+        dtype=mindspore.float32,
+    ) -> Tuple[mindspore.Tensor, mindspore.Tensor]:
+        """Returns the cos and sin tables of the positions `[0, seq_len)`, of shape `(seq_len, dim)`."""
+        key = (dim, base, scaling_type, scaling_factor, max_position_embeddings, str(dtype))
+        entry = cls._tables.get(key)
+        if entry is None or entry["length"] < seq_len:
+            if entry is None:
+                length = max(seq_len, max_position_embeddings)
+            elif scaling_type == "dynamic" and seq_len > max_position_embeddings:
+                length = seq_len
+            else:
+                length = max(seq_len, 2 * entry["length"])
+            cos, sin = cls._compute_tables(
+                dim, length, base, scaling_type, scaling_factor, max_position_embeddings, dtype
+            )
+            entry = {"length": length, "cos": cos, "sin": sin, "slice_length": None, "slice": None}
+            cls._tables[key] = entry
+
+        if entry["slice_length"] != seq_len:
+            entry["slice"] = (entry["cos"][:seq_len], entry["sin"][:seq_len])
+            entry["slice_length"] = seq_len
+        return entry["slice"]
+
+    @staticmethod
+    def _compute_tables(dim, length, base, scaling_type, scaling_factor, max_position_embeddings, dtype):
+        if scaling_type == "dynamic" and length > max_position_embeddings:
+            base = base * (
+                (scaling_factor * length / max_position_embeddings) - (scaling_factor - 1)
+            ) ** (dim / (dim - 2))
+        inv_freq = 1.0 / (base ** (ops.arange(0, dim, 2).float() / dim))
+
+        t = ops.arange(length, dtype=inv_freq.dtype)
+        if scaling_type == "linear":
+            t = t / scaling_factor
+
+        freqs = ops.outer(t, inv_freq)
+        # Different from paper, but it uses a different permutation in order to obtain the same calculation
+        emb = ops.cat((freqs, freqs), axis=-1)
+        return emb.cos().to(dtype), emb.sin().to(dtype)
+
+    @classmethod
+    def clear(cls):
+        """Releases all the tables."""
+        cls._tables.clear()
+
+
+class RotaryEmbedding(nn.Cell):
+    """
+    Rotary position embedding whose cos/sin tables live in `RotaryEmbeddingTables`, so that the layers of a model
+    do not each build and grow their own copy.
+
+    Subclasses set `scaling_type` to `"linear"` or `"dynamic"` for linear and dynamic NTK scaling.
+    """
+
+    scaling_type = None
+
+    def __init__(self, dim, max_position_embeddings=2048, base=10000, scaling_factor=1.0):
+        super().__init__()
+        self.dim = dim
+        self.max_position_embeddings = max_position_embeddings
+        self.base = base
+        self.scaling_factor = scaling_factor
+
+    def tables(self, seq_len, dtype):
+        """Returns the `(seq_len, dim)` cos and sin tables in `dtype`."""
+        return RotaryEmbeddingTables.get(
+            self.dim,
+            seq_len,
+            base=self.base,
+            scaling_type=self.scaling_type,
+            scaling_factor=self.scaling_factor,
+            max_position_embeddings=self.max_position_embeddings,
+            dtype=dtype,
+        )
+
+    def gather(self, position_ids, seq_len, dtype):
+        """
+        Returns the cos and sin of `position_ids`, of shape `(batch_size, seq_len, dim)`. Models call it once per
+        forward pass and pass the result to all their layers.
+        """
+        cos, sin = self.tables(seq_len, dtype)
+        return cos[position_ids], sin[position_ids]
+
+    def construct(self, x, seq_len=None):
+        """Returns the `(seq_len, dim)` cos and sin tables in the dtype of `x`."""
+        # x: [bs, num_attention_heads, seq_len, head_size]
+        return self.tables(seq_len, x.dtype)
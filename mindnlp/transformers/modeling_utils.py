@@ -49,7 +49,7 @@ from mindnlp.configs import MS_URL_BASE, HF_URL_BASE, PT_WEIGHTS_NAME, WEIGHTS_N
 from mindnlp.utils.download import is_remote_url, download_url, cached_file, get_checkpoint_shard_files
 from mindnlp.utils import convert_file_size_to_int, logging, ModelOutput, is_safetensors_available
 from mindnlp._legacy.functional import arange
-from mindnlp.utils.serialization import load
+from mindnlp.utils.serialization import load_checkpoint_lazy
 from mindnlp.injection import set_global_fp16
 
 from .generation import GenerationMixin
@@ -297,6 +297,11 @@ class PreTrainedModel(nn.Cell, CellUtilMixin, GenerationMixin):
 
     supports_recompute = False
 
+    # Whether the model accepts `Cache` instances as `past_key_values`, and whether it can be generated with a
+    # preallocated `StaticCache` (`generate(..., cache_implementation="static")`).
+    _supports_cache_class = False
+    _supports_static_cache = False
+
     def __init__(self, config):
         super().__init__(config)
         self._check_and_unset_acl()
@@ -1049,10 +1054,9 @@ class PreTrainedModel(nn.Cell, CellUtilMixin, GenerationMixin):
         if ms_dtype is None:
             ms_dtype = mindspore.float32
 
-        use_bf16 = False
+        # bfloat16 weights are converted to float16 one tensor at a time when they are loaded
         if ms_dtype == mindspore.bfloat16:
             ms_dtype = mindspore.float16
-            use_bf16 = True
 
         def empty_initializer(init, shape=None, dtype=mindspore.float32):
             if not isinstance(shape, (tuple, list)):
@@ -1083,32 +1087,26 @@ class PreTrainedModel(nn.Cell, CellUtilMixin, GenerationMixin):
         # These are all the pointers of shared tensors.
         tied_params = [names for _, names in ptrs.items() if len(names) > 1]
 
+        def rename_key(key):
+            return key.replace('gamma', 'weight').replace('beta', 'bias').replace('embedding_table', 'weight')
+
         def load_ckpt(resolved_archive_file, from_pt=False):
             if from_pt and 'ckpt' not in resolved_archive_file:
-                if use_safetensors:
-                    from safetensors.numpy import load_file
-                    origin_state_dict = load_file(resolved_archive_file)
-                    if use_bf16:
-                        logger.warning_once("MindSpore do not support bfloat16 dtype, we will automaticlly convert to float16")
-                        state_dict = {k: Parameter(v.astype(np.float16)) for k, v in origin_state_dict.items()}
-                    else:
-                        state_dict = {k: Parameter(v) for k, v in origin_state_dict.items()}
-                else:
-                    state_dict = load(resolved_archive_file)
-            else:
-                try:
-                    state_dict = load_checkpoint(str(resolved_archive_file))
-                except Exception as exc:
-                    raise OSError(
-                        f"Unable to load weights from mindspore checkpoint file '{resolved_archive_file}'. "
-                    ) from exc
+                # memory-mapped, the tensors are only read (and converted) when they are assigned to the model
+                state_dict = load_checkpoint_lazy(resolved_archive_file)
+                return state_dict.rename_keys(rename_key)
+
+            try:
+                state_dict = load_checkpoint(str(resolved_archive_file))
+            except Exception as exc:
+                raise OSError(
+                    f"Unable to load weights from mindspore checkpoint file '{resolved_archive_file}'. "
+                ) from exc
 
             new_state_dict = {}
             for key, value in state_dict.items():
-                key = key.replace('gamma', 'weight').replace('beta', 'bias').replace('embedding_table', 'weight')
-                value.name = value.name.replace('gamma', 'weight').replace('beta', 'bias')\
-                    .replace('embedding_table', 'weight')
-                new_state_dict[key] = value
+                value.name = value.name.replace('gamma', 'weight').replace('beta', 'bias')
+                new_state_dict[rename_key(key)] = value
             return new_state_dict
 
         keys_missing = list(model.parameters_dict().keys())
@@ -15,101 +15,10 @@
 """
 Models init
 """
-from . import albert, auto, bart, bert, bloom, clip, codegen, cpm, distilbert, electra, ernie, ernie_m, chatglm, chatglm2, gpt, gpt_neo, gpt_neox, gpt2, \
-    llama, longformer, luke, mbart, megatron_bert, minicpm, mistral, mobilebert, nezha, opt, gpt_pangu, phi, roberta, rwkv, \
-    seamless_m4t, seamless_m4t_v2, t5, tinybert, xlm, xlm_roberta, gpt_bigcode, whisper, bark, encodec, \
-    graphormer, pop2piano, wav2vec2, hubert
-from .albert import *
-from .auto import *
-from .bark import *
-from .bart import *
-from .bert import *
-from .bloom import *
-from .clip import *
-from .codegen import *
-from .cpm import *
-from .distilbert import *
-from .ernie import *
-from .ernie_m import *
-from .electra import *
-from .chatglm import *
-from .chatglm2 import *
-from .gpt import *
-from .gpt_neo import *
-from .gpt_neox import *
-from .gpt2 import *
-from .graphormer import *
-from .llama import *
-from .longformer import *
-from .luke import *
-from .mbart import *
-from .megatron_bert import *
-from .minicpm import *
-from .mistral import *
-from .mobilebert import *
-from .nezha import *
-from .opt import *
-from .gpt_pangu import *
-from .phi import *
-from .roberta import *
-from .rwkv import *
-from .t5 import *
-from .seamless_m4t import *
-from .seamless_m4t_v2 import *
-from .tinybert import *
-from .xlm import *
-from .xlm_roberta import *
-from .gpt_bigcode import *
-from .whisper import *
-from .encodec import *
-from .pop2piano import *
-from .wav2vec2 import *
-from .hubert import *
+import sys
 
-__all__ = []
-__all__.extend(albert.__all__)
-__all__.extend(auto.__all__)
-__all__.extend(bart.__all__)
-__all__.extend(bert.__all__)
-__all__.extend(bloom.__all__)
-__all__.extend(clip.__all__)
-__all__.extend(codegen.__all__)
-__all__.extend(cpm.__all__)
-__all__.extend(distilbert.__all__)
-__all__.extend(ernie.__all__)
-__all__.extend(ernie_m.__all__)
-__all__.extend(electra.__all__)
-__all__.extend(chatglm.__all__)
-__all__.extend(chatglm2.__all__)
-__all__.extend(gpt.__all__)
-__all__.extend(gpt_neo.__all__)
-__all__.extend(gpt_neox.__all__)
-__all__.extend(gpt2.__all__)
-__all__.extend(graphormer.__all__)
-__all__.extend(llama.__all__)
-__all__.extend(longformer.__all__)
-__all__.extend(luke.__all__)
-__all__.extend(mbart.__all__)
-__all__.extend(megatron_bert.__all__)
-__all__.extend(minicpm.__all__)
-__all__.extend(mistral.__all__)
-__all__.extend(mobilebert.__all__)
-__all__.extend(nezha.__all__)
-__all__.extend(opt.__all__)
-__all__.extend(gpt_pangu.__all__)
-__all__.extend(phi.__all__)
-__all__.extend(roberta.__all__)
-__all__.extend(rwkv.__all__)
-__all__.extend(t5.__all__)
-__all__.extend(seamless_m4t.__all__)
-__all__.extend(seamless_m4t_v2.__all__)
-__all__.extend(tinybert.__all__)
-__all__.extend(xlm.__all__)
-__all__.extend(xlm_roberta.__all__)
-__all__.extend(gpt_bigcode.__all__)
-__all__.extend(whisper.__all__)
-__all__.extend(bark.__all__)
-__all__.extend(encodec.__all__)
-__all__.extend(pop2piano.__all__)
-__all__.extend(wav2vec2.__all__)
-__all__.extend(hubert.__all__)
+from mindnlp.utils.import_utils import _LazyModule
+from ._import_structure import _import_structure
+
+# model packages are only imported when one of their names (or the package itself) is accessed
+sys.modules[__name__] = _LazyModule(__name__, globals()["__file__"], _import_structure, module_spec=__spec__)
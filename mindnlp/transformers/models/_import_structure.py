@@ -0,0 +1,620 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+# This file is generated by `scripts/generate_import_structure.py`, do not edit the name lists by hand.
+"""
+Map from model package to the public names it exports, used by the lazy `mindnlp.transformers.models` module.
+"""
+
+_import_structure = {
+    "albert": [
+        "ALBERT_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "AlbertForMaskedLM",
+        "AlbertForMultipleChoice",
+        "AlbertForPreTraining",
+        "AlbertForQuestionAnswering",
+        "AlbertForSequenceClassification",
+        "AlbertForTokenClassification",
+        "AlbertModel",
+        "AlbertPreTrainedModel",
+        "AlbertConfig",
+        "AlbertTokenizer",
+        "AlbertTokenizerFast",
+    ],
+    "auto": [
+        "get_values",
+        "ALL_PRETRAINED_CONFIG_ARCHIVE_MAP",
+        "CONFIG_MAPPING",
+        "MODEL_NAMES_MAPPING",
+        "AutoConfig",
+        "TOKENIZER_MAPPING",
+        "AutoTokenizer",
+        "MODEL_FOR_AUDIO_FRAME_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_AUDIO_XVECTOR_MAPPING",
+        "MODEL_FOR_BACKBONE_MAPPING",
+        "MODEL_FOR_CAUSAL_LM_MAPPING",
+        "MODEL_FOR_CTC_MAPPING",
+        "MODEL_FOR_DEPTH_ESTIMATION_MAPPING",
+        "MODEL_FOR_DOCUMENT_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_IMAGE_TO_IMAGE_MAPPING",
+        "MODEL_FOR_INSTANCE_SEGMENTATION_MAPPING",
+        "MODEL_FOR_MASK_GENERATION_MAPPING",
+        "MODEL_FOR_MASKED_LM_MAPPING",
+        "MODEL_FOR_MULTIPLE_CHOICE_MAPPING",
+        "MODEL_FOR_NEXT_SENTENCE_PREDICTION_MAPPING",
+        "MODEL_FOR_OBJECT_DETECTION_MAPPING",
+        "MODEL_FOR_PRETRAINING_MAPPING",
+        "MODEL_FOR_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_SEQ_TO_SEQ_CAUSAL_LM_MAPPING",
+        "MODEL_FOR_SEQUENCE_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_SPEECH_SEQ_2_SEQ_MAPPING",
+        "MODEL_FOR_TABLE_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_TEXT_ENCODING_MAPPING",
+        "MODEL_FOR_TEXT_TO_SPECTROGRAM_MAPPING",
+        "MODEL_FOR_TEXT_TO_WAVEFORM_MAPPING",
+        "MODEL_FOR_TOKEN_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_UNIVERSAL_SEGMENTATION_MAPPING",
+        "MODEL_FOR_VIDEO_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_VISION_2_SEQ_MAPPING",
+        "MODEL_FOR_VISUAL_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_ZERO_SHOT_IMAGE_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_ZERO_SHOT_OBJECT_DETECTION_MAPPING",
+        "MODEL_MAPPING",
+        "MODEL_WITH_LM_HEAD_MAPPING",
+        "AutoBackbone",
+        "AutoModel",
+        "AutoModelForAudioClassification",
+        "AutoModelForAudioFrameClassification",
+        "AutoModelForAudioXVector",
+        "AutoModelForCausalLM",
+        "AutoModelForCTC",
+        "AutoModelForDepthEstimation",
+        "AutoModelForDocumentQuestionAnswering",
+        "AutoModelForImageToImage",
+        "AutoModelForInstanceSegmentation",
+        "AutoModelForMaskedLM",
+        "AutoModelForMaskGeneration",
+        "AutoModelForMultipleChoice",
+        "AutoModelForNextSentencePrediction",
+        "AutoModelForObjectDetection",
+        "AutoModelForPreTraining",
+        "AutoModelForQuestionAnswering",
+        "AutoModelForSeq2SeqLM",
+        "AutoModelForSequenceClassification",
+        "AutoModelForSpeechSeq2Seq",
+        "AutoModelForTableQuestionAnswering",
+        "AutoModelForTextEncoding",
+        "AutoModelForTextToSpectrogram",
+        "AutoModelForTextToWaveform",
+        "AutoModelForTokenClassification",
+        "AutoModelForUniversalSegmentation",
+        "AutoModelForVideoClassification",
+        "AutoModelForVision2Seq",
+        "AutoModelForVisualQuestionAnswering",
+        "AutoModelForZeroShotImageClassification",
+        "AutoModelForZeroShotObjectDetection",
+        "AutoModelWithLMHead",
+    ],
+    "bart": [
+        "BART_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "BartForCausalLM",
+        "BartForConditionalGeneration",
+        "BartForQuestionAnswering",
+        "BartForSequenceClassification",
+        "BartModel",
+        "BartPreTrainedModel",
+        "BartConfig",
+        "BartTokenizer",
+        "BartTokenizerFast",
+    ],
+    "bert": [
+        "BertEmbeddings",
+        "BertAttention",
+        "BertEncoder",
+        "BertIntermediate",
+        "BertLayer",
+        "BertModel",
+        "BertForPretraining",
+        "BertLMPredictionHead",
+        "BertForSequenceClassification",
+        "BertForMaskedLM",
+        "BertForMultipleChoice",
+        "BertForNextSentencePrediction",
+        "BertForPreTraining",
+        "BertForQuestionAnswering",
+        "BertForTokenClassification",
+        "BertLMHeadModel",
+        "MSBertEmbeddings",
+        "MSBertAttention",
+        "MSBertEncoder",
+        "MSBertIntermediate",
+        "MSBertLayer",
+        "MSBertModel",
+        "MSBertForPretraining",
+        "MSBertLMPredictionHead",
+        "MSBertForSequenceClassification",
+        "BertConfig",
+        "BertTokenizer",
+        "BertTokenizerFast",
+    ],
+    "bloom": [
+        "BLOOM_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "BloomForCausalLM",
+        "BloomModel",
+        "BloomPreTrainedModel",
+        "BloomForSequenceClassification",
+        "BloomForTokenClassification",
+        "BloomForQuestionAnswering",
+        "BloomConfig",
+        "BloomTokenizerFast",
+    ],
+    "clip": [
+        "CLIPModel",
+        "CLIPPreTrainedModel",
+        "CLIPTextModel",
+        "CLIPTextModelWithProjection",
+        "CLIPVisionModel",
+        "CLIPVisionModelWithProjection",
+        "CLIPTextConfig",
+        "CLIPVisionConfig",
+        "CLIPConfig",
+    ],
+    "codegen": [
+        "CodeGenForCausalLM",
+        "CodeGenModel",
+        "CodeGenPreTrainedModel",
+        "CodeGenConfig",
+        "CodeGenTokenizer",
+        "CodeGenTokenizerFast",
+    ],
+    "cpm": [
+        "CpmAntForCausalLM",
+        "CpmAntModel",
+        "CpmAntPreTrainedModel",
+        "CpmAntConfig",
+    ],
+    "distilbert": [
+        "DistilBertConfig",
+        "DISTILBERT_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "DistilBertForMaskedLM",
+        "DistilBertForMultipleChoice",
+        "DistilBertForQuestionAnswering",
+        "DistilBertForSequenceClassification",
+        "DistilBertForTokenClassification",
+        "DistilBertModel",
+        "DistilBertPreTrainedModel",
+        "DistilBertTokenizer",
+        "DistilBertTokenizerFast",
+    ],
+    "ernie": [
+        "ERNIE_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "ErnieForCausalLM",
+        "ErnieForMaskedLM",
+        "ErnieForMultipleChoice",
+        "ErnieForNextSentencePrediction",
+        "ErnieForPreTraining",
+        "ErnieForQuestionAnswering",
+        "ErnieForSequenceClassification",
+        "ErnieForTokenClassification",
+        "ErnieModel",
+        "ErniePreTrainedModel",
+        "UIE",
+        "MSErnieForCausalLM",
+        "MSErnieForMaskedLM",
+        "MSErnieForMultipleChoice",
+        "MSErnieForNextSentencePrediction",
+        "MSErnieForPreTraining",
+        "MSErnieForQuestionAnswering",
+        "MSErnieForSequenceClassification",
+        "MSErnieForTokenClassification",
+        "MSErnieModel",
+        "MSErniePreTrainedModel",
+        "MSUIE",
+        "ErnieConfig",
+    ],
+    "ernie_m": [
+        "ErnieMConfig",
+        "ERNIE_M_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "ErnieMForMultipleChoice",
+        "ErnieMForQuestionAnswering",
+        "ErnieMForSequenceClassification",
+        "ErnieMForTokenClassification",
+        "ErnieMModel",
+        "ErnieMPreTrainedModel",
+        "ErnieMForInformationExtraction",
+        "UIEM",
+        "MSErnieMForMultipleChoice",
+        "MSErnieMForQuestionAnswering",
+        "MSErnieMForSequenceClassification",
+        "MSErnieMForTokenClassification",
+        "MSErnieMModel",
+        "MSErnieMPreTrainedModel",
+        "MSErnieMForInformationExtraction",
+        "MSUIEM",
+        "ErnieMTokenizer",
+    ],
+    "electra": [
+    ],
+    "chatglm": [
+        "CHATGLM_6B_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "ChatGLMModel",
+        "ChatGLMPreTrainedModel",
+        "ChatGLMForConditionalGeneration",
+        "MSChatGLMModel",
+        "MSChatGLMPreTrainedModel",
+        "MSChatGLMForConditionalGeneration",
+        "ChatGLMConfig",
+        "ChatGLMTokenizer",
+    ],
+    "chatglm2": [
+        "CHATGLM2_6B_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "ChatGLM2Model",
+        "ChatGLM2PreTrainedModel",
+        "ChatGLM2ForConditionalGeneration",
+        "ChatGLM2Config",
+        "ChatGLM2Tokenizer",
+    ],
+    "gpt": [
+        "OPENAI_GPT_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "GPTDoubleHeadsModel",
+        "GPTForSequenceClassification",
+        "GPTLMHeadModel",
+        "GPTModel",
+        "GPTPreTrainedModel",
+        "GPTConfig",
+        "GPTTokenizer",
+        "GPTTokenizerFast",
+    ],
+    "gpt_neo": [
+        "GPTNeoForCausalLM",
+        "GPTNeoForSequenceClassification",
+        "GPTNeoModel",
+        "GPTNeoPreTrainedModel",
+        "GPTNeoConfig",
+    ],
+    "gpt_neox": [
+        "GPTNeoXTokenizerFast",
+    ],
+    "gpt2": [
+        "GPT2_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "GPT2DoubleHeadsModel",
+        "GPT2ForQuestionAnswering",
+        "GPT2ForSequenceClassification",
+        "GPT2ForTokenClassification",
+        "GPT2LMHeadModel",
+        "GPT2Model",
+        "GPT2PreTrainedModel",
+        "GPT2Config",
+        "GPT2Tokenizer",
+        "GPT2TokenizerFast",
+    ],
+    "graphormer": [
+        "GraphormerConfig",
+        "GraphormerDataCollator",
+        "GraphormerForGraphClassification",
+        "GraphormerModel",
+        "GraphormerPreTrainedModel",
+    ],
+    "llama": [
+        "LlamaForCausalLM",
+        "LlamaModel",
+        "LlamaPreTrainedModel",
+        "LlamaForSequenceClassification",
+        "LlamaConfig",
+        "LlamaTokenizer",
+        "LlamaTokenizerFast",
+        "CodeLlamaTokenizer",
+        "CodeLlamaTokenizerFast",
+    ],
+    "longformer": [
+        "LONGFORMER_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "LongformerForMaskedLM",
+        "LongformerForMultipleChoice",
+        "LongformerForQuestionAnswering",
+        "LongformerForSequenceClassification",
+        "LongformerForTokenClassification",
+        "LongformerModel",
+        "LongformerPreTrainedModel",
+        "LongformerSelfAttention",
+        "LongformerConfig",
+        "LongformerTokenizer",
+        "LongformerTokenizerFast",
+    ],
+    "luke": [
+        "LukeForEntityClassification",
+        "LukeForEntityPairClassification",
+        "LukeForEntitySpanClassification",
+        "LukeForMultipleChoice",
+        "LukeForQuestionAnswering",
+        "LukeForSequenceClassification",
+        "LukeForTokenClassification",
+        "LukeForMaskedLM",
+        "LukeModel",
+        "LukePreTrainedModel",
+        "LukeConfig",
+        "LukeTokenizer",
+    ],
+    "mbart": [
+        "MBART_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "MBartForCausalLM",
+        "MBartForConditionalGeneration",
+        "MBartForQuestionAnswering",
+        "MBartForSequenceClassification",
+        "MBartModel",
+        "MBartPreTrainedModel",
+        "MBartConfig",
+        "MBartTokenizer",
+        "MBartTokenizerFast",
+    ],
+    "megatron_bert": [
+        "MEGATRON_BERT_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "MegatronBertForCausalLM",
+        "MegatronBertForMaskedLM",
+        "MegatronBertForMultipleChoice",
+        "MegatronBertForNextSentencePrediction",
+        "MegatronBertForPreTraining",
+        "MegatronBertForQuestionAnswering",
+        "MegatronBertForSequenceClassification",
+        "MegatronBertForTokenClassification",
+        "MegatronBertModel",
+        "MegatronBertPreTrainedModel",
+        "MegatronBertConfig",
+    ],
+    "minicpm": [
+        "MiniCPMModel",
+        "MiniCPMPreTrainedModel",
+        "MiniCPMForCausalLM",
+        "MiniCPMForSequenceClassification",
+        "MiniCPMConfig",
+    ],
+    "mistral": [
+        "MistralForCausalLM",
+        "MistralModel",
+        "MistralPreTrainedModel",
+        "MistralForSequenceClassification",
+        "MistralConfig",
+    ],
+    "mobilebert": [
+        "MobileBertForMaskedLM",
+        "MobileBertForMultipleChoice",
+        "MobileBertForNextSentencePrediction",
+        "MobileBertForPreTraining",
+        "MobileBertForQuestionAnswering",
+        "MobileBertForSequenceClassification",
+        "MobileBertForTokenClassification",
+        "MobileBertLayer",
+        "MobileBertModel",
+        "MobileBertPreTrainedModel",
+        "MobileBertConfig",
+        "MobileBertTokenizer",
+    ],
+    "nezha": [
+        "NezhaForNextSentencePrediction",
+        "NezhaForMaskedLM",
+        "NezhaForPreTraining",
+        "NezhaForMultipleChoice",
+        "NezhaForQuestionAnswering",
+        "NezhaForSequenceClassification",
+        "NezhaForTokenClassification",
+        "NezhaModel",
+        "NezhaPreTrainedModel",
+        "NezhaConfig",
+        "NezhaTokenizer",
+    ],
+    "opt": [
+        "OPT_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "OPTForCausalLM",
+        "OPTModel",
+        "OPTPreTrainedModel",
+        "OPTForSequenceClassification",
+        "OPTForQuestionAnswering",
+        "OPTConfig",
+    ],
+    "gpt_pangu": [
+        "GPTPangu_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "GPTPanguPreTrainedModel",
+        "GPTPanguModel",
+        "GPTPanguForCausalLM",
+        "GPTPanguConfig",
+        "GPTPanguTokenizer",
+    ],
+    "phi": [
+        "PhiConfig",
+        "PHI_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "PhiForTokenClassification",
+        "PhiForSequenceClassification",
+        "PhiForCausalLM",
+        "PhiModel",
+        "PhiPreTrainedModel",
+    ],
+    "roberta": [
+        "RobertaForCausalLM",
+        "RobertaForMaskedLM",
+        "RobertaForMultipleChoice",
+        "RobertaForQuestionAnswering",
+        "RobertaForSequenceClassification",
+        "RobertaForTokenClassification",
+        "RobertaModel",
+        "RobertaPreTrainedModel",
+        "RobertaConfig",
+        "RobertaTokenizer",
+        "RobertaTokenizerFast",
+    ],
+    "rwkv": [
+        "RWKV_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "RwkvForCausalLM",
+        "RwkvModel",
+        "RwkvPreTrainedModel",
+        "RwkvConfig",
+    ],
+    "t5": [
+        "T5_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "T5EncoderModel",
+        "T5ForConditionalGeneration",
+        "T5Model",
+        "T5PreTrainedModel",
+        "T5ForQuestionAnswering",
+        "T5ForSequenceClassification",
+        "T5Config",
+        "T5Tokenizer",
+        "T5TokenizerFast",
+        "ByT5Tokenizer",
+        "ChatYuanTokenizer",
+    ],
+    "seamless_m4t": [
+        "SEAMLESS_M4T_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "SeamlessM4TForTextToSpeech",
+        "SeamlessM4TForSpeechToSpeech",
+        "SeamlessM4TForTextToText",
+        "SeamlessM4TForSpeechToText",
+        "SeamlessM4TModel",
+        "SeamlessM4TPreTrainedModel",
+        "SeamlessM4TCodeHifiGan",
+        "SeamlessM4THifiGan",
+        "SeamlessM4TTextToUnitForConditionalGeneration",
+        "SeamlessM4TTextToUnitModel",
+        "SeamlessM4TConfig",
+        "SeamlessM4TTokenizer",
+        "SeamlessM4TTokenizerFast",
+        "SeamlessM4TFeatureExtractor",
+        "SeamlessM4TProcessor",
+    ],
+    "seamless_m4t_v2": [
+        "SEAMLESS_M4T_V2_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "SeamlessM4Tv2ForTextToSpeech",
+        "SeamlessM4Tv2ForSpeechToSpeech",
+        "SeamlessM4Tv2ForTextToText",
+        "SeamlessM4Tv2ForSpeechToText",
+        "SeamlessM4Tv2Model",
+        "SeamlessM4Tv2PreTrainedModel",
+        "SeamlessM4Tv2Config",
+    ],
+    "tinybert": [
+        "TinyBertModel",
+        "TinyBertForSequenceClassification",
+        "TinyBertForMaskedLM",
+        "TinyBertForNextSentencePrediction",
+        "TinyBertForSentencePairClassification",
+        "TinyBertForPreTraining",
+        "TinyBertFitForPreTraining",
+        "TinyBertConfig",
+    ],
+    "xlm": [
+        "XLM_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "XLMForMultipleChoice",
+        "XLMForQuestionAnswering",
+        "XLMForQuestionAnsweringSimple",
+        "XLMForSequenceClassification",
+        "XLMForTokenClassification",
+        "XLMModel",
+        "XLMPreTrainedModel",
+        "XLMWithLMHeadModel",
+        "XLMConfig",
+        "XLMTokenizer",
+    ],
+    "xlm_roberta": [
+        "XLMRobertaConfig",
+        "XLMRobertaForCausalLM",
+        "XLMRobertaForMaskedLM",
+        "XLMRobertaForMultipleChoice",
+        "XLMRobertaForQuestionAnswering",
+        "XLMRobertaForSequenceClassification",
+        "XLMRobertaForTokenClassification",
+        "XLMRobertaModel",
+        "XLMRobertaPreTrainedModel",
+        "XLMRobertaTokenizer",
+        "XLMRobertaTokenizerFast",
+    ],
+    "gpt_bigcode": [
+        "GPTBigCodeAttention",
+        "GPTBigCodeMLP",
+        "GPTBigCodeBlock",
+        "GPTBigCodePreTrainedModel",
+        "GPTBigCodeModel",
+        "GPTBigCodeForTokenClassification",
+        "GPTBigCodeForSequenceClassification",
+        "GPTBigCodeForCausalLM",
+        "GPTBigCodeConfig",
+        "GPTBigCodeTokenizer",
+    ],
+    "whisper": [
+        "WhisperForCausalLM",
+        "WhisperForConditionalGeneration",
+        "WhisperModel",
+        "WhisperPreTrainedModel",
+        "WhisperForAudioClassification",
+        "WhisperTokenizer",
+        "WhisperProcessor",
+        "WhisperConfig",
+        "WhisperFeatureExtractor",
+    ],
+    "bark": [
+        "BarkModel",
+        "BarkSelfAttention",
+        "BarkMLP",
+        "BarkLayerNorm",
+        "BarkBlock",
+        "BarkCausalModel",
+        "BarkSemanticModel",
+        "BarkCoarseModel",
+        "BarkFineModel",
+        "BarkSubModelConfig",
+        "BarkConfig",
+        "BarkSemanticConfig",
+        "BarkCoarseConfig",
+        "BarkFineConfig",
+    ],
+    "encodec": [
+        "EncodecModel",
+        "EncodecConv1d",
+        "EncodecConvTranspose1d",
+        "EncodecLSTM",
+        "EncodecResnetBlock",
+        "EncodecConfig",
+    ],
+    "pop2piano": [
+        "Pop2PianoPreTrainedModel",
+        "Pop2PianoForConditionalGeneration",
+        "Pop2PianoTokenizer",
+        "Pop2PianoProcessor",
+        "Pop2PianoConfig",
+        "Pop2PianoFeatureExtractor",
+    ],
+    "wav2vec2": [
+        "WAV_2_VEC_2_PRETRAINED_CONFIG_ARCHIVE_MAP",
+        "Wav2Vec2Config",
+        "Wav2Vec2FeatureExtractor",
+        "Wav2Vec2Processor",
+        "Wav2Vec2CTCTokenizer",
+        "Wav2Vec2Tokenizer",
+        "WAV_2_VEC_2_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "Wav2Vec2PreTrainedModel",
+        "Wav2Vec2Model",
+        "Wav2Vec2ForPreTraining",
+        "Wav2Vec2ForMaskedLM",
+        "Wav2Vec2ForCTC",
+        "Wav2Vec2ForSequenceClassification",
+        "Wav2Vec2ForAudioFrameClassification",
+        "Wav2Vec2ForXVector",
+    ],
+    "hubert": [
+        "HUBERT_PRETRAINED_CONFIG_ARCHIVE_MAP",
+        "HubertConfig",
+        "HUBERT_PRETRAINED_MODEL_ARCHIVE_LIST",
+        "HubertPreTrainedModel",
+        "HubertModel",
+        "HubertForCTC",
+        "HubertForSequenceClassification",
+    ],
+}
@@ -13,162 +13,91 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """ Auto class."""
+import sys
 
-from mindnlp.utils import (
-    OptionalDependencyNotAvailable,
-    is_mindspore_available,
-)
+from mindnlp.utils.import_utils import _LazyModule
 
-from .auto_factory import get_values
-from .configuration_auto import (
-    ALL_PRETRAINED_CONFIG_ARCHIVE_MAP,
-    CONFIG_MAPPING,
-    MODEL_NAMES_MAPPING,
-    AutoConfig,
-)
+_import_structure = {
+    "auto_factory": [
+        "get_values",
+    ],
+    "configuration_auto": [
+        "ALL_PRETRAINED_CONFIG_ARCHIVE_MAP",
+        "CONFIG_MAPPING",
+        "MODEL_NAMES_MAPPING",
+        "AutoConfig",
+    ],
+    "tokenization_auto": [
+        "TOKENIZER_MAPPING",
+        "AutoTokenizer",
+    ],
+    "modeling_auto": [
+        "MODEL_FOR_AUDIO_FRAME_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_AUDIO_XVECTOR_MAPPING",
+        "MODEL_FOR_BACKBONE_MAPPING",
+        "MODEL_FOR_CAUSAL_LM_MAPPING",
+        "MODEL_FOR_CTC_MAPPING",
+        "MODEL_FOR_DEPTH_ESTIMATION_MAPPING",
+        "MODEL_FOR_DOCUMENT_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_IMAGE_TO_IMAGE_MAPPING",
+        "MODEL_FOR_INSTANCE_SEGMENTATION_MAPPING",
+        "MODEL_FOR_MASK_GENERATION_MAPPING",
+        "MODEL_FOR_MASKED_LM_MAPPING",
+        "MODEL_FOR_MULTIPLE_CHOICE_MAPPING",
+        "MODEL_FOR_NEXT_SENTENCE_PREDICTION_MAPPING",
+        "MODEL_FOR_OBJECT_DETECTION_MAPPING",
+        "MODEL_FOR_PRETRAINING_MAPPING",
+        "MODEL_FOR_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_SEQ_TO_SEQ_CAUSAL_LM_MAPPING",
+        "MODEL_FOR_SEQUENCE_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_SPEECH_SEQ_2_SEQ_MAPPING",
+        "MODEL_FOR_TABLE_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_TEXT_ENCODING_MAPPING",
+        "MODEL_FOR_TEXT_TO_SPECTROGRAM_MAPPING",
+        "MODEL_FOR_TEXT_TO_WAVEFORM_MAPPING",
+        "MODEL_FOR_TOKEN_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_UNIVERSAL_SEGMENTATION_MAPPING",
+        "MODEL_FOR_VIDEO_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_VISION_2_SEQ_MAPPING",
+        "MODEL_FOR_VISUAL_QUESTION_ANSWERING_MAPPING",
+        "MODEL_FOR_ZERO_SHOT_IMAGE_CLASSIFICATION_MAPPING",
+        "MODEL_FOR_ZERO_SHOT_OBJECT_DETECTION_MAPPING",
+        "MODEL_MAPPING",
+        "MODEL_WITH_LM_HEAD_MAPPING",
+        "AutoBackbone",
+        "AutoModel",
+        "AutoModelForAudioClassification",
+        "AutoModelForAudioFrameClassification",
+        "AutoModelForAudioXVector",
+        "AutoModelForCausalLM",
+        "AutoModelForCTC",
+        "AutoModelForDepthEstimation",
+        "AutoModelForDocumentQuestionAnswering",
+        "AutoModelForImageToImage",
+        "AutoModelForInstanceSegmentation",
+        "AutoModelForMaskedLM",
+        "AutoModelForMaskGeneration",
+        "AutoModelForMultipleChoice",
+        "AutoModelForNextSentencePrediction",
+        "AutoModelForObjectDetection",
+        "AutoModelForPreTraining",
+        "AutoModelForQuestionAnswering",
+        "AutoModelForSeq2SeqLM",
+        "AutoModelForSequenceClassification",
+        "AutoModelForSpeechSeq2Seq",
+        "AutoModelForTableQuestionAnswering",
+        "AutoModelForTextEncoding",
+        "AutoModelForTextToSpectrogram",
+        "AutoModelForTextToWaveform",
+        "AutoModelForTokenClassification",
+        "AutoModelForUniversalSegmentation",
+        "AutoModelForVideoClassification",
+        "AutoModelForVision2Seq",
+        "AutoModelForVisualQuestionAnswering",
+        "AutoModelForZeroShotImageClassification",
+        "AutoModelForZeroShotObjectDetection",
+        "AutoModelWithLMHead",
+    ],
+}
 
-from .tokenization_auto import TOKENIZER_MAPPING, AutoTokenizer
-
-
-from .modeling_auto import (
-    MODEL_FOR_AUDIO_FRAME_CLASSIFICATION_MAPPING,
-    MODEL_FOR_AUDIO_XVECTOR_MAPPING,
-    MODEL_FOR_BACKBONE_MAPPING,
-    MODEL_FOR_CAUSAL_LM_MAPPING,
-    MODEL_FOR_CTC_MAPPING,
-    MODEL_FOR_DEPTH_ESTIMATION_MAPPING,
-    MODEL_FOR_DOCUMENT_QUESTION_ANSWERING_MAPPING,
-    MODEL_FOR_IMAGE_TO_IMAGE_MAPPING,
-    MODEL_FOR_INSTANCE_SEGMENTATION_MAPPING,
-    MODEL_FOR_MASK_GENERATION_MAPPING,
-    MODEL_FOR_MASKED_LM_MAPPING,
-    MODEL_FOR_MULTIPLE_CHOICE_MAPPING,
-    MODEL_FOR_NEXT_SENTENCE_PREDICTION_MAPPING,
-    MODEL_FOR_OBJECT_DETECTION_MAPPING,
-    MODEL_FOR_PRETRAINING_MAPPING,
-    MODEL_FOR_QUESTION_ANSWERING_MAPPING,
-    MODEL_FOR_SEQ_TO_SEQ_CAUSAL_LM_MAPPING,
-    MODEL_FOR_SEQUENCE_CLASSIFICATION_MAPPING,
-    MODEL_FOR_SPEECH_SEQ_2_SEQ_MAPPING,
-    MODEL_FOR_TABLE_QUESTION_ANSWERING_MAPPING,
-    MODEL_FOR_TEXT_ENCODING_MAPPING,
-    MODEL_FOR_TEXT_TO_SPECTROGRAM_MAPPING,
-    MODEL_FOR_TEXT_TO_WAVEFORM_MAPPING,
-    MODEL_FOR_TOKEN_CLASSIFICATION_MAPPING,
-    MODEL_FOR_UNIVERSAL_SEGMENTATION_MAPPING,
-    MODEL_FOR_VIDEO_CLASSIFICATION_MAPPING,
-    MODEL_FOR_VISION_2_SEQ_MAPPING,
-    MODEL_FOR_VISUAL_QUESTION_ANSWERING_MAPPING,
-    MODEL_FOR_ZERO_SHOT_IMAGE_CLASSIFICATION_MAPPING,
-    MODEL_FOR_ZERO_SHOT_OBJECT_DETECTION_MAPPING,
-    MODEL_MAPPING,
-    MODEL_WITH_LM_HEAD_MAPPING,
-    AutoBackbone,
-    AutoModel,
-    AutoModelForAudioClassification,
-    AutoModelForAudioFrameClassification,
-    AutoModelForAudioXVector,
-    AutoModelForCausalLM,
-    AutoModelForCTC,
-    AutoModelForDepthEstimation,
-    AutoModelForDocumentQuestionAnswering,
-    AutoModelForImageToImage,
-    AutoModelForInstanceSegmentation,
-    AutoModelForMaskedLM,
-    AutoModelForMaskGeneration,
-    AutoModelForMultipleChoice,
-    AutoModelForNextSentencePrediction,
-    AutoModelForObjectDetection,
-    AutoModelForPreTraining,
-    AutoModelForQuestionAnswering,
-    AutoModelForSeq2SeqLM,
-    AutoModelForSequenceClassification,
-    AutoModelForSpeechSeq2Seq,
-    AutoModelForTableQuestionAnswering,
-    AutoModelForTextEncoding,
-    AutoModelForTextToSpectrogram,
-    AutoModelForTextToWaveform,
-    AutoModelForTokenClassification,
-    AutoModelForUniversalSegmentation,
-    AutoModelForVideoClassification,
-    AutoModelForVision2Seq,
-    AutoModelForVisualQuestionAnswering,
-    AutoModelForZeroShotImageClassification,
-    AutoModelForZeroShotObjectDetection,
-    AutoModelWithLMHead,
-)
-
-__all__ = [
-    'get_values',
-    'ALL_PRETRAINED_CONFIG_ARCHIVE_MAP',
-    'CONFIG_MAPPING',
-    'MODEL_NAMES_MAPPING',
-    'AutoConfig',
-    'TOKENIZER_MAPPING',
-    'AutoTokenizer',
-    'MODEL_FOR_AUDIO_FRAME_CLASSIFICATION_MAPPING',
-    'MODEL_FOR_AUDIO_XVECTOR_MAPPING',
-    'MODEL_FOR_BACKBONE_MAPPING',
-    'MODEL_FOR_CAUSAL_LM_MAPPING',
-    'MODEL_FOR_CTC_MAPPING',
-    'MODEL_FOR_DEPTH_ESTIMATION_MAPPING',
-    'MODEL_FOR_DOCUMENT_QUESTION_ANSWERING_MAPPING',
-    'MODEL_FOR_IMAGE_TO_IMAGE_MAPPING',
-    'MODEL_FOR_INSTANCE_SEGMENTATION_MAPPING',
-    'MODEL_FOR_MASK_GENERATION_MAPPING',
-    'MODEL_FOR_MASKED_LM_MAPPING',
-    'MODEL_FOR_MULTIPLE_CHOICE_MAPPING',
-    'MODEL_FOR_NEXT_SENTENCE_PREDICTION_MAPPING',
-    'MODEL_FOR_OBJECT_DETECTION_MAPPING',
-    'MODEL_FOR_PRETRAINING_MAPPING',
-    'MODEL_FOR_QUESTION_ANSWERING_MAPPING',
-    'MODEL_FOR_SEQ_TO_SEQ_CAUSAL_LM_MAPPING',
-    'MODEL_FOR_SEQUENCE_CLASSIFICATION_MAPPING',
-    'MODEL_FOR_SPEECH_SEQ_2_SEQ_MAPPING',
-    'MODEL_FOR_TABLE_QUESTION_ANSWERING_MAPPING',
-    'MODEL_FOR_TEXT_ENCODING_MAPPING',
-    'MODEL_FOR_TEXT_TO_SPECTROGRAM_MAPPING',
-    'MODEL_FOR_TEXT_TO_WAVEFORM_MAPPING',
-    'MODEL_FOR_TOKEN_CLASSIFICATION_MAPPING',
-    'MODEL_FOR_UNIVERSAL_SEGMENTATION_MAPPING',
-    'MODEL_FOR_VIDEO_CLASSIFICATION_MAPPING',
-    'MODEL_FOR_VISION_2_SEQ_MAPPING',
-    'MODEL_FOR_VISUAL_QUESTION_ANSWERING_MAPPING',
-    'MODEL_FOR_ZERO_SHOT_IMAGE_CLASSIFICATION_MAPPING',
-    'MODEL_FOR_ZERO_SHOT_OBJECT_DETECTION_MAPPING',
-    'MODEL_MAPPING',
-    'MODEL_WITH_LM_HEAD_MAPPING',
-    'AutoBackbone',
-    'AutoModel',
-    'AutoModelForAudioClassification',
-    'AutoModelForAudioFrameClassification',
-    'AutoModelForAudioXVector',
-    'AutoModelForCausalLM',
-    'AutoModelForCTC',
-    'AutoModelForDepthEstimation',
-    'AutoModelForDocumentQuestionAnswering',
-    'AutoModelForImageToImage',
-    'AutoModelForInstanceSegmentation',
-    'AutoModelForMaskedLM',
-    'AutoModelForMaskGeneration',
-    'AutoModelForMultipleChoice',
-    'AutoModelForNextSentencePrediction',
-    'AutoModelForObjectDetection',
-    'AutoModelForPreTraining',
-    'AutoModelForQuestionAnswering',
-    'AutoModelForSeq2SeqLM',
-    'AutoModelForSequenceClassification',
-    'AutoModelForSpeechSeq2Seq',
-    'AutoModelForTableQuestionAnswering',
-    'AutoModelForTextEncoding',
-    'AutoModelForTextToSpectrogram',
-    'AutoModelForTextToWaveform',
-    'AutoModelForTokenClassification',
-    'AutoModelForUniversalSegmentation',
-    'AutoModelForVideoClassification',
-    'AutoModelForVision2Seq',
-    'AutoModelForVisualQuestionAnswering',
-    'AutoModelForZeroShotImageClassification',
-    'AutoModelForZeroShotObjectDetection',
-    'AutoModelWithLMHead',
-]
+sys.modules[__name__] = _LazyModule(__name__, globals()["__file__"], _import_structure, module_spec=__spec__)
@@ -649,6 +649,8 @@ class BloomForCausalLM(BloomPreTrainedModel):
                 "attention_mask": attention_mask,
             }
         )
+        if kwargs.get("num_logits_to_keep") is not None:
+            model_inputs["num_logits_to_keep"] = kwargs["num_logits_to_keep"]
         return model_inputs
 
     def construct(
@@ -663,6 +665,7 @@ class BloomForCausalLM(BloomPreTrainedModel):
         output_attentions: Optional[bool] = None,
         output_hidden_states: Optional[bool] = None,
         return_dict: Optional[bool] = None,
+        num_logits_to_keep: int = 0,
         **deprecated_arguments,
     ) -> Union[Tuple[mindspore.Tensor], CausalLMOutputWithCrossAttentions]:
         r"""
@@ -670,6 +673,8 @@ class BloomForCausalLM(BloomPreTrainedModel):
             Labels for language modeling. Note that the labels **are shifted** inside the model, i.e. you can set
             `labels = input_ids` Indices are selected in `[-100, 0, ..., config.vocab_size]` All labels set to `-100`
             are ignored (masked), the loss is only computed for labels in `[0, ..., config.vocab_size]`
+        num_logits_to_keep (`int`, *optional*, defaults to 0):
+            Calculate logits for the last `num_logits_to_keep` tokens only. If `0`, calculate logits for all tokens.
         """
         if deprecated_arguments.pop("position_ids", False) is not False:
             # `position_ids` could have been `mindspore.Tensor` or `None` so defaulting pop to `False` allows to detect if users were passing explicitly `None`
@@ -696,7 +701,7 @@ class BloomForCausalLM(BloomPreTrainedModel):
         )
         hidden_states = transformer_outputs[0]
 
-        lm_logits = self.lm_head(hidden_states)
+        lm_logits = self.lm_head(hidden_states[:, -num_logits_to_keep:, :])
 
         loss = None
         if labels is not None:
@@ -27,6 +27,7 @@ import mindspore
 from mindspore import nn, ops, Parameter
 
 from mindnlp.utils import logging
+from ...modeling_rope_utils import RotaryEmbeddingTables
 from ...modeling_outputs import (
     BaseModelOutputWithPast,
     CausalLMOutputWithPast,
@@ -120,10 +121,10 @@ def split_tensor_along_last_dim(
 class RotaryEmbedding(nn.Cell):
     def __init__(self, dim, original_impl=False, dtype=None):
         super().__init__()
-        inv_freq = 1.0 / (10000 ** (ops.arange(0, dim, 2).to(dtype=dtype) / dim))
-        self.inv_freq = inv_freq
         self.dim = dim
         self.original_impl = original_impl
+        self.cache_dtype = dtype if dtype is not None else mindspore.float32
+        self._rope_cache = None
 
     def construct_impl(
             self, seq_len: int, n_elem: int, dtype: mindspore.dtype, base: int = 10000
@@ -134,16 +135,10 @@ class RotaryEmbedding(nn.Cell):
         transformers/rope/__init__.py. MIT License:
         https://github.com/labmlai/annotated_deep_learning_paper_implementations/blob/master/license.
         """
-        # $\Theta = {\theta_i = 10000^{\frac{2(i-1)}{d}}, i \in [1, 2, ..., \frac{d}{2}]}$
-        theta = 1.0 / (base ** (ops.arange(0, n_elem, 2, dtype=dtype) / n_elem))
-
-        # Create position indexes `[0, 1, ..., seq_len - 1]`
-        seq_idx = ops.arange(seq_len, dtype=dtype)
-
-        # Calculate the product of position index and $\theta_i$
-        idx_theta = ops.outer(seq_idx, theta).float()
-
-        cache = ops.stack([ops.cos(idx_theta), ops.sin(idx_theta)], axis=-1)
+        # cos and sin of $\theta_i m$ for $\theta_i = 10000^{\frac{2(i-1)}{d}}, i \in [1, 2, ..., \frac{d}{2}]$ and
+        # the positions $m$ in `[0, seq_len)`, taken from the tables shared with the other RoPE models
+        cos, sin = RotaryEmbeddingTables.get(n_elem, seq_len, base=base, max_position_embeddings=seq_len)
+        cache = ops.stack([cos[:, : n_elem // 2], sin[:, : n_elem // 2]], axis=-1)
 
         # this is to mimic the behaviour of complex32, else we will get different results
         if dtype in (mindspore.float16, mindspore.bfloat16, mindspore.int8):
@@ -151,7 +146,10 @@ class RotaryEmbedding(nn.Cell):
         return cache
 
     def construct(self, max_seq_len, offset=0):
-        return self.construct_impl(max_seq_len, self.dim, dtype=self.inv_freq.dtype)
+        # the model asks for the same length at every forward pass, so the cache is built once
+        if self._rope_cache is None or self._rope_cache[0] != max_seq_len:
+            self._rope_cache = (max_seq_len, self.construct_impl(max_seq_len, self.dim, dtype=self.cache_dtype))
+        return self._rope_cache[1]
 
 
 def apply_rotary_pos_emb(x: mindspore.Tensor, rope_cache: mindspore.Tensor) -> mindspore.Tensor:
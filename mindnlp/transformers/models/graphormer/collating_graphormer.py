@@ -17,6 +17,9 @@ MindNLP Graphormer data collator
 """
 
 
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from typing import Mapping
 
 import numpy as np
@@ -40,9 +43,135 @@ def convert_to_single_emb(node_feature, offset: int = 512):
     return node_feature
 
 
-def preprocess_item(item, keep_features=True):
-    """Process each item of the graph dataset"""
-    requires_backends(preprocess_item, ["cython"])
+# Same cap as `algos_graphormer.UNREACHABLE_NODE_DISTANCE`
+UNREACHABLE_NODE_DISTANCE = 510
+
+SHORTEST_PATH_ALGORITHMS = ("bfs", "floyd_warshall")
+
+
+def bfs_shortest_path(edge_index, num_nodes):
+    """
+    All-pairs shortest paths of a sparse unweighted graph, by a breadth-first search from every
+    node at once. It costs O(num_nodes * num_edges), instead of O(num_nodes ** 3) for Floyd-Warshall.
+
+    Args:
+        edge_index (numpy.ndarray): The `(2, num_edges)` source and target nodes of the edges.
+        num_nodes (int): The number of nodes.
+
+    Returns:
+        - numpy.ndarray, The `(num_nodes, num_nodes)` int32 distances, `UNREACHABLE_NODE_DISTANCE`
+          between disconnected nodes.
+        - numpy.ndarray, The `(num_nodes, num_nodes)` int32 predecessors, `predecessors[i, j]` is the
+          node before `j` on the shortest path from `i`, -1 when there is none.
+    """
+    edge_index = np.asarray(edge_index, dtype=np.int64).reshape(2, -1)
+    order = np.argsort(edge_index[0], kind="stable")
+    targets = edge_index[1][order]
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_index[0], minlength=num_nodes), out=indptr[1:])
+
+    dist = np.full((num_nodes, num_nodes), UNREACHABLE_NODE_DISTANCE, dtype=np.int32)
+    predecessors = np.full((num_nodes, num_nodes), -1, dtype=np.int32)
+    sources = np.arange(num_nodes)
+    dist[sources, sources] = 0
+
+    # the frontier holds (source, node) pairs, expanded one level at a time along the CSR edges
+    nodes = sources
+    depth = 0
+    while sources.size and depth < UNREACHABLE_NODE_DISTANCE - 1:
+        depth += 1
+        degrees = indptr[nodes + 1] - indptr[nodes]
+        total = int(degrees.sum())
+        if total == 0:
+            break
+        offsets = np.arange(total) - np.repeat(np.cumsum(degrees) - degrees, degrees)
+        next_nodes = targets[np.repeat(indptr[nodes], degrees) + offsets]
+        parents = np.repeat(nodes, degrees)
+        sources = np.repeat(sources, degrees)
+
+        unseen = dist[sources, next_nodes] == UNREACHABLE_NODE_DISTANCE
+        sources, parents, next_nodes = sources[unseen], parents[unseen], next_nodes[unseen]
+        # a node reached by several parents keeps the first one
+        _, first = np.unique(sources * num_nodes + next_nodes, return_index=True)
+        sources, parents, nodes = sources[first], parents[first], next_nodes[first]
+
+        dist[sources, nodes] = depth
+        predecessors[sources, nodes] = parents
+
+    return dist, predecessors
+
+
+def gen_edge_input_from_predecessors(max_dist, dist, predecessors, edge_feat):
+    """
+    Vectorized edge features along the shortest paths given by `bfs_shortest_path`.
+
+    Args:
+        max_dist (int): The size of the path dimension of the output.
+        dist (numpy.ndarray): The `(num_nodes, num_nodes)` shortest path distances.
+        predecessors (numpy.ndarray): The `(num_nodes, num_nodes)` predecessors of the shortest paths.
+        edge_feat (numpy.ndarray): The `(num_nodes, num_nodes, num_edge_features)` edge features.
+
+    Returns:
+        - numpy.ndarray, The `(num_nodes, num_nodes, max_dist, num_edge_features)` int32 features of
+          the `k`-th edge of the path from node `i` to node `j`, -1 past the end of the path.
+    """
+    num_nodes = dist.shape[0]
+    edge_input = np.full((num_nodes, num_nodes, max_dist, edge_feat.shape[-1]), -1, dtype=np.int32)
+
+    reachable = (dist > 0) & (dist < UNREACHABLE_NODE_DISTANCE) & (dist <= max_dist)
+    sources, targets = np.nonzero(reachable)
+    nodes = targets
+    # walk every path back from its target, writing one edge per step for all pairs at once
+    while sources.size:
+        parents = predecessors[sources, nodes]
+        edge_input[sources, targets, dist[sources, nodes] - 1] = edge_feat[parents, nodes]
+        keep = parents != sources
+        sources, targets, nodes = sources[keep], targets[keep], parents[keep]
+
+    return edge_input
+
+
+def _cache_key(item, keep_features, shortest_path):
+    sha = hashlib.sha1()
+    sha.update(f"{shortest_path}:{keep_features}:{int(item['num_nodes'])}".encode())
+    sha.update(np.ascontiguousarray(item["edge_index"], dtype=np.int64).tobytes())
+    if keep_features and "edge_attr" in item.keys():
+        edge_attr = np.ascontiguousarray(item["edge_attr"], dtype=np.int64)
+        sha.update(str(edge_attr.shape).encode())
+        sha.update(edge_attr.tobytes())
+    return sha.hexdigest()
+
+
+def _cache_paths(cache_dir, key):
+    return (os.path.join(cache_dir, key[:2], f"{key}.spatial_pos.npy"),
+            os.path.join(cache_dir, key[:2], f"{key}.input_edges.npy"))
+
+
+def _save_array(path, array):
+    # written to a temporary file first, so concurrent workers never read a partial array
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.save(file, array)
+    os.replace(tmp_path, path)
+
+
+def preprocess_item(item, keep_features=True, shortest_path="bfs", cache_dir=None):
+    """
+    Process each item of the graph dataset
+
+    Args:
+        item (dict): The graph, with `edge_index`, `num_nodes` and optionally `edge_attr` and `node_feat`.
+        keep_features (bool): Whether to use the node and edge features. Default: True.
+        shortest_path (str): The all-pairs shortest path algorithm, `"bfs"` for sparse unweighted graphs,
+            or the Cython `"floyd_warshall"`. Shortest paths of the same length may be chosen differently.
+            Default: "bfs".
+        cache_dir (str): If set, `spatial_pos` and `input_edges` are stored in this directory under a hash
+            of the graph, and memory-mapped when the same graph is processed again. Default: None.
+    """
+    if shortest_path not in SHORTEST_PATH_ALGORITHMS:
+        raise ValueError(f"`shortest_path` should be one of {SHORTEST_PATH_ALGORITHMS}, but got {shortest_path}.")
+    if shortest_path == "floyd_warshall":
+        requires_backends(preprocess_item, ["cython"])
 
     if keep_features and "edge_attr" in item.keys():  # edge_attr
         edge_attr = np.asarray(item["edge_attr"], dtype=np.int64)
@@ -68,38 +197,85 @@ def preprocess_item(item, keep_features=True):
     adj = np.zeros([num_nodes, num_nodes], dtype=bool)
     adj[edge_index[0], edge_index[1]] = True
 
-    shortest_path_result, path = algos_graphormer.floyd_warshall(adj)
-    max_dist = np.amax(shortest_path_result)
+    cache_paths = None
+    if cache_dir is not None:
+        cache_paths = _cache_paths(cache_dir, _cache_key(item, keep_features, shortest_path))
+    if cache_paths is not None and all(os.path.exists(path) for path in cache_paths):
+        spatial_pos = np.load(cache_paths[0], mmap_mode="r")
+        input_edges = np.load(cache_paths[1], mmap_mode="r")
+    else:
+        if shortest_path == "bfs":
+            shortest_path_result, predecessors = bfs_shortest_path(edge_index, num_nodes)
+            max_dist = np.amax(shortest_path_result, initial=0)
+            input_edges = gen_edge_input_from_predecessors(
+                max_dist, shortest_path_result, predecessors, attn_edge_type
+            )
+        else:
+            shortest_path_result, path = algos_graphormer.floyd_warshall(adj)
+            max_dist = np.amax(shortest_path_result)
+            input_edges = algos_graphormer.gen_edge_input(max_dist, path, attn_edge_type)
+        spatial_pos = shortest_path_result.astype(np.int64) + 1  # we shift all indices by one for padding
+        input_edges = input_edges + 1  # we shift all indices by one for padding
+        if cache_paths is not None:
+            os.makedirs(os.path.dirname(cache_paths[0]), exist_ok=True)
+            _save_array(cache_paths[0], spatial_pos)
+            _save_array(cache_paths[1], input_edges)
 
-    input_edges = algos_graphormer.gen_edge_input(max_dist, path, attn_edge_type)
     attn_bias = np.zeros([num_nodes + 1, num_nodes + 1], dtype=np.single)  # with graph token
 
     # combine
     item["input_nodes"] = input_nodes + 1  # we shift all indices by one for padding
     item["attn_bias"] = attn_bias
     item["attn_edge_type"] = attn_edge_type
-    item["spatial_pos"] = shortest_path_result.astype(np.int64) + 1  # we shift all indices by one for padding
+    item["spatial_pos"] = spatial_pos
     item["in_degree"] = np.sum(adj, axis=1).reshape(-1) + 1  # we shift all indices by one for padding
     item["out_degree"] = item["in_degree"]  # for undirected graph
-    item["input_edges"] = input_edges + 1  # we shift all indices by one for padding
+    item["input_edges"] = input_edges
     if "labels" not in item:
         item["labels"] = item["y"]
 
     return item
 
 
+def _precompute_item(args):
+    item, keep_features, shortest_path, cache_dir = args
+    preprocess_item(dict(item), keep_features, shortest_path, cache_dir)
+
+
+def precompute_cache(items, cache_dir, keep_features=True, shortest_path="bfs", num_workers=None, chunksize=64):
+    """
+    Fill the on-disk cache of `preprocess_item` for a graph dataset with a process pool, so that
+    later epochs only memory-map the `spatial_pos` and `input_edges` arrays.
+
+    Args:
+        items (Iterable[dict]): The graphs, as accepted by `preprocess_item`.
+        cache_dir (str): The cache directory.
+        keep_features (bool): Whether to use the edge features. Default: True.
+        shortest_path (str): The all-pairs shortest path algorithm. Default: "bfs".
+        num_workers (int): The number of processes, `os.cpu_count()` if None. Default: None.
+        chunksize (int): The number of graphs sent to a process at once. Default: 64.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    tasks = ((item, keep_features, shortest_path, cache_dir) for item in items)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        for _ in executor.map(_precompute_item, tasks, chunksize=chunksize):
+            pass
+
+
 class GraphormerDataCollator:
     """
     Graphormer data collator
 
     Converts graph dataset into the format accepted by Graphormer model
     """
-    def __init__(self, spatial_pos_max=20, on_the_fly_processing=False):
-        if not is_cython_available():
+    def __init__(self, spatial_pos_max=20, on_the_fly_processing=False, shortest_path="bfs", cache_dir=None):
+        if shortest_path == "floyd_warshall" and not is_cython_available():
             raise ImportError("Graphormer preprocessing needs Cython (pyximport)")
 
         self.spatial_pos_max = spatial_pos_max
         self.on_the_fly_processing = on_the_fly_processing
+        self.shortest_path = shortest_path
+        self.cache_dir = cache_dir
         self.output_columns=["attn_bias",
                              "attn_edge_type",
                              "spatial_pos",
@@ -120,7 +296,8 @@ class GraphormerDataCollator:
                              "node_feat": node_feat[i]})
 
         if self.on_the_fly_processing:
-            features = [preprocess_item(i) for i in features]
+            features = [preprocess_item(i, shortest_path=self.shortest_path, cache_dir=self.cache_dir)
+                        for i in features]
 
         if not isinstance(features[0], Mapping):
             features = [vars(f) for f in features]
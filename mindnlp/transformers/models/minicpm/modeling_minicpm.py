@@ -38,9 +38,11 @@ from mindspore.common.initializer import initializer, Normal
 
 from mindnlp.utils import logging
 from ...activations import ACT2FN
-from ...cache_utils import Cache, DynamicCache
+from ...cache_utils import Cache, DynamicCache, SinkCache
 from ...modeling_attn_mask_utils import _prepare_4d_causal_attention_mask
+from ...modeling_attn_utils import grouped_query_attention
 from ...modeling_outputs import BaseModelOutputWithPast, CausalLMOutputWithPast, SequenceClassifierOutputWithPast
+from ...modeling_rope_utils import RotaryEmbedding
 from ...modeling_utils import PreTrainedModel
 from ...ms_utils import ALL_LAYERNORM_LAYERS
 
@@ -73,87 +75,21 @@ class MiniCPMRMSNorm(nn.Cell):
 ALL_LAYERNORM_LAYERS.append(MiniCPMRMSNorm)
 
 
-class MiniCPMRotaryEmbedding(nn.Cell):
-    def __init__(self, dim, max_position_embeddings=2048, base=10000):
-        super().__init__()
-
-        self.dim = dim
-        self.max_position_embeddings = max_position_embeddings
-        self.base = base
-        inv_freq = 1.0 / (self.base ** (ops.arange(0, self.dim, 2).float() / self.dim))
-        self.inv_freq = inv_freq
-
-        # Build here to make `torch.jit.trace` work.
-        self._set_cos_sin_cache(
-            # seq_len=max_position_embeddings, dtype=torch.get_default_dtype()
-            seq_len=max_position_embeddings, dtype=mindspore.float32
-        )
-
-    def _set_cos_sin_cache(self, seq_len, dtype):
-        self.max_seq_len_cached = seq_len
-        t = ops.arange(self.max_seq_len_cached, dtype=self.inv_freq.dtype)
-        freqs = ops.outer(t, self.inv_freq)
-        # Different from paper, but it uses a different permutation in order to obtain the same calculation
-        emb = ops.cat((freqs, freqs), axis=-1)
-
-        self.cos_cached = emb.cos().to(dtype)
-        self.sin_cached = emb.sin().to(dtype)
-
-    def construct(self, x, seq_len=None):
-        # x: [bs, num_attention_heads, seq_len, head_size]
-        if seq_len > self.max_seq_len_cached:
-            self._set_cos_sin_cache(seq_len=seq_len, dtype=x.dtype)
-
-        return (
-            self.cos_cached[:seq_len].to(dtype=x.dtype),
-            self.sin_cached[:seq_len].to(dtype=x.dtype),
-        )
+class MiniCPMRotaryEmbedding(RotaryEmbedding):
+    """Rotary position embedding, the cos/sin tables are shared by all the layers through `RotaryEmbeddingTables`"""
 
 
 class MiniCPMLinearScalingRotaryEmbedding(MiniCPMRotaryEmbedding):
     """MiniCPMRotaryEmbedding extended with linear scaling. Credits to the Reddit user /u/kaiokendev"""
 
-    def __init__(self, dim, max_position_embeddings=2048, base=10000, scaling_factor=1.0):
-        self.scaling_factor = scaling_factor
-        super().__init__(dim, max_position_embeddings, base)
-
-    def _set_cos_sin_cache(self, seq_len, dtype):
-        self.max_seq_len_cached = seq_len
-        t = ops.arange(self.max_seq_len_cached, dtype=self.inv_freq.dtype)
-        t = t / self.scaling_factor
-
-        freqs = ops.outer(t, self.inv_freq)
-        # Different from paper, but it uses a different permutation in order to obtain the same calculation
-        emb = ops.cat((freqs, freqs), axis=-1)
-        self.cos_cached = emb.cos().to(dtype)
-        self.sin_cached = emb.sin().to(dtype)
+    scaling_type = "linear"
 
 
 class MiniCPMDynamicNTKScalingRotaryEmbedding(MiniCPMRotaryEmbedding):
     """MiniCPMRotaryEmbedding extended with Dynamic NTK scaling. Credits to the Reddit users /u/bloc97 and /u/emozilla"""
 
-    def __init__(self, dim, max_position_embeddings=2048, base=10000, scaling_factor=1.0):
-        self.scaling_factor = scaling_factor
-        super().__init__(dim, max_position_embeddings, base)
-
-    def _set_cos_sin_cache(self, seq_len, dtype):
-        self.max_seq_len_cached = seq_len
-
-        if seq_len > self.max_position_embeddings:
-            base = self.base * (
-                (self.scaling_factor * seq_len / self.max_position_embeddings) - (self.scaling_factor - 1)
-            ) ** (self.dim / (self.dim - 2))
-            inv_freq = 1.0 / (base ** (ops.arange(0, self.dim, 2).float() / self.dim))
-            self.inv_freq = inv_freq
+    scaling_type = "dynamic"
 
-        t = ops.arange(self.max_seq_len_cached, dtype=self.inv_freq.dtype)
-
-        freqs = ops.outer(t, self.inv_freq)
-        # Different from paper, but it uses a different permutation in order to obtain the same calculation
-        emb = ops.cat((freqs, freqs), axis=-1)
-
-        self.cos_cached = emb.cos().to(dtype)
-        self.sin_cached = emb.sin().to(dtype)
 
 def rotate_half(x):
     """Rotates half the hidden dims of the input."""
@@ -163,7 +99,7 @@ def rotate_half(x):
     return ops.cat((-x2, x1), axis=-1)
 
 
-def apply_rotary_pos_emb(q, k, cos, sin, position_ids, unsqueeze_dim=1):
+def apply_rotary_pos_emb(q, k, cos, sin, position_ids=None, unsqueeze_dim=1):
     """Applies Rotary Position Embedding to the query and key tensors.
 
     Args:
@@ -171,9 +107,10 @@ def apply_rotary_pos_emb(q, k, cos, sin, position_ids, unsqueeze_dim=1):
         k (`mindspore.Tensor`): The key tensor.
         cos (`mindspore.Tensor`): The cosine part of the rotary embedding.
         sin (`mindspore.Tensor`): The sine part of the rotary embedding.
-        position_ids (`mindspore.Tensor`):
+        position_ids (`mindspore.Tensor`, *optional*):
             The position indices of the tokens corresponding to the query and key tensors. For example, this can be
-            used to pass offsetted position ids when working with a KV-cache.
+            used to pass offsetted position ids when working with a KV-cache. If `None`, `cos` and `sin` are already
+            gathered at the positions of the tokens.
         unsqueeze_dim (`int`, *optional*, defaults to 1):
             The 'unsqueeze_dim' argument specifies the dimension along which to unsqueeze cos[position_ids] and
             sin[position_ids] so that they can be properly broadcasted to the dimensions of q and k. For example, note
@@ -184,13 +121,11 @@ def apply_rotary_pos_emb(q, k, cos, sin, position_ids, unsqueeze_dim=1):
     Returns:
         `tuple(mindspore.Tensor)` comprising of the query and key tensors rotated using the Rotary Position Embedding.
     """
-    # cos = cos[position_ids].unsqueeze(unsqueeze_dim)
-    # sin = sin[position_ids].unsqueeze(unsqueeze_dim)
-    # q_embed = (q * cos) + (rotate_half(q) * sin)
-    # k_embed = (k * cos) + (rotate_half(k) * sin)
     orig_dtype = k.dtype
-    cos = cos[position_ids].unsqueeze(unsqueeze_dim)  # [bs, 1, seq_len, dim]
-    sin = sin[position_ids].unsqueeze(unsqueeze_dim)  # [bs, 1, seq_len, dim]
+    if position_ids is not None:
+        cos, sin = cos[position_ids], sin[position_ids]
+    cos = cos.unsqueeze(unsqueeze_dim)  # [bs, 1, seq_len, dim]
+    sin = sin.unsqueeze(unsqueeze_dim)  # [bs, 1, seq_len, dim]
     q_fp32 = q.to(dtype=mindspore.float32)
     k_fp32 = k.to(dtype=mindspore.float32)
     q_embed = (q_fp32 * cos) + (rotate_half(q_fp32) * sin)
@@ -231,19 +166,6 @@ class MiniCPMMLP(nn.Cell):
         return down_proj
 
 
-def repeat_kv(hidden_states: mindspore.Tensor, n_rep: int) -> mindspore.Tensor:
-    """
-    This is the equivalent of torch.repeat_interleave(x, dim=1, repeats=n_rep). The hidden states go from (batch,
-    num_key_value_heads, seqlen, head_dim) to (batch, num_attention_heads, seqlen, head_dim)
-    """
-    batch, num_key_value_heads, slen, head_dim = hidden_states.shape
-    if n_rep == 1:
-        return hidden_states
-    hidden_states = hidden_states[:, :, None, :, :].expand(batch, num_key_value_heads, n_rep, slen, head_dim)
-    return hidden_states.reshape(batch, num_key_value_heads * n_rep, slen, head_dim)
-
-
-
 class MiniCPMAttention(nn.Cell):
     """Multi-headed attention from 'Attention Is All You Need' paper"""
 
@@ -318,6 +240,7 @@ class MiniCPMAttention(nn.Cell):
         past_key_value: Optional[Cache] = None,
         output_attentions: bool = False,
         use_cache: bool = False,
+        position_embeddings: Optional[Tuple[mindspore.Tensor, mindspore.Tensor]] = None,
         **kwargs,
     ) -> Tuple[mindspore.Tensor, Optional[mindspore.Tensor], Optional[Tuple[mindspore.Tensor]]]:
         if "padding_mask" in kwargs:
@@ -362,41 +285,28 @@ class MiniCPMAttention(nn.Cell):
                     "with a layer index."
                 )
             kv_seq_len += past_key_value.get_usable_length(kv_seq_len, self.layer_idx)
-        cos, sin = self.rotary_emb(value_states.to(mindspore.float32), seq_len=kv_seq_len)
+        cos, sin = None, None
 
-        query_states, key_states = apply_rotary_pos_emb(query_states, key_states, cos, sin, position_ids)
+        if position_embeddings is None:
+            cos, sin = self.rotary_emb(value_states.to(mindspore.float32), seq_len=kv_seq_len)
+            position_embeddings = (cos[position_ids], sin[position_ids])
+        query_states, key_states = apply_rotary_pos_emb(query_states, key_states, *position_embeddings)
 
         if past_key_value is not None:
+            if cos is None and isinstance(past_key_value, SinkCache):
+                # the sink cache re-rotates its kept keys with the full tables
+                cos, sin = self.rotary_emb(value_states.to(mindspore.float32), seq_len=kv_seq_len)
             cache_kwargs = {"sin": sin, "cos": cos}  # Specific to RoPE models
             key_states, value_states = past_key_value.update(key_states, value_states, self.layer_idx, cache_kwargs)
 
-        key_states = repeat_kv(key_states, self.num_key_value_groups)
-        value_states = repeat_kv(value_states, self.num_key_value_groups)
-
-        attn_weights = ops.matmul(query_states, key_states.swapaxes(2, 3)) / math.sqrt(self.head_dim)
-        if attn_weights.shape != (bsz, self.num_heads, q_len, kv_seq_len):
-            raise ValueError(
-                f"Attention weights should be of size {(bsz, self.num_heads, q_len, kv_seq_len)}, but is"
-                f" {attn_weights.shape}"
-            )
-
-        if attention_mask is not None:
-            if attention_mask.shape != (bsz, 1, q_len, kv_seq_len):
-                raise ValueError(
-                    f"Attention mask should be of size {(bsz, 1, q_len, kv_seq_len)}, but is {attention_mask.shape}"
-                )
-            attn_weights = attn_weights + attention_mask
-
-        # upcast attention to fp32
-        attn_weights = ops.softmax(attn_weights, axis=-1, dtype=mindspore.float32).to(query_states.dtype)
-        attn_weights = ops.dropout(attn_weights, p=self.attention_dropout, training=self.training)
-        attn_output = ops.matmul(attn_weights, value_states)
-
-        if attn_output.shape != (bsz, self.num_heads, q_len, self.head_dim):
-            raise ValueError(
-                f"`attn_output` should be of size {(bsz, self.num_heads, q_len, self.head_dim)}, but is"
-                f" {attn_output.shape}"
-            )
+        attn_output, attn_weights = grouped_query_attention(
+            query_states,
+            key_states,
+            value_states,
+            attention_mask,
+            dropout=self.attention_dropout,
+            training=self.training,
+        )
 
         attn_output = attn_output.swapaxes(1, 2)
 
@@ -441,6 +351,7 @@ class MiniCPMDecoderLayer(nn.Cell):
         past_key_value: Optional[Tuple[mindspore.Tensor]] = None,
         output_attentions: Optional[bool] = False,
         use_cache: Optional[bool] = False,
+        position_embeddings: Optional[Tuple[mindspore.Tensor, mindspore.Tensor]] = None,
         **kwargs,
     ) -> Tuple[mindspore.Tensor, Optional[Tuple[mindspore.Tensor, mindspore.Tensor]]]:
         """
@@ -456,6 +367,8 @@ class MiniCPMDecoderLayer(nn.Cell):
                 If set to `True`, `past_key_values` key value states are returned and can be used to speed up decoding
                 (see `past_key_values`).
             past_key_value (`Tuple(mindspore.Tensor)`, *optional*): cached past key and value projection states
+            position_embeddings (`Tuple[mindspore.Tensor, mindspore.Tensor]`, *optional*):
+                cos and sin of the rotary embedding at `position_ids`, gathered once by the model for all the layers
         """
         if "padding_mask" in kwargs:
             warnings.warn(
@@ -472,6 +385,7 @@ class MiniCPMDecoderLayer(nn.Cell):
             past_key_value=past_key_value,
             output_attentions=output_attentions,
             use_cache=use_cache,
+            position_embeddings=position_embeddings,
             **kwargs,
         )
 
@@ -602,6 +516,11 @@ class MiniCPMModel(MiniCPMPreTrainedModel):
         # embed positions
         hidden_states = inputs_embeds
 
+        # the rotary tables are shared by all the layers, gather them at `position_ids` once for the forward pass
+        position_embeddings = self.layers[0].self_attn.rotary_emb.gather(
+            position_ids, past_key_values_length + seq_length, mindspore.float32
+        )
+
         # decoder layers
         all_hidden_states = () if output_hidden_states else None
         all_self_attns = () if output_attentions else None
@@ -618,6 +537,7 @@ class MiniCPMModel(MiniCPMPreTrainedModel):
                 past_key_value=past_key_values,
                 output_attentions=output_attentions,
                 use_cache=use_cache,
+                position_embeddings=position_embeddings,
             )
 
             hidden_states = layer_outputs[0]
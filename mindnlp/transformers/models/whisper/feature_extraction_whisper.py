@@ -20,7 +20,7 @@ from typing import List, Optional, Union
 import numpy as np
 
 from mindnlp.utils import TensorType, logging
-from ...audio_utils import mel_filter_bank, spectrogram, window_function
+from ...audio_utils import mel_filter_bank, spectrogram_batch, window_function
 from ...feature_extraction_sequence_utils import SequenceFeatureExtractor
 from ...feature_extraction_utils import BatchFeature
 
@@ -90,13 +90,14 @@ class WhisperFeatureExtractor(SequenceFeatureExtractor):
             mel_scale="slaney",
         )
 
-    def _np_extract_fbank_features(self, waveform: np.array) -> np.ndarray:
+    def _np_extract_fbank_features(self, waveform_batch: np.array) -> np.ndarray:
         """
-        Compute the log-mel spectrogram of the provided audio, gives similar results to Whisper's original torch
-        implementation with 1e-5 tolerance.
+        Compute the log-mel spectrograms of a batch of audio of shape `(batch_size, length)` in a single call, gives
+        similar results to Whisper's original torch implementation with 1e-5 tolerance.
         """
-        log_spec = spectrogram(
-            waveform,
+        # the waveforms are padded to the same length, so no frame of the batch is padding
+        log_spec_batch, _ = spectrogram_batch(
+            list(waveform_batch),
             window_function(self.n_fft, "hann"),
             frame_length=self.n_fft,
             hop_length=self.hop_length,
@@ -104,10 +105,10 @@ class WhisperFeatureExtractor(SequenceFeatureExtractor):
             mel_filters=self.mel_filters,
             log_mel="log10",
         )
-        log_spec = log_spec[:, :-1]
-        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
-        log_spec = (log_spec + 4.0) / 4.0
-        return log_spec
+        log_spec_batch = log_spec_batch[:, :, :-1]
+        log_spec_batch = np.maximum(log_spec_batch, log_spec_batch.max(axis=(1, 2), keepdims=True) - 8.0)
+        log_spec_batch = (log_spec_batch + 4.0) / 4.0
+        return log_spec_batch
 
     @staticmethod
     # Copied from transformers.models.wav2vec2.feature_extraction_wav2vec2.Wav2Vec2FeatureExtractor.zero_mean_unit_var_norm
@@ -246,7 +247,7 @@ class WhisperFeatureExtractor(SequenceFeatureExtractor):
         # make sure list is in array format
         input_features = padded_inputs.get("input_features").transpose(2, 0, 1)
 
-        input_features = [self._np_extract_fbank_features(waveform) for waveform in input_features[0]]
+        input_features = list(self._np_extract_fbank_features(input_features[0]))
 
         if isinstance(input_features[0], List):
             padded_inputs["input_features"] = [np.asarray(feature, dtype=np.float32) for feature in input_features]
@@ -19,6 +19,7 @@
 # pylint: disable=invalid-name
 """ MindSpore Whisper model."""
 
+import copy
 import math
 from typing import Optional, Tuple, Union
 
@@ -27,7 +28,7 @@ import mindspore
 from mindspore import ops, nn, Parameter, Tensor
 from mindspore.common.initializer import initializer, Normal
 
-from mindnlp.utils import logging
+from mindnlp.utils import ModelOutput, logging
 from ...activations import ACT2FN
 from ...generation.logits_process import WhisperTimeStampLogitsProcessor
 from ...modeling_attn_mask_utils import _prepare_4d_causal_attention_mask
@@ -292,6 +293,94 @@ def _dynamic_time_warping(matrix: np.ndarray):
     return text_indices, time_indices
 
 
+def _long_form_windows(num_frames: int, window_frames: int, stride_frames: int):
+    """
+    Start frames of the overlapping windows covering `num_frames` input frames for long-form transcription.
+    """
+    starts = [0]
+    while starts[-1] + window_frames < num_frames:
+        starts.append(starts[-1] + stride_frames)
+    return starts
+
+
+def _split_timestamp_segments(
+    tokens, timestamp_begin, eos_token_id, decoder_start_token_id, time_precision, window_duration, token_times=None
+):
+    """
+    Splits the tokens decoded for one window on their timestamp tokens. Tokens before the last
+    `decoder_start_token_id` (the prompt) are skipped. A trailing segment that has no closing timestamp was
+    cut off by the end of the window, and is marked as not `complete`.
+
+    Returns:
+        list of dicts with the `start` and `end` times in seconds, and the text `tokens` of each segment
+    """
+    tokens = list(tokens)
+    first = 0
+    if decoder_start_token_id in tokens:
+        first = len(tokens) - tokens[::-1].index(decoder_start_token_id)
+
+    segments = []
+    text, times = [], []
+    start, last_time = None, 0.0
+
+    def close(end, complete):
+        segment = {"start": last_time if start is None else start, "end": end, "tokens": text, "complete": complete}
+        if token_times is not None:
+            segment["token_timestamps"] = times
+        segments.append(segment)
+
+    for idx in range(first, len(tokens)):
+        token = tokens[idx]
+        if token == eos_token_id:
+            break
+        if token >= timestamp_begin:
+            time = (token - timestamp_begin) * time_precision
+            if text:
+                close(time, True)
+                text, times = [], []
+                start = None
+            else:
+                start = time
+            last_time = time
+        elif token < eos_token_id:
+            text.append(token)
+            if token_times is not None:
+                times.append(float(token_times[idx]))
+        # the other special tokens (language, task, ...) carry no text
+
+    if text:
+        close(window_duration, False)
+    return segments
+
+
+def _stitch_segments(window_segments, window_offsets):
+    """
+    Merges the segments of the consecutive overlapping windows of one input, in absolute times. A segment is
+    kept when the midpoint of its span is past the end of the last kept segment, so speech in an overlap is
+    taken once. A segment cut off by the end of its window is left to the next window when it starts inside
+    it, as that window sees it whole. Otherwise it is kept, and its end is trimmed to the start of the next
+    kept segment.
+    """
+    stitched = []
+    covered = 0.0
+    for idx, (segments, offset) in enumerate(zip(window_segments, window_offsets)):
+        next_offset = window_offsets[idx + 1] if idx + 1 < len(window_offsets) else None
+        for segment in segments:
+            start, end = segment["start"] + offset, segment["end"] + offset
+            if not segment["complete"] and next_offset is not None and start >= next_offset:
+                continue
+            if (start + end) / 2 < covered:
+                continue
+            if stitched and not stitched[-1]["complete"] and stitched[-1]["end"] > start:
+                stitched[-1]["end"] = max(stitched[-1]["start"], start)
+            segment = dict(segment, start=start, end=end)
+            if "token_timestamps" in segment:
+                segment["token_timestamps"] = [time + offset for time in segment["token_timestamps"]]
+            stitched.append(segment)
+            covered = end
+    return stitched
+
+
 class WhisperPositionalEmbedding(nn.Embedding):
     def __init__(self, num_positions: int, embedding_dim: int, padding_idx: Optional[int] = None):
         super().__init__(num_positions, embedding_dim)
@@ -1359,6 +1448,10 @@ class WhisperForConditionalGeneration(WhisperPreTrainedModel):
         is_multilingual=None,
         prompt_ids: Optional[mindspore.Tensor] = None,
         return_token_timestamps=None,
+        long_form_batch_size: int = 8,
+        long_form_overlap_s: float = 5.0,
+        condition_on_prev_tokens: bool = False,
+        return_segments: bool = False,
         **kwargs,
     ):
         """
@@ -1425,6 +1518,16 @@ class WhisperForConditionalGeneration(WhisperPreTrainedModel):
                 Whether to return token-level timestamps with the text. This can be used with or without the
                 `return_timestamps` option. To get word-level timestamps, use the tokenizer to group the tokens into
                 words.
+            long_form_batch_size (`int`, *optional*, defaults to 8):
+                Long-form mode only. The number of 30 s windows, from one or several inputs, decoded together.
+            long_form_overlap_s (`float`, *optional*, defaults to 5.0):
+                Long-form mode only. The overlap in seconds between consecutive windows.
+            condition_on_prev_tokens (`bool`, *optional*, defaults to `False`):
+                Long-form mode only. Whether to prompt each window with the text of the previous one. The windows of
+                an input are then decoded one after the other instead of in batches.
+            return_segments (`bool`, *optional*, defaults to `False`):
+                Long-form mode only. Whether to also return the stitched segments, with their absolute `start` and
+                `end` times in seconds.
             kwargs (`Dict[str, Any]`, *optional*):
                 Ad hoc parametrization of `generate_config` and/or additional model-specific kwargs that will be
                 forwarded to the `forward` function of the model. If the model is an encoder-decoder model, encoder
@@ -1449,10 +1552,37 @@ class WhisperForConditionalGeneration(WhisperPreTrainedModel):
                     - [`~generation.SampleEncoderDecoderOutput`],
                     - [`~generation.BeamSearchEncoderDecoderOutput`],
                     - [`~generation.BeamSampleEncoderDecoderOutput`]
+
+            In long-form mode, when `input_features` hold more than 30 s of audio, the input is sliced into
+            overlapping 30 s windows that are batched through the encoder and decoded in parallel, then stitched on
+            their timestamp tokens. The output is a `mindspore.Tensor` of the stitched text tokens of each input, or
+            a dict with these `sequences` and the `segments` if `return_segments=True`.
         """
         if generation_config is None:
             generation_config = self.generation_config
 
+        input_features = inputs if inputs is not None else kwargs.get("input_features")
+        if input_features is not None and input_features.shape[-1] > self._window_frames():
+            kwargs.pop("input_features", None)
+            return self._generate_long_form(
+                input_features,
+                generation_config,
+                logits_processor=logits_processor,
+                stopping_criteria=stopping_criteria,
+                prefix_allowed_tokens_fn=prefix_allowed_tokens_fn,
+                synced_gpus=synced_gpus,
+                task=task,
+                language=language,
+                is_multilingual=is_multilingual,
+                prompt_ids=prompt_ids,
+                return_token_timestamps=return_token_timestamps,
+                batch_size=long_form_batch_size,
+                overlap_s=long_form_overlap_s,
+                condition_on_prev_tokens=condition_on_prev_tokens,
+                return_segments=return_segments,
+                **kwargs,
+            )
+
         if return_timestamps is not None:
             if not hasattr(generation_config, "no_timestamps_token_id"):
                 raise ValueError(
@@ -1621,6 +1751,139 @@ class WhisperForConditionalGeneration(WhisperPreTrainedModel):
 
         return outputs
 
+    def _window_frames(self):
+        # the encoder halves the input frames, 3000 frames (30 s) for 1500 positions
+        return 2 * self.config.max_source_positions
+
+    def _generate_long_form(
+        self,
+        input_features,
+        generation_config,
+        batch_size=8,
+        overlap_s=5.0,
+        condition_on_prev_tokens=False,
+        return_segments=False,
+        return_token_timestamps=None,
+        prompt_ids=None,
+        attention_mask=None,
+        **kwargs,
+    ):
+        """
+        Transcribes inputs longer than 30 s. The windows of all the inputs are decoded `batch_size` at a time,
+        except with `condition_on_prev_tokens`, where each window is prompted with the text of the previous one
+        and the windows of an input are decoded sequentially.
+        """
+        if not hasattr(generation_config, "no_timestamps_token_id"):
+            raise ValueError(
+                "Long-form generation stitches the windows on timestamp tokens, but the generation config has no "
+                "`no_timestamps_token_id`."
+            )
+        time_precision = 0.02
+        window_frames = self._window_frames()
+        frame_duration = time_precision / 2
+        window_duration = window_frames * frame_duration
+        overlap_frames = int(round(overlap_s / frame_duration))
+        if not 0 <= overlap_frames < window_frames:
+            raise ValueError(f"`long_form_overlap_s` should be in [0, {window_duration}), but got {overlap_s}.")
+        stride_frames = window_frames - overlap_frames
+
+        if attention_mask is not None:
+            num_frames = attention_mask.sum(-1).asnumpy().astype(np.int64).tolist()
+        else:
+            num_frames = [input_features.shape[-1]] * input_features.shape[0]
+        windows = [
+            (idx, start)
+            for idx, frames in enumerate(num_frames)
+            for start in _long_form_windows(frames, window_frames, stride_frames)
+        ]
+
+        timestamp_begin = generation_config.no_timestamps_token_id + 1
+        eos_token_id = generation_config.eos_token_id
+        if isinstance(eos_token_id, list):
+            eos_token_id = eos_token_id[0]
+
+        def window_features(idx, start):
+            features = input_features[idx, :, start : min(start + window_frames, num_frames[idx])]
+            if features.shape[-1] < window_frames:
+                features = ops.pad(features, (0, window_frames - features.shape[-1]))
+            return features
+
+        def decode(batch_windows, window_prompt_ids):
+            # generate updates the config it is given, so each call gets its own copy
+            outputs = self.generate(
+                ops.stack([window_features(idx, start) for idx, start in batch_windows]),
+                copy.deepcopy(generation_config),
+                return_timestamps=True,
+                return_token_timestamps=return_token_timestamps,
+                prompt_ids=window_prompt_ids,
+                **kwargs,
+            )
+            # `return_dict_in_generate` may also be passed by the caller
+            sequences = outputs["sequences"] if isinstance(outputs, ModelOutput) else outputs
+            token_times = outputs["token_timestamps"].asnumpy() if return_token_timestamps else None
+            return [
+                _split_timestamp_segments(
+                    tokens,
+                    timestamp_begin,
+                    eos_token_id,
+                    generation_config.decoder_start_token_id,
+                    time_precision,
+                    window_duration,
+                    token_times=None if token_times is None else token_times[row],
+                )
+                for row, tokens in enumerate(sequences.asnumpy().tolist())
+            ]
+
+        window_segments = {}
+        if condition_on_prev_tokens:
+            if prompt_ids is not None:
+                prev_sot_token_id, *initial_prompt = prompt_ids.tolist()
+            else:
+                prev_sot_token_id = getattr(generation_config, "prev_sot_token_id", None)
+                initial_prompt = []
+            if prev_sot_token_id is None:
+                raise ValueError(
+                    "`condition_on_prev_tokens` needs the `<|startofprev|>` token, pass `prompt_ids` or set "
+                    "`prev_sot_token_id` in the generation config."
+                )
+            previous = {}
+            for idx, start in windows:
+                context = initial_prompt + previous.get(idx, [])
+                window_prompt_ids = mindspore.tensor([prev_sot_token_id] + context) if context else prompt_ids
+                segments = decode([(idx, start)], window_prompt_ids)[0]
+                window_segments[(idx, start)] = segments
+                context = previous.get(idx, []) + [token for segment in segments for token in segment["tokens"]]
+                # generate keeps the same tail of the prompt
+                previous[idx] = context[-(self.config.max_target_positions // 2 - 1) :]
+        else:
+            for batch_start in range(0, len(windows), batch_size):
+                batch_windows = windows[batch_start : batch_start + batch_size]
+                for window, segments in zip(batch_windows, decode(batch_windows, prompt_ids)):
+                    window_segments[window] = segments
+
+        all_segments = []
+        for idx, frames in enumerate(num_frames):
+            starts = _long_form_windows(frames, window_frames, stride_frames)
+            all_segments.append(
+                _stitch_segments(
+                    [window_segments[(idx, start)] for start in starts],
+                    [start * frame_duration for start in starts],
+                )
+            )
+
+        pad_token_id = generation_config.pad_token_id
+        if pad_token_id is None:
+            pad_token_id = eos_token_id
+        token_lists = [[token for segment in segments for token in segment["tokens"]] for segments in all_segments]
+        sequences = np.full((len(token_lists), max(1, *map(len, token_lists))), pad_token_id, dtype=np.int64)
+        for row, token_list in enumerate(token_lists):
+            sequences[row, : len(token_list)] = token_list
+        sequences = mindspore.tensor(sequences)
+
+        if return_segments:
+            return {"sequences": sequences, "segments": all_segments}
+        return sequences
+
     def prepare_inputs_for_generation(
         self,
         decoder_input_ids,
@@ -22,6 +22,7 @@
 # pylint: disable=missing-class-docstring
 """pipeline base"""
 
+import collections
 import csv
 import importlib
 import json
@@ -32,6 +33,7 @@ import traceback
 import types
 import warnings
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from os.path import abspath, exists
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -176,6 +178,49 @@ def pad_collate_fn(tokenizer, feature_extractor):
     return inner
 
 
+def _input_length(model_inputs):
+    """Sequence length of preprocessed inputs, used to sort them before padding."""
+    value = model_inputs.get("input_ids") if isinstance(model_inputs, dict) else None
+    if value is None and isinstance(model_inputs, dict):
+        value = next((v for v in model_inputs.values() if isinstance(v, mindspore.Tensor) and v.ndim > 1), None)
+    return value.shape[1] if isinstance(value, mindspore.Tensor) and value.ndim > 1 else 0
+
+
+def _unbatch_value(value, batch_size):
+    if isinstance(value, mindspore.Tensor) and value.ndim > 0 and value.shape[0] == batch_size:
+        # keep a batch dimension of 1, as `postprocess` expects the outputs of a single item
+        return [value[i : i + 1] for i in range(batch_size)]
+    if isinstance(value, tuple):
+        # e.g. `hidden_states`, one batched tensor per layer
+        return [tuple(items) for items in zip(*[_unbatch_value(v, batch_size) for v in value])] or [()] * batch_size
+    if isinstance(value, list) and len(value) == batch_size:
+        return value
+    return [value] * batch_size
+
+
+def _unbatch(model_outputs, batch_size):
+    """Split the outputs of a batched `forward` into the outputs of each item, as if run with batch size 1."""
+    if isinstance(model_outputs, dict):
+        columns = {key: _unbatch_value(value, batch_size) for key, value in model_outputs.items()}
+        return [model_outputs.__class__(**{key: column[i] for key, column in columns.items()}) for i in range(batch_size)]
+    return _unbatch_value(model_outputs, batch_size)
+
+
+def _ordered_map(function, iterable, num_workers, max_pending):
+    """`map` running `function` in a thread pool, keeping the order and at most `max_pending` items in flight."""
+    if num_workers <= 0:
+        yield from map(function, iterable)
+        return
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        pending = collections.deque()
+        for item in iterable:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 def load_model(
     model,
     config: AutoConfig,
@@ -665,6 +710,7 @@ class Pipeline(_ScikitCompat):
         self.call_count = 0
         self._batch_size = kwargs.pop("batch_size", None)
         self._num_workers = kwargs.pop("num_workers", None)
+        self._sort_by_length = kwargs.pop("sort_by_length", False)
         self._preprocess_params, self._forward_params, self._postprocess_params = self._sanitize_parameters(**kwargs)
 
         # if self.image_processor is None and self.feature_extractor is not None:
@@ -791,7 +837,7 @@ class Pipeline(_ScikitCompat):
         model_outputs = self._forward(model_inputs, **forward_params)
         return model_outputs
 
-    def __call__(self, inputs, *args, num_workers=None, batch_size=None, **kwargs):
+    def __call__(self, inputs, *args, num_workers=None, batch_size=None, sort_by_length=None, **kwargs):
         if args:
             logger.warning(f"Ignoring args : {args}")
 
@@ -806,6 +852,9 @@ class Pipeline(_ScikitCompat):
             else:
                 batch_size = self._batch_size
 
+        if sort_by_length is None:
+            sort_by_length = self._sort_by_length
+
         preprocess_params, forward_params, postprocess_params = self._sanitize_parameters(**kwargs)
         # Fuse __init__ params and __call__ params without modifying the __init__ ones.
         preprocess_params = {**self._preprocess_params, **preprocess_params}
@@ -826,9 +875,22 @@ class Pipeline(_ScikitCompat):
 
         is_iterable = is_dataset or is_generator or is_list
 
+        can_use_iterator = batch_size > 1 or num_workers > 0
         if is_list:
+            if can_use_iterator:
+                return list(
+                    self.get_iterator(
+                        inputs, num_workers, batch_size, preprocess_params, forward_params, postprocess_params,
+                        sort_by_length=sort_by_length,
+                    )
+                )
             return self.run_multi(inputs, preprocess_params, forward_params, postprocess_params)
         elif is_iterable:
+            if can_use_iterator:
+                return self.get_iterator(
+                    inputs, num_workers, batch_size, preprocess_params, forward_params, postprocess_params,
+                    sort_by_length=sort_by_length,
+                )
             return self.iterate(inputs, preprocess_params, forward_params, postprocess_params)
         else:
             return self.run_single(inputs, preprocess_params, forward_params, postprocess_params)
@@ -852,6 +914,73 @@ class Pipeline(_ScikitCompat):
             for input_ in inputs:
                 yield self.run_single(input_, preprocess_params, forward_params, postprocess_params)
 
+    # number of batches sorted together by `get_iterator` when `sort_by_length` is set
+    sort_window_batches = 16
+
+    def preprocess_chunks(self, inputs, preprocess_params):
+        """All the model inputs of one pipeline input: a single one, except for [`ChunkPipeline`]."""
+        return [self.preprocess(inputs, **preprocess_params)]
+
+    def postprocess_chunks(self, model_outputs, postprocess_params):
+        """Postprocess the outputs of all the model inputs returned by `preprocess_chunks` for one pipeline input."""
+        return self.postprocess(model_outputs[0], **postprocess_params)
+
+    def get_iterator(
+        self, inputs, num_workers, batch_size, preprocess_params, forward_params, postprocess_params,
+        sort_by_length=False,
+    ):
+        """
+        Run the pipeline over an iterable of inputs with batched model calls, yielding the outputs in input order.
+
+        Inputs are preprocessed by a pool of `num_workers` threads, collated with `pad_collate_fn` into batches of
+        `batch_size` and run through a single `forward` call, whose outputs are split back into batch size 1 outputs
+        for `postprocess`. With `sort_by_length`, the model inputs of `sort_window_batches` batches are sorted by
+        length before batching to minimize padding.
+        """
+        if isinstance(inputs, Dataset):
+            inputs = inputs.create_dict_iterator(output_numpy=True)
+        collate_fn = no_collate_fn if batch_size == 1 else pad_collate_fn(self.tokenizer, self.feature_extractor)
+        window_size = batch_size * (self.sort_window_batches if sort_by_length else 1)
+
+        # outputs of the model inputs of each pipeline input, and how many of them are still missing
+        chunk_outputs = {}
+        num_missing = {}
+
+        def preprocess(input_):
+            return self.preprocess_chunks(input_, preprocess_params)
+
+        def model_inputs_stream():
+            all_model_inputs = _ordered_map(preprocess, inputs, num_workers, max_pending=2 * window_size)
+            for index, model_inputs_list in enumerate(all_model_inputs):
+                chunk_outputs[index] = [None] * len(model_inputs_list)
+                num_missing[index] = len(model_inputs_list)
+                for position, model_inputs in enumerate(model_inputs_list):
+                    yield index, position, model_inputs
+
+        stream = model_inputs_stream()
+        next_index = 0
+        while True:
+            window = [item for _, item in zip(range(window_size), stream)]
+            if sort_by_length:
+                window.sort(key=lambda item: _input_length(item[2]))
+            for start in range(0, len(window), batch_size):
+                batch = window[start : start + batch_size]
+                model_outputs = self.forward(collate_fn([item[2] for item in batch]), **forward_params)
+                if batch_size > 1:
+                    model_outputs = _unbatch(model_outputs, len(batch))
+                else:
+                    model_outputs = [model_outputs]
+                for (index, position, _), outputs in zip(batch, model_outputs):
+                    chunk_outputs[index][position] = outputs
+                    num_missing[index] -= 1
+
+            while num_missing.get(next_index) == 0:
+                del num_missing[next_index]
+                yield self.postprocess_chunks(chunk_outputs.pop(next_index), postprocess_params)
+                next_index += 1
+            if not window:
+                break
+
 
 class ChunkPipeline(Pipeline):
     def run_single(self, inputs, preprocess_params, forward_params, postprocess_params):
@@ -862,6 +991,12 @@ class ChunkPipeline(Pipeline):
         outputs = self.postprocess(all_outputs, **postprocess_params)
         return outputs
 
+    def preprocess_chunks(self, inputs, preprocess_params):
+        return list(self.preprocess(inputs, **preprocess_params))
+
+    def postprocess_chunks(self, model_outputs, postprocess_params):
+        return self.postprocess(model_outputs, **postprocess_params)
+
 
 class PipelineRegistry:
     def __init__(self, supported_tasks: Dict[str, Any], task_aliases: Dict[str, str]) -> None:
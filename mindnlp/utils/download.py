@@ -30,6 +30,7 @@ import json
 import types
 import functools
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Union, Optional, Dict, Any
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
@@ -52,6 +53,13 @@ logger = logging.get_logger(__name__)  # pylint: disable=invalid-name
 _CACHED_NO_EXIST = object()
 _CACHED_NO_EXIST_T = Any
 
+# size of the chunks read from the connection (data of an unfinished chunk is lost when the connection breaks)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# size of the write buffer of downloaded files and of the reads used for hashing
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+# number of checkpoint shards downloaded concurrently
+MAX_DOWNLOAD_WORKERS = int(os.environ.get("MINDNLP_MAX_DOWNLOAD_WORKERS", "8"))
+
 _is_offline_mode = True if os.environ.get("TRANSFORMERS_OFFLINE", "0").upper() in ENV_VARS_TRUE_VALUES else False
 
 def is_offline_mode():
@@ -126,10 +134,13 @@ ca
     return cache_dir
 
 
-def http_get(url, path=None, md5sum=None, download_file_name=None, proxies=None):
+def http_get(url, path=None, md5sum=None, download_file_name=None, proxies=None, resume=True):
     r"""
     Download from given url, save to path.
 
+    The file is first written to `<name>_tmp`. If such a partial file exists (e.g. from an interrupted download), the
+    download is resumed from its end with an HTTP Range request. The md5 is computed while streaming.
+
     Args:
         url (str): download url
         path (str): download to given path (default value: '{home}\.text')
@@ -137,6 +148,7 @@ def http_get(url, path=None, md5sum=None, download_file_name=None, proxies=None)
         download_file_name(str): The name of the downloaded file.\
             (This para meter is required if the end of the link is not the downloaded file name.)
         proxies (dict): a dict to identify proxies,for example: {"https": "https://127.0.0.1:7890"}.
+        resume (bool): Whether to resume from an existing partial file. Default: True.
 
     Returns:
         str, the path of default or the environment 'cache_path'.
@@ -152,11 +164,8 @@ def http_get(url, path=None, md5sum=None, download_file_name=None, proxies=None)
         ('{home}\.text', '{home}\aclImdb_v1.tar.gz')
 
     """
-    if not os.path.exists(path):
-        os.makedirs(path)
-
-    retry_cnt = 0
     retry_limit = 3
+    last_error = None
 
     if download_file_name is None:
         name = extract_filename_from_url(url)
@@ -164,15 +173,44 @@ def http_get(url, path=None, md5sum=None, download_file_name=None, proxies=None)
         name = download_file_name
 
     file_path = os.path.join(path, name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    if os.path.exists(file_path) and check_md5(file_path, md5sum):
+        return file_path
+
+    tmp_file_path = file_path + "_tmp"
+    if not resume and os.path.exists(tmp_file_path):
+        os.remove(tmp_file_path)
+
+    for _ in range(retry_limit):
+        try:
+            md5hex = _download_to_tmp(url, tmp_file_path, proxies=proxies, compute_md5=md5sum is not None)
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.Timeout,
+        ) as exc:
+            # keep the partial file, the next attempt resumes from it
+            last_error = exc
+            logger.warning(f"Download from {url} interrupted ({exc}), retrying.")
+            continue
+        if md5sum is not None and md5hex != md5sum:
+            os.remove(tmp_file_path)
+            last_error = HTTPError(f"Download from {url} failed. The md5 of the downloaded file does not match.")
+            continue
+        shutil.move(tmp_file_path, file_path)
+        return file_path
+
+    if isinstance(last_error, requests.exceptions.ConnectionError):
+        raise last_error
+    raise HTTPError(f"Download from {url} failed. " "Retry limit reached") from last_error
+
 
-    while not (os.path.exists(file_path) and check_md5(file_path, md5sum)):
-        if retry_cnt < retry_limit:
-            retry_cnt += 1
-        else:
-            raise HTTPError(
-                f"Download from {url} failed. " "Retry limit reached")
-        req = requests.get(url, stream=True, timeout=10, proxies=proxies)
+def _download_to_tmp(url, tmp_file_path, proxies=None, compute_md5=False):
+    """Appends the missing bytes of `url` to `tmp_file_path` and returns the md5 of the whole file if requested."""
+    resume_size = os.path.getsize(tmp_file_path) if os.path.exists(tmp_file_path) else 0
+    headers = {"Range": f"bytes={resume_size}-"} if resume_size > 0 else None
 
+    with requests.get(url, stream=True, timeout=10, proxies=proxies, headers=headers) as req:
         status = req.status_code
         if status == 404:
             raise EntryNotFoundError(f"Can not found url: {url}")
@@ -180,23 +218,39 @@ def http_get(url, path=None, md5sum=None, download_file_name=None, proxies=None)
             raise GatedRepoError('You should have authorization to access the model.')
         if status == 429:
             raise HTTPError('Too many requests.')
-        tmp_file_path = file_path + "_tmp"
-        total_size = req.headers.get("content-length")
-        with open(tmp_file_path, "wb") as file:
-            if total_size:
-                with tqdm(
-                    total=int(total_size), unit="B", unit_scale=True, unit_divisor=1024
-                ) as pbar:
-                    for chunk in req.iter_content(chunk_size=1024):
-                        file.write(chunk)
-                        pbar.update(len(chunk))
-            else:
-                for chunk in req.iter_content(chunk_size=1024):
-                    if chunk:
-                        file.write(chunk)
-        shutil.move(tmp_file_path, file_path)
-
-    return file_path
+        if status == 416:
+            # the partial file does not match the remote one anymore, start over
+            os.remove(tmp_file_path)
+            return _download_to_tmp(url, tmp_file_path, proxies=proxies, compute_md5=compute_md5)
+        req.raise_for_status()
+        if status != 206:
+            # the server ignored the range request and sends the whole file
+            resume_size = 0
+
+        md5 = hashlib.md5() if compute_md5 else None
+        if md5 is not None and resume_size > 0:
+            with open(tmp_file_path, "rb") as file:
+                for chunk in iter(lambda: file.read(DOWNLOAD_BUFFER_SIZE), b""):
+                    md5.update(chunk)
+
+        content_length = req.headers.get("content-length")
+        total_size = int(content_length) + resume_size if content_length else None
+        with open(tmp_file_path, "ab" if resume_size > 0 else "wb", buffering=DOWNLOAD_BUFFER_SIZE) as file, tqdm(
+            total=total_size, initial=resume_size, unit="B", unit_scale=True, unit_divisor=1024,
+            desc=os.path.basename(tmp_file_path)[:-len("_tmp")]
+        ) as pbar:
+            for chunk in req.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    file.write(chunk)
+                    if md5 is not None:
+                        md5.update(chunk)
+                    pbar.update(len(chunk))
+
+    if total_size is not None and os.path.getsize(tmp_file_path) != total_size:
+        raise requests.exceptions.ConnectionError(
+            f"Incomplete download from {url}: got {os.path.getsize(tmp_file_path)} of {total_size} bytes."
+        )
+    return md5.hexdigest() if md5 is not None else None
 
 
 def check_md5(filename: str, md5sum=None):
@@ -225,7 +279,7 @@ def check_md5(filename: str, md5sum=None):
 
     md5 = hashlib.md5()
     with open(filename, "rb") as file:
-        for chunk in iter(lambda: file.read(4096), b""):
+        for chunk in iter(lambda: file.read(DOWNLOAD_BUFFER_SIZE), b""):
             md5.update(chunk)
     md5hex = md5.hexdigest()
 
@@ -495,7 +549,8 @@ def download(
         req = requests.head(model_url, timeout=3, proxies=proxies)
         if req.status_code >= 400:
             raise RepositoryNotFoundError(f"Can not found model: {repo_id}")
-        pointer_path = http_get(url, storage_folder, download_file_name=relative_filename, proxies=proxies)
+        pointer_path = http_get(url, storage_folder, download_file_name=relative_filename, proxies=proxies,
+                                resume=not force_download)
     except (requests.exceptions.SSLError, requests.exceptions.ProxyError):
         # Actually raise for those subclasses of ConnectionError
         raise
@@ -682,6 +737,7 @@ def get_checkpoint_shard_files(
     user_agent=None,
     subfolder="",
     endpoint=None,
+    max_workers=None,
 ):
     """
     For a given model:
@@ -691,7 +747,8 @@ def get_checkpoint_shard_files(
     - returns the list of paths to all the shards, as well as some metadata.
 
     For the description of each arg, see [`PreTrainedModel.from_pretrained`]. `index_filename` is the full path to the
-    index (downloaded and cached if `pretrained_model_name_or_path` is a model ID on the Hub).
+    index (downloaded and cached if `pretrained_model_name_or_path` is a model ID on the Hub). Up to `max_workers`
+    shards (default: `MINDNLP_MAX_DOWNLOAD_WORKERS` or 8) are downloaded concurrently.
     """
 
     if not os.path.isfile(index_filename):
@@ -711,17 +768,17 @@ def get_checkpoint_shard_files(
         return shard_filenames, sharded_metadata
 
     # At this stage pretrained_model_name_or_path is a model identifier on the Hub
-    cached_filenames = []
     # Check if the model is already cached or not. We only try the last checkpoint, this should cover most cases of
     # downloaded (if interrupted).
     last_shard = try_to_load_from_cache(
         pretrained_model_name_or_path, shard_filenames[-1], cache_dir=cache_dir
     )
     show_progress_bar = last_shard is None or force_download
-    for shard_filename in tqdm(shard_filenames, desc="Downloading shards", disable=not show_progress_bar):
+
+    def fetch(shard_filename):
         try:
             # Load from URL
-            cached_filename = cached_file(
+            return cached_file(
                 pretrained_model_name_or_path,
                 shard_filename,
                 cache_dir=cache_dir,
@@ -746,7 +803,18 @@ def get_checkpoint_shard_files(
                 " again after checking your internet connection."
             ) from exc
 
-        cached_filenames.append(cached_filename)
+    # shards are fetched concurrently, each over its own connection
+    max_workers = max(1, min(max_workers or MAX_DOWNLOAD_WORKERS, len(shard_filenames)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch, shard_filename) for shard_filename in shard_filenames]
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc="Downloading shards", disable=not show_progress_bar
+        ):
+            if future.exception() is not None:
+                for pending in futures:
+                    pending.cancel()
+                raise future.exception()
+        cached_filenames = [future.result() for future in futures]
 
     return cached_filenames, sharded_metadata
 
@@ -28,7 +28,9 @@ import warnings
 from types import ModuleType
 from collections import OrderedDict
 from functools import wraps
-from typing import Tuple, Union
+from itertools import chain
+from typing import Any, Tuple, Union
+import importlib
 import importlib.util
 
 if sys.version_info >= (3, 8):
@@ -314,6 +316,71 @@ class OptionalDependencyNotAvailable(BaseException):
     """Internally used error class for signalling an optional dependency was not found."""
 
 
+class _LazyModule(ModuleType):
+    """
+    Module class that surfaces all objects but only performs associated imports when the objects are requested.
+
+    Args:
+        name (`str`): The name of the module, usually `__name__`.
+        module_file (`str`): The file of the module, usually `__file__`.
+        import_structure (`Dict[str, List[str]]`): Map from submodule name to the public names it defines.
+        module_spec (`ModuleSpec`, *optional*): The spec of the module, usually `__spec__`.
+        extra_objects (`Dict[str, Any]`, *optional*): Objects that are already imported and returned as is.
+    """
+
+    # Very heavily inspired by optuna.integration._IntegrationModule
+    # https://github.com/optuna/optuna/blob/master/optuna/integration/__init__.py
+    def __init__(self, name, module_file, import_structure, module_spec=None, extra_objects=None):
+        super().__init__(name)
+        self._modules = set(import_structure.keys())
+        self._class_to_module = {}
+        for key, values in import_structure.items():
+            for value in values:
+                self._class_to_module[value] = key
+        # only the objects are public, the submodules are reachable as attributes but not part of `import *`
+        self.__all__ = list(dict.fromkeys(chain(*import_structure.values())))
+        self.__file__ = module_file
+        self.__spec__ = module_spec
+        self.__path__ = [os.path.dirname(module_file)]
+        self._objects = {} if extra_objects is None else extra_objects
+        self._name = name
+        self._import_structure = import_structure
+
+    # Needed for autocompletion in an IDE
+    def __dir__(self):
+        result = super().__dir__()
+        for attr in chain(self._modules, self.__all__):
+            if attr not in result:
+                result.append(attr)
+        return result
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._objects:
+            return self._objects[name]
+        if name in self._class_to_module:
+            module = self._get_module(self._class_to_module[name])
+            value = getattr(module, name)
+        elif name in self._modules:
+            value = self._get_module(name)
+        else:
+            raise AttributeError(f"module {self.__name__} has no attribute {name}")
+
+        setattr(self, name, value)
+        return value
+
+    def _get_module(self, module_name: str):
+        try:
+            return importlib.import_module("." + module_name, self.__name__)
+        except Exception as e:
+            raise RuntimeError(
+                f"Failed to import {self.__name__}.{module_name} because of the following error (look up to see its"
+                f" traceback):\n{e}"
+            ) from e
+
+    def __reduce__(self):
+        return (self.__class__, (self._name, self.__file__, self._import_structure))
+
+
 def direct_transformers_import(path: str, file="__init__.py") -> ModuleType:
     """Imports transformers directly
 
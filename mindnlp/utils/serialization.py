@@ -28,6 +28,7 @@ Serialization utils
 import os
 import io
 import sys
+import json
 import pickle
 import shutil
 import zipfile
@@ -37,9 +38,10 @@ import warnings
 import tempfile
 import operator
 
+from collections.abc import Mapping
 from contextlib import closing, contextmanager
 from enum import Enum
-from typing import Dict, Union, Optional, Any
+from typing import Callable, Dict, Union, Optional, Any
 from functools import reduce
 from dataclasses import dataclass
 from ml_dtypes import bfloat16
@@ -255,7 +257,7 @@ class _open_zipfile_reader(_opener):
     def __init__(self, name_or_buffer) -> None:
         super().__init__(PyTorchFileReader(name_or_buffer))
 
-def _rebuild_tensor_v2(storage, storage_offset, size, stride, requires_grad, backward_hooks, metadata=None):
+def _rebuild_array(storage, storage_offset, size, stride):
     if size == ():
         size = (1,)
         stride = (1,)
@@ -266,7 +268,10 @@ def _rebuild_tensor_v2(storage, storage_offset, size, stride, requires_grad, bac
         order = "F"
     else:
         order = "C"
-    array = array.reshape(size, order=order)
+    return array.reshape(size, order=order)
+
+def _rebuild_tensor_v2(storage, storage_offset, size, stride, requires_grad, backward_hooks, metadata=None):
+    array = _rebuild_array(storage, storage_offset, size, stride)
 
     if array.dtype == bfloat16:
         logger.warning_once("MindSpore do not support bfloat16 dtype, we will automaticlly convert to float16")
@@ -274,6 +279,11 @@ def _rebuild_tensor_v2(storage, storage_offset, size, stride, requires_grad, bac
     param = mindspore.Parameter(array, requires_grad=requires_grad)
     return param
 
+def _rebuild_lazy_tensor_v2(storage, storage_offset, size, stride, requires_grad, backward_hooks, metadata=None):
+    return LazyTensor(
+        lambda: _rebuild_array(storage, storage_offset, size, stride), tuple(size) or (1,), storage.dtype
+    )
+
 @dataclass
 class FakeParameter:
     storage: np.ndarray = None
@@ -312,7 +322,14 @@ element_size_map = {
     'ByteStorage': 1
 }
 
-def load(f, pickle_module=pickle, *, mmap=None, **pickle_load_args):
+def load(f, pickle_module=pickle, *, mmap=None, lazy=False, **pickle_load_args):
+    """
+    Loads a PyTorch checkpoint as numpy-backed `Parameter`s. With `mmap=True` the storages of a zip checkpoint are
+    memory-mapped instead of read, and with `lazy=True` (which requires `mmap`) tensors are returned as
+    [`LazyTensor`]s that are only read when materialized.
+    """
+    if lazy and not mmap:
+        raise ValueError("`lazy=True` requires `mmap=True`.")
     if pickle_module is None:
         pickle_module = pickle
 
@@ -340,6 +357,7 @@ def load(f, pickle_module=pickle, *, mmap=None, **pickle_load_args):
                 return _load(opened_zipfile,
                              pickle_module,
                              overall_storage=overall_storage,
+                             lazy=lazy,
                              **pickle_load_args)
         if mmap:
             raise RuntimeError("mmap can only be used with files saved with ",
@@ -467,7 +485,7 @@ def _legacy_load(f, pickle_module, **pickle_load_args):
 
     return new_result
 
-def _load(zip_file, pickle_module, overall_storage=None, pickle_file='data.pkl', **pickle_load_args):
+def _load(zip_file, pickle_module, overall_storage=None, pickle_file='data.pkl', lazy=False, **pickle_load_args):
     loaded_storages = {}
     # check if byteswapping is needed
     byteordername = 'byteorder'
@@ -532,6 +550,8 @@ def _load(zip_file, pickle_module, overall_storage=None, pickle_file='data.pkl',
         # This is useful for maintaining BC if we change a module path that tensor instantiation relies on.
         def find_class(self, mod_name, name):
             if mod_name == 'torch._utils':
+                if lazy and name == '_rebuild_tensor_v2':
+                    return _rebuild_lazy_tensor_v2
                 return eval(name)
             if mod_name == 'torch':
                 return str(name)
@@ -548,6 +568,179 @@ def _load(zip_file, pickle_module, overall_storage=None, pickle_file='data.pkl',
 
     return result
 
+class LazyTensor:
+    """
+    A checkpoint tensor whose data stays on disk (memory-mapped) until [`~LazyTensor.materialize`] is called.
+
+    Args:
+        reader (`Callable[[], np.ndarray]`): Returns the array, usually a view of a memory map.
+        shape (`tuple`): The shape of the tensor.
+        dtype (`np.dtype`): The dtype of the tensor as stored in the checkpoint.
+    """
+
+    def __init__(self, reader: Callable[[], np.ndarray], shape: tuple, dtype):
+        self._reader = reader
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+    def materialize(self) -> np.ndarray:
+        return self._reader()
+
+    def __repr__(self):
+        return f"LazyTensor(shape={self.shape}, dtype={self.dtype})"
+
+
+class LazyStateDict(Mapping):
+    """
+    Read-only state dict of a memory-mapped checkpoint.
+
+    All keys are known up front, but a value is only read from disk, converted to a MindSpore supported dtype and
+    wrapped into a `Parameter` when it is accessed. Loading a model by popping the parameters one at a time therefore
+    keeps a single tensor in host memory instead of the whole checkpoint.
+    """
+
+    def __init__(self, tensors: Dict[str, Any]):
+        self._tensors = tensors
+
+    def rename_keys(self, fn: Callable[[str], str]) -> "LazyStateDict":
+        """Returns a new `LazyStateDict` with the keys mapped by `fn`, without reading any tensor."""
+        return LazyStateDict({fn(key): value for key, value in self._tensors.items()})
+
+    def __getitem__(self, key):
+        return self._materialize(self._tensors[key])
+
+    def __iter__(self):
+        return iter(self._tensors)
+
+    def __len__(self):
+        return len(self._tensors)
+
+    def __contains__(self, key):
+        return key in self._tensors
+
+    def pop(self, key, default=None):
+        if key not in self._tensors:
+            return default
+        return self._materialize(self._tensors.pop(key))
+
+    @staticmethod
+    def _materialize(value):
+        if not isinstance(value, LazyTensor):
+            return value
+        array = value.materialize()
+        if array.dtype == bfloat16:
+            logger.warning_once("MindSpore do not support bfloat16 dtype, we will automaticlly convert to float16")
+            array = array.astype(np.float16)
+        return mindspore.Parameter(array)
+
+
+_SAFETENSORS_DTYPES = {
+    "F64": np.float64,
+    "F32": np.float32,
+    "F16": np.float16,
+    "BF16": bfloat16,
+    "I64": np.int64,
+    "I32": np.int32,
+    "I16": np.int16,
+    "I8": np.int8,
+    "U8": np.uint8,
+    "BOOL": np.bool_,
+}
+
+
+def _safetensors_reader(storage, start, end, dtype, shape):
+    return lambda: storage[start:end].view(dtype).reshape(shape)
+
+
+def load_safetensors_lazy(filename: str) -> LazyStateDict:
+    """
+    Memory-maps a safetensors file and returns its tensors as a [`LazyStateDict`]. Only the json header is read.
+    """
+    with open(filename, 'rb') as f:
+        header_size = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(header_size))
+    header.pop('__metadata__', None)
+    data_start = 8 + header_size
+    storage = np.memmap(filename, dtype=np.uint8, mode='r') if header else None
+
+    tensors = {}
+    for key, info in header.items():
+        if info['dtype'] not in _SAFETENSORS_DTYPES:
+            raise ValueError(f"Unsupported dtype {info['dtype']} of tensor {key} in {filename}.")
+        dtype = _SAFETENSORS_DTYPES[info['dtype']]
+        shape = tuple(info['shape'])
+        start, end = info['data_offsets']
+        tensors[key] = LazyTensor(
+            _safetensors_reader(storage, data_start + start, data_start + end, dtype, shape), shape, dtype
+        )
+    return LazyStateDict(tensors)
+
+
+def _as_numpy(value) -> np.ndarray:
+    if isinstance(value, np.ndarray):
+        return value
+    if value.dtype == mindspore.bfloat16:
+        return value.astype(mindspore.float32).asnumpy().astype(bfloat16)
+    return value.asnumpy()
+
+
+def _numpy_dtype(value) -> np.dtype:
+    if isinstance(value, np.ndarray):
+        return value.dtype
+    if value.dtype == mindspore.bfloat16:
+        return np.dtype(bfloat16)
+    return np.dtype(mindspore.dtype_to_nptype(value.dtype))
+
+
+def save_safetensors(tensors: Dict[str, Any], filename: str, metadata: Optional[Dict[str, str]] = None):
+    """
+    Writes tensors to a safetensors file, one tensor at a time.
+
+    The header is computed from the shapes and dtypes only, then each `Tensor` is copied to host and written before
+    the next one is read, so saving never holds more than one tensor in host memory.
+
+    Args:
+        tensors (`Dict[str, Union[Tensor, np.ndarray]]`): The tensors to save.
+        filename (`str`): The file to write.
+        metadata (`Dict[str, str]`, *optional*): Text metadata stored in the header.
+    """
+    dtype_names = {np.dtype(dtype): name for name, dtype in _SAFETENSORS_DTYPES.items()}
+    header = {}
+    if metadata is not None:
+        header['__metadata__'] = metadata
+    offset = 0
+    for key, value in tensors.items():
+        dtype = _numpy_dtype(value)
+        if dtype not in dtype_names:
+            raise ValueError(f"Unsupported dtype {dtype} of tensor {key}.")
+        nbytes = int(np.prod(value.shape, dtype=np.int64)) * dtype.itemsize
+        header[key] = {'dtype': dtype_names[dtype], 'shape': list(value.shape), 'data_offsets': [offset, offset + nbytes]}
+        offset += nbytes
+
+    header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    # the data is 8 bytes aligned, as in files written by the `safetensors` package
+    header += b' ' * (-len(header) % 8)
+    with open(filename, 'wb') as f:
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for value in tensors.values():
+            f.write(np.ascontiguousarray(_as_numpy(value)).tobytes())
+
+
+def load_checkpoint_lazy(filename: str) -> LazyStateDict:
+    """
+    Opens a safetensors or PyTorch checkpoint as a [`LazyStateDict`]. PyTorch checkpoints saved in the legacy
+    (non-zip) format cannot be memory-mapped and are read eagerly.
+    """
+    if str(filename).endswith('.safetensors'):
+        return load_safetensors_lazy(filename)
+    with open(filename, 'rb') as f:
+        is_zip = _is_zipfile(f)
+    if is_zip:
+        return LazyStateDict(load(str(filename), mmap=True, lazy=True))
+    return LazyStateDict(load(filename))
+
+
 def convert_torch_to_mindspore(pth_file):
     """convert torch checkpoint to mindspore"""
     try:
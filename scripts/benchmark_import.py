@@ -0,0 +1,71 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+Measure the cold import time of `mindnlp` and the number of modules it imports.
+
+Every run uses a fresh interpreter. Example:
+
+    python scripts/benchmark_import.py --repeat 5
+    python scripts/benchmark_import.py --statement "from mindnlp.transformers import BertModel"
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = """
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+modules = set(sys.modules) - before
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": len(modules),
+    "mindnlp_modules": len([m for m in modules if m.startswith("mindnlp")]),
+    "model_packages": len([m for m in modules if m.count(".") == 3 and m.startswith("mindnlp.transformers.models.")]),
+}}))
+"""
+
+
+def run_once(statement):
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--statement", default="import mindnlp", help="The import statement to measure.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of fresh interpreters to average over.")
+    args = parser.parse_args()
+
+    runs = [run_once(args.statement) for _ in range(args.repeat)]
+    seconds = [run["seconds"] for run in runs]
+    print(f"statement:             {args.statement}")
+    print(f"time (s):              mean {statistics.mean(seconds):.3f}, min {min(seconds):.3f}, max {max(seconds):.3f}")
+    print(f"modules imported:      {runs[-1]['modules']}")
+    print(f"mindnlp modules:       {runs[-1]['mindnlp_modules']}")
+    print(f"model packages loaded: {runs[-1]['model_packages']}")
+
+
+if __name__ == "__main__":
+    main()
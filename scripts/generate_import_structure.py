@@ -0,0 +1,158 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+Generate `mindnlp/transformers/models/_import_structure.py`, the name -> model package map used by the lazy
+`mindnlp.transformers.models` module.
+
+The public names of every model package are read statically (without importing anything) from the `__all__`
+definitions of its `__init__.py` and of the submodules it extends `__all__` with, or from its own
+`_import_structure` when the package is lazy itself. To export a new model package, add
+its name with an empty list to `_import_structure.py` and run:
+
+    python scripts/generate_import_structure.py
+
+Use `--check` in CI to fail when the file is out of date.
+"""
+import argparse
+import ast
+import os
+import sys
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mindnlp", "transformers", "models")
+OUTPUT_FILE = os.path.join(MODELS_DIR, "_import_structure.py")
+
+HEADER = '''# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+# This file is generated by `scripts/generate_import_structure.py`, do not edit the name lists by hand.
+"""
+Map from model package to the public names it exports, used by the lazy `mindnlp.transformers.models` module.
+"""
+'''
+
+
+def _module_file(package_dir, module_name):
+    """Returns the source file of `module_name` relative to `package_dir`."""
+    path = os.path.join(package_dir, *module_name.split("."))
+    if os.path.isdir(path):
+        return os.path.join(path, "__init__.py")
+    return path + ".py"
+
+
+def _literal_names(node):
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [elt.value for elt in node.elts if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+    return None
+
+
+def _all_of(path):
+    """Statically resolves the `__all__` of the module at `path`."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    package_dir = os.path.dirname(path)
+
+    def resolve(node):
+        names = _literal_names(node)
+        if names is not None:
+            return names
+        # `module.__all__`
+        if isinstance(node, ast.Attribute) and node.attr == "__all__" and isinstance(node.value, ast.Name):
+            return _all_of(_module_file(package_dir, node.value.id))
+        # `a + b`
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            return resolve(node.left) + resolve(node.right)
+        raise ValueError(f"Cannot statically resolve `__all__` in {path}: {ast.dump(node)}")
+
+    result = []
+    for stmt in tree.body:
+        # lazy packages declare `_import_structure = {"submodule": [names]}` instead of `__all__`
+        if (
+            isinstance(stmt, ast.Assign)
+            and isinstance(stmt.value, ast.Dict)
+            and any(isinstance(target, ast.Name) and target.id == "_import_structure" for target in stmt.targets)
+        ):
+            result = [name for value in stmt.value.values for name in _literal_names(value)]
+        elif isinstance(stmt, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "__all__" for target in stmt.targets
+        ):
+            result = resolve(stmt.value)
+        elif isinstance(stmt, ast.AugAssign) and isinstance(stmt.target, ast.Name) and stmt.target.id == "__all__":
+            result += resolve(stmt.value)
+        elif (
+            isinstance(stmt, ast.Expr)
+            and isinstance(stmt.value, ast.Call)
+            and isinstance(stmt.value.func, ast.Attribute)
+            and isinstance(stmt.value.func.value, ast.Name)
+            and stmt.value.func.value.id == "__all__"
+            and stmt.value.func.attr in ("extend", "append")
+        ):
+            value = stmt.value.args[0]
+            if stmt.value.func.attr == "append":
+                result.append(value.value)
+            else:
+                result += resolve(value)
+    return result
+
+
+def _exported_packages():
+    with open(OUTPUT_FILE, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Assign) and stmt.targets[0].id == "_import_structure":
+            return [key.value for key in stmt.value.keys]
+    raise ValueError(f"`_import_structure` not found in {OUTPUT_FILE}")
+
+
+def generate():
+    lines = [HEADER, "_import_structure = {"]
+    for package in _exported_packages():
+        names = list(dict.fromkeys(_all_of(os.path.join(MODELS_DIR, package, "__init__.py"))))
+        lines.append(f'    "{package}": [')
+        lines.extend(f'        "{name}",' for name in names)
+        lines.append("    ],")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Only check that the generated file is up to date.")
+    args = parser.parse_args()
+
+    content = generate()
+    with open(OUTPUT_FILE, encoding="utf-8") as f:
+        current = f.read()
+    if args.check:
+        if current != content:
+            print(f"{OUTPUT_FILE} is out of date, run `python scripts/generate_import_structure.py`.")
+            sys.exit(1)
+        return
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+Test batched transfer of Huggingface datasets
+"""
+
+import unittest
+import numpy as np
+from datasets import Dataset
+from mindspore.dataset import GeneratorDataset
+
+from mindnlp.dataset.load import BatchedTransferDataset, BatchedTransferIterableDataset
+
+
+class TestBatchedTransferDataset(unittest.TestCase):
+    r"""
+    Test BatchedTransferDataset
+    """
+    def setUp(self):
+        self.ds = Dataset.from_dict({
+            "input_ids": [[1, 2, 3], [4, 5], [6], [7, 8, 9, 10], [11, 12], [13, 14, 15]],
+            "label": [0, 1, 0, 1, 0, 1],
+            "text": ["a", "b", "c", "d", "e", "f"],
+        })
+
+    def test_padding_longest(self):
+        """test padding to the longest row of each batch"""
+        source = BatchedTransferDataset(self.ds, ["input_ids", "label", "text"], 4, padding=True)
+        batches = list(source)
+        assert len(source) == len(batches) == 2
+        input_ids, label, text = batches[0]
+        assert np.array_equal(input_ids, [[1, 2, 3, 0], [4, 5, 0, 0], [6, 0, 0, 0], [7, 8, 9, 10]])
+        assert np.array_equal(label, [0, 1, 0, 1])
+        assert list(text) == ["a", "b", "c", "d"]
+        assert batches[1][0].shape == (2, 3)
+
+    def test_padding_max_length(self):
+        """test fixed length padding and truncation"""
+        source = BatchedTransferDataset(self.ds, ["input_ids"], 3, padding='max_length', max_length=3,
+                                        drop_remainder=True)
+        batches = list(source)
+        assert len(batches) == 2
+        assert np.array_equal(batches[1][0], [[7, 8, 9], [11, 12, 0], [13, 14, 15]])
+
+    def test_ragged_without_padding(self):
+        """test rows of different lengths without padding"""
+        with self.assertRaises(ValueError):
+            list(BatchedTransferDataset(self.ds, ["input_ids"], 2))
+
+    def test_shuffle(self):
+        """test shuffled batches cover every row once"""
+        source = BatchedTransferDataset(self.ds, ["label", "text"], 4, shuffle=True, seed=0)
+        texts = np.concatenate([text for _, text in source])
+        assert sorted(texts) == ["a", "b", "c", "d", "e", "f"]
+
+    def test_bucketing(self):
+        """test batches are drawn from a single bucket"""
+        source = BatchedTransferDataset(self.ds, ["input_ids", "label"], 2, shuffle=True, padding=True,
+                                        bucket_boundaries=[3], length_column="input_ids", seed=1)
+        batches = list(source)
+        assert len(source) == len(batches) == 4
+        for input_ids, _ in batches:
+            lengths = (input_ids != 0).sum(-1)
+            assert (lengths < 3).all() or (lengths >= 3).all()
+
+    def test_iterable_dataset(self):
+        """test batched transfer of an iterable dataset"""
+        source = BatchedTransferIterableDataset(self.ds.to_iterable_dataset(), ["input_ids", "label"], 4,
+                                                padding=True)
+        batches = list(source)
+        assert [batch[0].shape for batch in batches] == [(4, 4), (2, 3)]
+
+    def test_generator_dataset(self):
+        """test batched source with GeneratorDataset"""
+        source = BatchedTransferDataset(self.ds, ["input_ids", "label"], 4, padding=True)
+        dataset = GeneratorDataset(source, column_names=["input_ids", "label"], shuffle=False)
+        assert dataset.get_dataset_size() == 2
+        input_ids, label = next(dataset.create_tuple_iterator(output_numpy=True))
+        assert input_ids.shape == (4, 4)
+        assert label.shape == (4,)
@@ -15,6 +15,7 @@
 """Test Trainer run function"""
 # pylint: disable=C0103
 # pylint: disable=W0621
+# pylint: disable=W0212
 import unittest
 import numpy as np
 from ddt import ddt, data
@@ -171,3 +172,17 @@ class TestTrainerRun(unittest.TestCase):
         trainer = Trainer(network=net, train_dataset=self.train_dataset, epochs=2,
                           optimizer=self.optimizer)
         trainer.run()
+
+    def test_trainer_gradient_accumulation(self):
+        """test_trainer_gradient_accumulation"""
+        trainer = Trainer(network=self.net, train_dataset=self.train_dataset, epochs=2,
+                          optimizer=self.optimizer, loss_fn=self.loss_fn,
+                          gradient_accumulation_steps=2, logging_steps=2)
+        trainer.run(tgt_columns='label')
+        assert trainer._data_binding == (['data'], ['label'])
+
+    def test_trainer_invalid_accumulation_steps(self):
+        """test_trainer_invalid_accumulation_steps"""
+        with self.assertRaises(ValueError):
+            Trainer(network=self.net, train_dataset=self.train_dataset, epochs=2,
+                    optimizer=self.optimizer, loss_fn=self.loss_fn, gradient_accumulation_steps=0)
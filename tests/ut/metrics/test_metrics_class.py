@@ -302,6 +302,21 @@ class TestClassRougeN(unittest.TestCase):
 
         assert rougen_score == 0.5
 
+    def test_class_rougen_batch(self):
+        """
+        Test class RougeN
+        """
+        cand_list = [["a", "cat", "is", "on", "the", "table"],
+                     ["the", "cat", "was", "found", "under", "the", "bed"]]
+        ref_list = [[["there", "is", "a", "cat", "on", "the", "table"]],
+                    [["the", "cat", "was", "under", "the", "bed"]]]
+
+        metric = RougeN(2)
+        metric.update(cand_list, ref_list)
+        rougen_score = metric.eval()
+
+        assert np.allclose(rougen_score, 0.63636, 1e-5, 1e-5)
+
 class TestClassRougeL(unittest.TestCase):
     r"""
     Test class RougeL
@@ -394,6 +409,22 @@ class TestClassRougeL(unittest.TestCase):
 
         assert np.allclose(rougel_score, 0.78005, 1e-5, 1e-5)
 
+    def test_class_rougel_batch(self):
+        """
+        Test class RougeL
+        """
+        cand_list = [["The","cat","The","cat","on","the","mat"],
+                     ["The","cat","The","cat","on","the","mat"]]
+        ref_list = [[["The","cat","is","on","the","mat"]],
+                    [["There","is","a","cat","on","the","mat"]]]
+
+        metric = RougeL()
+        metric.update(cand_list, ref_list)
+
+        rougel_score = metric.eval()
+
+        assert np.allclose(rougel_score, 0.67573, 1e-5, 1e-5)
+
 class TestClassDistinct(unittest.TestCase):
     r"""
     Test class Distinct
@@ -319,6 +319,27 @@ class TestDecode(MindNLPTestCase):
 
             assert tuple(best_tag) == manual_best_tag
 
+    def test_batch_post_decode(self):
+        """test batch post decode returns padded tags and lengths."""
+        crf = make_crf()
+        # shape: (seq_length, batch_size, num_tags)
+        emissions = make_emissions(crf, 5, 4)
+        seq_length = mindspore.Tensor([5, 2, 1, 4], mindspore.int64)
+
+        score, history = crf(emissions, seq_length=seq_length)
+        best_tags, lengths = crf.batch_post_decode(score, history, seq_length, pad_tag=-1)
+        assert best_tags.shape == (4, 5)
+        assert lengths.asnumpy().tolist() == [5, 2, 1, 4]
+
+        best_tags_list = crf.post_decode(score, history, seq_length)
+        for tags, best_tag, length in zip(best_tags.asnumpy(), best_tags_list, [5, 2, 1, 4]):
+            assert tags[:length].tolist() == best_tag
+            assert (tags[length:] == -1).all()
+
+        # the tuple of per-step backpointers is accepted too
+        best_tags_tuple, _ = crf.batch_post_decode(score, tuple(history), seq_length, pad_tag=-1)
+        assert (best_tags_tuple.asnumpy() == best_tags.asnumpy()).all()
+
     def test_works_without_mask(self):
         """test works without mask."""
         crf = make_crf()
@@ -0,0 +1,66 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the binary cache of pretrained word vectors"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from mindnlp.modules.embeddings.utils import load_vectors, select_vectors, vectors_cache_paths
+from mindnlp.vocab import Vocab
+
+
+class VectorsCacheTest(unittest.TestCase):
+    """Test load_vectors and select_vectors"""
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.tokens = ['the', '. . .', 'cat', 'dog', 'café']
+        self.matrix = np.random.default_rng(0).standard_normal((5, 4)).astype(np.float32)
+        self.path = os.path.join(self.tmpdir.name, 'vectors.vec')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write('5 4\n')
+            for token, row in zip(self.tokens, self.matrix):
+                file.write(token + ' ' + ' '.join(map(str, row)) + ' \n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_load_vectors(self):
+        tokens, matrix = load_vectors(self.path, 4, skip_header=True)
+        self.assertListEqual(tokens, self.tokens)
+        self.assertTrue(np.allclose(matrix, self.matrix))
+        for cache_path in vectors_cache_paths(self.path):
+            self.assertTrue(os.path.exists(cache_path))
+
+        # the second load memory-maps the cache
+        tokens, matrix = load_vectors(self.path, 4, skip_header=True)
+        self.assertIsInstance(matrix, np.memmap)
+        self.assertListEqual(tokens, self.tokens)
+        self.assertTrue(np.allclose(matrix, self.matrix))
+
+    def test_wrong_dims(self):
+        with self.assertRaises(ValueError):
+            load_vectors(self.path, 5, skip_header=True)
+
+    def test_select_vectors(self):
+        tokens, matrix = load_vectors(self.path, 4, skip_header=True)
+        vocab = Vocab(['dog', 'unknown', 'the'], ['<pad>'])
+        embeddings = select_vectors(tokens, matrix, vocab)
+        self.assertEqual(embeddings.shape, (4, 4))
+        self.assertTrue(np.allclose(embeddings[1], self.matrix[3]))
+        self.assertTrue(np.allclose(embeddings[3], self.matrix[0]))
+        self.assertFalse(embeddings[0].any())
+        self.assertFalse(embeddings[2].any())
@@ -14,7 +14,10 @@
 # ============================================================================
 """Test Glove_embedding"""
 
+import os
+import tempfile
 import unittest
+import numpy as np
 from mindspore import Tensor
 from mindnlp.modules.embeddings.glove_embedding import Glove
 
@@ -41,3 +44,22 @@ class TestGlove(unittest.TestCase):
         g_res = embed(wordlist_input)
 
         assert g_res.shape == (2, 3)
+
+    def test_glove_save_load(self):
+        r"""
+        Unit test for glove embedding save and load.
+        """
+        init_embed = Tensor(np.random.randn(4, 3).astype(np.float32))
+        embed = Glove(init_embed=init_embed, dropout=0.1)
+        with tempfile.TemporaryDirectory() as root:
+            embed.save('test', root=root)
+            folder = os.path.join(root, 'embeddings', 'Glove', 'save', 'test')
+            loaded = Glove.load('test', root=root)
+            assert np.allclose(loaded.embed.asnumpy(), init_embed.asnumpy())
+            assert loaded.dropout_p == 0.1
+
+            # folders saved without the npy copy are parsed from text and cached
+            os.remove(os.path.join(folder, 'glove.npy'))
+            loaded = Glove.load('test', root=root)
+            assert np.allclose(loaded.embed.asnumpy(), init_embed.asnumpy(), atol=1e-6)
+            assert os.path.exists(os.path.join(folder, 'glove.npy'))
@@ -0,0 +1,187 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test mixed-adapter batches of Lora layers"""
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+    from mindspore import nn
+
+    from mindnlp.peft import LoraConfig, LoraModel
+
+
+if is_mindspore_available():
+    class TinyModel(nn.Cell):
+        """Two dense layers, the first one is adapted."""
+        def __init__(self):
+            super().__init__()
+            self.query = nn.Dense(8, 6)
+            self.out = nn.Dense(6, 3)
+
+        def construct(self, x):
+            return self.out(self.query(x))
+
+
+    class TinyEmbeddingModel(nn.Cell):
+        """An embedding followed by a dense layer, both adapted."""
+        def __init__(self):
+            super().__init__()
+            self.embed = nn.Embedding(10, 8)
+            self.query = nn.Dense(8, 6)
+
+        def construct(self, ids):
+            return self.query(self.embed(ids))
+
+
+@require_mindspore
+class LoraMixedAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.model = LoraModel(TinyModel(), LoraConfig(r=2, lora_alpha=4, target_modules=["query"]), "a")
+        self.model.peft_config["b"] = LoraConfig(r=4, lora_alpha=4, target_modules=["query"])
+        self.model.inject_adapter(self.model.model, "b")
+        rng = np.random.default_rng(0)
+        for name in ("a", "b"):
+            lora_B = self.model.model.query.lora_B[name].weight
+            lora_B.set_data(mindspore.tensor(rng.standard_normal(lora_B.shape), lora_B.dtype))
+        self.inputs = mindspore.tensor(rng.standard_normal((4, 5, 8)), mindspore.float32)
+
+    def _single_adapter(self, name):
+        self.model.set_adapter(name)
+        return self.model(self.inputs).asnumpy()
+
+    def test_mixed_batch_matches_single_adapter(self):
+        expected_a = self._single_adapter("a")
+        expected_b = self._single_adapter("b")
+        adapter_ids = mindspore.tensor([1, 0, -1, 1], mindspore.int32)
+        outputs = self.model(self.inputs, adapter_ids=adapter_ids).asnumpy()
+
+        self.assertTrue(np.allclose(outputs[0], expected_b[0], atol=1e-5))
+        self.assertTrue(np.allclose(outputs[1], expected_a[1], atol=1e-5))
+        self.assertTrue(np.allclose(outputs[3], expected_b[3], atol=1e-5))
+        # -1 runs the row through the base model only
+        base = self.model.model.out(self.model.model.query._linear(self.inputs)).asnumpy()
+        self.assertTrue(np.allclose(outputs[2], base[2], atol=1e-5))
+        self.assertIsNone(self.model.model.query.adapter_ids)
+
+    def test_mixed_batch_flattened_rows(self):
+        expected_b = self._single_adapter("b")
+        adapter_ids = mindspore.tensor([1, 1, 1, 1], mindspore.int32)
+        outputs = self.model(self.inputs.reshape(20, 8), adapter_ids=adapter_ids).asnumpy()
+        self.assertTrue(np.allclose(outputs, expected_b.reshape(20, 3), atol=1e-5))
+
+    def test_mixed_batch_wrong_rows(self):
+        adapter_ids = mindspore.tensor([0, 1, 0], mindspore.int32)
+        with self.assertRaises(ValueError):
+            self.model(self.inputs, adapter_ids=adapter_ids)
+
+    def test_mixed_batch_invalid_ids(self):
+        for adapter_ids in ([0, 2, 1, 0], [0, -2, 1, 0]):
+            with self.assertRaises(ValueError):
+                self.model(self.inputs, adapter_ids=mindspore.tensor(adapter_ids, mindspore.int32))
+        self.assertIsNone(self.model.model.query.adapter_ids)
+
+    def test_mixed_batch_ids_checked_once(self):
+        adapter_ids = mindspore.tensor([1, 0, -1, 1], mindspore.int32)
+        outputs = self.model(self.inputs, adapter_ids=adapter_ids).asnumpy()
+        checked_ids = self.model._checked_adapter_ids[2]
+        # the same tensor is not checked again, and lists are checked without a tensor
+        self.model(self.inputs, adapter_ids=adapter_ids)
+        self.assertIs(self.model._checked_adapter_ids[2], checked_ids)
+        list_outputs = self.model(self.inputs, adapter_ids=[1, 0, -1, 1]).asnumpy()
+        self.assertTrue(np.allclose(list_outputs, outputs, atol=1e-6))
+        with self.assertRaises(ValueError):
+            self.model(self.inputs, adapter_ids=[0, 2, 1, 0])
+
+    def test_mixed_batch_repacks_new_adapters(self):
+        self.model.pack_adapters()
+        self.model.peft_config["c"] = LoraConfig(r=2, lora_alpha=2, target_modules=["query"])
+        self.model.inject_adapter(self.model.model, "c")
+        lora_B = self.model.model.query.lora_B["c"].weight
+        lora_B.set_data(mindspore.tensor(np.ones(lora_B.shape), lora_B.dtype))
+        expected_c = self._single_adapter("c")
+
+        adapter_ids = mindspore.tensor([2, 2, 2, 2], mindspore.int32)
+        outputs = self.model(self.inputs, adapter_ids=adapter_ids).asnumpy()
+        self.assertEqual(self.model.packed_adapter_names, ["a", "b", "c"])
+        self.assertTrue(np.allclose(outputs, expected_c, atol=1e-5))
+
+    def test_mixed_batch_explicit_packing_is_kept(self):
+        expected_b = self._single_adapter("b")
+        self.model.pack_adapters(["b"])
+        self.model.peft_config["c"] = LoraConfig(r=2, lora_alpha=2, target_modules=["query"])
+        self.model.inject_adapter(self.model.model, "c")
+
+        adapter_ids = mindspore.tensor([0, 0, 0, 0], mindspore.int32)
+        outputs = self.model(self.inputs, adapter_ids=adapter_ids).asnumpy()
+        self.assertEqual(self.model.packed_adapter_names, ["b"])
+        self.assertTrue(np.allclose(outputs, expected_b, atol=1e-5))
+
+    def test_merge_matches_unmerged(self):
+        self.model.set_adapter("b")
+        expected = self.model(self.inputs).asnumpy()
+        weight = self.model.model.query.weight.asnumpy()
+
+        report = self.model.merge_adapter()
+        self.assertEqual(report["num_layers"], 1)
+        self.assertTrue(self.model.model.query.merged)
+        self.assertTrue(np.allclose(self.model(self.inputs).asnumpy(), expected, atol=1e-5))
+
+        self.model.unmerge_adapter()
+        self.assertFalse(self.model.model.query.merged)
+        self.assertTrue(np.allclose(self.model.model.query.weight.asnumpy(), weight, atol=1e-5))
+
+    def test_unmerge_with_residuals_is_exact(self):
+        query = self.model.model.query
+        query.weight.set_data(query.weight.astype(mindspore.float16))
+        weight = query.weight.asnumpy()
+
+        report = self.model.merge_adapter(residual_dtype=mindspore.float64)
+        self.assertEqual(report["residual_bytes"], weight.size * 8)
+        self.model.switch_adapter("a", residual_dtype=mindspore.float64)
+        self.model.unmerge_adapter()
+        np.testing.assert_array_equal(query.weight.asnumpy(), weight)
+        self.assertIsNone(query.merge_residual)
+
+    def test_delta_weight_is_computed_in_adapter_dtype(self):
+        query = self.model.model.query
+        query.weight.set_data(query.weight.astype(mindspore.float16))
+        delta = query.get_delta_weight("b")
+        self.assertEqual(delta.dtype, mindspore.float16)
+        expected = query.lora_B["b"].weight.asnumpy() @ query.lora_A["b"].weight.asnumpy() * query.scaling["b"]
+        np.testing.assert_allclose(delta.asnumpy(), expected.astype(np.float16), rtol=1e-3, atol=1e-3)
+
+
+@require_mindspore
+class LoraMergeAndUnloadTest(unittest.TestCase):
+    def test_merge_and_unload(self):
+        model = LoraModel(TinyEmbeddingModel(), LoraConfig(r=2, lora_alpha=4, target_modules=["embed", "query"]), "a")
+        rng = np.random.default_rng(0)
+        for param in (model.model.query.lora_B["a"].weight, model.model.embed.lora_embedding_B["a"]):
+            param.set_data(mindspore.tensor(rng.standard_normal(param.shape), param.dtype))
+        ids = mindspore.tensor(rng.integers(0, 10, (2, 5)), mindspore.int32)
+        expected = model(ids).asnumpy()
+
+        merged = model.merge_and_unload()
+        # the adapted layers are replaced by plain cells built on the merged weights
+        self.assertIs(type(merged.embed), nn.Embedding)
+        self.assertIs(type(merged.query), nn.Dense)
+        self.assertEqual(merged.embed.weight.shape, (10, 8))
+        self.assertEqual(merged.query.bias.shape, (6,))
+        self.assertTrue(np.allclose(merged(ids).asnumpy(), expected, atol=1e-5))
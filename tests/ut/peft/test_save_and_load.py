@@ -0,0 +1,88 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test saving and loading the adapters of a Peft model"""
+import tempfile
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+    from mindspore import nn
+
+    from mindnlp.peft import LoraConfig, PeftModel, get_peft_model_state_dict
+
+
+if is_mindspore_available():
+    class TinyModel(nn.Cell):
+        """A dense layer adapted by Lora, followed by a fully trained one."""
+        def __init__(self):
+            super().__init__()
+            self.query = nn.Dense(8, 6)
+            self.out = nn.Dense(6, 3)
+
+        def construct(self, x):
+            return self.out(self.query(x))
+
+
+@require_mindspore
+class PeftSaveLoadTest(unittest.TestCase):
+    def _peft_model(self, seed):
+        config = LoraConfig(r=2, lora_alpha=4, target_modules=["query"], modules_to_save=["out"])
+        model = PeftModel(TinyModel(), config)
+        rng = np.random.default_rng(seed)
+        for key, param in self._adapter_parameters(model).items():
+            param.set_data(mindspore.tensor(rng.standard_normal(param.shape), param.dtype))
+        return model
+
+    @staticmethod
+    def _adapter_parameters(model):
+        return {
+            key: param for key, param in model.parameters_dict().items()
+            if "lora_" in key or "modules_to_save" in key
+        }
+
+    def _check_round_trip(self, safe_serialization):
+        model = self._peft_model(0)
+        loaded = self._peft_model(1)
+        parameters = self._adapter_parameters(loaded)
+        self.assertEqual(len(parameters), 4)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model.save_pretrained(tmp_dir, safe_serialization=safe_serialization)
+            param_not_load, ckpt_not_load = loaded.load_adapter(tmp_dir, "default")
+        self.assertEqual(param_not_load, [])
+        self.assertEqual(ckpt_not_load, [])
+
+        expected = self._adapter_parameters(model)
+        for key, param in self._adapter_parameters(loaded).items():
+            # the weights are assigned to the existing parameters
+            self.assertIs(param, parameters[key])
+            np.testing.assert_array_equal(param.asnumpy(), expected[key].asnumpy())
+
+    def test_save_load_safetensors(self):
+        self._check_round_trip(safe_serialization=True)
+
+    def test_save_load_checkpoint(self):
+        self._check_round_trip(safe_serialization=False)
+
+    def test_modules_to_save_keys(self):
+        state_dict = get_peft_model_state_dict(self._peft_model(0))
+        # the adapter name and the wrapper of `modules_to_save` are stripped from the saved keys
+        suffixes = sorted(key.rsplit("model.", 1)[-1] for key in state_dict)
+        self.assertEqual(suffixes, ["out.bias", "out.weight", "query.lora_A.weight", "query.lora_B.weight"])
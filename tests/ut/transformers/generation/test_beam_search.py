@@ -0,0 +1,129 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the tensorized beam search scorer"""
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+    from mindspore import ops
+
+    from mindnlp.transformers.generation import BeamSearchScorer, TensorBeamSearchScorer
+
+
+@require_mindspore
+class TensorBeamSearchScorerTest(unittest.TestCase):
+    batch_size = 3
+    num_beams = 4
+    vocab_size = 10
+    pad_token_id = 0
+    eos_token_id = 1
+    max_length = 8
+
+    def _run(self, scorer_class, num_beam_groups=1, do_early_stopping=False, length_penalty=1.0):
+        scorer = scorer_class(
+            batch_size=self.batch_size,
+            num_beams=self.num_beams,
+            length_penalty=length_penalty,
+            do_early_stopping=do_early_stopping,
+            num_beam_hyps_to_keep=2,
+            num_beam_groups=num_beam_groups,
+            max_length=self.max_length,
+        )
+        group_size = self.num_beams // num_beam_groups
+        rng = np.random.default_rng(0)
+        input_ids = mindspore.tensor(
+            rng.integers(2, self.vocab_size, (self.batch_size * self.num_beams, 2)), mindspore.int64
+        )
+        beam_scores = ops.zeros(self.batch_size * self.num_beams, mindspore.float32)
+        outputs = []
+        while input_ids.shape[-1] < self.max_length:
+            next_input_ids = []
+            next_beam_scores = []
+            for group_index in range(num_beam_groups):
+                rows = np.concatenate(
+                    [
+                        np.arange(group_size) + b * self.num_beams + group_index * group_size
+                        for b in range(self.batch_size)
+                    ]
+                )
+                group_input_ids = input_ids[mindspore.tensor(rows)]
+                logprobs = np.log(rng.dirichlet(np.ones(self.vocab_size), self.batch_size * group_size))
+                scores = mindspore.tensor(logprobs, mindspore.float32) + beam_scores[mindspore.tensor(rows)][:, None]
+                scores = scores.view(self.batch_size, group_size * self.vocab_size)
+                next_scores, next_tokens = ops.topk(scores, 2 * group_size, dim=1, largest=True, sorted=True)
+                next_indices = ops.div(next_tokens, self.vocab_size, rounding_mode="floor")
+                next_tokens = next_tokens % self.vocab_size
+
+                beam_outputs = scorer.process(
+                    group_input_ids,
+                    next_scores,
+                    next_tokens.astype(mindspore.int64),
+                    next_indices,
+                    pad_token_id=self.pad_token_id,
+                    eos_token_id=self.eos_token_id,
+                    group_index=group_index,
+                )
+                outputs.append({k: v.asnumpy() for k, v in beam_outputs.items()})
+                beam_idx = beam_outputs["next_beam_indices"]
+                next_input_ids.append(
+                    ops.cat([group_input_ids[beam_idx], beam_outputs["next_beam_tokens"].unsqueeze(-1)], axis=-1)
+                )
+                next_beam_scores.append(beam_outputs["next_beam_scores"])
+
+            # interleave the groups back into `(batch_size * num_beams)`
+            input_ids = ops.stack(
+                [x.view(self.batch_size, group_size, -1) for x in next_input_ids], axis=1
+            ).view(self.batch_size * self.num_beams, -1)
+            beam_scores = ops.stack(
+                [x.view(self.batch_size, group_size) for x in next_beam_scores], axis=1
+            ).view(-1)
+            if scorer.is_done:
+                break
+
+        final = scorer.finalize(
+            input_ids,
+            beam_scores,
+            None,
+            None,
+            max_length=self.max_length,
+            pad_token_id=self.pad_token_id,
+            eos_token_id=self.eos_token_id,
+        )
+        return outputs, {k: v.asnumpy() for k, v in final.items() if v is not None}
+
+    def _assert_same(self, **kwargs):
+        expected_steps, expected = self._run(BeamSearchScorer, **kwargs)
+        steps, result = self._run(TensorBeamSearchScorer, **kwargs)
+        self.assertEqual(len(expected_steps), len(steps))
+        for expected_step, step in zip(expected_steps, steps):
+            for key, value in expected_step.items():
+                np.testing.assert_allclose(step[key], value, rtol=1e-5)
+        np.testing.assert_array_equal(result["sequences"], expected["sequences"])
+        np.testing.assert_allclose(result["sequence_scores"], expected["sequence_scores"], rtol=1e-5)
+
+    def test_matches_beam_search_scorer(self):
+        self._assert_same()
+
+    def test_matches_beam_search_scorer_early_stopping(self):
+        self._assert_same(do_early_stopping=True)
+        self._assert_same(do_early_stopping="never", length_penalty=2.0)
+
+    def test_matches_beam_search_scorer_groups(self):
+        self._assert_same(num_beam_groups=2)
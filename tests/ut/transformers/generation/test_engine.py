@@ -0,0 +1,84 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the continuous batching engine"""
+import asyncio
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+
+    from mindnlp.transformers import LlamaConfig, LlamaForCausalLM
+    from mindnlp.transformers.generation import AsyncGenerationEngine, ContinuousBatchingEngine
+
+
+@require_mindspore
+class ContinuousBatchingEngineTest(unittest.TestCase):
+    def setUp(self):
+        config = LlamaConfig(
+            vocab_size=99,
+            hidden_size=32,
+            num_hidden_layers=2,
+            num_attention_heads=4,
+            intermediate_size=37,
+            max_position_embeddings=64,
+            eos_token_id=None,
+        )
+        self.model = LlamaForCausalLM(config)
+        self.model.set_train(False)
+        self.prompts = [np.random.randint(1, 99, (length,)).tolist() for length in (3, 7, 5)]
+
+    def reference(self, prompt, max_new_tokens):
+        output = self.model.generate(
+            mindspore.Tensor([prompt], mindspore.int64), max_new_tokens=max_new_tokens, do_sample=False
+        )
+        return output[0].asnumpy().tolist()
+
+    def test_matches_generate(self):
+        engine = ContinuousBatchingEngine(self.model, max_batch_size=2, block_size=4)
+        outputs = engine.generate(self.prompts, max_new_tokens=4)
+        for prompt, output in zip(self.prompts, outputs):
+            self.assertListEqual(output, self.reference(prompt, 4))
+        # every block is back in the pool
+        self.assertEqual(engine.cache.num_used_blocks, 0)
+
+    def test_per_request_lengths(self):
+        engine = ContinuousBatchingEngine(self.model, max_batch_size=4, block_size=4)
+        streams = [
+            engine.add_request(prompt, max_new_tokens=max_new_tokens)
+            for prompt, max_new_tokens in zip(self.prompts, (2, 6, 4))
+        ]
+        tokens = [list(stream) for stream in streams]
+        self.assertListEqual([len(output) for output in tokens], [2, 6, 4])
+        self.assertListEqual(self.prompts[1] + tokens[1], self.reference(self.prompts[1], 6))
+
+    def test_background_and_async(self):
+        engine = ContinuousBatchingEngine(self.model, max_batch_size=2, block_size=4)
+        async_engine = AsyncGenerationEngine(engine)
+
+        async def collect(prompt):
+            return [token async for token in async_engine.generate(prompt, max_new_tokens=3)]
+
+        async def run():
+            return await asyncio.gather(*(collect(prompt) for prompt in self.prompts))
+
+        outputs = asyncio.run(run())
+        async_engine.shutdown()
+        for prompt, output in zip(self.prompts, outputs):
+            self.assertListEqual(prompt + output, self.reference(prompt, 3))
@@ -0,0 +1,121 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the n-gram blocking and bad words logits processors"""
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+    from mindspore import ops
+
+    from mindnlp.transformers.generation import (
+        EncoderNoRepeatNGramLogitsProcessor,
+        NoBadWordsLogitsProcessor,
+        NoRepeatNGramLogitsProcessor,
+    )
+
+
+def _reference_banned_ngram_tokens(ngram_size, prev_tokens, source_tokens):
+    """Python n-gram dictionary, as in fairseq."""
+    generated_ngrams = {}
+    for ngram in zip(*[source_tokens[i:] for i in range(ngram_size)]):
+        generated_ngrams.setdefault(tuple(ngram[:-1]), set()).add(ngram[-1])
+    cur_len = len(prev_tokens)
+    return generated_ngrams.get(tuple(prev_tokens[cur_len + 1 - ngram_size:cur_len]), set())
+
+
+@require_mindspore
+class LogitsProcessorTest(unittest.TestCase):
+    vocab_size = 8
+
+    def _banned(self, scores):
+        return [set(np.nonzero(np.isinf(row))[0].tolist()) for row in scores.asnumpy()]
+
+    def test_no_repeat_ngram_dist_processor(self):
+        input_ids = mindspore.tensor([[1, 1, 2, 1], [0, 1, 0, 1]], mindspore.int64)
+        scores = ops.ones((2, 5), mindspore.float32)
+
+        no_repeat_proc_2_gram = NoRepeatNGramLogitsProcessor(2)
+        no_repeat_proc_3_gram = NoRepeatNGramLogitsProcessor(3)
+
+        # 2-gram would forbid 2nd and 3rd token (1,2) at 1st batch and 1st token (0) at 2nd batch
+        self.assertListEqual(self._banned(no_repeat_proc_2_gram(input_ids, scores.copy())), [{1, 2}, {0}])
+        # 3-gram would forbid no token at 1st batch and 1st token (0) at 2nd batch
+        self.assertListEqual(self._banned(no_repeat_proc_3_gram(input_ids, scores.copy())), [set(), {0}])
+
+    def test_no_repeat_ngram_random(self):
+        rng = np.random.default_rng(0)
+        for ngram_size in (1, 2, 3, 4):
+            tokens = rng.integers(0, 4, (6, 12))
+            scores = ops.zeros((6, self.vocab_size), mindspore.float32)
+            processed = NoRepeatNGramLogitsProcessor(ngram_size)(mindspore.tensor(tokens, mindspore.int64), scores)
+            expected = [_reference_banned_ngram_tokens(ngram_size, row.tolist(), row.tolist()) for row in tokens]
+            self.assertListEqual(self._banned(processed), expected)
+
+    def test_no_repeat_ngram_before_first_ngram(self):
+        # with `ngram_size - 1` tokens there is no complete n-gram to ban yet
+        input_ids = mindspore.tensor([[1, 1], [0, 1]], mindspore.int64)
+        scores = ops.ones((2, 5), mindspore.float32)
+        processed = NoRepeatNGramLogitsProcessor(3)(input_ids, scores)
+        self.assertListEqual(self._banned(processed), [set(), set()])
+
+    def test_encoder_no_repeat_ngram_before_ngram_size(self):
+        # the n-grams come from the encoder, so `ngram_size - 1` decoder tokens are enough to ban one
+        encoder_input_ids = mindspore.tensor([[1, 2, 3], [0, 1, 0]], mindspore.int64)
+        input_ids = mindspore.tensor([[1, 2], [1, 1]], mindspore.int64)
+        scores = ops.ones((2, 5), mindspore.float32)
+        processed = EncoderNoRepeatNGramLogitsProcessor(3, encoder_input_ids)(input_ids, scores)
+        self.assertListEqual(self._banned(processed), [{3}, set()])
+
+    def test_encoder_no_repeat_ngram_random(self):
+        rng = np.random.default_rng(1)
+        batch_size, num_beams = 2, 3
+        encoder_tokens = rng.integers(0, 4, (batch_size, 10))
+        tokens = rng.integers(0, 4, (batch_size * num_beams, 7))
+        processor = EncoderNoRepeatNGramLogitsProcessor(2, mindspore.tensor(encoder_tokens, mindspore.int64))
+        scores = ops.zeros((batch_size * num_beams, self.vocab_size), mindspore.float32)
+        processed = processor(mindspore.tensor(tokens, mindspore.int64), scores)
+        expected = [
+            _reference_banned_ngram_tokens(2, row.tolist(), encoder_tokens[idx // num_beams].tolist())
+            for idx, row in enumerate(tokens)
+        ]
+        self.assertListEqual(self._banned(processed), expected)
+
+    def test_no_bad_words_dist_processor(self):
+        input_ids = mindspore.tensor([[0, 1, 3, 1], [0, 1, 0, 1]], mindspore.int64)
+        scores = ops.ones((2, 5), mindspore.float32)
+
+        bad_word_tokens = [[1], [4], [1, 0], [0, 1, 2], [1, 3, 1, 3], [2, 2, 2, 2, 2]]
+        no_bad_words_dist_proc = NoBadWordsLogitsProcessor(bad_words_ids=bad_word_tokens, eos_token_id=4)
+
+        # batch 1: 1st, 2nd, and 4th (0, 1, 3) token are forbidden
+        # batch 2: 1st, 2nd, and 3rd (0, 1, 2) token are forbidden
+        # Note that 5th element cannot be forbidden as it is EOS token
+        self.assertListEqual(self._banned(no_bad_words_dist_proc(input_ids, scores)), [{0, 1, 3}, {0, 1, 2}])
+
+        # check edge case
+        no_bad_words_dist_proc = NoBadWordsLogitsProcessor(bad_words_ids=[[4]], eos_token_id=4)
+        filtered_scores = no_bad_words_dist_proc(input_ids, scores.copy())
+        self.assertTrue(np.allclose(scores.asnumpy(), filtered_scores.asnumpy(), atol=1e-3))
+
+    def test_no_bad_words_out_of_vocabulary(self):
+        input_ids = mindspore.tensor([[0, 1], [1, 1]], mindspore.int64)
+        scores = ops.ones((2, 5), mindspore.float32)
+        no_bad_words_dist_proc = NoBadWordsLogitsProcessor(bad_words_ids=[[0, 1, 7], [1, 2]], eos_token_id=None)
+        self.assertListEqual(self._banned(no_bad_words_dist_proc(input_ids, scores)), [{2}, {2}])
@@ -0,0 +1,127 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the text streamers"""
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    from mindnlp.transformers.generation import BatchTextIteratorStreamer, TextIteratorStreamer, TextStreamer
+
+
+class ByteTokenizer:
+    """One token per UTF-8 byte, incomplete characters decode to U+FFFD. Byte 0 is the special padding token."""
+
+    def __init__(self):
+        self.decoded_tokens = 0
+
+    def encode(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode(self, token_ids, **kwargs):
+        self.decoded_tokens += len(token_ids)
+        if kwargs.get("skip_special_tokens"):
+            token_ids = [idx for idx in token_ids if idx != 0]
+        return bytes(token_ids).decode("utf-8", errors="replace")
+
+
+class PieceTokenizer:
+    """SentencePiece-like pieces, where "▁" marks a space that is dropped at the start of the text."""
+
+    pieces = ["▁Hello", "▁world", ",", "▁how", "▁are", "▁you", "?", "▁I", "'m", "▁fine"]
+
+    def encode(self, text):
+        return [self.pieces.index(piece) for piece in text]
+
+    def decode(self, token_ids, **kwargs):
+        text = "".join(self.pieces[idx] for idx in token_ids).replace("▁", " ")
+        return text[1:] if text.startswith(" ") else text
+
+
+def _stream(streamer, prompt, new_tokens):
+    streamer.put(np.array([prompt]))
+    for token in new_tokens:
+        streamer.put(np.array([token]))
+    streamer.end()
+
+
+@require_mindspore
+class StreamerTest(unittest.TestCase):
+    def test_text_streamer_prints_prompt_and_tokens(self):
+        tokenizer = ByteTokenizer()
+        printed = []
+        with mock.patch("builtins.print", lambda text, **kwargs: printed.append(text)):
+            _stream(TextStreamer(tokenizer), tokenizer.encode("Héllo"), tokenizer.encode(" wörld 你好"))
+        self.assertEqual("".join(printed), "Héllo wörld 你好")
+        # incomplete characters are held back, never printed
+        self.assertTrue(all("�" not in text for text in printed))
+
+    def test_iterator_streamer_skip_prompt(self):
+        tokenizer = PieceTokenizer()
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True)
+        _stream(streamer, [0, 1, 2], [3, 4, 5, 6])
+        chunks = list(streamer)
+        self.assertEqual(chunks, [" how", " are", " you", "?"])
+
+    def test_matches_full_decode(self):
+        rng = np.random.default_rng(0)
+        tokenizer = PieceTokenizer()
+        for _ in range(20):
+            tokens = rng.integers(0, len(tokenizer.pieces), 12).tolist()
+            streamer = TextIteratorStreamer(tokenizer)
+            _stream(streamer, tokens[:1], tokens[1:])
+            self.assertEqual("".join(streamer), tokenizer.decode(tokens))
+
+    def test_decode_work_is_constant_per_token(self):
+        tokenizer = ByteTokenizer()
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True)
+        _stream(streamer, tokenizer.encode("prompt"), tokenizer.encode("a" * 1000))
+        self.assertEqual("".join(streamer), "a" * 1000)
+        self.assertLess(tokenizer.decoded_tokens, 20 * 1000)
+
+    def test_batch_streamer(self):
+        tokenizer = ByteTokenizer()
+        streamer = BatchTextIteratorStreamer(tokenizer, batch_size=2, skip_prompt=True)
+        first, second = tokenizer.encode("ab€"), tokenizer.encode("cd好")
+        streamer.put(np.array([[1], [2]]))
+        for tokens in zip(first, second):
+            streamer.put(np.array(tokens))
+        streamer.end()
+        self.assertEqual(len(streamer), 2)
+        self.assertEqual(list(streamer[0]), ["a", "b", "€"])
+        self.assertEqual(list(streamer[1]), ["c", "d", "好"])
+
+    def test_batch_streamer_finished_rows(self):
+        tokenizer = ByteTokenizer()
+        streamer = BatchTextIteratorStreamer(tokenizer, batch_size=2, skip_prompt=True, skip_special_tokens=True)
+        streamer.put(np.array([[1], [2]]))
+        streamer.put(np.array(tokenizer.encode("ab")))
+        # the first row is finished and only pads from here on
+        for token in tokenizer.encode("c" * 1000):
+            streamer.put(np.array([0, token]))
+        streamer.end()
+        self.assertEqual("".join(streamer[0]), "a")
+        self.assertEqual("".join(streamer[1]), "b" + "c" * 1000)
+        self.assertLess(tokenizer.decoded_tokens, 20 * 2000)
+
+    def test_batch_size_mismatch(self):
+        with self.assertRaises(ValueError):
+            TextStreamer(ByteTokenizer()).put(np.array([[1], [2]]))
+        with self.assertRaises(ValueError):
+            BatchTextIteratorStreamer(ByteTokenizer(), batch_size=3).put(np.array([1, 2]))
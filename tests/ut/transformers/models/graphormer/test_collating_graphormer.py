@@ -0,0 +1,93 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the Graphormer shortest paths and preprocessing cache"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from mindnlp.transformers.models.graphormer.collating_graphormer import (
+    UNREACHABLE_NODE_DISTANCE,
+    bfs_shortest_path,
+    gen_edge_input_from_predecessors,
+    preprocess_item,
+)
+
+
+def _reference_distances(edge_index, num_nodes):
+    """Dense Floyd-Warshall, as in `algos_graphormer.floyd_warshall`."""
+    dist = np.full((num_nodes, num_nodes), UNREACHABLE_NODE_DISTANCE, dtype=np.int64)
+    dist[edge_index[0], edge_index[1]] = 1
+    np.fill_diagonal(dist, 0)
+    for k in range(num_nodes):
+        dist = np.minimum(dist, dist[:, k:k + 1] + dist[k:k + 1, :])
+    return np.minimum(dist, UNREACHABLE_NODE_DISTANCE)
+
+
+def _random_graph(rng, num_nodes, num_edges):
+    edges = rng.integers(0, num_nodes, (2, num_edges))
+    return np.concatenate([edges, edges[::-1]], axis=1)
+
+
+class GraphormerShortestPathTest(unittest.TestCase):
+    def test_bfs_matches_floyd_warshall(self):
+        rng = np.random.default_rng(0)
+        for num_nodes in (1, 2, 5, 12, 30):
+            edge_index = _random_graph(rng, num_nodes, num_nodes)
+            dist, _ = bfs_shortest_path(edge_index, num_nodes)
+            np.testing.assert_array_equal(dist, _reference_distances(edge_index, num_nodes))
+
+    def test_edge_input_follows_shortest_paths(self):
+        rng = np.random.default_rng(1)
+        num_nodes = 12
+        edge_index = _random_graph(rng, num_nodes, 18)
+        edge_feat = rng.integers(0, 100, (num_nodes, num_nodes, 2))
+        dist, predecessors = bfs_shortest_path(edge_index, num_nodes)
+        max_dist = int(dist[dist < UNREACHABLE_NODE_DISTANCE].max())
+        edge_input = gen_edge_input_from_predecessors(max_dist, dist, predecessors, edge_feat)
+
+        for i in range(num_nodes):
+            for j in range(num_nodes):
+                if i == j or dist[i, j] == UNREACHABLE_NODE_DISTANCE:
+                    self.assertTrue((edge_input[i, j] == -1).all())
+                    continue
+                path = [j]
+                while path[-1] != i:
+                    path.append(predecessors[i, path[-1]])
+                path = path[::-1]
+                self.assertEqual(len(path) - 1, dist[i, j])
+                for k in range(len(path) - 1):
+                    np.testing.assert_array_equal(edge_input[i, j, k], edge_feat[path[k], path[k + 1]])
+                self.assertTrue((edge_input[i, j, len(path) - 1:] == -1).all())
+
+    def test_preprocess_item_cache(self):
+        item = {
+            "edge_index": np.array([[0, 1, 1, 2], [1, 0, 2, 1]]),
+            "edge_attr": np.arange(8).reshape(4, 2),
+            "node_feat": np.ones((3, 1), dtype=np.int64),
+            "num_nodes": 3,
+            "y": [1],
+        }
+        with tempfile.TemporaryDirectory() as cache_dir:
+            expected = preprocess_item(dict(item), cache_dir=cache_dir)
+            num_files = sum(len(files) for _, _, files in os.walk(cache_dir))
+            self.assertEqual(num_files, 2)
+
+            cached = preprocess_item(dict(item), cache_dir=cache_dir)
+            self.assertIsInstance(cached["input_edges"], np.memmap)
+            np.testing.assert_array_equal(cached["spatial_pos"], expected["spatial_pos"])
+            np.testing.assert_array_equal(cached["input_edges"], expected["input_edges"])
+            np.testing.assert_array_equal(expected["spatial_pos"], [[1, 2, 3], [2, 1, 2], [3, 2, 1]])
@@ -383,6 +383,47 @@ class LlamaModelTest(ModelTesterMixin, GenerationTesterMixin, unittest.TestCase)
         # The output should be different for long inputs
         self.assertFalse(np.allclose(original_long_output.asnumpy(), scaled_long_output.asnumpy(), atol=1e-5))
 
+    def test_generate_with_static_cache(self):
+        config, inputs_dict = self.model_tester.prepare_config_and_inputs_for_common()
+        input_ids = inputs_dict["input_ids"]
+        attention_mask = ops.ones_like(input_ids)
+
+        model = LlamaForCausalLM(config)
+        model.set_train(False)
+
+        dynamic_output = model.generate(input_ids, attention_mask=attention_mask, max_new_tokens=5, do_sample=False)
+        static_output = model.generate(
+            input_ids, attention_mask=attention_mask, max_new_tokens=5, do_sample=False, cache_implementation="static"
+        )
+        self.assertListEqual(dynamic_output.asnumpy().tolist(), static_output.asnumpy().tolist())
+
+        # the preallocated buffers are reused by a second call with the same shapes
+        cache = model._cache
+        model.generate(
+            input_ids, attention_mask=attention_mask, max_new_tokens=5, do_sample=False, cache_implementation="static"
+        )
+        self.assertIs(cache, model._cache)
+
+    def test_num_logits_to_keep(self):
+        config, inputs_dict = self.model_tester.prepare_config_and_inputs_for_common()
+        input_ids = inputs_dict["input_ids"]
+        attention_mask = ops.ones_like(input_ids)
+
+        model = LlamaForCausalLM(config)
+        model.set_train(False)
+
+        all_logits = model(input_ids, attention_mask=attention_mask).logits
+        last_logits = model(input_ids, attention_mask=attention_mask, num_logits_to_keep=1).logits
+        self.assertEqual(last_logits.shape, (input_ids.shape[0], 1, config.vocab_size))
+        self.assertTrue(np.allclose(all_logits[:, -1:].asnumpy(), last_logits.asnumpy(), atol=1e-5))
+
+        # generate only computes the last logits by default, which must not change the output
+        full_output = model.generate(
+            input_ids, attention_mask=attention_mask, max_new_tokens=5, do_sample=False, num_logits_to_keep=0
+        )
+        output = model.generate(input_ids, attention_mask=attention_mask, max_new_tokens=5, do_sample=False)
+        self.assertListEqual(full_output.asnumpy().tolist(), output.asnumpy().tolist())
+
     @slow
     def test_generate_padding_right(self):
         """
@@ -18,6 +18,7 @@ import copy
 import inspect
 import os
 import tempfile
+import types
 import unittest
 
 import numpy as np
@@ -51,7 +52,16 @@ if is_mindspore_available():
         WhisperModel,
         WhisperProcessor,
     )
-    from mindnlp.transformers.models.whisper.modeling_whisper import WhisperDecoder, WhisperEncoder, sinusoids
+    from mindnlp.transformers.generation import GenerationConfig
+    from mindnlp.transformers.generation.utils import GreedySearchEncoderDecoderOutput
+    from mindnlp.transformers.models.whisper.modeling_whisper import (
+        WhisperDecoder,
+        WhisperEncoder,
+        _long_form_windows,
+        _split_timestamp_segments,
+        _stitch_segments,
+        sinusoids,
+    )
 
 
 def prepare_whisper_inputs_dict(
@@ -1336,6 +1346,85 @@ class WhisperModelIntegrationTests(MindNLPTestCase):
         self.assertTrue(prompt in text)
 
 
+@require_mindspore
+class WhisperLongFormTest(unittest.TestCase):
+    timestamp_begin = 1000
+    eos_token_id = 500
+    decoder_start_token_id = 600
+
+    def _timestamp(self, seconds):
+        return self.timestamp_begin + int(round(seconds / 0.02))
+
+    def _split(self, tokens):
+        return _split_timestamp_segments(
+            tokens, self.timestamp_begin, self.eos_token_id, self.decoder_start_token_id, 0.02, 30.0
+        )
+
+    def test_long_form_windows(self):
+        self.assertListEqual(_long_form_windows(100, 3000, 2500), [0])
+        self.assertListEqual(_long_form_windows(3000, 3000, 2500), [0])
+        self.assertListEqual(_long_form_windows(3001, 3000, 2500), [0, 2500])
+        self.assertListEqual(_long_form_windows(8000, 3000, 2500), [0, 2500, 5000])
+
+    def test_split_timestamp_segments(self):
+        ts = self._timestamp
+        # prompt tokens before <|startoftranscript|>, then a language token
+        tokens = [7, 8, self.decoder_start_token_id, 601, ts(0), 1, 2, ts(10), ts(10), 3, ts(24), ts(24), 4, 5]
+        segments = self._split(tokens + [self.eos_token_id, self.eos_token_id])
+        self.assertListEqual(
+            [(seg["start"], seg["end"], seg["tokens"], seg["complete"]) for seg in segments],
+            [(0.0, 10.0, [1, 2], True), (10.0, 24.0, [3], True), (24.0, 30.0, [4, 5], False)],
+        )
+
+    def test_stitch_segments(self):
+        ts = self._timestamp
+        first = self._split([self.decoder_start_token_id, ts(0), 1, ts(10), ts(10), 2, ts(26), ts(26), 3])
+        # the cut off segment starts at 26 s, inside the second window, which sees it whole
+        second = self._split([self.decoder_start_token_id, ts(1), 3, ts(4), ts(4), 4, ts(12), self.eos_token_id])
+        stitched = _stitch_segments([first, second], [0.0, 25.0])
+        self.assertListEqual(
+            [(seg["start"], seg["end"], seg["tokens"]) for seg in stitched],
+            [(0.0, 10.0, [1]), (10.0, 26.0, [2]), (26.0, 29.0, [3]), (29.0, 37.0, [4])],
+        )
+
+        # a segment cut off before the next window starts is kept, and trimmed to the next kept segment
+        cut_first = self._split([self.decoder_start_token_id, ts(0), 1, ts(12), ts(12), 2, 3])
+        cut_second = self._split([self.decoder_start_token_id, ts(0), 3, ts(3), ts(3), 4, ts(8), self.eos_token_id])
+        stitched = _stitch_segments([cut_first, cut_second], [0.0, 25.0])
+        self.assertListEqual(
+            [(seg["start"], seg["end"], seg["tokens"]) for seg in stitched],
+            [(0.0, 12.0, [1]), (12.0, 28.0, [2, 3]), (28.0, 33.0, [4])],
+        )
+
+        # a segment taken again by the next window is dropped
+        repeated = self._split([self.decoder_start_token_id, ts(0), 2, ts(1), ts(1), 3, ts(8)])
+        stitched = _stitch_segments([first[:2], repeated], [0.0, 23.0])
+        self.assertListEqual([seg["tokens"] for seg in stitched], [[1], [2], [3]])
+
+    def test_long_form_dict_outputs(self):
+        tokens = [self.decoder_start_token_id, self._timestamp(0), 1, 2, self._timestamp(10), self.eos_token_id]
+
+        def generate(input_features, generation_config, **kwargs):
+            sequences = mindspore.tensor([tokens] * input_features.shape[0], mindspore.int64)
+            if kwargs.get("return_dict_in_generate"):
+                return GreedySearchEncoderDecoderOutput(sequences=sequences)
+            return sequences
+
+        model = types.SimpleNamespace(generate=generate, _window_frames=lambda: 3000, config=WhisperConfig())
+        generation_config = GenerationConfig(
+            no_timestamps_token_id=self.timestamp_begin - 1,
+            eos_token_id=self.eos_token_id,
+            decoder_start_token_id=self.decoder_start_token_id,
+        )
+        input_features = ops.zeros((1, 80, 5000), mindspore.float32)
+        for return_dict_in_generate in (False, True):
+            sequences = WhisperForConditionalGeneration._generate_long_form(
+                model, input_features, generation_config, return_dict_in_generate=return_dict_in_generate
+            )
+            # each of the two windows transcribes one segment, at 0 s and 25 s
+            self.assertListEqual(sequences.asnumpy().tolist(), [[1, 2, 1, 2]])
+
+
 def prepare_whisper_encoder_inputs_dict(config, input_features, head_mask=None):
     if head_mask is None:
         head_mask = ops.ones((config.encoder_layers, config.encoder_attention_heads))
@@ -182,6 +182,17 @@ class CommonPipelineTest(unittest.TestCase):
         outputs = text_classifier(["This is great !"] * 20, batch_size=32)
         self.assertEqual(len(outputs), 20)
 
+    @require_mindspore
+    def test_batched_outputs_match_unbatched(self):
+        text_classifier = pipeline(model="hf-internal-testing/tiny-random-distilbert")
+        texts = ["This is great !", "Short", "This is a much longer sentence that needs padding", "Ok"] * 5
+
+        expected = nested_simplify(text_classifier(texts))
+        self.assertEqual(nested_simplify(text_classifier(texts, batch_size=3)), expected)
+        self.assertEqual(nested_simplify(text_classifier(texts, batch_size=4, sort_by_length=True)), expected)
+        outputs = text_classifier((text for text in texts), batch_size=4, num_workers=2, sort_by_length=True)
+        self.assertEqual(nested_simplify(list(outputs)), expected)
+
 
 @is_pipeline_test
 class PipelineScikitCompatTest(unittest.TestCase):
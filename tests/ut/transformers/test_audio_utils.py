@@ -0,0 +1,82 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the spectrogram functions of audio_utils"""
+import unittest
+
+import numpy as np
+
+from mindnlp.transformers.audio_utils import mel_filter_bank, spectrogram, spectrogram_batch, window_function
+
+
+def _reference_spectrogram(waveform, window, frame_length, hop_length, fft_length=None, power=1.0, center=True,
+                           preemphasis=None, remove_dc_offset=None):
+    """Frame by frame STFT in float64, used as ground truth."""
+    fft_length = fft_length or frame_length
+    if center:
+        waveform = np.pad(waveform, frame_length // 2, mode="reflect")
+    waveform = waveform.astype(np.float64)
+    num_frames = 1 + (waveform.size - frame_length) // hop_length
+    frames = []
+    for idx in range(num_frames):
+        buffer = np.zeros(fft_length)
+        buffer[:frame_length] = waveform[idx * hop_length: idx * hop_length + frame_length]
+        if remove_dc_offset:
+            buffer[:frame_length] -= buffer[:frame_length].mean()
+        if preemphasis is not None:
+            buffer[1:frame_length] -= preemphasis * buffer[: frame_length - 1]
+            buffer[0] *= 1 - preemphasis
+        buffer[:frame_length] *= window
+        frames.append(np.fft.rfft(buffer))
+    spec = np.stack(frames).T
+    return np.abs(spec) ** power if power is not None else spec
+
+
+class SpectrogramTest(unittest.TestCase):
+    """Test spectrogram and spectrogram_batch"""
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.waveforms = [rng.standard_normal(length).astype(np.float32) for length in (4000, 5321, 1600)]
+        self.window = window_function(400, "hann")
+        self.mel_filters = mel_filter_bank(201, 80, 0.0, 8000.0, 16000, norm="slaney", mel_scale="slaney")
+
+    def test_matches_reference(self):
+        for kwargs in [{"power": 1.0}, {"power": 2.0}, {"power": None},
+                       {"power": 2.0, "center": False, "fft_length": 512, "preemphasis": 0.97,
+                        "remove_dc_offset": True}]:
+            expected = _reference_spectrogram(self.waveforms[0], self.window, 400, 160, **kwargs)
+            result = spectrogram(self.waveforms[0], self.window, 400, 160, **kwargs)
+            self.assertEqual(result.shape, expected.shape)
+            self.assertTrue(np.allclose(result, expected, rtol=1e-4, atol=1e-4))
+
+    def test_float32_compute(self):
+        kwargs = {"power": 2.0, "mel_filters": self.mel_filters, "log_mel": "log10"}
+        expected = spectrogram(self.waveforms[0], self.window, 400, 160, **kwargs)
+        result = spectrogram(self.waveforms[0], self.window, 400, 160, compute_dtype=np.float32, **kwargs)
+        self.assertEqual(result.dtype, np.float32)
+        self.assertTrue(np.allclose(result, expected, atol=1e-4))
+
+    def test_batch_matches_single(self):
+        kwargs = {"power": 2.0, "mel_filters": self.mel_filters, "log_mel": "dB", "db_range": 80.0}
+        batch, num_frames = spectrogram_batch(self.waveforms, self.window, 400, 160, padding_value=-1.0, **kwargs)
+        self.assertEqual(batch.shape, (len(self.waveforms), 80, max(num_frames)))
+        for waveform, result, frames_count in zip(self.waveforms, batch, num_frames):
+            expected = spectrogram(waveform, self.window, 400, 160, **kwargs)
+            self.assertEqual(frames_count, expected.shape[-1])
+            self.assertTrue(np.allclose(result[:, :frames_count], expected, atol=1e-4))
+            self.assertTrue((result[:, frames_count:] == -1.0).all())
+
+    def test_too_short_waveform(self):
+        with self.assertRaises(ValueError):
+            spectrogram_batch([np.zeros(100, np.float32)], self.window, 400, 160, center=False)
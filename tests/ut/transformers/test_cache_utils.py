@@ -0,0 +1,134 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test cache utils"""
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+    from mindspore import ops
+
+    from mindnlp.transformers import LlamaConfig, LlamaForCausalLM
+    from mindnlp.transformers.cache_utils import DynamicCache, PagedCache
+
+
+@require_mindspore
+class PagedCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.config = LlamaConfig(
+            vocab_size=99,
+            hidden_size=32,
+            num_hidden_layers=2,
+            num_attention_heads=4,
+            num_key_value_heads=2,
+            intermediate_size=37,
+        )
+
+    def random_states(self, batch_size, seq_len):
+        shape = (batch_size, 2, seq_len, 8)
+        return (
+            mindspore.Tensor(np.random.randn(*shape), mindspore.float32),
+            mindspore.Tensor(np.random.randn(*shape), mindspore.float32),
+        )
+
+    def test_matches_dynamic_cache(self):
+        paged_cache = PagedCache(self.config, num_blocks=8, block_size=4)
+        dynamic_cache = DynamicCache()
+        for seq_len in (5, 1, 1, 3):
+            for layer_idx in range(self.config.num_hidden_layers):
+                key_states, value_states = self.random_states(2, seq_len)
+                paged_keys, paged_values = paged_cache.update(key_states, value_states, layer_idx)
+                dynamic_keys, dynamic_values = dynamic_cache.update(key_states, value_states, layer_idx)
+                self.assertTrue(np.allclose(paged_keys.asnumpy(), dynamic_keys.asnumpy()))
+                self.assertTrue(np.allclose(paged_values.asnumpy(), dynamic_values.asnumpy()))
+        self.assertEqual(paged_cache.get_seq_length(), dynamic_cache.get_seq_length())
+        # 10 tokens per sequence in blocks of 4 tokens
+        self.assertEqual(paged_cache.num_used_blocks, 6)
+
+    def test_free_returns_blocks(self):
+        cache = PagedCache(self.config, num_blocks=4, block_size=4)
+        for layer_idx in range(self.config.num_hidden_layers):
+            cache.update(*self.random_states(2, 6), layer_idx)
+        self.assertEqual(cache.num_free_blocks, 0)
+        with self.assertRaises(RuntimeError):
+            cache.update(*self.random_states(2, 4), 0)
+
+        cache.reset()
+        self.assertEqual(cache.num_free_blocks, 4)
+
+    def test_out_of_blocks_leaves_cache_unchanged(self):
+        cache = PagedCache(self.config, num_blocks=3, block_size=4)
+        for layer_idx in range(self.config.num_hidden_layers):
+            cache.update(*self.random_states(2, 3), layer_idx)
+        block_tables = {seq_id: list(blocks) for seq_id, blocks in cache.block_tables.items()}
+        # the first sequence fits in the last free block, the second one does not
+        with self.assertRaises(RuntimeError):
+            cache.update(*self.random_states(2, 2), 0)
+        self.assertEqual(cache.block_tables, block_tables)
+        self.assertEqual(list(cache.seq_lengths.values()), [3, 3])
+        self.assertEqual(cache.num_free_blocks, 1)
+
+    def test_gather_before_update(self):
+        cache = PagedCache(self.config, num_blocks=4, block_size=4)
+        self.assertEqual(cache.get_seq_length(), 0)
+        with self.assertRaises(ValueError):
+            _ = cache[0]
+        cache.set_batch([cache.add_sequence()])
+        with self.assertRaises(ValueError):
+            cache.update(*self.random_states(1, 2), 1)
+
+    def test_fork_copy_on_write(self):
+        cache = PagedCache(self.config, num_blocks=8, block_size=4)
+        parent = cache.add_sequence()
+        cache.set_batch([parent])
+        for layer_idx in range(self.config.num_hidden_layers):
+            cache.update(*self.random_states(1, 6), layer_idx)
+        parent_keys = cache[0][0].asnumpy()
+
+        child = cache.fork_sequence(parent)
+        # the prefix is shared, not copied
+        self.assertEqual(cache.num_used_blocks, 2)
+
+        cache.set_batch([parent, child])
+        for layer_idx in range(self.config.num_hidden_layers):
+            keys, _ = cache.update(*self.random_states(2, 1), layer_idx)
+            self.assertTrue(np.allclose(keys[:, :, :6].asnumpy(), np.concatenate([parent_keys] * 2)))
+        # the partially filled block is copied for the child, the full one stays shared
+        self.assertEqual(cache.num_used_blocks, 3)
+        self.assertEqual(cache.block_tables[parent][0], cache.block_tables[child][0])
+        self.assertNotEqual(cache.block_tables[parent][1], cache.block_tables[child][1])
+
+        cache.free_sequence(parent)
+        self.assertEqual(cache.num_used_blocks, 2)
+
+    def test_generate_with_paged_cache(self):
+        model = LlamaForCausalLM(self.config)
+        model.set_train(False)
+        input_ids = mindspore.Tensor(np.random.randint(1, 99, (2, 7)), mindspore.int64)
+        attention_mask = ops.ones_like(input_ids)
+
+        dynamic_output = model.generate(input_ids, attention_mask=attention_mask, max_new_tokens=5, do_sample=False)
+        paged_output = model.generate(
+            input_ids,
+            attention_mask=attention_mask,
+            max_new_tokens=5,
+            do_sample=False,
+            past_key_values=PagedCache(self.config, num_blocks=8, block_size=4),
+        )
+        self.assertListEqual(dynamic_output.asnumpy().tolist(), paged_output.asnumpy().tolist())
@@ -0,0 +1,64 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the lazy import of mindnlp.transformers"""
+import os
+import subprocess
+import sys
+import unittest
+
+from mindnlp.utils.testing_utils import require_mindspore
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True, cwd=REPO_ROOT
+    ).stdout.strip()
+
+
+@require_mindspore
+class LazyImportTest(unittest.TestCase):
+    def test_import_does_not_load_model_packages(self):
+        loaded = _run(
+            "import sys, mindnlp\n"
+            "print(sorted(m for m in sys.modules if m.startswith('mindnlp.transformers.models.')))"
+        )
+        self.assertNotIn("mindnlp.transformers.models.bert", loaded)
+        self.assertNotIn("mindnlp.transformers.models.seamless_m4t", loaded)
+
+    def test_only_requested_package_is_loaded(self):
+        loaded = _run(
+            "import sys\n"
+            "from mindnlp.transformers import BertModel\n"
+            "print(sorted({m.split('.')[3] for m in sys.modules if m.startswith('mindnlp.transformers.models.')}))"
+        )
+        self.assertIn("bert", loaded)
+        self.assertNotIn("whisper", loaded)
+        self.assertNotIn("bark", loaded)
+
+    def test_public_names_resolve(self):
+        from mindnlp import transformers
+        from mindnlp.transformers import models
+        from mindnlp.transformers.models import auto
+
+        for module in (auto, models, transformers):
+            for name in module.__all__:
+                self.assertTrue(hasattr(module, name), f"{module.__name__}.{name}")
+        self.assertIs(models.bert.BertModel, transformers.BertModel)
+        self.assertIs(auto.AutoModel, transformers.AutoModel)
+
+    def test_import_structure_up_to_date(self):
+        subprocess.run([sys.executable, "scripts/generate_import_structure.py", "--check"], check=True, cwd=REPO_ROOT)
@@ -0,0 +1,131 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the cached causal masks of AttentionMaskConverter"""
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+    from mindspore import ops
+
+    from mindnlp.transformers.modeling_attn_mask_utils import AttentionMaskConverter, _prepare_4d_causal_attention_mask
+
+
+def _reference_causal_mask(tgt_len, past_key_values_length, sliding_window=None):
+    """Causal mask built from scratch, 1 where masked."""
+    query_positions = np.arange(tgt_len)[:, None] + past_key_values_length
+    key_positions = np.arange(tgt_len + past_key_values_length)[None, :]
+    masked = key_positions > query_positions
+    if sliding_window is not None:
+        masked |= key_positions <= query_positions - sliding_window
+    return masked
+
+
+@require_mindspore
+class AttentionMaskConverterTest(unittest.TestCase):
+    def setUp(self):
+        AttentionMaskConverter.clear_cache()
+
+    def tearDown(self):
+        AttentionMaskConverter.clear_cache()
+
+    def _check(self, mask, tgt_len, past_key_values_length, sliding_window=None):
+        expected = _reference_causal_mask(tgt_len, past_key_values_length, sliding_window)
+        mask = mask.asnumpy()
+        self.assertEqual(mask.shape[-2:], expected.shape)
+        self.assertTrue((mask[..., expected] == np.finfo(np.float32).min).all())
+        self.assertTrue((mask[..., ~expected] == 0).all())
+
+    def test_make_causal_mask(self):
+        for sliding_window in (None, 1, 3):
+            for tgt_len, past_key_values_length in [(5, 0), (1, 7), (4, 3), (9, 0), (3, 20)]:
+                mask = AttentionMaskConverter._make_causal_mask(
+                    (2, tgt_len), mindspore.float32, past_key_values_length, sliding_window
+                )
+                self.assertEqual(mask.shape, (2, 1, tgt_len, tgt_len + past_key_values_length))
+                self._check(mask, tgt_len, past_key_values_length, sliding_window)
+
+    def test_cache_reuse_and_growth(self):
+        first = AttentionMaskConverter._causal_mask_2d(4, 4, mindspore.float32)
+        self.assertIs(AttentionMaskConverter._causal_mask_2d(4, 4, mindspore.float32), first)
+        # decoding steps are sliced from the maximal mask without being cached
+        AttentionMaskConverter._causal_mask_2d(1, 5, mindspore.float32)
+        self.assertEqual(len(AttentionMaskConverter._causal_mask_cache), 1)
+        # a longer mask grows the maximal mask, previous slices stay valid
+        self._check(AttentionMaskConverter._causal_mask_2d(6, 30, mindspore.float32), 6, 24)
+        self._check(first, 4, 0)
+
+    def test_cache_is_bounded(self):
+        max_cached_masks = AttentionMaskConverter.max_cached_masks
+        AttentionMaskConverter.max_cached_masks = 2
+        try:
+            for tgt_len in (2, 3, 4):
+                AttentionMaskConverter._causal_mask_2d(tgt_len, tgt_len, mindspore.float32)
+            self.assertEqual(len(AttentionMaskConverter._causal_mask_cache), 2)
+        finally:
+            AttentionMaskConverter.max_cached_masks = max_cached_masks
+
+    def test_longer_than_cached_length(self):
+        max_cached_mask_length = AttentionMaskConverter.max_cached_mask_length
+        AttentionMaskConverter.max_cached_mask_length = 8
+        try:
+            self._check(AttentionMaskConverter._causal_mask_2d(3, 12, mindspore.float32, 4), 3, 9, 4)
+            self._check(AttentionMaskConverter._causal_mask_2d(1, 20, mindspore.float32), 1, 19)
+            self._check(AttentionMaskConverter._causal_mask_2d(10, 10, mindspore.float32, 3), 10, 0, 3)
+            self.assertEqual(len(AttentionMaskConverter._full_causal_masks), 0)
+            self.assertEqual(len(AttentionMaskConverter._causal_mask_cache), 0)
+        finally:
+            AttentionMaskConverter.max_cached_mask_length = max_cached_mask_length
+
+    def test_full_masks_are_bounded(self):
+        max_cached_full_masks = AttentionMaskConverter.max_cached_full_masks
+        AttentionMaskConverter.max_cached_full_masks = 1
+        try:
+            AttentionMaskConverter._causal_mask_2d(4, 4, mindspore.float32)
+            self._check(AttentionMaskConverter._causal_mask_2d(4, 4, mindspore.float32, 2), 4, 0, 2)
+            self.assertEqual(list(AttentionMaskConverter._full_causal_masks), [(2, str(mindspore.float32))])
+        finally:
+            AttentionMaskConverter.max_cached_full_masks = max_cached_full_masks
+
+    def test_cached_elements_are_bounded(self):
+        max_cached_mask_elements = AttentionMaskConverter.max_cached_mask_elements
+        AttentionMaskConverter.max_cached_mask_elements = 40
+        try:
+            AttentionMaskConverter._causal_mask_2d(4, 4, mindspore.float32)
+            AttentionMaskConverter._causal_mask_2d(4, 6, mindspore.float32)
+            # 16 + 24 elements fit, another 16 evicts the least recently used slice
+            self.assertEqual(AttentionMaskConverter._cached_mask_elements, 40)
+            AttentionMaskConverter._causal_mask_2d(2, 8, mindspore.float32)
+            self.assertEqual(len(AttentionMaskConverter._causal_mask_cache), 2)
+            self.assertEqual(AttentionMaskConverter._cached_mask_elements, 40)
+            # slices larger than the budget are returned without being cached
+            self._check(AttentionMaskConverter._causal_mask_2d(7, 7, mindspore.float32), 7, 0)
+            self.assertNotIn((7, 7, None, str(mindspore.float32)), AttentionMaskConverter._causal_mask_cache)
+        finally:
+            AttentionMaskConverter.max_cached_mask_elements = max_cached_mask_elements
+
+    def test_prepare_4d_causal_attention_mask(self):
+        attention_mask = mindspore.tensor([[0, 1, 1, 1, 1, 1], [1, 1, 1, 1, 1, 1]], mindspore.int64)
+        inputs_embeds = ops.zeros((2, 4, 8), mindspore.float32)
+        mask = _prepare_4d_causal_attention_mask(attention_mask, (2, 4), inputs_embeds, 2).asnumpy()
+        expected = _reference_causal_mask(4, 2)
+        self.assertTrue((mask[1, 0][expected] < 0).all())
+        self.assertTrue((mask[1, 0][~expected] == 0).all())
+        # the padded first position is masked for every query of the first sequence
+        self.assertTrue((mask[0, 0, :, 0] < 0).all())
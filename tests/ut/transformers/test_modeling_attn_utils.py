@@ -0,0 +1,63 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the grouped-query attention utility"""
+import math
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+    from mindspore import ops
+
+    from mindnlp.transformers.modeling_attn_utils import grouped_query_attention, repeat_kv
+
+
+@require_mindspore
+class GroupedQueryAttentionTest(unittest.TestCase):
+    def _reference(self, query_states, key_states, value_states, attention_mask):
+        n_rep = query_states.shape[1] // key_states.shape[1]
+        key_states = repeat_kv(key_states, n_rep)
+        value_states = repeat_kv(value_states, n_rep)
+        attn_weights = ops.matmul(query_states, key_states.swapaxes(2, 3)) / math.sqrt(query_states.shape[-1])
+        attn_weights = ops.softmax(attn_weights + attention_mask, axis=-1, dtype=mindspore.float32)
+        return ops.matmul(attn_weights, value_states), attn_weights
+
+    def test_matches_repeated_key_values(self):
+        rng = np.random.default_rng(0)
+        for num_heads, num_key_value_heads in [(8, 8), (8, 2), (8, 1)]:
+            query_states = mindspore.tensor(rng.standard_normal((2, num_heads, 3, 16)), mindspore.float32)
+            key_states = mindspore.tensor(rng.standard_normal((2, num_key_value_heads, 5, 16)), mindspore.float32)
+            value_states = mindspore.tensor(rng.standard_normal((2, num_key_value_heads, 5, 16)), mindspore.float32)
+            attention_mask = mindspore.tensor(rng.standard_normal((2, 1, 3, 5)), mindspore.float32)
+
+            attn_output, attn_weights = grouped_query_attention(query_states, key_states, value_states, attention_mask)
+            expected_output, expected_weights = self._reference(query_states, key_states, value_states, attention_mask)
+            self.assertEqual(attn_output.shape, (2, num_heads, 3, 16))
+            self.assertEqual(attn_weights.shape, (2, num_heads, 3, 5))
+            self.assertTrue(np.allclose(attn_output.asnumpy(), expected_output.asnumpy(), atol=1e-5))
+            self.assertTrue(np.allclose(attn_weights.asnumpy(), expected_weights.asnumpy(), atol=1e-5))
+
+    def test_invalid_shapes(self):
+        query_states = ops.zeros((1, 6, 2, 4), mindspore.float32)
+        key_states = ops.zeros((1, 4, 2, 4), mindspore.float32)
+        with self.assertRaises(ValueError):
+            grouped_query_attention(query_states, key_states, key_states)
+        key_states = ops.zeros((1, 2, 2, 4), mindspore.float32)
+        with self.assertRaises(ValueError):
+            grouped_query_attention(query_states, key_states, key_states, ops.zeros((1, 1, 2, 3), mindspore.float32))
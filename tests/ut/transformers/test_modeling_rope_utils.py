@@ -0,0 +1,84 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test the shared rotary embedding tables"""
+import unittest
+
+import numpy as np
+
+from mindnlp.utils import is_mindspore_available
+from mindnlp.utils.testing_utils import require_mindspore
+
+if is_mindspore_available():
+    import mindspore
+
+    from mindnlp.transformers.modeling_rope_utils import RotaryEmbedding, RotaryEmbeddingTables
+
+
+def _reference_tables(dim, seq_len, base=10000, scaling_type=None, scaling_factor=1.0, max_position_embeddings=2048):
+    if scaling_type == "dynamic" and seq_len > max_position_embeddings:
+        base = base * ((scaling_factor * seq_len / max_position_embeddings) - (scaling_factor - 1)) ** (dim / (dim - 2))
+    inv_freq = 1.0 / (base ** (np.arange(0, dim, 2) / dim))
+    t = np.arange(seq_len, dtype=np.float64)
+    if scaling_type == "linear":
+        t = t / scaling_factor
+    emb = np.concatenate([np.outer(t, inv_freq)] * 2, axis=-1)
+    return np.cos(emb), np.sin(emb)
+
+
+class LinearScalingRotaryEmbedding(RotaryEmbedding):
+    scaling_type = "linear"
+
+
+@require_mindspore
+class RotaryEmbeddingTablesTest(unittest.TestCase):
+    def setUp(self):
+        RotaryEmbeddingTables.clear()
+
+    def tearDown(self):
+        RotaryEmbeddingTables.clear()
+
+    def _check(self, tables, expected):
+        for table, reference in zip(tables, expected):
+            self.assertEqual(table.shape, reference.shape)
+            self.assertTrue(np.allclose(table.asnumpy(), reference, atol=1e-4))
+
+    def test_tables(self):
+        for scaling_type in (None, "linear", "dynamic"):
+            tables = RotaryEmbeddingTables.get(
+                16, 40, scaling_type=scaling_type, scaling_factor=2.0, max_position_embeddings=32
+            )
+            self._check(tables, _reference_tables(16, 40, 10000, scaling_type, 2.0, 32))
+
+    def test_shared_and_grown(self):
+        layers = [RotaryEmbedding(16, max_position_embeddings=8) for _ in range(3)]
+        x = mindspore.ops.zeros((1, 2, 4, 16), mindspore.float32)
+        first = layers[0](x, seq_len=4)
+        for layer in layers[1:]:
+            self.assertIs(layer(x, seq_len=4)[0], first[0])
+        self.assertEqual(len(RotaryEmbeddingTables._tables), 1)
+
+        # growing past the cached length doubles the tables
+        self._check(layers[1](x, seq_len=9), _reference_tables(16, 9))
+        self.assertEqual(RotaryEmbeddingTables._tables[(16, 10000, None, 1.0, 8, str(mindspore.float32))]["length"], 16)
+
+    def test_gather(self):
+        layer = LinearScalingRotaryEmbedding(8, max_position_embeddings=16, scaling_factor=4.0)
+        position_ids = mindspore.tensor([[3, 4, 5], [0, 1, 2]], mindspore.int64)
+        cos, sin = layer.gather(position_ids, 6, mindspore.float16)
+        self.assertEqual(cos.shape, (2, 3, 8))
+        self.assertEqual(cos.dtype, mindspore.float16)
+        expected_cos, expected_sin = _reference_tables(8, 6, scaling_type="linear", scaling_factor=4.0)
+        self.assertTrue(np.allclose(cos.asnumpy(), expected_cos[position_ids.asnumpy()], atol=1e-3))
+        self.assertTrue(np.allclose(sin.asnumpy(), expected_sin[position_ids.asnumpy()], atol=1e-3))
@@ -18,7 +18,16 @@ Test Download
 
 import unittest
 import os
-from mindnlp.utils.download import get_cache_path, check_md5, get_filepath, match_file
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.exceptions import HTTPError
+from mindnlp.utils.download import get_cache_path, check_md5, get_filepath, match_file, http_get, \
+    get_checkpoint_shard_files
 
 class TestGetCachePath(unittest.TestCase):
     r"""
@@ -72,3 +81,139 @@ class TestMatchFile(unittest.TestCase):
         path = os.path.expanduser('~')
         match_file_result = match_file(name, path)
         assert match_file_result == ''
+
+
+class _RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves `server.files`, supports `Range` requests and can cut the first response of a file short."""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split("/")[-1]
+        if path not in server.files:
+            self.send_response(404)
+            self.end_headers()
+            return
+        content = server.files[path]
+        with server.lock:
+            server.requests.append((path, self.headers.get("Range")))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+            start = 0
+            range_header = self.headers.get("Range")
+            if range_header and server.support_range:
+                start = int(range_header[len("bytes="):].split("-")[0])
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+            else:
+                self.send_response(200)
+            body = content[start:]
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if path in server.cut_once:
+                server.cut_once.discard(path)
+                body = body[: len(body) // 2]
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+class TestHttpGet(unittest.TestCase):
+    r"""
+    Test http_get resume and concurrent shard download against a local server
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeRequestHandler)
+        self.server.files = {}
+        self.server.requests = []
+        self.server.cut_once = set()
+        self.server.support_range = True
+        self.server.delay = 0
+        self.server.active = 0
+        self.server.max_active = 0
+        self.server.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def _add_file(self, name, size=1000000):
+        content = os.urandom(size)
+        self.server.files[name] = content
+        return content, hashlib.md5(content).hexdigest()
+
+    def test_resume_partial_file(self):
+        content, md5sum = self._add_file("model.bin")
+        with open(os.path.join(self.tmpdir.name, "model.bin_tmp"), "wb") as f:
+            f.write(content[:1000])
+
+        path = http_get(f"{self.base_url}/model.bin", self.tmpdir.name, md5sum=md5sum)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(self.server.requests, [("model.bin", "bytes=1000-")])
+        self.assertFalse(os.path.exists(path + "_tmp"))
+
+    def test_resume_after_interrupted_connection(self):
+        content, md5sum = self._add_file("model.bin")
+        self.server.cut_once.add("model.bin")
+
+        path = http_get(f"{self.base_url}/model.bin", self.tmpdir.name, md5sum=md5sum)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIsNone(self.server.requests[0][1])
+        # the second request resumes from the bytes received before the connection broke
+        self.assertTrue(self.server.requests[1][1].startswith("bytes="))
+        self.assertGreater(int(self.server.requests[1][1][len("bytes="):-1]), 0)
+
+    def test_server_without_range_support(self):
+        content, md5sum = self._add_file("model.bin")
+        self.server.support_range = False
+        with open(os.path.join(self.tmpdir.name, "model.bin_tmp"), "wb") as f:
+            f.write(b"stale")
+
+        path = http_get(f"{self.base_url}/model.bin", self.tmpdir.name, md5sum=md5sum)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_md5_mismatch(self):
+        self._add_file("model.bin")
+        with self.assertRaises(HTTPError):
+            http_get(f"{self.base_url}/model.bin", self.tmpdir.name, md5sum="0" * 32)
+
+    def test_shards_downloaded_concurrently(self):
+        shards = [f"model-0000{i}-of-00004.bin" for i in range(1, 5)]
+        contents = {shard: self._add_file(shard, 10000)[0] for shard in shards}
+        self.server.delay = 0.2
+        index_file = os.path.join(self.tmpdir.name, "model.bin.index.json")
+        with open(index_file, "w") as f:
+            json.dump({"metadata": {}, "weight_map": {f"w{i}": shard for i, shard in enumerate(shards)}}, f)
+
+        filenames, _ = get_checkpoint_shard_files(
+            "org/model",
+            index_file,
+            cache_dir=os.path.join(self.tmpdir.name, "cache"),
+            endpoint=self.base_url + "/{}/resolve/main/{}",
+            max_workers=4,
+        )
+        self.assertEqual([os.path.basename(name) for name in filenames], shards)
+        for name, shard in zip(filenames, shards):
+            with open(name, "rb") as f:
+                self.assertEqual(f.read(), contents[shard])
+        self.assertGreater(self.server.max_active, 1)
@@ -0,0 +1,178 @@
+# Copyright 2024 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+Test lazy checkpoint loading
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import types
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+import numpy as np
+from ml_dtypes import bfloat16
+
+from mindnlp.utils import is_safetensors_available
+from mindnlp.utils.serialization import (
+    MAGIC_NUMBER,
+    PROTOCOL_VERSION,
+    LazyTensor,
+    load,
+    load_checkpoint_lazy,
+    save_safetensors,
+)
+
+
+@unittest.skipUnless(is_safetensors_available(), "safetensors is not installed")
+class TestLazySafetensors(unittest.TestCase):
+    r"""
+    Test load_checkpoint_lazy on safetensors files
+    """
+
+    def setUp(self):
+        from safetensors.numpy import save_file
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "model.safetensors")
+        self.tensors = {
+            "encoder.gamma": np.random.randn(4, 3).astype(np.float32),
+            "encoder.beta": np.random.randn(3).astype(np.float16),
+            "ids": np.arange(5, dtype=np.int64),
+        }
+        save_file(self.tensors, self.filename)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_values_are_read_on_access(self):
+        state_dict = load_checkpoint_lazy(self.filename)
+        self.assertEqual(set(state_dict.keys()), set(self.tensors))
+        self.assertTrue(all(isinstance(value, LazyTensor) for value in state_dict._tensors.values()))
+
+        param = state_dict.pop("encoder.gamma")
+        np.testing.assert_array_equal(param.asnumpy(), self.tensors["encoder.gamma"])
+        self.assertNotIn("encoder.gamma", state_dict)
+        self.assertIsNone(state_dict.pop("encoder.gamma", None))
+        np.testing.assert_array_equal(state_dict["ids"].asnumpy(), self.tensors["ids"])
+
+    def test_rename_keys(self):
+        state_dict = load_checkpoint_lazy(self.filename).rename_keys(
+            lambda key: key.replace("gamma", "weight").replace("beta", "bias")
+        )
+        self.assertEqual(set(state_dict.keys()), {"encoder.weight", "encoder.bias", "ids"})
+        np.testing.assert_array_equal(state_dict.pop("encoder.bias").asnumpy(), self.tensors["encoder.beta"])
+
+    def test_bfloat16_converted_to_float16(self):
+        # safetensors.numpy cannot write bfloat16, so write the file by hand
+        array = np.random.randn(2, 2).astype(bfloat16)
+        header = b'{"w":{"dtype":"BF16","shape":[2,2],"data_offsets":[0,8]}}'
+        filename = os.path.join(self.tmpdir.name, "bf16.safetensors")
+        with open(filename, "wb") as f:
+            f.write(len(header).to_bytes(8, "little") + header + array.tobytes())
+
+        param = load_checkpoint_lazy(filename)["w"]
+        self.assertEqual(param.asnumpy().dtype, np.float16)
+        np.testing.assert_array_equal(param.asnumpy(), array.astype(np.float16))
+
+    def test_save_safetensors(self):
+        from safetensors.numpy import load_file
+
+        filename = os.path.join(self.tmpdir.name, "saved.safetensors")
+        save_safetensors(self.tensors, filename, metadata={"format": "np"})
+
+        loaded = load_file(filename)
+        self.assertEqual(set(loaded), set(self.tensors))
+        for key, value in self.tensors.items():
+            np.testing.assert_array_equal(loaded[key], value)
+        np.testing.assert_array_equal(load_checkpoint_lazy(filename)["ids"].asnumpy(), self.tensors["ids"])
+
+
+def _save_legacy_checkpoint(state_dict, filename):
+    """Write numpy float32 arrays in the legacy (non-zip) `torch.save` format."""
+    torch_module = types.ModuleType("torch")
+    utils_module = types.ModuleType("torch._utils")
+
+    class FloatStorage:  # pylint: disable=too-few-public-methods
+        pass
+
+    def _rebuild_tensor_v2(*args):
+        return args
+
+    # pickle stores globals by module and qualified name
+    FloatStorage.__module__, FloatStorage.__qualname__ = "torch", "FloatStorage"
+    _rebuild_tensor_v2.__module__, _rebuild_tensor_v2.__qualname__ = "torch._utils", "_rebuild_tensor_v2"
+    torch_module.FloatStorage = FloatStorage
+    utils_module._rebuild_tensor_v2 = _rebuild_tensor_v2
+
+    class Storage:  # pylint: disable=too-few-public-methods
+        def __init__(self, key, array):
+            self.key, self.array = key, array
+
+    class Tensor:  # pylint: disable=too-few-public-methods
+        def __init__(self, key, array):
+            self.storage, self.array = Storage(key, array), array
+
+        def __reduce__(self):
+            strides = tuple(stride // self.array.itemsize for stride in self.array.strides)
+            return _rebuild_tensor_v2, (self.storage, 0, self.array.shape, strides, False, OrderedDict())
+
+    class Pickler(pickle.Pickler):
+        def persistent_id(self, obj):
+            if isinstance(obj, Storage):
+                return ("storage", FloatStorage, obj.key, "cpu", obj.array.size, None)
+            return None
+
+    with mock.patch.dict(sys.modules, {"torch": torch_module, "torch._utils": utils_module}), \
+            open(filename, "wb") as f:
+        for value in (MAGIC_NUMBER, PROTOCOL_VERSION, {"protocol_version": PROTOCOL_VERSION}):
+            pickle.dump(value, f, protocol=2)
+        Pickler(f, protocol=2).dump({key: Tensor(key, value) for key, value in state_dict.items()})
+        pickle.dump(list(state_dict), f, protocol=2)
+        for value in state_dict.values():
+            f.write(value.size.to_bytes(8, "little"))
+            f.write(value.tobytes())
+
+
+class TestLegacyTorchLoad(unittest.TestCase):
+    r"""
+    Test loading PyTorch checkpoints saved in the legacy (non-zip) format
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "pytorch_model.bin")
+        self.state_dict = {
+            "dense.weight": np.random.randn(4, 3).astype(np.float32),
+            "dense.bias": np.random.randn(3).astype(np.float32),
+        }
+        _save_legacy_checkpoint(self.state_dict, self.filename)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_load(self):
+        loaded = load(self.filename)
+        self.assertEqual(set(loaded), set(self.state_dict))
+        for key, value in self.state_dict.items():
+            np.testing.assert_array_equal(loaded[key].asnumpy(), value)
+
+    def test_load_checkpoint_lazy_falls_back(self):
+        state_dict = load_checkpoint_lazy(self.filename)
+        np.testing.assert_array_equal(state_dict["dense.weight"].asnumpy(), self.state_dict["dense.weight"])
+        np.testing.assert_array_equal(state_dict["dense.bias"].asnumpy(), self.state_dict["dense.bias"])